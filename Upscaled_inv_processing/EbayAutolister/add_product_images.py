@@ -42,17 +42,8 @@ def search_product_image(brand: str, model: str) -> str:
 def get_item_id_from_sku(api: EbayTradingAPI, sku: str) -> str:
     """Get eBay Item ID from SKU using GetItem call"""
 
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<GetItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <SKU>{sku}</SKU>
-    <IncludeItemSpecifics>false</IncludeItemSpecifics>
-</GetItemRequest>'''
-
     try:
-        response = api._make_xml_request('GetItem', xml_request)
+        response = api._make_xml_request('GetItem', api.builder.get_item(sku=sku))
         return response.get('ItemID')
     except:
         return None
@@ -60,26 +51,8 @@ def get_item_id_from_sku(api: EbayTradingAPI, sku: str) -> str:
 
 def update_item_images(api: EbayTradingAPI, item_id: str, image_urls: list) -> bool:
     """Update an existing eBay listing with new images"""
-
-    # Build PictureURL elements
-    picture_urls = '\n'.join([f'<PictureURL>{url}</PictureURL>' for url in image_urls])
-
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<ReviseFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <ItemID>{item_id}</ItemID>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-            {picture_urls}
-        </PictureDetails>
-    </Item>
-</ReviseFixedPriceItemRequest>'''
-
     try:
-        response = api._make_xml_request('ReviseFixedPriceItem', xml_request)
+        response = api.revise_item_pictures(item_id, image_urls)
         if response.get('Ack') in ['Success', 'Warning']:
             return True
         return False
@@ -13,6 +13,8 @@ import pandas as pd
 from agents import Agent, Runner, function_tool
 from openai import OpenAI
 
+from enrichment_cache import KIND_AGENT, EnrichmentCache, get_enrichment_cache, product_key
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -581,12 +583,19 @@ If any agent fails, try to work with available data or request clarification.
 class AgentBasedEnricher:
     """AI Agent-based product enrichment system"""
 
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        cache: Optional[EnrichmentCache] = None,
+        use_cache: bool = True
+    ):
         """
         Initialize the enrichment system.
 
         Args:
             openai_api_key: OpenAI API key (or reads from env)
+            cache: Enrichment cache for enrich_product_cached (default: global cache)
+            use_cache: Set False to research every product again
         """
         self.api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -594,6 +603,8 @@ class AgentBasedEnricher:
 
         os.environ["OPENAI_API_KEY"] = self.api_key
         self.coordinator = create_coordinator_agent()
+        self.cache = (cache or get_enrichment_cache()) if use_cache else None
+        self._memo: Dict[tuple, EnrichedProduct] = {}
 
     def enrich_product(
         self,
@@ -666,6 +677,41 @@ Coordinate with your specialized agents and compile complete results.
                 confidence_score=0.0
             )
 
+    def enrich_product_cached(
+        self,
+        sku: str,
+        brand: str,
+        model: str,
+        condition: str
+    ) -> EnrichedProduct:
+        """
+        Enrich a product, reusing the result for the same brand/model/condition.
+
+        Each distinct product runs the agent workflow once per run (and once
+        per cache TTL when a cache is configured); duplicates get a copy with
+        their own SKU. Failed enrichments are not reused.
+        """
+        # Pricing depends on condition, so it is part of the key
+        key = product_key(brand, model, variant=condition)
+
+        product = self._memo.get(key)
+        if product is None and self.cache:
+            data = self.cache.get(KIND_AGENT, key)
+            if data:
+                logger.info(f"Using cached enrichment for {sku}: {brand} {model}")
+                product = EnrichedProduct(**data)
+
+        if product is None:
+            product = self.enrich_product(sku, brand, model, condition)
+            if product.confidence_score <= 0:
+                return product
+            if self.cache:
+                self.cache.put(KIND_AGENT, key, asdict(product))
+
+        self._memo[key] = product
+        # asdict() deep-copies, so rows never share item specifics or image lists
+        return EnrichedProduct(**{**asdict(product), 'sku': sku, 'condition': condition})
+
     def _parse_agent_output(
         self,
         sku: str,
@@ -731,8 +777,8 @@ Coordinate with your specialized agents and compile complete results.
                 logger.warning(f"Skipping row {idx}: missing brand and model")
                 continue
 
-            # Enrich the product
-            enriched = self.enrich_product(sku, brand, model, condition)
+            # Enrich the product (duplicates of an earlier row reuse its result)
+            enriched = self.enrich_product_cached(sku, brand, model, condition)
             enriched_products.append(asdict(enriched))
 
             logger.info(f"Progress: {idx + 1}/{len(df)}")
@@ -4,13 +4,13 @@ Automatically find and upload stock product images to eBay listings
 Uses web search and image scraping to find official product photos
 """
 
-import requests
 import os
-import csv
-import time
 import json
 from dotenv import load_dotenv
 from ebay_trading_uploader import EbayTradingAPI
+from image_hashing import get_hash_index
+from image_pipeline import (ImagePipeline, ImageSource, get_image_cache, print_result, print_summary,
+                            read_item_mapping)
 from openai import OpenAI
 
 load_dotenv()
@@ -19,6 +19,8 @@ load_dotenv()
 def find_product_images_with_ai(brand: str, model: str, openai_client) -> list:
     """
     Use OpenAI to search the web and find official product images
+
+    Returns candidate URLs; the image pipeline validates them.
     """
 
     # Create a prompt to search for product images
@@ -62,20 +64,7 @@ Brand: {brand}"""
         result = result.strip()
 
         urls = json.loads(result)
-
-        # Validate URLs
-        valid_urls = []
-        for url in urls:
-            if isinstance(url, str) and url.startswith('http'):
-                # Quick validation
-                try:
-                    resp = requests.head(url, timeout=5, allow_redirects=True)
-                    if resp.status_code == 200:
-                        valid_urls.append(url)
-                except:
-                    continue
-
-        return valid_urls[:3]  # Max 3 images
+        return [url for url in urls if isinstance(url, str) and url.startswith('http')]
 
     except Exception as e:
         print(f"  AI search error: {e}")
@@ -105,54 +94,7 @@ def find_images_fallback(brand: str, model: str) -> list:
             f"https://image-us.samsung.com/SamsungUS/home/mobile/tablets/gallery/{model_clean}_Front_Black.jpg",
         ])
 
-    # Test URLs
-    valid_urls = []
-    for url in potential_urls:
-        try:
-            resp = requests.head(url, timeout=5, allow_redirects=True)
-            if resp.status_code == 200:
-                valid_urls.append(url)
-        except:
-            continue
-
-    return valid_urls
-
-
-def update_listing_images(api: EbayTradingAPI, item_id: str, image_urls: list) -> bool:
-    """Update eBay listing with product images"""
-
-    if not image_urls:
-        return False
-
-    # Build PictureURL elements
-    picture_urls = '\n'.join([f'            <PictureURL>{url}</PictureURL>' for url in image_urls[:12]])
-
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<ReviseFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <ItemID>{item_id}</ItemID>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-{picture_urls}
-        </PictureDetails>
-    </Item>
-</ReviseFixedPriceItemRequest>'''
-
-    try:
-        response = api._make_xml_request('ReviseFixedPriceItem', xml_request)
-        if response.get('Ack') in ['Success', 'Warning']:
-            return True
-        else:
-            errors = response.get('Errors', [])
-            if errors:
-                print(f"  Error: {errors[0].get('LongMessage', 'Unknown error')}")
-            return False
-    except Exception as e:
-        print(f"  Exception: {e}")
-        return False
+    return potential_urls
 
 
 def main():
@@ -175,95 +117,29 @@ def main():
         return
 
     print(f"Reading {mapping_file}...")
-    with open(mapping_file, 'r') as f:
-        reader = csv.DictReader(f)
-        items = list(reader)
+    items = read_item_mapping(mapping_file)
 
     print(f"Found {len(items)} items to update")
     print("="*80)
 
-    # Track unique models to avoid redundant searches
-    model_image_cache = {}
-
-    updated = 0
-    failed = 0
-
-    for idx, item in enumerate(items, 1):
-        sku = item['sku']
-        item_id = item['item_id']
-        brand = item['brand'].strip()
-        model = item['model'].strip()
-
-        if not model:
-            print(f"\n[{idx}/{len(items)}] Skipping - no model")
-            failed += 1
-            continue
-
-        print(f"\n[{idx}/{len(items)}] {brand} {model}")
-        print(f"  Item ID: {item_id}")
-
-        # Check cache first
-        cache_key = f"{brand}_{model}"
-        if cache_key in model_image_cache:
-            print(f"  Using cached images")
-            images = model_image_cache[cache_key]
-        else:
-            # Search for images
-            print(f"  Searching for product images...")
-
-            # Try AI search first if available
-            if openai_client:
-                images = find_product_images_with_ai(brand, model, openai_client)
-                if images:
-                    print(f"  ✓ Found {len(images)} images via AI search")
-            else:
-                images = []
-
-            # Fallback to direct URL patterns
-            if not images:
-                print(f"  Trying fallback image search...")
-                images = find_images_fallback(brand, model)
-                if images:
-                    print(f"  ✓ Found {len(images)} images via fallback")
-
-            # Cache the results
-            model_image_cache[cache_key] = images
-
-        if not images:
-            print(f"  ✗ No images found")
-            failed += 1
-            continue
-
-        # Show found images
-        for img_url in images:
-            print(f"    - {img_url}")
-
-        # Update listing
-        print(f"  Updating listing...")
-        if update_listing_images(api, item_id, images):
-            print(f"  ✓ Successfully updated")
-            updated += 1
-        else:
-            print(f"  ✗ Failed to update")
-            failed += 1
-
-        # Rate limiting
-        time.sleep(2)
-
-    print(f"\n{'='*80}")
-    print("Summary:")
-    print(f"  ✓ Successfully updated: {updated}")
-    print(f"  ✗ Failed: {failed}")
-    print(f"  Total processed: {len(items)}")
-    print(f"{'='*80}\n")
+    # AI search first if available, then direct URL patterns
+    sources = []
+    if openai_client:
+        sources.append(ImageSource('ai', lambda brand, model: find_product_images_with_ai(brand, model, openai_client)))
+    sources.append(ImageSource('fallback', find_images_fallback))
+
+    pipeline = ImagePipeline(api, sources, cache=get_image_cache(), hash_index=get_hash_index())
+    results = pipeline.run(items, on_result=print_result)
+    print_summary(results, len(items))
 
     # Save results
     with open('image_update_results.json', 'w') as f:
         json.dump({
-            'updated': updated,
-            'failed': failed,
+            'updated': len(results['successful']),
+            'failed': len(results['failed']),
+            'skipped': len(results['skipped']),
             'total': len(items),
-            'model_image_cache': model_image_cache
+            'model_image_cache': {key: found['images'] for key, found in results['images'].items()}
         }, f, indent=2)
 
     print("Results saved to image_update_results.json")
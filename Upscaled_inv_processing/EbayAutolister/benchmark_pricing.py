@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the pricing stack.
+
+Replays a recorded manifest through get_pricing_recommendation() with the
+provider latency captured at record time, then reports SKUs/sec, per-SKU
+p50/p95 latency, market-data cache hit rate and provider call counts.
+
+Usage:
+    # Build a synthetic 1,000-SKU manifest + cassette (no network, no credits)
+    python benchmark_pricing.py synthesize --skus 1000
+
+    # Record a real cassette from live providers (spends API credits once)
+    python benchmark_pricing.py record bench_manifest.csv
+
+    # Replay offline
+    python benchmark_pricing.py run bench_manifest.csv --workers 4 --latency-scale 0.1
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_pricing import cache_manager
+from ebay_pricing.cache_manager import CacheManager
+from ebay_pricing.pricing_engine import get_pricing_recommendation
+from ebay_pricing.replay import (
+    ProviderRecorder, set_recorder, PROVIDERS, MODE_RECORD, MODE_REPLAY
+)
+from ebay_pricing import upc_lookup
+
+DEFAULT_MANIFEST = 'bench_manifest.csv'
+DEFAULT_CASSETTE = 'bench_cassette.jsonl'
+
+# Typical live latencies (ms) used when synthesizing a cassette: (median, sigma)
+SYNTHETIC_LATENCY = {
+    'tavily': (1400, 0.35),
+    'openai': (2800, 0.40),
+    'browse_api': (350, 0.30),
+    'upc': (250, 0.30),
+}
+
+SYNTHETIC_PRODUCTS = [
+    ('Apple', 'MacBook Air A2337', 650.0),
+    ('Apple', 'iPad Air A2588', 420.0),
+    ('Samsung', 'Galaxy Watch4 SM-R890', 160.0),
+    ('Samsung', 'Galaxy Tab S6 Lite SM-P610', 210.0),
+    ('Nintendo', 'Switch OLED HEG-001', 260.0),
+    ('Sony', 'PlayStation 5 CFI-1215A', 390.0),
+    ('Microsoft', 'Surface Pro 7 1866', 380.0),
+    ('Dell', 'Latitude 7420', 430.0),
+    ('Lenovo', 'Yoga 6 13ARE05', 340.0),
+    ('Asus', 'ROG Zephyrus GA401I', 720.0),
+]
+
+SYNTHETIC_CONDITIONS = ['like new', 'very good', 'good', 'acceptable', 'salvage']
+
+
+class SyntheticRecorder(ProviderRecorder):
+    """Recorder that writes deterministic synthetic responses instead of calling providers"""
+
+    def call(self, provider: str, key: str, fn) -> Any:
+        with self._lock:
+            self.call_counts[provider] += 1
+
+        rng = random.Random(hashlib.sha1(key.encode()).hexdigest())
+        median, sigma = SYNTHETIC_LATENCY[provider]
+        latency_ms = rng.lognormvariate(0, sigma) * median
+        response = self._synthesize(provider, rng)
+
+        self._append_entry({
+            'provider': provider,
+            'key': key,
+            'latency_ms': round(latency_ms, 2),
+            'response': response
+        })
+        return response
+
+    @staticmethod
+    def _synthesize(provider: str, rng: random.Random) -> Any:
+        """Build a plausible provider response"""
+        base_price = rng.uniform(120, 800)
+
+        if provider == 'tavily':
+            return {'results': [
+                {
+                    'title': f"Sold listing {i}",
+                    'url': f"https://www.ebay.com/itm/{rng.randint(10**11, 10**12)}",
+                    'content': f"Sold for ${base_price * rng.uniform(0.8, 1.2):.2f}"
+                }
+                for i in range(rng.randint(4, 10))
+            ]}
+
+        if provider == 'openai':
+            return json.dumps({'listings': [
+                {
+                    'title': f"Sold listing {i}",
+                    'price': round(base_price * rng.uniform(0.8, 1.2), 2),
+                    'condition': 'Used'
+                }
+                for i in range(rng.randint(0, 8))
+            ]})
+
+        if provider == 'browse_api':
+            count = rng.randint(0, 40)
+            return {
+                'total': count,
+                'itemSummaries': [
+                    {'price': {'value': f"{base_price * rng.uniform(0.85, 1.3):.2f}", 'currency': 'USD'}}
+                    for _ in range(count)
+                ]
+            }
+
+        # upc: providers only hit for some items
+        if rng.random() < 0.6:
+            return None
+        return {'title': 'Synthetic Product', 'brand': '', 'model': '',
+                'msrp': round(base_price * 1.8, 2), 'source': 'synthetic'}
+
+
+def load_manifest(path: str) -> List[Dict[str, str]]:
+    """Load benchmark manifest rows (sku, brand, model, condition, upc, retail_price)"""
+    with open(path, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _fresh_pricing_state() -> str:
+    """Point the pricing cache at an empty temp DB and clear in-process UPC cache"""
+    cache_dir = tempfile.mkdtemp(prefix='pricing_bench_')
+    cache_manager._cache_instance = CacheManager(os.path.join(cache_dir, 'cache.db'))
+    upc_lookup._upc_lookup = None
+    return cache_dir
+
+
+def price_manifest(rows: List[Dict[str, str]], workers: int = 1) -> Dict:
+    """
+    Price every manifest row and collect timing.
+
+    Args:
+        rows: Manifest rows
+        workers: Number of concurrent pricing workers
+
+    Returns:
+        Dictionary with per-SKU latencies, errors and wall time
+    """
+    latencies = [0.0] * len(rows)
+    errors = []
+
+    def _price(idx: int) -> None:
+        row = rows[idx]
+        started = time.perf_counter()
+        try:
+            retail = row.get('retail_price')
+            get_pricing_recommendation(
+                brand=row.get('brand', ''),
+                model=row.get('model', ''),
+                condition=row.get('condition', 'good'),
+                retail_price=float(retail) if retail else None,
+                upc=row.get('upc') or None
+            )
+        except Exception as e:
+            errors.append({'sku': row.get('sku'), 'error': str(e)})
+        latencies[idx] = time.perf_counter() - started
+
+    wall_start = time.perf_counter()
+    if workers <= 1:
+        for idx in range(len(rows)):
+            _price(idx)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_price, range(len(rows))))
+    wall_time = time.perf_counter() - wall_start
+
+    return {'latencies': latencies, 'errors': errors, 'wall_time': wall_time}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def build_report(run: Dict, recorder: ProviderRecorder, workers: int,
+                 latency_scale: float) -> Dict:
+    """Summarize a benchmark run"""
+    latencies = run['latencies']
+    cache_stats = cache_manager.get_cache().get_cache_stats()
+    provider_stats = recorder.get_stats()
+
+    return {
+        'skus': len(latencies),
+        'workers': workers,
+        'latency_scale': latency_scale,
+        'wall_time_s': round(run['wall_time'], 3),
+        'skus_per_sec': round(len(latencies) / run['wall_time'], 2) if run['wall_time'] else 0.0,
+        'p50_latency_ms': round(_percentile(latencies, 50) * 1000, 1),
+        'p95_latency_ms': round(_percentile(latencies, 95) * 1000, 1),
+        'mean_latency_ms': round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+        'cache_hit_rate': round(cache_stats['session_hit_rate'], 4),
+        'cache_hits': cache_stats['session_hits'],
+        'cache_misses': cache_stats['session_misses'],
+        'provider_calls': {p: provider_stats['calls'].get(p, 0) for p in PROVIDERS},
+        'replay_misses': provider_stats['misses'],
+        'errors': len(run['errors'])
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Print benchmark report"""
+    print("\n" + "=" * 80)
+    print("PRICING BENCHMARK")
+    print("=" * 80)
+    print(f"SKUs:             {report['skus']}")
+    print(f"Workers:          {report['workers']}")
+    print(f"Latency scale:    {report['latency_scale']}")
+    print(f"Wall time:        {report['wall_time_s']:.2f}s")
+    print(f"Throughput:       {report['skus_per_sec']:.2f} SKUs/sec")
+    print(f"Latency p50/p95:  {report['p50_latency_ms']:.1f}ms / {report['p95_latency_ms']:.1f}ms")
+    print(f"Cache hit rate:   {report['cache_hit_rate']:.1%} "
+          f"({report['cache_hits']} hits, {report['cache_misses']} misses)")
+    print("Provider calls:")
+    for provider, count in report['provider_calls'].items():
+        print(f"  {provider:<12} {count}")
+    if report['replay_misses']:
+        print(f"Replay misses:    {report['replay_misses']}")
+    print(f"Errors:           {report['errors']}")
+    print("=" * 80 + "\n")
+
+
+def cmd_synthesize(args) -> None:
+    """Write a synthetic manifest and matching cassette"""
+    rng = random.Random(args.seed)
+
+    rows = []
+    for i in range(args.skus):
+        brand, model, retail = rng.choice(SYNTHETIC_PRODUCTS)
+        # Long-tail of one-off models alongside the repeated ones
+        if rng.random() < args.unique_ratio:
+            model = f"{model} v{rng.randint(1, 10 ** 6)}"
+        rows.append({
+            'sku': f"BENCH-{i + 1:05d}",
+            'brand': brand,
+            'model': model,
+            'condition': rng.choice(SYNTHETIC_CONDITIONS),
+            'upc': f"{rng.randint(10 ** 11, 10 ** 12 - 1)}" if rng.random() < 0.3 else '',
+            'retail_price': f"{retail:.2f}"
+        })
+
+    with open(args.manifest, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if os.path.exists(args.cassette):
+        os.remove(args.cassette)
+
+    # Provider code paths check for keys before calling; synthetic calls never use them
+    os.environ.setdefault('TAVILY_API_KEY', 'synthetic')
+    os.environ.setdefault('OPENAI_API_KEY', 'synthetic')
+
+    recorder = SyntheticRecorder(mode=MODE_RECORD, cassette_path=args.cassette)
+    set_recorder(recorder)
+    _fresh_pricing_state()
+    price_manifest(rows)
+
+    print(f"Synthetic manifest: {args.manifest} ({len(rows)} SKUs)")
+    print(f"Synthetic cassette: {args.cassette} ({recorder.get_stats()['total_calls']} calls)")
+
+
+def cmd_record(args) -> None:
+    """Price a manifest against live providers, recording every call"""
+    rows = load_manifest(args.manifest)
+    recorder = ProviderRecorder(mode=MODE_RECORD, cassette_path=args.cassette)
+    set_recorder(recorder)
+    _fresh_pricing_state()
+
+    run = price_manifest(rows, workers=args.workers)
+    print_report(build_report(run, recorder, args.workers, 1.0))
+    print(f"Cassette written: {args.cassette}")
+
+
+def cmd_run(args) -> None:
+    """Replay a recorded manifest offline and report throughput"""
+    rows = load_manifest(args.manifest)
+    if args.limit:
+        rows = rows[:args.limit]
+
+    recorder = ProviderRecorder(mode=MODE_REPLAY, cassette_path=args.cassette,
+                                latency_scale=args.latency_scale)
+    set_recorder(recorder)
+    _fresh_pricing_state()
+
+    run = price_manifest(rows, workers=args.workers)
+    report = build_report(run, recorder, args.workers, args.latency_scale)
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.json_out}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline pricing stack benchmark")
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show pricing logs')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    synth = sub.add_parser('synthesize', help='Create a synthetic manifest and cassette')
+    synth.add_argument('--skus', type=int, default=1000)
+    synth.add_argument('--unique-ratio', type=float, default=0.3,
+                       help='Share of rows with a one-off model (rest repeat common models)')
+    synth.add_argument('--seed', type=int, default=42)
+    synth.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    synth.add_argument('--cassette', default=DEFAULT_CASSETTE)
+    synth.set_defaults(func=cmd_synthesize)
+
+    record = sub.add_parser('record', help='Record live provider calls for a manifest')
+    record.add_argument('manifest')
+    record.add_argument('--cassette', default=DEFAULT_CASSETTE)
+    record.add_argument('--workers', type=int, default=1)
+    record.set_defaults(func=cmd_record)
+
+    run = sub.add_parser('run', help='Replay a recorded manifest offline')
+    run.add_argument('manifest', nargs='?', default=DEFAULT_MANIFEST)
+    run.add_argument('--cassette', default=DEFAULT_CASSETTE)
+    run.add_argument('--workers', type=int, default=1)
+    run.add_argument('--latency-scale', type=float, default=1.0,
+                     help='Multiplier on recorded latency (0 = no simulated latency)')
+    run.add_argument('--limit', type=int, default=0, help='Only replay the first N rows')
+    run.add_argument('--json-out', default=None, help='Write report JSON to this path')
+    run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,9 @@ import os
 import json
 import logging
 from typing import Optional
+import pandas as pd
 from ebay_autolister import EbayAutolister, ConditionMapper
+from condition_normalizer import get_normalizer
 from config import Config, create_sample_env
 from enricher import enrich_csv, EnrichmentError
 
@@ -65,8 +67,11 @@ def setup(ctx):
 @click.argument('csv_file', type=click.Path(exists=True))
 @click.option('--create-listings', is_flag=True, help='Create listings after inventory items')
 @click.option('--dry-run', is_flag=True, help='Preview actions without making API calls')
+@click.option('--sync', is_flag=True, help='Only push SKUs that changed since the last successful push')
+@click.option('--resume', is_flag=True, help='Continue the last unfinished job for this CSV from its checkpoints')
+@click.option('--feed', is_flag=True, help='List through bulk feed files (Feed API) instead of per-call APIs')
 @click.pass_context
-def process(ctx, csv_file, create_listings, dry_run):
+def process(ctx, csv_file, create_listings, dry_run, sync, resume, feed):
     """Process CSV file and create inventory items"""
     config = ctx.obj['config']
     
@@ -96,20 +101,49 @@ def process(ctx, csv_file, create_listings, dry_run):
         config.ebay_sandbox
     )
     
+    if feed:
+        # Feed files always create live listings
+        create_listings = True
+        click.echo("📦 Feed mode: uploading bulk feed files and waiting for eBay to process them...")
+    
     # Process the file
     with click.progressbar(length=100, label='Processing') as bar:
-        results = autolister.process_csv_file(csv_file, create_listings)
+        if feed:
+            results = autolister.process_csv_feed(csv_file, resume=resume)
+        else:
+            results = autolister.process_csv_file(csv_file, create_listings, sync=sync, resume=resume)
         bar.update(100)
     
     # Display results
     click.echo("\n📈 Processing Results:")
     click.echo(f"✅ Inventory items created: {results.get('inventory_created', 0)}")
     click.echo(f"❌ Inventory items failed: {results.get('inventory_failed', 0)}")
+    if sync:
+        click.echo(f"⏭️  Inventory items unchanged: {results.get('inventory_unchanged', 0)}")
     
     if create_listings:
         click.echo(f"📋 Listings created: {results.get('listings_created', 0)}")
+        if sync:
+            click.echo(f"🔄 Listings updated: {results.get('listings_updated', 0)}")
+            click.echo(f"⏭️  Listings unchanged: {results.get('listings_unchanged', 0)}")
         click.echo(f"❌ Listings failed: {results.get('listings_failed', 0)}")
     
+    validation = results.get('validation')
+    if validation:
+        click.echo(f"🧹 Validation: {validation['fixed']} auto-fixed, {validation['rejected']} rejected "
+                   f"before reaching eBay")
+        for entry in results.get('auto_fixed', [])[:5]:
+            click.echo(f"  • {entry['sku']} auto-fixed: {'; '.join(entry['fixes'])}")
+    
+    for task in results.get('feed_tasks', []):
+        click.echo(f"📦 Feed task {task['task_id']}: {task['status']} ({task['items']} items)")
+    if results.get('feed_in_flight'):
+        click.echo(f"⏳ {results['feed_in_flight']} SKUs still processing in feed tasks; "
+                   f"rerun with --resume to collect them")
+    
+    if results.get('job_status') == 'partial':
+        click.echo(f"🗂️  Job {results['job_id']} has failures; rerun with --resume to retry them")
+    
     # Show failed items
     if results.get('failed_items'):
         click.echo("\n❌ Failed Items:")
@@ -118,8 +152,9 @@ def process(ctx, csv_file, create_listings, dry_run):
 
 @cli.command()
 @click.argument('sku')
+@click.option('--live', is_flag=True, help='Query eBay directly instead of the local mirror')
 @click.pass_context
-def check(ctx, sku):
+def check(ctx, sku, live):
     """Check status of inventory item by SKU"""
     config = ctx.obj['config']
     
@@ -131,7 +166,7 @@ def check(ctx, sku):
     
     click.echo(f"🔍 Checking inventory item: {sku}")
     
-    item_data = autolister.inventory.get_inventory_item(sku)
+    item_data = autolister.inventory.get_inventory_item(sku, live=live)
     
     if item_data:
         click.echo("✅ Item found:")
@@ -143,9 +178,182 @@ def check(ctx, sku):
         
         if item_data.get('product', {}).get('imageUrls'):
             click.echo(f"  Images: {len(item_data['product']['imageUrls'])} attached")
+        
+        if not live:
+            updated_at = autolister.inventory.mirror.item_updated_at(sku)
+            if updated_at:
+                click.echo(f"  Source: local mirror, updated {updated_at} (--live queries eBay)")
+            for offer in autolister.inventory.mirror.get_offers(sku):
+                price = offer.get('pricingSummary', {}).get('price', {}).get('value', 'N/A')
+                click.echo(f"  Offer: {offer.get('offerId')} [{offer.get('status', 'N/A')}] ${price}")
     else:
         click.echo("❌ Item not found")
 
+@cli.command()
+@click.option('--full', is_flag=True, help='Rewrite every page and refetch offers for every SKU')
+@click.pass_context
+def mirror_sync(ctx, full):
+    """Refresh the local mirror of eBay inventory items and offers"""
+    from inventory_mirror import get_mirror
+    
+    config = ctx.obj['config']
+    autolister = EbayAutolister(
+        config.ebay_client_id,
+        config.ebay_client_secret,
+        config.ebay_sandbox,
+        config=config
+    )
+    
+    click.echo(f"🪞 {'Full' if full else 'Incremental'} mirror refresh...")
+    stats = get_mirror().refresh(autolister.api, full=full)
+    
+    click.echo(f"📄 Pages fetched: {stats['pages']} ({stats['pages_changed']} changed)")
+    click.echo(f"🔄 Items changed: {stats['items_changed']}, removed: {stats['items_removed']}")
+    click.echo(f"📋 Offer lookups: {stats['offer_calls']}")
+    click.echo(f"📦 Mirror now holds: {get_mirror().get_stats()['inventory_items']} items")
+
+@cli.command()
+@click.argument('csv_file', type=click.Path(exists=True))
+@click.option('--output', default=None, help='Write the full report to this JSON file')
+@click.pass_context
+def reconcile(ctx, csv_file, output):
+    """Reconcile a CSV against the local mirror (duplicates, missing, mismatches)"""
+    from ebay_autolister import CSVProcessor
+    from inventory_mirror import get_mirror
+    
+    mirror = get_mirror()
+    stats = mirror.get_stats()
+    if not stats['inventory_items']:
+        click.echo("⚠️  Mirror is empty; run 'mirror-sync' first")
+        return
+    
+    click.echo(f"🪞 Mirror: {stats['inventory_items']} items, {stats['offers']} offers "
+               f"(refreshed {stats['last_refresh']})")
+    
+    report = mirror.reconcile(CSVProcessor.load_items_from_csv(csv_file))
+    report.update(mirror.find_duplicates())
+    
+    for key, entries in report.items():
+        click.echo(f"  {key.replace('_', ' ').title()}: {len(entries)}")
+        for entry in entries[:5]:
+            click.echo(f"    • {entry}")
+    
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"💾 Report saved to: {output}")
+
+@cli.command()
+@click.argument('prices_csv', type=click.Path(exists=True))
+@click.option('--price-col', default='buy_it_now_price', help='Column with the new price')
+@click.option('--quantity-col', default='quantity', help='Column with the new quantity (optional)')
+@click.option('--min-confidence', default=0.0, help='Skip prices below this pricing confidence')
+@click.pass_context
+def reprice(ctx, prices_csv, price_col, quantity_col, min_confidence):
+    """Update price/quantity of live listings from pricing engine output"""
+    config = ctx.obj['config']
+    
+    autolister = EbayAutolister(
+        config.ebay_client_id,
+        config.ebay_client_secret,
+        config.ebay_sandbox,
+        config=config
+    )
+    
+    click.echo(f"💲 Repricing from: {prices_csv}")
+    results = autolister.reprice_from_csv(prices_csv, price_column=price_col,
+                                          quantity_column=quantity_col, min_confidence=min_confidence)
+    
+    click.echo(f"✅ Updated: {len(results['successful'])}")
+    click.echo(f"❌ Failed: {len(results['failed'])}")
+    for failed in results['failed'][:5]:
+        click.echo(f"  • {failed['sku']}: {failed['error']}")
+
+@cli.command()
+@click.option('--batch-size', default=5, help='Items per retry call')
+@click.option('--max-attempts', default=5, help='Skip items that already failed this many times')
+@click.option('--limit', default=None, type=int, help='Maximum number of items to retry')
+@click.option('--list', 'list_only', is_flag=True, help='Only list dead-lettered items')
+@click.pass_context
+def retry_failed(ctx, batch_size, max_attempts, limit, list_only):
+    """Retry only the retryable failures recorded in the dead-letter store"""
+    from dead_letter import get_dead_letters
+    
+    config = ctx.obj['config']
+    dead_letters = get_dead_letters()
+    stats = dead_letters.get_stats()
+    click.echo(f"🪦 Dead letters: {stats['retryable']} retryable, {stats['permanent']} permanent")
+    
+    if list_only:
+        for entry in dead_letters.list(limit=limit):
+            kind = 'retryable' if entry['retryable'] else 'permanent'
+            click.echo(f"  • {entry['sku']} [{kind}, attempts {entry['attempts']}] "
+                       f"errorIds={entry['error_ids']}")
+        return
+    
+    autolister = EbayAutolister(
+        config.ebay_client_id,
+        config.ebay_client_secret,
+        config.ebay_sandbox,
+        config=config
+    )
+    
+    results = autolister.retry_dead_letters(batch_size=batch_size, max_attempts=max_attempts, limit=limit)
+    
+    click.echo(f"🔁 Retried: {results['retried']}")
+    click.echo(f"✅ Recovered: {len(results['successful'])}")
+    click.echo(f"❌ Still failing: {len(results['failed'])}")
+    for failed in results['failed'][:5]:
+        click.echo(f"  • {failed['sku']}: {failed['error']}")
+
+@cli.command()
+@click.argument('csv_file', type=click.Path(exists=True))
+@click.option('--fix/--no-fix', default=None, help='Fix fixable problems instead of rejecting them (default: VALIDATION_AUTO_FIX)')
+@click.option('--report', 'report_path', default=None, help='Write every issue to this CSV')
+@click.option('--live', is_flag=True, help='Fetch missing category condition policies from eBay')
+@click.pass_context
+def validate(ctx, csv_file, fix, report_path, live):
+    """Validate a product CSV offline and report what would be fixed or rejected"""
+    config = ctx.obj['config']
+    from ebay_autolister import CSVProcessor
+    
+    autolister = EbayAutolister(config.ebay_client_id, config.ebay_client_secret, config.ebay_sandbox,
+                                config=config)
+    validator = autolister.make_validator(offline=not live)
+    if fix is not None:
+        validator.auto_fix = fix
+    
+    for batch in CSVProcessor.iter_item_batches(csv_file, batch_size=config.batch_size, compact=True):
+        validator.validate_batch(batch)
+    
+    summary = validator.report.summary()
+    click.echo(f"🧹 Checked {summary['checked']} items: {summary['passed']} clean, "
+               f"{summary['fixed']} auto-fixed, {summary['rejected']} rejected")
+    for rule, count in summary['by_rule'].items():
+        click.echo(f"  • {rule}: {count}")
+    
+    if report_path:
+        validator.report.write_csv(report_path)
+        click.echo(f"📝 Report written to {report_path}")
+
+@cli.command()
+@click.option('--items', default=10000, help='Synthetic catalog size')
+@click.option('--create-listings', is_flag=True, help='Also create and publish offers')
+@click.option('--concurrency', default=4, help='Inventory batches in flight')
+@click.option('--latency-scale', default=1.0, help='Multiplier on simulated latency (0 = none)')
+@click.option('--rate-limit', default=None, type=float, help='Fake server calls/sec before 429s')
+@click.option('--transient-rate', default=0.01, help='Share of SKUs whose first attempt fails')
+@click.option('--permanent-rate', default=0.002, help='Share of SKUs that always fail')
+def load_test(items, create_listings, concurrency, latency_scale, rate_limit, transient_rate, permanent_rate):
+    """Push a synthetic catalog through the pipeline against a local fake eBay API"""
+    from load_test import run_load_test, print_report
+    
+    click.echo(f"🏋️  Load testing {items} synthetic items against a local fake eBay API...")
+    report = run_load_test(items=items, create_listings=create_listings, concurrency=concurrency,
+                           latency_scale=latency_scale, rate_limit=rate_limit,
+                           transient_rate=transient_rate, permanent_rate=permanent_rate)
+    print_report(report)
+
 @cli.command()
 @click.pass_context
 def config_info(ctx):
@@ -205,10 +413,24 @@ def test_connection(ctx, marketplace):
         click.echo(f"❌ Connection failed: {e}")
 
 @cli.command()
-@click.argument('condition')
+@click.argument('condition', required=False, default='')
 @click.option('--grade', default='', help='Optional grade (PSA 1-10, A+/A/B/C, etc.)')
-def map_condition(condition, grade):
+@click.option('--csv', 'csv_file', type=click.Path(exists=True), default=None,
+              help='Summarize how every condition/grade in a CSV maps')
+def map_condition(condition, grade, csv_file):
     """Test condition mapping to eBay standards"""
+    if csv_file:
+        df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+        if 'condition' not in df.columns:
+            click.echo("❌ CSV has no 'condition' column")
+            return
+        df['ebay_condition'] = get_normalizer().map_column(df['condition'], df.get('grade'))
+        summary = df.groupby(['condition', 'ebay_condition']).size().reset_index(name='items')
+        click.echo(f"🔍 {len(df)} rows, {len(summary)} distinct conditions:")
+        for row in summary.itertuples(index=False):
+            click.echo(f"  • '{row.condition}' → {row.ebay_condition} ({row.items})")
+        return
+    
     click.echo(f"🔍 Mapping condition: '{condition}' with grade: '{grade}'")
     
     ebay_condition = ConditionMapper.map_condition(condition, grade)
@@ -304,7 +526,13 @@ def _parse_column(col_value: str):
 @click.option('--id-col', default='sku', help='Column (name or index) for the item identifier/sku')
 @click.option('--brand-col', default='brand', help='Column (name or index) for brand')
 @click.option('--model-col', default='mpn', help='Column (name or index) for model')
-def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col):
+@click.option('--no-process-images', is_flag=True, help='Keep downloaded images as-is (skip resize/recompress)')
+@click.option('--workers', default=None, type=int, help='Concurrent searches (default: ENRICH_WORKERS or 8)')
+@click.option('--no-cache', is_flag=True, help='Search every product again instead of reusing cached results')
+@click.option('--resume', is_flag=True, help='Continue an interrupted run from the existing output CSV')
+@click.option('--only-missing', is_flag=True, help='Only enrich rows without a title or retail price (e.g. failed rows)')
+def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col, no_process_images, workers, no_cache,
+           resume, only_missing):
     """Enrich a CSV using OpenAI web search (title, pricing, images)."""
     output_path = output_csv or f"{os.path.splitext(input_csv)[0]}_enriched.csv"
 
@@ -321,6 +549,11 @@ def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col):
             id_col=_parse_column(id_col),
             brand_col=_parse_column(brand_col),
             model_col=_parse_column(model_col),
+            process_images=not no_process_images,
+            max_workers=workers,
+            use_cache=not no_cache,
+            resume=resume,
+            only_missing=only_missing,
         )
     except EnrichmentError as exc:
         click.echo(f"❌ Enrichment failed: {exc}")
@@ -330,5 +563,48 @@ def enrich(input_csv, output_csv, images_dir, id_col, brand_col, model_col):
     click.echo(f"📄 Enriched CSV: {output_path}")
     click.echo(f"🖼️  Images saved to: {images_dir}")
 
+
+@cli.command()
+@click.argument('images_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--max-dimension', default=1600, help='Longest side in pixels after resizing')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: one per core)')
+@click.option('--force', is_flag=True, help='Re-encode images that are already processed')
+@click.pass_context
+def process_images(ctx, images_dir, max_dimension, workers, force):
+    """Resize, strip and recompress every image in a directory (with thumbnails)"""
+    from image_processing import ImageProcessor
+
+    config = ctx.obj['config']
+    processor = ImageProcessor(max_dimension=max_dimension, max_image_size_mb=config.max_image_size_mb,
+                               max_workers=workers, force=force)
+
+    click.echo(f"🖼️  Processing images in {images_dir}...")
+    results = processor.process_directory(images_dir)
+    done = [r for r in results if 'error' not in r]
+    before = sum(r['bytes_before'] for r in done)
+    after = sum(r['bytes_after'] for r in done)
+
+    skipped = sum(1 for r in done if r['skipped'])
+    click.echo(f"✅ Processed {len(done) - skipped}/{len(results)} images ({skipped} already processed)")
+    if before:
+        click.echo(f"📉 {before / 1024 / 1024:.1f} MB → {after / 1024 / 1024:.1f} MB")
+    for result in results:
+        if 'error' in result:
+            click.echo(f"  ❌ {result['source']}: {result['error']}")
+
+
+@cli.command()
+@click.argument('image_url')
+@click.option('--reason', default='', help='Why the photo is bad (stored with its hash)')
+def mark_bad_image(image_url, reason):
+    """Reject a photo (and copies of it at other URLs/sizes) in future image runs"""
+    from image_hashing import get_hash_index
+
+    if get_hash_index().mark_bad_url(image_url, reason):
+        click.echo(f"🚫 Marked as bad: {image_url}")
+    else:
+        click.echo(f"❌ {image_url} has not been hashed yet (run an image script that finds it first)")
+        raise SystemExit(1)
+
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Condition Normalizer for eBay Autolister
+
+One engine for turning free-text conditions and grades into eBay condition
+enums, shared by listing, pricing and batch scripts. Exact matches come from a
+table precomputed from CONDITION_MAPPINGS/GRADE_MAPPINGS, anything else goes
+through a memoized fuzzy fallback, and map_column() normalizes whole pandas
+columns by resolving each distinct value only once.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Optional
+
+import pandas as pd
+
+from config import CONDITION_MAPPINGS, GRADE_MAPPINGS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONDITION = 'USED_GOOD'
+
+# Term fallbacks for conditions no mapping key matches, checked in order
+_FALLBACK_TERMS = (
+    (('new', 'mint', 'sealed'), 'NEW'),
+    (('excellent', 'near mint'), 'USED_EXCELLENT'),
+    (('very good', 'light'), 'USED_VERY_GOOD'),
+    (('good', 'normal'), 'USED_GOOD'),
+    (('acceptable', 'fair', 'heavy'), 'USED_ACCEPTABLE'),
+    (('parts', 'broken', 'repair'), 'FOR_PARTS_OR_NOT_WORKING'),
+)
+
+
+def condition_key(condition) -> str:
+    """Lookup key for a condition: lowercased with whitespace collapsed"""
+    return ' '.join(str(condition).lower().split())
+
+
+def grade_key(grade) -> str:
+    """Lookup key for a grade: uppercased and stripped"""
+    return str(grade).strip().upper()
+
+
+class ConditionNormalizer:
+    """Maps condition/grade text to eBay condition enums"""
+
+    def __init__(self, condition_mappings: Dict[str, str] = None,
+                 grade_mappings: Dict[str, str] = None):
+        condition_mappings = CONDITION_MAPPINGS if condition_mappings is None else condition_mappings
+        grade_mappings = GRADE_MAPPINGS if grade_mappings is None else grade_mappings
+
+        # Fuzzy candidates keep CONDITION_MAPPINGS order, which decides ties
+        self._fuzzy_keys = tuple((condition_key(k), v) for k, v in condition_mappings.items())
+
+        # eBay enums map to themselves so already-normalized values pass through
+        self.exact = {condition_key(v): v for v in set(condition_mappings.values()) | set(grade_mappings.values())}
+        self.exact.update({condition_key(v).replace('_', ' '): v for v in list(self.exact.values())})
+        self.exact.update(dict(self._fuzzy_keys))
+        self.grades = {grade_key(k): v for k, v in grade_mappings.items()}
+
+        self.fuzzy = lru_cache(maxsize=4096)(self._fuzzy)
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        """Substring match against mapping keys, then term fallbacks; None if nothing fits"""
+        if not key:
+            return None
+
+        for mapping_key, value in self._fuzzy_keys:
+            if mapping_key in key or key in mapping_key:
+                return value
+
+        for terms, value in _FALLBACK_TERMS:
+            if any(term in key for term in terms):
+                return value
+
+        logger.warning(f"Could not map condition '{key}', defaulting to {DEFAULT_CONDITION}")
+        return None
+
+    def normalize(self, condition=None, grade=None, default: str = DEFAULT_CONDITION) -> str:
+        """
+        Map one condition/grade pair to an eBay condition enum.
+
+        Args:
+            condition: Condition text (e.g. 'like new', 'USED_GOOD')
+            grade: Optional grade (PSA 1-10, letter grade, or LN/VG/G/AC/SA);
+                a recognized grade wins over the condition
+            default: Returned when nothing matches
+
+        Returns:
+            eBay condition enum
+        """
+        if grade:
+            mapped = self.grades.get(grade_key(grade))
+            if mapped:
+                return mapped
+
+        if condition is None:
+            return default
+
+        key = condition_key(condition)
+        mapped = self.exact.get(key)
+        if mapped is None:
+            mapped = self.fuzzy(key)
+        return mapped or default
+
+    def map_column(self, conditions: pd.Series, grades: pd.Series = None,
+                   default: str = DEFAULT_CONDITION) -> pd.Series:
+        """
+        Map a whole column of conditions (and optional grades) at once.
+
+        Keys are built with vectorized string ops and looked up in the exact
+        tables; only distinct leftovers go through the fuzzy fallback.
+
+        Returns:
+            Series of eBay condition enums aligned with ``conditions``
+        """
+        keys = (conditions.fillna('').astype(str).str.lower()
+                .str.split().str.join(' ').fillna(''))
+        mapped = keys.map(self.exact)
+
+        if grades is not None:
+            by_grade = grades.fillna('').astype(str).str.strip().str.upper().map(self.grades)
+            mapped = by_grade.where(by_grade.notna(), mapped)
+
+        missing = mapped.isna()
+        if missing.any():
+            leftovers = {key: self.fuzzy(key) or default for key in keys[missing].unique()}
+            mapped = mapped.where(~missing, keys.map(leftovers))
+
+        return mapped.astype(object)
+
+
+# Global normalizer instance
+_normalizer_instance = None
+
+
+def get_normalizer() -> ConditionNormalizer:
+    """Get or create the global condition normalizer"""
+    global _normalizer_instance
+    if _normalizer_instance is None:
+        _normalizer_instance = ConditionNormalizer()
+    return _normalizer_instance
+
+
+def normalize_condition(condition=None, grade=None, default: str = DEFAULT_CONDITION) -> str:
+    """Map a condition/grade pair with the global normalizer"""
+    return get_normalizer().normalize(condition, grade, default)
@@ -19,10 +19,29 @@ class Config:
         self.ebay_client_id = os.getenv('EBAY_CLIENT_ID', '')
         self.ebay_client_secret = os.getenv('EBAY_CLIENT_SECRET', '')
         
+        # Override the eBay API host (e.g. a local fake_ebay_server for load tests)
+        self.ebay_api_base_url = os.getenv('EBAY_API_BASE_URL', '')
+        
         # API Configuration
         self.rate_limit_interval = float(os.getenv('RATE_LIMIT_INTERVAL', '0.1'))
         self.batch_size = int(os.getenv('BATCH_SIZE', '25'))
+        self.max_concurrent_batches = int(os.getenv('MAX_CONCURRENT_BATCHES', '4'))
         self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
+        self.request_timeout = float(os.getenv('REQUEST_TIMEOUT', '30'))
+        self.retry_backoff_base = float(os.getenv('RETRY_BACKOFF_BASE', '1.0'))
+        self.retry_backoff_max = float(os.getenv('RETRY_BACKOFF_MAX', '60'))
+        self.circuit_breaker_threshold = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5'))
+        self.circuit_breaker_reset = float(os.getenv('CIRCUIT_BREAKER_RESET_SECONDS', '60'))
+        
+        # Offline payload validation
+        self.validate_payloads = os.getenv('VALIDATE_PAYLOADS', 'true').lower() == 'true'
+        self.validation_auto_fix = os.getenv('VALIDATION_AUTO_FIX', 'false').lower() == 'true'
+        self.category_policy_ttl_days = float(os.getenv('CATEGORY_POLICY_TTL_DAYS', '7'))
+        
+        # Bulk feed-file mode (Sell Feed API)
+        self.feed_max_items_per_file = int(os.getenv('FEED_MAX_ITEMS_PER_FILE', '10000'))
+        self.feed_poll_interval = float(os.getenv('FEED_POLL_INTERVAL', '30'))
+        self.feed_timeout = float(os.getenv('FEED_TIMEOUT_SECONDS', '7200'))
         
         # Logging Configuration
         self.log_level = os.getenv('LOG_LEVEL', 'INFO')
@@ -75,9 +94,22 @@ class Config:
         """Convert configuration to dictionary (excluding secrets)"""
         return {
             'ebay_sandbox': self.ebay_sandbox,
+            'ebay_api_base_url': self.ebay_api_base_url,
             'rate_limit_interval': self.rate_limit_interval,
             'batch_size': self.batch_size,
+            'max_concurrent_batches': self.max_concurrent_batches,
             'max_retries': self.max_retries,
+            'request_timeout': self.request_timeout,
+            'retry_backoff_base': self.retry_backoff_base,
+            'retry_backoff_max': self.retry_backoff_max,
+            'circuit_breaker_threshold': self.circuit_breaker_threshold,
+            'circuit_breaker_reset': self.circuit_breaker_reset,
+            'validate_payloads': self.validate_payloads,
+            'validation_auto_fix': self.validation_auto_fix,
+            'category_policy_ttl_days': self.category_policy_ttl_days,
+            'feed_max_items_per_file': self.feed_max_items_per_file,
+            'feed_poll_interval': self.feed_poll_interval,
+            'feed_timeout': self.feed_timeout,
             'log_level': self.log_level,
             'log_file': self.log_file,
             'default_marketplace': self.default_marketplace,
@@ -213,7 +245,14 @@ GRADE_MAPPINGS = {
     'C': 'USED_ACCEPTABLE',
     'C-': 'USED_ACCEPTABLE',
     'D': 'FOR_PARTS_OR_NOT_WORKING',
-    'F': 'FOR_PARTS_OR_NOT_WORKING'
+    'F': 'FOR_PARTS_OR_NOT_WORKING',
+    
+    # Upscaled grade codes (SKU prefixes)
+    'LN': 'LIKE_NEW',
+    'VG': 'USED_VERY_GOOD',
+    'G': 'USED_GOOD',
+    'AC': 'USED_ACCEPTABLE',
+    'SA': 'FOR_PARTS_OR_NOT_WORKING'
 }
 
 # Pricing Configuration
@@ -254,11 +293,28 @@ def create_sample_env():
 EBAY_CLIENT_ID=your_client_id_here
 EBAY_CLIENT_SECRET=your_client_secret_here
 EBAY_SANDBOX=true
+# EBAY_API_BASE_URL=http://127.0.0.1:8765  # Point at a local fake_ebay_server
 
 # API Settings
 RATE_LIMIT_INTERVAL=0.1
 BATCH_SIZE=25
+MAX_CONCURRENT_BATCHES=4
 MAX_RETRIES=3
+REQUEST_TIMEOUT=30
+RETRY_BACKOFF_BASE=1.0
+RETRY_BACKOFF_MAX=60
+CIRCUIT_BREAKER_THRESHOLD=5
+CIRCUIT_BREAKER_RESET_SECONDS=60
+
+# Offline payload validation (reject/auto-fix items before they reach eBay)
+VALIDATE_PAYLOADS=true
+VALIDATION_AUTO_FIX=false
+CATEGORY_POLICY_TTL_DAYS=7
+
+# Bulk feed-file mode (process --feed)
+FEED_MAX_ITEMS_PER_FILE=10000
+FEED_POLL_INTERVAL=30
+FEED_TIMEOUT_SECONDS=7200
 
 # Logging
 LOG_LEVEL=INFO
@@ -7,10 +7,11 @@ and copy their product images to our listings
 import requests
 import xml.etree.ElementTree as ET
 import os
-import csv
-import time
 from dotenv import load_dotenv
 from ebay_trading_uploader import EbayTradingAPI
+from image_hashing import get_hash_index
+from image_pipeline import (ImagePipeline, ImageSource, get_image_cache, print_result, print_summary,
+                            read_item_mapping)
 
 load_dotenv()
 
@@ -60,43 +61,6 @@ def find_similar_listing_images(model: str, api: EbayTradingAPI) -> list:
         return []
 
 
-def update_listing_images(api: EbayTradingAPI, item_id: str, image_urls: list) -> bool:
-    """Update eBay listing with product images"""
-
-    if not image_urls:
-        return False
-
-    picture_urls = '\n'.join([f'            <PictureURL>{url}</PictureURL>' for url in image_urls[:12]])
-
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<ReviseFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <ItemID>{item_id}</ItemID>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-{picture_urls}
-        </PictureDetails>
-    </Item>
-</ReviseFixedPriceItemRequest>'''
-
-    try:
-        response = api._make_xml_request('ReviseFixedPriceItem', xml_request)
-        if response.get('Ack') in ['Success', 'Warning']:
-            return True
-        else:
-            errors = response.get('Errors', [])
-            if errors:
-                error_msg = errors[0].get('LongMessage', 'Unknown')
-                print(f"    Error: {error_msg}")
-            return False
-    except Exception as e:
-        print(f"    Exception: {e}")
-        return False
-
-
 def main():
     dev_id = os.getenv('EBAY_DEV_ID')
     app_id = os.getenv('EBAY_CLIENT_ID')
@@ -106,69 +70,17 @@ def main():
 
     api = EbayTradingAPI(dev_id, app_id, cert_id, auth_token, sandbox)
 
-    with open('item_mapping.csv', 'r') as f:
-        items = list(csv.DictReader(f))
+    items = read_item_mapping('item_mapping.csv')
 
     print(f"Processing {len(items)} items...")
     print("="*80)
 
-    model_cache = {}
-    updated = 0
-    failed = 0
-
-    for idx, item in enumerate(items, 1):
-        sku = item['sku']
-        item_id = item['item_id']
-        brand = item['brand'].strip()
-        model = item['model'].strip()
-
-        if not model:
-            print(f"\n[{idx}/{len(items)}] Skipping - no model")
-            failed += 1
-            continue
-
-        print(f"\n[{idx}/{len(items)}] {brand} {model}")
-        print(f"  Item ID: {item_id}")
-
-        # Check cache
-        cache_key = model.upper()
-        if cache_key in model_cache:
-            print(f"  Using cached images")
-            images = model_cache[cache_key]
-        else:
-            print(f"  Searching for similar eBay listings...")
-            images = find_similar_listing_images(model, api)
-            model_cache[cache_key] = images
-
-            if images:
-                print(f"  ✓ Found {len(images)} images")
-                for img in images:
-                    print(f"    - {img[:80]}...")
-            else:
-                print(f"  ✗ No images found")
-
-            time.sleep(1)  # Rate limiting
-
-        if not images:
-            failed += 1
-            continue
-
-        print(f"  Updating listing...")
-        if update_listing_images(api, item_id, images):
-            print(f"  ✓ Successfully updated!")
-            updated += 1
-        else:
-            print(f"  ✗ Failed to update")
-            failed += 1
-
-        time.sleep(1)
-
-    print(f"\n{'='*80}")
-    print(f"Summary:")
-    print(f"  ✓ Updated: {updated}")
-    print(f"  ✗ Failed: {failed}")
-    print(f"  Total: {len(items)}")
-    print(f"{'='*80}\n")
+    sources = [ImageSource('ebay', lambda brand, model: find_similar_listing_images(model, api))]
+    # Shopping API calls share the app's call quota, so keep searches modest
+    pipeline = ImagePipeline(api, sources, search_workers=2, cache=get_image_cache(),
+                             hash_index=get_hash_index())
+    results = pipeline.run(items, on_result=print_result)
+    print_summary(results, len(items))
 
 
 if __name__ == '__main__':
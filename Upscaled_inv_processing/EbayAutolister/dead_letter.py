@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Dead-Letter Store for eBay Autolister
+
+Persists per-SKU bulk failures together with their eBay error codes and the
+item that failed, classified as retryable (throttling, system errors, network
+trouble) or permanent (bad data, policy problems). Retryable entries can be
+re-sent on their own later instead of re-running the whole CSV.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Operations whose failures are dead-lettered
+OP_INVENTORY = "inventory"
+
+
+class DeadLetterStore:
+    """SQLite store of failed SKUs awaiting retry or manual attention"""
+
+    def __init__(self, db_path: str = None):
+        """Initialize the store, defaulting to dead_letters.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "dead_letters.db"
+
+        self.db_path = str(db_path)
+        self._init_database()
+        logger.debug(f"Dead-letter store initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and table if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                sku TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                retryable INTEGER NOT NULL,
+                error_ids TEXT,
+                error TEXT,
+                item_json TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                first_failed_at TIMESTAMP NOT NULL,
+                last_failed_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (sku, operation)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dead_letters_retryable ON dead_letters(operation, retryable)
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def add(self, operation: str, failures: List[Dict], items: Dict[str, Dict] = None):
+        """
+        Record failures; a SKU that fails again has its attempt count bumped.
+
+        Args:
+            operation: Operation that failed (e.g. 'inventory')
+            failures: Failure dicts with 'sku', 'error', 'error_ids' and 'retryable'
+            items: Optional sku -> serialized item, stored so a retry needs no CSV
+        """
+        if not failures:
+            return
+
+        items = items or {}
+        now = datetime.now().isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT INTO dead_letters (sku, operation, retryable, error_ids, error, item_json,
+                                      attempts, first_failed_at, last_failed_at)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT(sku, operation) DO UPDATE SET
+                retryable = excluded.retryable,
+                error_ids = excluded.error_ids,
+                error = excluded.error,
+                item_json = COALESCE(excluded.item_json, dead_letters.item_json),
+                attempts = dead_letters.attempts + 1,
+                last_failed_at = excluded.last_failed_at
+        """, [
+            (f["sku"], operation, int(bool(f.get("retryable"))),
+             json.dumps(f.get("error_ids") or []),
+             json.dumps(f.get("error"), default=str),
+             json.dumps(items[f["sku"]], default=str) if f["sku"] in items else None,
+             now, now)
+            for f in failures
+        ])
+        conn.commit()
+        conn.close()
+
+        retryable = sum(1 for f in failures if f.get("retryable"))
+        logger.info(f"Dead-lettered {len(failures)} {operation} failures ({retryable} retryable)")
+
+    def resolve(self, operation: str, skus: List[str]):
+        """Remove SKUs that have since succeeded"""
+        if not skus:
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("DELETE FROM dead_letters WHERE sku = ? AND operation = ?",
+                         [(sku, operation) for sku in skus])
+        conn.commit()
+        conn.close()
+
+    def list(self, operation: str = None, retryable: Optional[bool] = None,
+             max_attempts: int = None, limit: int = None) -> List[Dict]:
+        """
+        List dead letters, oldest first.
+
+        Args:
+            operation: Only this operation
+            retryable: Only retryable (True) or permanent (False) entries
+            max_attempts: Skip entries that already used this many attempts
+            limit: Maximum number of entries
+
+        Returns:
+            List of entry dicts
+        """
+        query = ("SELECT sku, operation, retryable, error_ids, error, item_json, attempts, "
+                 "first_failed_at, last_failed_at FROM dead_letters WHERE 1 = 1")
+        params = []
+        if operation:
+            query += " AND operation = ?"
+            params.append(operation)
+        if retryable is not None:
+            query += " AND retryable = ?"
+            params.append(int(retryable))
+        if max_attempts:
+            query += " AND attempts < ?"
+            params.append(max_attempts)
+        query += " ORDER BY first_failed_at, sku"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [{
+            "sku": row[0],
+            "operation": row[1],
+            "retryable": bool(row[2]),
+            "error_ids": json.loads(row[3] or '[]'),
+            "error": json.loads(row[4]) if row[4] else None,
+            "item": json.loads(row[5]) if row[5] else None,
+            "attempts": row[6],
+            "first_failed_at": row[7],
+            "last_failed_at": row[8]
+        } for row in rows]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Count dead letters by classification"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT retryable, COUNT(*) FROM dead_letters GROUP BY retryable")
+        counts = dict(cursor.fetchall())
+        conn.close()
+        return {
+            "retryable": counts.get(1, 0),
+            "permanent": counts.get(0, 0),
+            "total": sum(counts.values())
+        }
+
+
+# Global dead-letter instance
+_dead_letter_instance = None
+
+
+def get_dead_letters() -> DeadLetterStore:
+    """Get or create global dead-letter store (DEAD_LETTER_DB overrides the path)"""
+    global _dead_letter_instance
+    if _dead_letter_instance is None:
+        _dead_letter_instance = DeadLetterStore(os.getenv('DEAD_LETTER_DB') or None)
+    return _dead_letter_instance
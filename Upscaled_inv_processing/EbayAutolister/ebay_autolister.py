@@ -6,15 +6,59 @@ Integrates with eBay Inventory API for bulk listing creation and management
 
 import json
 import csv
+import random
+import threading
 import requests
 import time
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 import logging
 from dataclasses import dataclass
 import pandas as pd
-from config import CONDITION_MAPPINGS, GRADE_MAPPINGS
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson  # Optional: faster batch serialization
+except ImportError:
+    orjson = None
+from config import Config
+from condition_normalizer import get_normalizer
+from sync_state import get_sync_state, payload_hash, KIND_INVENTORY, KIND_OFFER, KIND_PRICE
+from job_journal import (get_journal, JobJournal, STAGE_FEED_TASK, STAGE_INVENTORY, STAGE_OFFER,
+                         STAGE_PUBLISHED, STAGE_VALIDATED, STATUS_IN_FLIGHT, STATUS_OK)
+from dead_letter import get_dead_letters, DeadLetterStore, OP_INVENTORY
+from inventory_mirror import get_mirror, InventoryMirror
+from payload_validator import PayloadValidator, fetch_condition_policy, get_policy_store
+
+# HTTP statuses worth retrying (throttling and transient server errors)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# eBay errorIds that signal a transient condition even on non-5xx responses
+RETRYABLE_EBAY_ERROR_IDS = {
+    2001,   # Too many requests / call limit reached
+    2003,   # Internal error
+    25001,  # Inventory API system error
+}
+
+# Throttling signals: the call was refused before any work was done, so it is
+# always safe to retry after Retry-After
+THROTTLE_STATUS_CODE = 429
+THROTTLE_EBAY_ERROR_ID = 2001
+
+# POST endpoints that replace state wholesale, so repeating them after a
+# timeout or 5xx cannot create duplicates (other POSTs create offers/tasks)
+IDEMPOTENT_POST_ENDPOINTS = {
+    'bulk_create_or_replace_inventory_item',
+    'bulk_update_price_quantity',
+}
+
+# eBay errorId returned when the OAuth access token is invalid or expired
+INVALID_TOKEN_ERROR_ID = 1001
 
 @dataclass
 class InventoryItem:
@@ -39,6 +83,48 @@ class InventoryItem:
         if self.images is None:
             self.images = []
 
+class CompactInventoryItem:
+    """
+    Slotted, memory-compact equivalent of InventoryItem.
+
+    Used by the streaming CSV path, where tens of thousands of items pass
+    through; it has the same fields and constructor as InventoryItem.
+    """
+    
+    __slots__ = ('sku', 'title', 'description', 'condition', 'category_id', 'price', 'quantity',
+                 'brand', 'mpn', 'upc', 'grade', 'weight', 'dimensions', 'images')
+    
+    def __init__(self, sku: str, title: str, description: str, condition: str, category_id: str,
+                 price: float, quantity: int, brand: str = "", mpn: str = "", upc: str = "",
+                 grade: str = "", weight: float = 1.0, dimensions: Dict[str, float] = None,
+                 images: List[str] = None):
+        self.sku = sku
+        self.title = title
+        self.description = description
+        self.condition = condition
+        self.category_id = category_id
+        self.price = price
+        self.quantity = quantity
+        self.brand = brand
+        self.mpn = mpn
+        self.upc = upc
+        self.grade = grade
+        self.weight = weight
+        self.dimensions = dimensions if dimensions is not None else {"length": 10.0, "width": 10.0, "height": 10.0}
+        self.images = images if images is not None else []
+    
+    def __repr__(self):
+        return f"CompactInventoryItem(sku={self.sku!r}, title={self.title!r}, price={self.price!r})"
+    
+    def __eq__(self, other):
+        return item_to_dict(self) == item_to_dict(other)
+
+
+def item_to_dict(item) -> Dict:
+    """Serialize an InventoryItem or CompactInventoryItem to a plain dict"""
+    return {field: getattr(item, field) for field in CompactInventoryItem.__slots__}
+
+
 class ConditionMapper:
     """Utility class for mapping conditions and grades to eBay standards"""
     
@@ -54,41 +140,7 @@ class ConditionMapper:
         Returns:
             Valid eBay condition enum value
         """
-        # First try to map by grade if provided
-        if grade:
-            grade_clean = str(grade).strip().upper()
-            if grade_clean in GRADE_MAPPINGS:
-                return GRADE_MAPPINGS[grade_clean]
-        
-        # Map by condition
-        condition_clean = condition.lower().strip()
-        
-        # Direct mapping
-        if condition_clean in CONDITION_MAPPINGS:
-            return CONDITION_MAPPINGS[condition_clean]
-        
-        # Fuzzy matching for common variations
-        for key, value in CONDITION_MAPPINGS.items():
-            if key in condition_clean or condition_clean in key:
-                return value
-        
-        # Default fallback based on common terms
-        if any(term in condition_clean for term in ['new', 'mint', 'sealed']):
-            return 'NEW'
-        elif any(term in condition_clean for term in ['excellent', 'near mint']):
-            return 'USED_EXCELLENT'
-        elif any(term in condition_clean for term in ['very good', 'light']):
-            return 'USED_VERY_GOOD'
-        elif any(term in condition_clean for term in ['good', 'normal']):
-            return 'USED_GOOD'
-        elif any(term in condition_clean for term in ['acceptable', 'fair', 'heavy']):
-            return 'USED_ACCEPTABLE'
-        elif any(term in condition_clean for term in ['parts', 'broken', 'repair']):
-            return 'FOR_PARTS_OR_NOT_WORKING'
-        
-        # Ultimate fallback
-        logging.warning(f"Could not map condition '{condition}' with grade '{grade}', defaulting to USED_GOOD")
-        return 'USED_GOOD'
+        return get_normalizer().normalize(condition, grade)
     
     @staticmethod
     def get_condition_description(condition: str, grade: str = "") -> str:
@@ -115,11 +167,107 @@ class ConditionMapper:
             return f"{base_description} (Grade: {grade})"
         
         return base_description
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def condition_fields(condition: str, grade: str = "") -> tuple:
+        """Cached (eBay condition, condition description) for a (condition, grade) pair"""
+        return (ConditionMapper.map_condition(condition, grade),
+                ConditionMapper.get_condition_description(condition, grade))
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and requests are short-circuited"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` transient failures in a row the circuit opens and
+    calls fail fast for `reset_timeout` seconds. The next call after that is a
+    half-open trial: success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.opened_at is not None and time.time() - self.opened_at < self.reset_timeout
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError if requests are currently short-circuited"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.time() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures; "
+                                       f"retry in {remaining:.0f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+
+def classify_errors(errors, status_code: int = None) -> tuple:
+    """
+    Classify a per-SKU bulk response failure.
+
+    Args:
+        errors: The 'errors' list from a bulk response entry
+        status_code: The entry's statusCode, if any
+
+    Returns:
+        (error_ids, retryable)
+    """
+    error_ids = [err.get('errorId') for err in errors or [] if isinstance(err, dict) and err.get('errorId')]
+    retryable = (status_code in RETRYABLE_STATUS_CODES
+                 or any(error_id in RETRYABLE_EBAY_ERROR_IDS for error_id in error_ids))
+    return error_ids, retryable
+
+
+def classify_exception(error: Exception) -> tuple:
+    """
+    Classify a whole-batch failure raised by EbayAPI._make_request.
+
+    Returns:
+        (error_ids, retryable)
+    """
+    if isinstance(error, (CircuitOpenError, requests.exceptions.ConnectionError,
+                          requests.exceptions.Timeout)):
+        return [], True
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        errors = body.get('errors', []) if isinstance(body, dict) else []
+        return classify_errors(errors, response.status_code)
+    return [], False
+
 
 class EbayAPI:
-    """eBay API client with OAuth authentication and rate limiting"""
+    """eBay API client with OAuth authentication, rate limiting and retries"""
     
-    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None):
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None,
+                 min_interval: float = 0.1, timeout: float = 30.0, max_retries: int = 3,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 circuit_threshold: int = 5, circuit_reset: float = 60.0, pool_size: int = 10,
+                 api_base_url: str = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.sandbox = sandbox
@@ -127,14 +275,33 @@ class EbayAPI:
         self.access_token = user_token if user_token else None
         self.token_expires = time.time() + 7200 if user_token else 0  # User tokens typically valid for 2 hours
 
-        # API endpoints
+        # API endpoints (api_base_url points everything at another host, e.g. fake_ebay_server)
         base_url = "https://api.sandbox.ebay.com" if sandbox else "https://api.ebay.com"
+        if api_base_url:
+            base_url = api_base_url.rstrip('/')
         self.inventory_url = f"{base_url}/sell/inventory/v1"
-        self.oauth_url = "https://api.sandbox.ebay.com/identity/v1/oauth2/token" if sandbox else "https://api.ebay.com/identity/v1/oauth2/token"
+        self.metadata_url = f"{base_url}/sell/metadata/v1"
+        self.feed_url = f"{base_url}/sell/feed/v1"
+        self.oauth_url = f"{base_url}/identity/v1/oauth2/token"
+
+        # Pooled HTTP session (keep-alive across calls)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = timeout
+
+        # Retry / backoff
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_breaker = CircuitBreaker(circuit_threshold, circuit_reset)
 
         # Rate limiting
         self.last_request = 0
-        self.min_interval = 0.1  # 100ms between requests
+        self.min_interval = min_interval  # 100ms between requests by default
+        self._rate_lock = threading.Lock()
+        self._auth_lock = threading.Lock()
 
         # Setup logging
         logging.basicConfig(level=logging.INFO)
@@ -148,10 +315,16 @@ class EbayAPI:
             self.logger.info("Using provided user token for authentication")
             return True
 
-        # Check if we have a valid token already
-        if self.access_token and time.time() < self.token_expires:
-            return True
+        # Concurrent batches share one token; only the first caller refreshes it
+        with self._auth_lock:
+            # Check if we have a valid token already
+            if self.access_token and time.time() < self.token_expires:
+                return True
 
+            return self._fetch_app_token()
+
+    def _fetch_app_token(self) -> bool:
+        """Request a client-credentials token from the OAuth endpoint"""
         try:
             headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
@@ -163,7 +336,8 @@ class EbayAPI:
                 'scope': 'https://api.ebay.com/oauth/api_scope/sell.inventory'
             }
 
-            response = requests.post(self.oauth_url, headers=headers, data=data)
+            response = None
+            response = self.session.post(self.oauth_url, headers=headers, data=data, timeout=self.timeout)
             response.raise_for_status()
 
             token_data = response.json()
@@ -175,7 +349,7 @@ class EbayAPI:
 
         except Exception as e:
             self.logger.error(f"Authentication failed: {e}")
-            if hasattr(response, 'text'):
+            if response is not None:
                 self.logger.error(f"Response: {response.text}")
             return False
     
@@ -186,192 +360,482 @@ class EbayAPI:
         return base64.b64encode(auth_string.encode()).decode()
     
     def _rate_limit(self):
-        """Enforce rate limiting between API calls"""
-        elapsed = time.time() - self.last_request
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_request = time.time()
-    
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
-        """Make authenticated API request with rate limiting"""
-        if not self.authenticate():
-            raise Exception("Failed to authenticate")
-        
-        self._rate_limit()
-        
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-        
-        url = f"{self.inventory_url}/{endpoint}"
-        
-        if method.upper() == 'GET':
-            response = requests.get(url, headers=headers, params=data)
-        elif method.upper() == 'POST':
-            response = requests.post(url, headers=headers, json=data)
-        elif method.upper() == 'PUT':
-            response = requests.put(url, headers=headers, json=data)
-        elif method.upper() == 'DELETE':
-            response = requests.delete(url, headers=headers)
-        else:
+        """Enforce rate limiting between API calls (shared across threads)"""
+        with self._rate_lock:
+            elapsed = time.time() - self.last_request
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+            self.last_request = time.time()
+
+    @staticmethod
+    def _error_ids(response: requests.Response) -> List[int]:
+        """Extract eBay errorIds from an error response body"""
+        try:
+            body = response.json()
+        except ValueError:
+            return []
+        if not isinstance(body, dict):
+            return []
+        return [err.get('errorId') for err in body.get('errors', []) if isinstance(err, dict)]
+
+    @staticmethod
+    def _parse_retry_after(response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _is_retryable(self, response: requests.Response) -> bool:
+        """Decide whether a failed response is transient"""
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            return True
+        return any(error_id in RETRYABLE_EBAY_ERROR_IDS for error_id in self._error_ids(response))
+
+    def _is_throttled(self, response: requests.Response) -> bool:
+        """True if the call was refused by rate limiting (nothing was processed)"""
+        return (response.status_code == THROTTLE_STATUS_CODE
+                or THROTTLE_EBAY_ERROR_ID in self._error_ids(response))
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff; Retry-After from the server wins when larger"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _make_request(self, method: str, endpoint: str, data: Dict = None, body: bytes = None,
+                      base_url: str = None, files: Dict = None, raw: bool = False,
+                      idempotent: Optional[bool] = None):
+        """
+        Make authenticated API request with rate limiting, retries and circuit breaking.
+
+        ``body`` sends an already-serialized JSON payload instead of ``data``;
+        ``base_url`` targets another Sell API (default: Inventory API);
+        ``files`` sends a multipart/form-data upload (Feed API); ``raw`` returns
+        the requests.Response (headers, binary bodies) instead of parsed JSON.
+
+        Timeouts, network errors and 5xx are only retried for idempotent calls:
+        GET/PUT/DELETE and the replace-style bulk endpoints, unless
+        ``idempotent`` says otherwise. A POST that creates something (offers,
+        publishes, feed tasks) may have succeeded before the failure, so it is
+        not repeated blindly. Throttled calls (429) are always retried.
+        """
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
             raise ValueError(f"Unsupported HTTP method: {method}")
+        if idempotent is None:
+            idempotent = method != 'POST' or endpoint in IDEMPOTENT_POST_ENDPOINTS
+
+        url = f"{base_url or self.inventory_url}/{endpoint}"
+        token_refreshed = False
+        attempt = 0
+
+        while True:
+            self.circuit_breaker.before_request()
+
+            if not self.authenticate():
+                raise Exception("Failed to authenticate")
+
+            self._rate_limit()
+
+            headers = {
+                'Authorization': f'Bearer {self.access_token}',
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            }
+            if files is not None:
+                # requests sets the multipart Content-Type (with boundary) itself
+                del headers['Content-Type']
+
+            try:
+                if files is not None:
+                    response = self.session.request(method, url, headers=headers, data=data, files=files,
+                                                    timeout=self.timeout)
+                elif method == 'GET':
+                    response = self.session.get(url, headers=headers, params=data, timeout=self.timeout)
+                elif method == 'DELETE':
+                    response = self.session.delete(url, headers=headers, timeout=self.timeout)
+                elif body is not None:
+                    response = self.session.request(method, url, headers=headers, data=body, timeout=self.timeout)
+                else:
+                    response = self.session.request(method, url, headers=headers, json=data, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.circuit_breaker.record_failure()
+                if not idempotent:
+                    self.logger.error(f"{method} {endpoint} failed ({e}); not retried (not idempotent)")
+                    raise
+                if attempt >= self.max_retries:
+                    self.logger.error(f"API request failed after {attempt + 1} attempts: {e}")
+                    raise
+                delay = self._backoff_delay(attempt)
+                self.logger.warning(f"{method} {endpoint} network error ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if response.ok:
+                self.circuit_breaker.record_success()
+                if raw:
+                    return response
+                return response.json() if response.text else {}
+
+            # Expired/invalid application token: refresh once and retry immediately
+            if (response.status_code == 401 and not self.user_token and not token_refreshed
+                    and INVALID_TOKEN_ERROR_ID in self._error_ids(response)):
+                self.logger.info("Access token rejected; re-authenticating")
+                self.access_token = None
+                self.token_expires = 0
+                token_refreshed = True
+                continue
+
+            if self._is_retryable(response):
+                throttled = self._is_throttled(response)
+                if not throttled:
+                    # Throttling is the service pacing us (Retry-After), not failing
+                    self.circuit_breaker.record_failure()
+                if attempt < self.max_retries and (throttled or idempotent):
+                    delay = self._backoff_delay(attempt, self._parse_retry_after(response))
+                    self.logger.warning(f"{method} {endpoint} returned {response.status_code}; "
+                                        f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+            else:
+                # Permanent client error: the service is healthy
+                self.circuit_breaker.record_success()
+
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                self.logger.error(f"API request failed: {e}")
+                self.logger.error(f"Response: {response.text}")
+                raise
+
+class InventoryPayloadBuilder:
+    """
+    Single source of inventory item payloads.
+
+    Condition mapping/description come from a per-(condition, grade) cache,
+    and whole bulk batches are serialized in one pass with orjson when it is
+    installed (stdlib json otherwise).
+    """
+    
+    def __init__(self, max_images: int = 12):
+        self.max_images = max_images
+    
+    def build(self, item, include_sku: bool = True) -> Dict:
+        """
+        Build the inventory item payload.
         
-        try:
-            response.raise_for_status()
-            return response.json() if response.text else {}
-        except requests.exceptions.HTTPError as e:
-            self.logger.error(f"API request failed: {e}")
-            self.logger.error(f"Response: {response.text}")
-            raise
+        Args:
+            item: InventoryItem or CompactInventoryItem
+            include_sku: Include 'sku' (bulk request entries); single-item PUTs
+                carry the SKU in the URL instead
+        """
+        ebay_condition, condition_description = ConditionMapper.condition_fields(
+            item.condition, item.grade or ""
+        )
+        dimensions = item.dimensions
+        
+        aspects = {}
+        if item.brand:
+            aspects["Brand"] = [item.brand]
+        if item.grade:
+            aspects["Grade"] = [item.grade]
+        
+        product = {
+            "title": item.title,
+            "description": item.description,
+            "brand": item.brand,
+            "mpn": item.mpn if item.mpn else item.sku,
+            "imageUrls": item.images[:self.max_images],
+            "aspects": aspects
+        }
+        if item.upc:
+            product["upc"] = [item.upc]
+        
+        payload = {
+            "product": product,
+            "condition": ebay_condition,
+            "conditionDescription": condition_description,
+            "availability": {
+                "shipToLocationAvailability": {
+                    "quantity": item.quantity
+                }
+            },
+            "packageWeightAndSize": {
+                "dimensions": {
+                    "height": dimensions["height"],
+                    "length": dimensions["length"],
+                    "width": dimensions["width"],
+                    "unit": "INCH"
+                },
+                "weight": {
+                    "value": item.weight,
+                    "unit": "POUND"
+                }
+            }
+        }
+        if include_sku:
+            payload = {"sku": item.sku, **payload}
+        return payload
+    
+    def dumps_batch(self, items) -> bytes:
+        """Serialize a bulk_create_or_replace_inventory_item body for a batch"""
+        body = {"requests": [self.build(item) for item in items]}
+        if orjson is not None:
+            return orjson.dumps(body)
+        return json.dumps(body, separators=(',', ':')).encode('utf-8')
+
 
 class InventoryManager:
     """Manages eBay inventory items and bulk operations"""
     
-    def __init__(self, api: EbayAPI):
+    def __init__(self, api: EbayAPI, max_concurrent_batches: int = 1,
+                 dead_letters: DeadLetterStore = None, mirror: InventoryMirror = None):
         self.api = api
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self.dead_letters = dead_letters
+        self.mirror = mirror
+        self.payload_builder = InventoryPayloadBuilder()
         self.logger = logging.getLogger(__name__)
     
     def create_inventory_item(self, item: InventoryItem) -> bool:
         """Create a single inventory item"""
         try:
-            # Map condition using the condition mapper
-            ebay_condition = ConditionMapper.map_condition(item.condition, item.grade)
-            
-            inventory_data = {
-                "availability": {
-                    "shipToLocationAvailability": {
-                        "quantity": item.quantity
-                    }
-                },
-                "condition": ebay_condition,
-                "conditionDescription": ConditionMapper.get_condition_description(item.condition, item.grade),
-                "product": {
-                    "title": item.title,
-                    "description": item.description,
-                    "aspects": {},
-                    "brand": item.brand,
-                    "mpn": item.mpn if item.mpn else item.sku,
-                    "imageUrls": item.images[:12]  # Max 12 images
-                },
-                "packageWeightAndSize": {
-                    "dimensions": {
-                        "height": item.dimensions["height"],
-                        "length": item.dimensions["length"],
-                        "width": item.dimensions["width"],
-                        "unit": "INCH"
-                    },
-                    "weight": {
-                        "value": item.weight,
-                        "unit": "POUND"
-                    }
-                }
-            }
-            
-            # Add UPC if provided
-            if item.upc:
-                inventory_data["product"]["upc"] = [item.upc]
-            
-            # Add brand to aspects if provided
-            if item.brand:
-                inventory_data["product"]["aspects"]["Brand"] = [item.brand]
-            
-            # Add grade to aspects if provided
-            if item.grade:
-                inventory_data["product"]["aspects"]["Grade"] = [item.grade]
+            inventory_data = self.payload_builder.build(item, include_sku=False)
             
             response = self.api._make_request('PUT', f"inventory_item/{item.sku}", inventory_data)
             self.logger.info(f"Created inventory item: {item.sku}")
+            if self.mirror:
+                self.mirror.record_items([{"sku": item.sku, **inventory_data}])
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to create inventory item {item.sku}: {e}")
             return False
     
-    def bulk_create_inventory_items(self, items: List[InventoryItem], batch_size: int = 25) -> Dict:
-        """Create multiple inventory items in batches"""
+    def bulk_create_inventory_items(self, items: List[InventoryItem], batch_size: int = 25,
+                                    on_batch=None) -> Dict:
+        """
+        Create multiple inventory items in batches.
+
+        Up to ``max_concurrent_batches`` batches are in flight at once; all of
+        them share the API's rate limiter, and results are merged back in batch
+        order so per-SKU reporting stays deterministic. ``on_batch`` is called
+        with each batch's {"successful", "failed"} result, in batch order, as
+        soon as it is available (used for job checkpoints). Failures carry
+        their eBay ``error_ids`` and a ``retryable`` flag and are persisted in
+        the dead-letter store when one is configured.
+        """
+        # Process in batches of 25 (API limit)
+        return self.bulk_create_inventory_batches(CSVProcessor.batched(items, batch_size), on_batch=on_batch)
+    
+    def bulk_create_inventory_batches(self, batches: Iterable[List[InventoryItem]], on_batch=None) -> Dict:
+        """
+        Create inventory items from an iterable of batches (e.g. CSVProcessor.iter_item_batches).
+
+        Batches are pulled lazily and at most ``max_concurrent_batches`` are in
+        flight, so memory stays flat however large the source file is.
+        See bulk_create_inventory_items for result and callback semantics.
+        """
         results = {"successful": [], "failed": []}
         
-        # Process in batches of 25 (API limit)
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            batch_data = {"requests": []}
+        def _collect(batch: List[InventoryItem], batch_result: Dict):
+            if self.dead_letters:
+                items_by_sku = {item.sku: item for item in batch}
+                self.dead_letters.resolve(OP_INVENTORY, batch_result["successful"])
+                self.dead_letters.add(OP_INVENTORY, batch_result["failed"], items={
+                    f["sku"]: item_to_dict(items_by_sku[f["sku"]])
+                    for f in batch_result["failed"] if f["sku"] in items_by_sku
+                })
+            if on_batch:
+                on_batch(batch_result)
+            results["successful"].extend(batch_result["successful"])
+            results["failed"].extend(batch_result["failed"])
+        
+        if self.max_concurrent_batches == 1:
+            for n, batch in enumerate(batches, 1):
+                _collect(batch, self._create_inventory_batch(batch, n))
+            return results
+        
+        # Sliding window: submit up to N batches, always collect the oldest first
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_batches) as executor:
+            for n, batch in enumerate(batches, 1):
+                if len(in_flight) >= self.max_concurrent_batches:
+                    done_batch, future = in_flight.popleft()
+                    _collect(done_batch, future.result())
+                in_flight.append((batch, executor.submit(self._create_inventory_batch, batch, n)))
+            while in_flight:
+                done_batch, future = in_flight.popleft()
+                _collect(done_batch, future.result())
+        
+        return results
+    
+    def build_inventory_payload(self, item: InventoryItem) -> Dict:
+        """Build the bulk_create_or_replace_inventory_item request entry for an item"""
+        return self.payload_builder.build(item)
+    
+    def _create_inventory_batch(self, batch: List[InventoryItem], batch_number: int) -> Dict:
+        """Send one bulk_create_or_replace_inventory_item call and map results per SKU"""
+        results = {"successful": [], "failed": []}
+        
+        try:
+            body = self.payload_builder.dumps_batch(batch)
+            response = self.api._make_request('POST', 'bulk_create_or_replace_inventory_item', body=body)
             
+            # Process response
+            for idx, resp in enumerate(response.get('responses', [])):
+                item_sku = resp.get('sku') or batch[idx].sku
+                if resp.get('statusCode') == 200:
+                    results["successful"].append(item_sku)
+                else:
+                    error_ids, retryable = classify_errors(resp.get('errors'), resp.get('statusCode'))
+                    results["failed"].append({
+                        "sku": item_sku,
+                        "error": resp.get('errors', ['Unknown error']),
+                        "error_ids": error_ids,
+                        "retryable": retryable
+                    })
+            
+            self.logger.info(f"Processed batch {batch_number}: {len(batch)} items")
+            if self.mirror and results["successful"]:
+                # Keep the mirror in step with what eBay now has, so reads from it are not stale
+                created = set(results["successful"])
+                self.mirror.record_items([entry for entry in json.loads(body)["requests"]
+                                          if entry["sku"] in created])
+            
+        except Exception as e:
+            self.logger.error(f"Batch creation failed: {e}")
+            error_ids, retryable = classify_exception(e)
             for item in batch:
-                # Map condition using the condition mapper
-                ebay_condition = ConditionMapper.map_condition(item.condition, item.grade)
-                
-                inventory_data = {
-                    "sku": item.sku,
-                    "product": {
-                        "title": item.title,
-                        "description": item.description,
-                        "brand": item.brand,
-                        "mpn": item.mpn if item.mpn else item.sku,
-                        "imageUrls": item.images[:12],
-                        "aspects": {}
-                    },
-                    "condition": ebay_condition,
-                    "conditionDescription": ConditionMapper.get_condition_description(item.condition, item.grade),
-                    "availability": {
-                        "shipToLocationAvailability": {
-                            "quantity": item.quantity
-                        }
-                    },
-                    "packageWeightAndSize": {
-                        "dimensions": {
-                            "height": item.dimensions["height"],
-                            "length": item.dimensions["length"],
-                            "width": item.dimensions["width"],
-                            "unit": "INCH"
-                        },
-                        "weight": {
-                            "value": item.weight,
-                            "unit": "POUND"
-                        }
-                    }
-                }
-                
-                # Add UPC if provided
-                if item.upc:
-                    inventory_data["product"]["upc"] = [item.upc]
-                
-                # Add brand to aspects if provided
-                if item.brand:
-                    inventory_data["product"]["aspects"]["Brand"] = [item.brand]
-                
-                # Add grade to aspects if provided
-                if item.grade:
-                    inventory_data["product"]["aspects"]["Grade"] = [item.grade]
-                
-                batch_data["requests"].append(inventory_data)
+                results["failed"].append({"sku": item.sku, "error": str(e),
+                                          "error_ids": error_ids, "retryable": retryable})
+        
+        return results
+    
+    # Inventory API maximum for bulk_update_price_quantity
+    BULK_PRICE_QUANTITY_LIMIT = 25
+    
+    @staticmethod
+    def build_price_quantity_request(update: Dict, currency: str = "USD") -> Dict:
+        """
+        Build one bulk_update_price_quantity request entry.
+        
+        Args:
+            update: Dict with 'sku' and any of 'price', 'quantity', 'offer_id'
+            currency: Price currency
+        """
+        request = {"sku": update["sku"]}
+        if update.get("quantity") is not None:
+            request["shipToLocationAvailability"] = {"quantity": int(update["quantity"])}
+        
+        if update.get("offer_id") and (update.get("price") is not None or update.get("quantity") is not None):
+            offer = {"offerId": update["offer_id"]}
+            if update.get("price") is not None:
+                offer["price"] = {"value": f"{float(update['price']):.2f}", "currency": currency}
+            if update.get("quantity") is not None:
+                offer["availableQuantity"] = int(update["quantity"])
+            request["offers"] = [offer]
+        
+        return request
+    
+    def bulk_update_price_quantity(self, updates: List[Dict], batch_size: int = BULK_PRICE_QUANTITY_LIMIT,
+                                   currency: str = "USD") -> Dict:
+        """
+        Update only price and/or quantity for live SKUs via bulk_update_price_quantity.
+        
+        Much lighter than re-sending full inventory payloads: no product data,
+        25 SKUs per call. Price changes need the SKU's offer_id; updates with
+        a price but no offer_id are reported as failed without being sent.
+        
+        Args:
+            updates: Dicts with 'sku' and any of 'price', 'quantity', 'offer_id'
+            batch_size: SKUs per call (capped at the API maximum of 25)
+            currency: Price currency
+        
+        Returns:
+            {"successful": [sku, ...], "failed": [{"sku", "error", "error_ids", "retryable"}]}
+        """
+        results = {"successful": [], "failed": []}
+        batch_size = min(batch_size, self.BULK_PRICE_QUANTITY_LIMIT)
+        
+        # A price can only be set on an offer; without one it would be silently dropped
+        sendable = []
+        for update in updates:
+            if update.get("price") is not None and not update.get("offer_id"):
+                results["failed"].append({"sku": update["sku"], "error": "No offer found for SKU",
+                                          "error_ids": [], "retryable": False})
+            else:
+                sendable.append(update)
+        updates = sendable
+        
+        for i in range(0, len(updates), batch_size):
+            batch = updates[i:i + batch_size]
+            batch_data = {"requests": [self.build_price_quantity_request(u, currency) for u in batch]}
             
             try:
-                response = self.api._make_request('POST', 'bulk_create_or_replace_inventory_item', batch_data)
+                response = self.api._make_request('POST', 'bulk_update_price_quantity', batch_data)
                 
-                # Process response
-                for idx, resp in enumerate(response.get('responses', [])):
-                    item_sku = batch[idx].sku
-                    if resp.get('statusCode') == 200:
-                        results["successful"].append(item_sku)
+                # One response per SKU and per offer; a SKU succeeds only if all of them did
+                errors_by_sku = {u["sku"]: [] for u in batch}
+                status_by_sku = {}
+                for resp in response.get('responses', []):
+                    sku = resp.get('sku')
+                    if sku not in errors_by_sku:
+                        continue
+                    if resp.get('statusCode') != 200:
+                        errors_by_sku[sku].extend(resp.get('errors') or ['Unknown error'])
+                        status_by_sku[sku] = resp.get('statusCode')
+                
+                applied = []
+                for update in batch:
+                    sku = update["sku"]
+                    if errors_by_sku[sku]:
+                        error_ids, retryable = classify_errors(errors_by_sku[sku], status_by_sku.get(sku))
+                        results["failed"].append({"sku": sku, "error": errors_by_sku[sku],
+                                                  "error_ids": error_ids, "retryable": retryable})
                     else:
-                        results["failed"].append({
-                            "sku": item_sku,
-                            "error": resp.get('errors', ['Unknown error'])
-                        })
+                        results["successful"].append(sku)
+                        applied.append(update)
+                
+                if self.mirror:
+                    # Offer-only changes never reach an incremental mirror refresh
+                    self.mirror.record_offer_changes([
+                        {"offer_id": u["offer_id"], "sku": u["sku"], "price": u["price"]}
+                        for u in applied if u.get("offer_id") and u.get("price") is not None
+                    ])
+                    self.mirror.record_quantities({
+                        u["sku"]: int(u["quantity"]) for u in applied if u.get("quantity") is not None
+                    })
                 
-                self.logger.info(f"Processed batch {i//batch_size + 1}: {len(batch)} items")
+                self.logger.info(f"Updated price/quantity batch {i//batch_size + 1}: {len(batch)} SKUs")
                 
             except Exception as e:
-                self.logger.error(f"Batch creation failed: {e}")
-                for item in batch:
-                    results["failed"].append({"sku": item.sku, "error": str(e)})
+                self.logger.error(f"Price/quantity update failed: {e}")
+                error_ids, retryable = classify_exception(e)
+                for update in batch:
+                    results["failed"].append({"sku": update["sku"], "error": str(e),
+                                              "error_ids": error_ids, "retryable": retryable})
         
         return results
     
-    def get_inventory_item(self, sku: str) -> Dict:
-        """Retrieve inventory item by SKU"""
+    def get_inventory_item(self, sku: str, live: bool = False) -> Dict:
+        """Retrieve inventory item by SKU (from the local mirror when available, unless live)"""
+        if self.mirror and not live:
+            item = self.mirror.get_item(sku)
+            if item:
+                return item
         try:
             return self.api._make_request('GET', f'inventory_item/{sku}')
         except Exception as e:
@@ -380,33 +844,48 @@ class InventoryManager:
 
 class ListingManager:
     """Manages eBay listing offers and publication"""
+
+    # Inventory API maximum for bulk_create_offer / bulk_publish_offer
+    BULK_OFFER_LIMIT = 25
     
-    def __init__(self, api: EbayAPI):
+    def __init__(self, api: EbayAPI, mirror: InventoryMirror = None):
         self.api = api
+        self.mirror = mirror
         self.logger = logging.getLogger(__name__)
+
+    def _record_offers(self, changes: List[Dict]):
+        """Write offer prices/statuses we just changed into the mirror, if any"""
+        if self.mirror:
+            self.mirror.record_offer_changes(changes)
+
+    @staticmethod
+    def _build_offer_payload(sku: str, category_id: str, price: float,
+                             marketplace_id: str = "EBAY_US") -> Dict:
+        """Build the offer body shared by single and bulk offer creation"""
+        return {
+            "sku": sku,
+            "marketplaceId": marketplace_id,
+            "format": "FIXED_PRICE",
+            "availableQuantity": 1,  # Will be pulled from inventory
+            "categoryId": category_id,
+            "pricingSummary": {
+                "price": {
+                    "value": str(price),
+                    "currency": "USD"
+                }
+            },
+            "listingPolicies": {
+                "fulfillmentPolicyId": "DEFAULT",  # Replace with actual policy
+                "paymentPolicyId": "DEFAULT",      # Replace with actual policy
+                "returnPolicyId": "DEFAULT"        # Replace with actual policy
+            }
+        }
     
     def create_offer(self, sku: str, category_id: str, price: float, 
                     marketplace_id: str = "EBAY_US") -> str:
         """Create an offer for an inventory item"""
         try:
-            offer_data = {
-                "sku": sku,
-                "marketplaceId": marketplace_id,
-                "format": "FIXED_PRICE",
-                "availableQuantity": 1,  # Will be pulled from inventory
-                "categoryId": category_id,
-                "pricingSummary": {
-                    "price": {
-                        "value": str(price),
-                        "currency": "USD"
-                    }
-                },
-                "listingPolicies": {
-                    "fulfillmentPolicyId": "DEFAULT",  # Replace with actual policy
-                    "paymentPolicyId": "DEFAULT",      # Replace with actual policy
-                    "returnPolicyId": "DEFAULT"        # Replace with actual policy
-                }
-            }
+            offer_data = self._build_offer_payload(sku, category_id, price, marketplace_id)
             
             response = self.api._make_request('POST', 'offer', offer_data)
             offer_id = response.get('offerId')
@@ -417,62 +896,304 @@ class ListingManager:
             self.logger.error(f"Failed to create offer for {sku}: {e}")
             return None
     
+    def update_offer(self, offer_id: str, sku: str, category_id: str, price: float,
+                     marketplace_id: str = "EBAY_US") -> bool:
+        """Replace an existing offer (updateOffer) with freshly built offer data"""
+        try:
+            offer_data = self._build_offer_payload(sku, category_id, price, marketplace_id)
+            self.api._make_request('PUT', f'offer/{offer_id}', offer_data)
+            self.logger.info(f"Updated offer {offer_id} for SKU {sku}")
+            self._record_offers([{"offer_id": offer_id, "sku": sku, "price": price}])
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to update offer {offer_id} for {sku}: {e}")
+            return False
+    
     def publish_offer(self, offer_id: str) -> bool:
         """Publish an offer to create active listing"""
         try:
-            self.api._make_request('POST', f'offer/{offer_id}/publish')
+            response = self.api._make_request('POST', f'offer/{offer_id}/publish')
             self.logger.info(f"Published offer {offer_id}")
+            self._record_offers([{"offer_id": offer_id, "status": "PUBLISHED",
+                                  "listing_id": (response or {}).get('listingId')}])
             return True
         except Exception as e:
             self.logger.error(f"Failed to publish offer {offer_id}: {e}")
             return False
 
+    def bulk_create_offers(self, offers: List[Dict], marketplace_id: str = "EBAY_US",
+                           batch_size: int = BULK_OFFER_LIMIT, on_batch=None) -> Dict:
+        """
+        Create offers in batches via bulk_create_offer.
+
+        Args:
+            offers: Dicts with 'sku', 'category_id' and 'price'
+            marketplace_id: Target marketplace
+            batch_size: Offers per call (capped at the API maximum of 25)
+            on_batch: Optional callback receiving each batch's results
+
+        Returns:
+            {"successful": [{"sku", "offer_id"}], "failed": [{"sku", "error"}]}
+        """
+        results = {"successful": [], "failed": []}
+        batch_size = min(batch_size, self.BULK_OFFER_LIMIT)
+
+        for i in range(0, len(offers), batch_size):
+            batch = offers[i:i + batch_size]
+            batch_results = {"successful": [], "failed": []}
+            batch_data = {"requests": [
+                self._build_offer_payload(o["sku"], o["category_id"], o["price"], marketplace_id)
+                for o in batch
+            ]}
+
+            try:
+                response = self.api._make_request('POST', 'bulk_create_offer', batch_data)
+
+                for idx, resp in enumerate(response.get('responses', [])):
+                    sku = resp.get('sku') or batch[idx]["sku"]
+                    if resp.get('statusCode') == 200 and resp.get('offerId'):
+                        batch_results["successful"].append({"sku": sku, "offer_id": resp['offerId']})
+                    else:
+                        batch_results["failed"].append({
+                            "sku": sku,
+                            "error": resp.get('errors', ['Unknown error'])
+                        })
+
+                self.logger.info(f"Created offer batch {i//batch_size + 1}: {len(batch)} offers")
+                prices = {o["sku"]: o["price"] for o in batch}
+                self._record_offers([
+                    {"offer_id": o["offer_id"], "sku": o["sku"], "price": prices.get(o["sku"]),
+                     "status": "UNPUBLISHED"}
+                    for o in batch_results["successful"]
+                ])
+
+            except Exception as e:
+                self.logger.error(f"Bulk offer creation failed: {e}")
+                for o in batch:
+                    batch_results["failed"].append({"sku": o["sku"], "error": str(e)})
+
+            if on_batch:
+                on_batch(batch_results)
+            results["successful"].extend(batch_results["successful"])
+            results["failed"].extend(batch_results["failed"])
+
+        return results
+
+    def bulk_publish_offers(self, offer_ids: List[str], batch_size: int = BULK_OFFER_LIMIT,
+                            on_batch=None) -> Dict:
+        """
+        Publish offers in batches via bulk_publish_offer.
+
+        Args:
+            offer_ids: Offer IDs to publish
+            batch_size: Offers per call (capped at the API maximum of 25)
+            on_batch: Optional callback receiving each batch's results
+
+        Returns:
+            {"successful": [{"offer_id", "listing_id"}], "failed": [{"offer_id", "error"}]}
+        """
+        results = {"successful": [], "failed": []}
+        batch_size = min(batch_size, self.BULK_OFFER_LIMIT)
+
+        for i in range(0, len(offer_ids), batch_size):
+            batch = offer_ids[i:i + batch_size]
+            batch_results = {"successful": [], "failed": []}
+            batch_data = {"requests": [{"offerId": offer_id} for offer_id in batch]}
+
+            try:
+                response = self.api._make_request('POST', 'bulk_publish_offer', batch_data)
+
+                for idx, resp in enumerate(response.get('responses', [])):
+                    offer_id = resp.get('offerId') or batch[idx]
+                    if resp.get('statusCode') == 200:
+                        batch_results["successful"].append({
+                            "offer_id": offer_id,
+                            "listing_id": resp.get('listingId')
+                        })
+                    else:
+                        batch_results["failed"].append({
+                            "offer_id": offer_id,
+                            "error": resp.get('errors', ['Unknown error'])
+                        })
+
+                self.logger.info(f"Published offer batch {i//batch_size + 1}: {len(batch)} offers")
+
+            except Exception as e:
+                self.logger.error(f"Bulk publish failed: {e}")
+                for offer_id in batch:
+                    batch_results["failed"].append({"offer_id": offer_id, "error": str(e)})
+
+            if on_batch:
+                on_batch(batch_results)
+            results["successful"].extend(batch_results["successful"])
+            results["failed"].extend(batch_results["failed"])
+
+        return results
+
+    def bulk_create_and_publish(self, offers: List[Dict], marketplace_id: str = "EBAY_US",
+                                existing_offer_ids: Dict[str, str] = None,
+                                on_offers_created=None, on_published=None) -> Dict:
+        """
+        Create and publish offers in bulk, mapping every outcome back to its SKU.
+
+        Args:
+            offers: Dicts with 'sku', 'category_id' and 'price'
+            marketplace_id: Target marketplace
+            existing_offer_ids: sku -> offer_id for offers created earlier but not
+                yet published; these are published without being created again
+            on_offers_created: Optional callback receiving each offer batch's results
+            on_published: Optional callback receiving each publish batch's results,
+                keyed by SKU like the return value
+
+        Returns:
+            {"successful": [{"sku", "offer_id", "listing_id"}], "failed": [{"sku", "error"}]}
+        """
+        offer_results = self.bulk_create_offers(offers, marketplace_id, on_batch=on_offers_created)
+        sku_by_offer = {offer_id: sku for sku, offer_id in (existing_offer_ids or {}).items()}
+        sku_by_offer.update({o["offer_id"]: o["sku"] for o in offer_results["successful"]})
+
+        def _by_sku(publish_results: Dict) -> Dict:
+            mapped = {"successful": [], "failed": []}
+            for published in publish_results["successful"]:
+                mapped["successful"].append({
+                    "sku": sku_by_offer.get(published["offer_id"]),
+                    "offer_id": published["offer_id"],
+                    "listing_id": published["listing_id"]
+                })
+            for failed in publish_results["failed"]:
+                mapped["failed"].append({
+                    "sku": sku_by_offer.get(failed["offer_id"]),
+                    "offer_id": failed["offer_id"],
+                    "error": failed["error"]
+                })
+            return mapped
+
+        def _on_publish_batch(batch: Dict):
+            mapped = _by_sku(batch)
+            self._record_offers([
+                {"offer_id": listing["offer_id"], "sku": listing["sku"], "status": "PUBLISHED",
+                 "listing_id": listing["listing_id"]}
+                for listing in mapped["successful"] if listing["sku"]
+            ])
+            if on_published:
+                on_published(mapped)
+
+        publish_results = _by_sku(self.bulk_publish_offers(list(sku_by_offer), on_batch=_on_publish_batch))
+
+        return {
+            "successful": publish_results["successful"],
+            "failed": list(offer_results["failed"]) + publish_results["failed"]
+        }
+
 class CSVProcessor:
     """Processes CSV files for bulk inventory management"""
     
+    REQUIRED_COLUMNS = ('sku', 'title', 'description', 'category_id', 'price')
+    
+    @staticmethod
+    def batched(items: Iterable, batch_size: int) -> Iterator[List]:
+        """Split any iterable into lists of at most batch_size"""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def _parse_dimensions(value: str) -> Dict[str, float]:
+        """Parse 'LxWxH' into a dimensions dict, falling back to the 10x10x10 default"""
+        dim_parts = value.split('x') if value else []
+        if len(dim_parts) == 3:
+            try:
+                return {
+                    "length": float(dim_parts[0]),
+                    "width": float(dim_parts[1]),
+                    "height": float(dim_parts[2])
+                }
+            except ValueError:
+                pass
+        return {"length": 10.0, "width": 10.0, "height": 10.0}
+    
+    @staticmethod
+    def iter_items(file_path: str, chunk_size: int = 5000, compact: bool = False) -> Iterator[InventoryItem]:
+        """
+        Stream validated inventory items from a CSV in chunks.
+
+        Rows are read as plain strings chunk by chunk and built from column
+        lists (no per-row Series), so memory use depends on chunk_size rather
+        than file size. Rows missing a SKU/title or with an invalid price are
+        logged and skipped.
+
+        Args:
+            file_path: CSV path
+            chunk_size: Rows per pandas chunk
+            compact: Yield slotted CompactInventoryItem instances instead
+        """
+        item_type = CompactInventoryItem if compact else InventoryItem
+        reader = pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+        row_number = 1
+        
+        for chunk in reader:
+            missing = [col for col in CSVProcessor.REQUIRED_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+            
+            n = len(chunk)
+            def column(name, default=''):
+                return chunk[name].tolist() if name in chunk.columns else [default] * n
+            
+            for (sku, title, description, condition, category_id, price, quantity, brand,
+                 mpn, upc, grade, weight, dimensions, images) in zip(
+                    column('sku'), column('title'), column('description'), column('condition', 'NEW'),
+                    column('category_id'), column('price'), column('quantity', '1'), column('brand'),
+                    column('mpn'), column('upc'), column('grade'), column('weight', '1.0'),
+                    column('dimensions'), column('images')):
+                row_number += 1
+                sku = sku.strip()
+                if not sku or not title:
+                    logging.warning(f"{file_path}:{row_number}: missing sku or title, skipped")
+                    continue
+                try:
+                    price = float(price)
+                    quantity = int(float(quantity)) if quantity else 1
+                    weight = float(weight) if weight else 1.0
+                except ValueError as e:
+                    logging.warning(f"{file_path}:{row_number} ({sku}): invalid number ({e}), skipped")
+                    continue
+                
+                yield item_type(
+                    sku=sku,
+                    title=title,
+                    description=description,
+                    condition=condition or 'NEW',
+                    category_id=category_id,
+                    price=price,
+                    quantity=quantity,
+                    brand=brand,
+                    mpn=mpn,
+                    upc=upc,
+                    grade=grade,
+                    weight=weight,
+                    dimensions=CSVProcessor._parse_dimensions(dimensions),
+                    images=[url.strip() for url in images.split(',')] if images else []
+                )
+    
+    @staticmethod
+    def iter_item_batches(file_path: str, batch_size: int = 25, chunk_size: int = 5000,
+                          compact: bool = False) -> Iterator[List[InventoryItem]]:
+        """Stream validated inventory items from a CSV in API-sized batches"""
+        return CSVProcessor.batched(CSVProcessor.iter_items(file_path, chunk_size, compact), batch_size)
+    
     @staticmethod
     def load_items_from_csv(file_path: str) -> List[InventoryItem]:
         """Load inventory items from CSV file"""
         items = []
         
         try:
-            df = pd.read_csv(file_path)
-            
-            for _, row in df.iterrows():
-                # Parse dimensions if provided
-                dimensions = {"length": 10.0, "width": 10.0, "height": 10.0}
-                if 'dimensions' in row and pd.notna(row['dimensions']):
-                    dim_parts = str(row['dimensions']).split('x')
-                    if len(dim_parts) == 3:
-                        dimensions = {
-                            "length": float(dim_parts[0]),
-                            "width": float(dim_parts[1]),
-                            "height": float(dim_parts[2])
-                        }
-                
-                # Parse image URLs
-                images = []
-                if 'images' in row and pd.notna(row['images']):
-                    images = [url.strip() for url in str(row['images']).split(',')]
-                
-                item = InventoryItem(
-                    sku=str(row['sku']),
-                    title=str(row['title']),
-                    description=str(row['description']),
-                    condition=str(row.get('condition', 'NEW')),
-                    category_id=str(row['category_id']),
-                    price=float(row['price']),
-                    quantity=int(row.get('quantity', 1)),
-                    brand=str(row.get('brand', '')),
-                    mpn=str(row.get('mpn', '')),
-                    upc=str(row.get('upc', '')),
-                    grade=str(row.get('grade', '')),
-                    weight=float(row.get('weight', 1.0)),
-                    dimensions=dimensions,
-                    images=images
-                )
-                items.append(item)
-                
+            items.extend(CSVProcessor.iter_items(file_path))
         except Exception as e:
             logging.error(f"Error loading CSV file {file_path}: {e}")
             
@@ -481,56 +1202,538 @@ class CSVProcessor:
 class EbayAutolister:
     """Main application class for eBay automated listing"""
     
-    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None):
-        self.api = EbayAPI(client_id, client_secret, sandbox, user_token)
-        self.inventory = InventoryManager(self.api)
-        self.listings = ListingManager(self.api)
+    def __init__(self, client_id: str, client_secret: str, sandbox: bool = True, user_token: str = None,
+                 config: Config = None):
+        self.config = config or Config()
+        self.api = EbayAPI(
+            client_id, client_secret, sandbox, user_token,
+            min_interval=self.config.rate_limit_interval,
+            timeout=self.config.request_timeout,
+            max_retries=self.config.max_retries,
+            backoff_base=self.config.retry_backoff_base,
+            backoff_max=self.config.retry_backoff_max,
+            circuit_threshold=self.config.circuit_breaker_threshold,
+            circuit_reset=self.config.circuit_breaker_reset,
+            api_base_url=self.config.ebay_api_base_url or None
+        )
+        self.inventory = InventoryManager(
+            self.api,
+            max_concurrent_batches=self.config.max_concurrent_batches,
+            dead_letters=get_dead_letters(),
+            mirror=get_mirror()
+        )
+        self.inventory.payload_builder = InventoryPayloadBuilder(self.config.max_images_per_listing)
+        self.listings = ListingManager(self.api, mirror=self.inventory.mirror)
         self.logger = logging.getLogger(__name__)
+    
+    def make_validator(self, offline: bool = False) -> PayloadValidator:
+        """
+        Build a payload validator from config.
+
+        Args:
+            offline: Only use cached category condition policies, never the Metadata API
+        """
+        marketplace_id = self.config.default_marketplace
+        fetch = None
+        if not offline:
+            fetch = lambda category_id: fetch_condition_policy(self.api, category_id, marketplace_id)
+        return PayloadValidator(
+            policies=get_policy_store(self.config.category_policy_ttl_days),
+            auto_fix=self.config.validation_auto_fix,
+            max_images=self.config.max_images_per_listing,
+            marketplace_id=marketplace_id,
+            fetch_policy=fetch
+        )
         
-    def process_csv_file(self, csv_path: str, create_listings: bool = False) -> Dict:
-        """Process CSV file and create inventory items and optionally listings"""
-        items = CSVProcessor.load_items_from_csv(csv_path)
+    def process_csv_file(self, csv_path: str, create_listings: bool = False, sync: bool = False,
+                         resume: bool = False) -> Dict:
+        """
+        Process CSV file and create inventory items and optionally listings.
+
+        The CSV is streamed in chunks (see CSVProcessor.iter_item_batches), so
+        memory stays flat for large exports.
+
+        Args:
+            csv_path: Path to the product CSV
+            create_listings: Also create and publish offers
+            sync: Only push SKUs whose inventory, offer or price payload changed
+                since the last successful push (see sync_state.py)
+            resume: Continue the last unfinished job for this CSV from its
+                journal checkpoints instead of starting over (see job_journal.py)
+        """
+        validator = self.make_validator() if self.config.validate_payloads else None
         
-        if not items:
+        if sync:
+            items = CSVProcessor.load_items_from_csv(csv_path)
+            if not items:
+                self.logger.error("No items found in CSV file")
+                return {"success": False, "message": "No items found"}
+            rejected = []
+            if validator:
+                items, rejected = validator.validate_batch(items)
+            results = self._sync_items(items, create_listings)
+            if validator:
+                results["inventory_failed"] = results.get("inventory_failed", 0) + len(rejected)
+                results["failed_items"] = rejected + results.get("failed_items", [])
+                results["validation"] = validator.report.summary()
+            return results
+        
+        journal = get_journal()
+        job_id = journal.start_or_resume('process_csv', csv_path, resume,
+                                         {"create_listings": create_listings})
+        journal.update_options(job_id, create_listings=create_listings)
+        
+        batches = CSVProcessor.iter_item_batches(csv_path, batch_size=self.config.batch_size, compact=True)
+        if validator:
+            # Rejected items are journaled as inventory failures without an API call,
+            # auto-fixes (VALIDATION_AUTO_FIX) per SKU so they can be reviewed
+            batches = validator.filter_batches(batches, self.config.batch_size,
+                                               on_rejected=journal.checkpoint(job_id, STAGE_INVENTORY),
+                                               on_fixed=journal.checkpoint(job_id, STAGE_VALIDATED))
+        
+        try:
+            seen = self.run_listing_job(batches, create_listings, journal, job_id)
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            # Batches pushed before the bad chunk stay checkpointed for --resume
+            self.logger.error(f"Error loading CSV file {csv_path}: {e}")
+            return {"success": False, "message": str(e), "job_id": job_id}
+        
+        if not seen and not (validator and validator.report.checked):
             self.logger.error("No items found in CSV file")
             return {"success": False, "message": "No items found"}
         
-        # Create inventory items
-        self.logger.info(f"Creating {len(items)} inventory items...")
-        inventory_results = self.inventory.bulk_create_inventory_items(items)
+        journal.finish_job(job_id)
+        results = journal.build_results(job_id)
+        if validator:
+            results["validation"] = validator.report.summary()
+        return results
+
+    def process_csv_feed(self, csv_path: str, resume: bool = False, work_dir: str = None) -> Dict:
+        """
+        Create listings for a whole CSV through bulk feed files (see feed_upload.py).
+
+        Items are validated, streamed into compressed LMS feed files and
+        uploaded as Feed API tasks; result files are mapped back per SKU and
+        journaled (inventory + published stages), so --resume skips SKUs a
+        previous feed already listed. Each task is journaled as soon as its file
+        is uploaded, so tasks still processing when a run stops are collected by
+        --resume rather than uploaded again.
+
+        Args:
+            csv_path: Path to the product CSV
+            resume: Continue the last unfinished feed job for this CSV
+            work_dir: Keep feed and result files here (temp dir by default)
+        """
+        from feed_upload import FeedUploader
+
+        validator = self.make_validator() if self.config.validate_payloads else None
+        journal = get_journal()
+        job_id = journal.start_or_resume('process_feed', csv_path, resume, {"create_listings": True})
+        published = journal.completed(job_id, STAGE_PUBLISHED)
+        in_flight = journal.in_flight(job_id, STAGE_FEED_TASK)
+        in_flight_tasks: Dict[str, List[str]] = {}
+        for sku, data in in_flight.items():
+            in_flight_tasks.setdefault(data["task_id"], []).append(sku)
+
+        batches = CSVProcessor.iter_item_batches(csv_path, batch_size=self.config.batch_size, compact=True)
+        if validator:
+            batches = validator.filter_batches(batches, self.config.batch_size,
+                                               on_rejected=journal.checkpoint(job_id, STAGE_INVENTORY),
+                                               on_fixed=journal.checkpoint(job_id, STAGE_VALIDATED))
+        pending = ([item for item in batch if item.sku not in published and item.sku not in in_flight]
+                   for batch in batches)
+
+        uploader = FeedUploader(
+            self.api,
+            listing_defaults={
+                "currency": self.config.default_currency,
+                "fulfillment_policy_id": self.config.default_fulfillment_policy,
+                "payment_policy_id": self.config.default_payment_policy,
+                "return_policy_id": self.config.default_return_policy
+            },
+            max_items_per_file=self.config.feed_max_items_per_file,
+            max_images=self.config.max_images_per_listing,
+            poll_interval=self.config.feed_poll_interval,
+            timeout=self.config.feed_timeout,
+            work_dir=work_dir
+        )
+        record_inventory = journal.checkpoint(job_id, STAGE_INVENTORY)
+        record_published = journal.checkpoint(job_id, STAGE_PUBLISHED)
+
+        def _on_uploaded(task_id: str, skus: List[str]):
+            journal.record(job_id, STAGE_FEED_TASK, [
+                {"sku": sku, "status": STATUS_IN_FLIGHT, "data": {"task_id": task_id}} for sku in skus
+            ])
+
+        def _on_results(task_results: Dict):
+            # A feed listing creates the item and the live listing in one step
+            record_inventory({"successful": [entry["sku"] for entry in task_results["successful"]],
+                              "failed": task_results["failed"]})
+            record_published({"successful": task_results["successful"], "failed": []})
+            journal.record(job_id, STAGE_FEED_TASK, [
+                {"sku": entry["sku"], "status": STATUS_OK}
+                for entry in task_results["successful"] + task_results["failed"]
+            ])
+
+        try:
+            feed_results = uploader.upload_batches(pending, on_results=_on_results, on_uploaded=_on_uploaded,
+                                                   in_flight=in_flight_tasks)
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            self.logger.error(f"Error loading CSV file {csv_path}: {e}")
+            return {"success": False, "message": str(e), "job_id": job_id}
+
+        journal.finish_job(job_id)
+        results = journal.build_results(job_id)
+        results["feed_tasks"] = feed_results["tasks"]
+        results["warnings"] = feed_results["warnings"]
+        if validator:
+            results["validation"] = validator.report.summary()
+        return results
+
+    def run_listing_job(self, item_batches: Iterable[List[InventoryItem]], create_listings: bool,
+                        journal: JobJournal, job_id: str, listing_details=None, on_stage=None) -> int:
+        """
+        Push items through the inventory, offer and publish stages, checkpointing
+        each batch in the job journal and skipping SKUs that already completed a
+        stage in an earlier run of the same job.
+        
+        Batches are consumed lazily; only (sku, category_id, price) is kept per
+        item for the offer stage.
+        
+        Args:
+            item_batches: Iterable of inventory item batches (API-sized)
+            create_listings: Also create and publish offers
+            journal: Job journal to checkpoint into
+            job_id: Job being run or resumed
+            listing_details: Optional callable sku -> dict merged into the
+                journaled record of each published listing
+            on_stage: Optional callable invoked with STAGE_INVENTORY, then
+                STAGE_OFFER, as each stage starts
+        
+        Returns:
+            Number of items seen
+        """
+        # Stage: inventory
+        inventory_done = journal.completed(job_id, STAGE_INVENTORY)
+        offer_candidates = []
+        
+        def _pending_batches():
+            for batch in item_batches:
+                offer_candidates.extend((item.sku, item.category_id, item.price) for item in batch)
+                pending = [item for item in batch if item.sku not in inventory_done]
+                if pending:
+                    yield pending
+        
+        if on_stage:
+            on_stage(STAGE_INVENTORY)
+        self.logger.info(f"Creating inventory items ({len(inventory_done)} already done)...")
+        self.inventory.bulk_create_inventory_batches(
+            _pending_batches(), on_batch=journal.checkpoint(job_id, STAGE_INVENTORY)
+        )
+        
+        if not create_listings:
+            return len(offer_candidates)
+        
+        # Stages: offer + publish, for items whose inventory item exists
+        if on_stage:
+            on_stage(STAGE_OFFER)
+        inventory_done = journal.completed(job_id, STAGE_INVENTORY)
+        offers_done = journal.completed(job_id, STAGE_OFFER)
+        published = journal.completed(job_id, STAGE_PUBLISHED)
+        
+        existing_offer_ids = {
+            sku: data["offer_id"] for sku, data in offers_done.items()
+            if sku not in published and data
+        }
+        new_offers = [
+            {"sku": sku, "category_id": category_id, "price": price}
+            for sku, category_id, price in offer_candidates
+            if sku in inventory_done and sku not in offers_done and sku not in published
+        ]
+        self.logger.info(f"Creating {len(new_offers)} offers, publishing "
+                         f"{len(new_offers) + len(existing_offer_ids)} ({len(published)} already live)...")
+        
+        record_published = journal.checkpoint(job_id, STAGE_PUBLISHED)
+        
+        def _on_published(batch_results: Dict):
+            if listing_details:
+                for listing in batch_results["successful"]:
+                    listing.update(listing_details(listing["sku"]))
+            record_published(batch_results)
+        
+        self.listings.bulk_create_and_publish(
+            new_offers,
+            existing_offer_ids=existing_offer_ids,
+            on_offers_created=journal.checkpoint(job_id, STAGE_OFFER),
+            on_published=_on_published
+        )
+        return len(offer_candidates)
+    
+    def retry_dead_letters(self, batch_size: int = 5, max_attempts: int = 5, limit: int = None) -> Dict:
+        """
+        Re-send only retryable dead-lettered inventory items, in small batches.
+
+        Batches that fail again back off (jittered exponential, via the API's
+        backoff settings) before the next batch is sent. Successes are removed
+        from the store; repeat failures bump their attempt count and entries
+        that reach ``max_attempts`` are left for manual attention.
+
+        Args:
+            batch_size: Items per bulk call
+            max_attempts: Skip entries that already failed this many times
+            limit: Maximum number of entries to retry
+
+        Returns:
+            {"retried", "successful": [...], "failed": [{"sku", "error", ...}]}
+        """
+        dead_letters = self.inventory.dead_letters or get_dead_letters()
+        entries = dead_letters.list(OP_INVENTORY, retryable=True, max_attempts=max_attempts, limit=limit)
+        items = [InventoryItem(**entry["item"]) for entry in entries if entry.get("item")]
+        
+        results = {"retried": len(items), "successful": [], "failed": []}
+        if not items:
+            self.logger.info("No retryable dead letters")
+            return results
+        
+        self.logger.info(f"Retrying {len(items)} dead-lettered items in batches of {batch_size}")
+        failed_batches = 0
+        for i in range(0, len(items), batch_size):
+            if failed_batches:
+                delay = self.api._backoff_delay(failed_batches)
+                self.logger.info(f"Backing off {delay:.1f}s before next retry batch")
+                time.sleep(delay)
+            
+            batch_results = self.inventory.bulk_create_inventory_items(items[i:i + batch_size],
+                                                                       batch_size=batch_size)
+            results["successful"].extend(batch_results["successful"])
+            results["failed"].extend(batch_results["failed"])
+            
+            if any(f.get("retryable") for f in batch_results["failed"]):
+                failed_batches += 1
+            else:
+                failed_batches = 0
+        
+        return results
+    
+    def reprice(self, updates: List[Dict]) -> Dict:
+        """
+        Push price/quantity changes for live SKUs with bulk_update_price_quantity.
+        
+        Offer IDs are looked up from the sync state (offers we created) and the
+        local inventory mirror, which prefers the SKU's published offer; price
+        changes for SKUs without a known offer, or with several offers and no
+        single published one, are reported as failed. Successful prices are recorded in the sync state so
+        a later sync does not push them again.
+        
+        Args:
+            updates: Dicts with 'sku' and 'price' and/or 'quantity'
+        
+        Returns:
+            {"successful": [...], "failed": [{"sku", "error", ...}]}
+        """
+        state = get_sync_state()
+        skus = [u["sku"] for u in updates]
+        offer_ids = state.get_remote_ids(KIND_OFFER, skus)
+        
+        ambiguous = {}
+        for sku in skus:
+            if sku not in offer_ids:
+                offer_id, error = self._mirrored_offer_id(sku)
+                if offer_id:
+                    offer_ids[sku] = offer_id
+                elif error:
+                    ambiguous[sku] = error
+        
+        sendable = []
+        failed = []
+        for update in updates:
+            update = dict(update, offer_id=update.get("offer_id") or offer_ids.get(update["sku"]))
+            if update.get("price") is not None and not update["offer_id"] and update["sku"] in ambiguous:
+                failed.append({"sku": update["sku"], "error": ambiguous[update["sku"]],
+                               "error_ids": [], "retryable": False})
+            else:
+                sendable.append(update)
+        
+        self.logger.info(f"Repricing {len(sendable)} SKUs in "
+                         f"{-(-len(sendable) // InventoryManager.BULK_PRICE_QUANTITY_LIMIT)} calls")
+        results = self.inventory.bulk_update_price_quantity(sendable, currency=self.config.default_currency)
+        results["failed"].extend(failed)
+        
+        prices = {u["sku"]: u["price"] for u in sendable if u.get("price") is not None}
+        state.mark_synced(KIND_PRICE, {
+            sku: payload_hash({"price": str(prices[sku])}) for sku in results["successful"] if sku in prices
+        })
+        return results
+    
+    def _mirrored_offer_id(self, sku: str):
+        """
+        Offer to reprice for a SKU according to the inventory mirror.
+        
+        Returns:
+            (offer_id, None), (None, error) when the SKU has several offers and
+            no single published one, or (None, None) when none is mirrored
+        """
+        offers = self.inventory.mirror.get_offers(sku) if self.inventory.mirror else []
+        if len(offers) == 1:
+            return offers[0]["offerId"], None
+        published = [offer for offer in offers if offer.get("status") == "PUBLISHED"]
+        if len(published) == 1:
+            return published[0]["offerId"], None
+        if offers:
+            return None, (f"Ambiguous offer for SKU: {len(offers)} offers, "
+                          f"{len(published)} published ({', '.join(o['offerId'] for o in offers)})")
+        return None, None
+    
+    def reprice_from_csv(self, csv_path: str, price_column: str = "buy_it_now_price",
+                         quantity_column: str = "quantity", min_confidence: float = 0.0) -> Dict:
+        """
+        Reprice live listings from pricing engine output (e.g. price_b2_batch.py's CSV).
+        
+        Rows with a non-positive price (pricing errors) or a confidence below
+        ``min_confidence`` are skipped.
+        
+        Args:
+            csv_path: CSV with 'sku' and a price column, optionally quantity/confidence
+            price_column: Column holding the new price
+            quantity_column: Column holding the new quantity, if present
+            min_confidence: Minimum 'confidence' value to accept a price
+        """
+        df = pd.read_csv(csv_path, dtype={'sku': str})
+        if price_column not in df.columns:
+            raise ValueError(f"Price column '{price_column}' not found in {csv_path}")
+        
+        df = df[pd.to_numeric(df[price_column], errors='coerce') > 0]
+        if min_confidence and 'confidence' in df.columns:
+            df = df[df['confidence'] >= min_confidence]
+        
+        has_quantity = quantity_column in df.columns
+        updates = [
+            {"sku": sku, "price": float(price),
+             "quantity": int(quantity) if has_quantity and pd.notna(quantity) else None}
+            for sku, price, quantity in zip(
+                df['sku'], df[price_column], df[quantity_column] if has_quantity else [None] * len(df)
+            )
+        ]
+        return self.reprice(updates)
+    
+    def _sync_items(self, items: List[InventoryItem], create_listings: bool) -> Dict:
+        """Push only new or changed inventory items, offers and prices"""
+        state = get_sync_state()
+        items_by_sku = {item.sku: item for item in items}
+        
+        # Inventory: compare the exact payload that would be sent
+        inventory_changed = state.changed(KIND_INVENTORY, {
+            item.sku: self.inventory.build_inventory_payload(item) for item in items
+        })
+        to_push = [item for item in items if item.sku in inventory_changed]
+        self.logger.info(f"Sync: {len(to_push)}/{len(items)} inventory items new or changed")
+        
+        inventory_results = self.inventory.bulk_create_inventory_items(to_push)
+        state.mark_synced(KIND_INVENTORY, {
+            sku: inventory_changed[sku] for sku in inventory_results["successful"]
+        })
         
         results = {
             "inventory_created": len(inventory_results["successful"]),
             "inventory_failed": len(inventory_results["failed"]),
+            "inventory_unchanged": len(items) - len(to_push),
             "failed_items": inventory_results["failed"]
         }
         
-        if create_listings:
-            # Create and publish listings for successful inventory items
-            listings_created = 0
-            listings_failed = 0
-            
-            for item in items:
-                if item.sku in inventory_results["successful"]:
-                    offer_id = self.listings.create_offer(
-                        item.sku, item.category_id, item.price
-                    )
-                    
-                    if offer_id:
-                        if self.listings.publish_offer(offer_id):
-                            listings_created += 1
-                        else:
-                            listings_failed += 1
-                    else:
-                        listings_failed += 1
-            
-            results.update({
-                "listings_created": listings_created,
-                "listings_failed": listings_failed
+        if not create_listings:
+            return results
+        
+        # Offers: only for SKUs whose inventory item exists on eBay
+        failed_skus = {f["sku"] for f in inventory_results["failed"]}
+        listable = [item for item in items if item.sku not in failed_skus]
+        
+        offer_changed = state.changed(KIND_OFFER, {
+            item.sku: self._offer_fields(item) for item in listable
+        })
+        price_changed = state.changed(KIND_PRICE, {
+            item.sku: {"price": str(item.price)} for item in listable
+        })
+        offer_ids = state.get_remote_ids(KIND_OFFER, [item.sku for item in listable])
+        # Offers created on an earlier sync whose publish failed: finish them
+        # rather than creating a duplicate offer
+        unpublished = state.get_pending(KIND_OFFER, offer_ids)
+        
+        new_offers = [item for item in listable if item.sku not in offer_ids]
+        updated = [
+            item for item in listable
+            if item.sku in offer_ids and item.sku in offer_changed and item.sku not in unpublished
+        ]
+        repriced = [
+            item for item in listable
+            if item.sku in offer_ids and item.sku in price_changed and item.sku not in offer_changed
+        ]
+        
+        failed_listings = []
+        existing_offer_ids = {}
+        for item in listable:
+            if item.sku not in unpublished:
+                continue
+            # The CSV may have fixed whatever made the publish fail
+            if self.listings.update_offer(unpublished[item.sku], item.sku, item.category_id, item.price):
+                existing_offer_ids[item.sku] = unpublished[item.sku]
+            else:
+                failed_listings.append({"sku": item.sku, "error": "Failed to update offer"})
+        
+        def _on_offers_created(batch_results: Dict):
+            # Saved before publishing, so a failed publish never loses the offerId
+            state.mark_pending(KIND_OFFER, {
+                offer["sku"]: offer["offer_id"] for offer in batch_results["successful"]
             })
         
+        listing_results = self.listings.bulk_create_and_publish([
+            {"sku": item.sku, "category_id": item.category_id, "price": item.price}
+            for item in new_offers
+        ], existing_offer_ids=existing_offer_ids, on_offers_created=_on_offers_created)
+        created_skus = [listing["sku"] for listing in listing_results["successful"]]
+        failed_listings.extend(listing_results["failed"])
+        
+        updated_skus = []
+        for item in updated:
+            if self.listings.update_offer(offer_ids[item.sku], item.sku, item.category_id, item.price):
+                updated_skus.append(item.sku)
+            else:
+                failed_listings.append({"sku": item.sku, "error": "Failed to update offer"})
+        
+        # Price-only changes go through the lightweight bulk price/quantity call
+        price_results = self.inventory.bulk_update_price_quantity([
+            {"sku": item.sku, "offer_id": offer_ids[item.sku], "price": item.price}
+            for item in repriced
+        ])
+        repriced_skus = price_results["successful"]
+        failed_listings.extend(price_results["failed"])
+        
+        pushed = created_skus + updated_skus + repriced_skus
+        state.mark_synced(KIND_OFFER, {
+            sku: payload_hash(self._offer_fields(items_by_sku[sku])) for sku in pushed
+        }, remote_ids={
+            listing["sku"]: listing["offer_id"] for listing in listing_results["successful"]
+        })
+        state.mark_synced(KIND_PRICE, {
+            sku: payload_hash({"price": str(items_by_sku[sku].price)}) for sku in pushed
+        })
+        
+        results.update({
+            "listings_created": len(created_skus),
+            "listings_updated": len(updated_skus),
+            "listings_repriced": len(repriced_skus),
+            "listings_unchanged": (len(listable) - len(new_offers) - len(unpublished)
+                                   - len(updated) - len(repriced)),
+            "listings_failed": len(failed_listings),
+            "failed_listings": failed_listings
+        })
         return results
     
+    def _offer_fields(self, item: InventoryItem) -> Dict:
+        """Offer payload without its price, which is tracked separately"""
+        offer = ListingManager._build_offer_payload(item.sku, item.category_id, item.price)
+        offer.pop("pricingSummary")
+        return offer
+    
     def create_sample_csv(self, file_path: str = "sample_products.csv"):
         """Create a sample CSV file for testing with your specific condition inputs"""
         sample_data = [
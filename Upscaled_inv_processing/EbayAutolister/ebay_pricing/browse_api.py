@@ -12,7 +12,8 @@ import statistics
 import requests
 import base64
 from typing import Dict, Any, List
-from config import CONDITION_MAPPINGS
+from condition_normalizer import normalize_condition
+from ebay_pricing.replay import provider_call
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +53,12 @@ class EbayBrowseAPI:
             self.oauth_url = "https://api.ebay.com/identity/v1/oauth2/token"
             self.base_url = "https://api.ebay.com/buy/browse/v1"
 
+        # Local stand-in (fake_ebay_server) for load tests
+        api_base_url = os.getenv('EBAY_API_BASE_URL', '').rstrip('/')
+        if api_base_url:
+            self.oauth_url = f"{api_base_url}/identity/v1/oauth2/token"
+            self.base_url = f"{api_base_url}/buy/browse/v1"
+
         self.access_token = None
         self.token_expires_at = 0
         self.min_interval = 0.1  # 100ms between requests (rate limiting)
@@ -120,6 +127,15 @@ class EbayBrowseAPI:
         Returns:
             Response JSON as dictionary
         """
+        return provider_call(
+            'browse_api',
+            lambda: self._send_request(endpoint, params),
+            endpoint=endpoint,
+            params=params
+        )
+
+    def _send_request(self, endpoint: str, params: Dict = None) -> Dict:
+        """Perform the live Browse API request"""
         if not self._ensure_authenticated():
             raise Exception("Failed to authenticate with eBay API")
 
@@ -169,7 +185,7 @@ class EbayBrowseAPI:
         # Add condition filter if specified
         if condition:
             # Normalize condition to eBay standard
-            normalized_condition = CONDITION_MAPPINGS.get(condition.lower(), condition)
+            normalized_condition = normalize_condition(condition)
             condition_id = self.CONDITION_IDS.get(normalized_condition)
 
             if condition_id:
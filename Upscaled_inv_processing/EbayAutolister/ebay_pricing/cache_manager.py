@@ -5,6 +5,7 @@ Cache Manager for eBay Pricing
 Provides SQLite-based caching for market data to minimize API costs and improve performance.
 """
 
+import os
 import sqlite3
 import json
 import logging
@@ -29,6 +30,8 @@ class CacheManager:
             db_path = base_dir / "ebay_pricing_cache.db"
 
         self.db_path = str(db_path)
+        self.hits = 0
+        self.misses = 0
         self._init_database()
         logger.info(f"Cache manager initialized: {self.db_path}")
 
@@ -95,6 +98,7 @@ class CacheManager:
 
         if not row:
             logger.debug(f"Cache miss: {cache_key}")
+            self.misses += 1
             return None
 
         data_json, created_at, expires_at = row
@@ -104,6 +108,7 @@ class CacheManager:
         if datetime.now() > expires_at:
             logger.debug(f"Cache expired: {cache_key}")
             self._delete_cache_entry(cache_key)
+            self.misses += 1
             return None
 
         # Deserialize MarketData from JSON
@@ -114,11 +119,13 @@ class CacheManager:
             market_data.data_age_hours = age_hours
 
             logger.info(f"Cache hit: {cache_key} (age: {age_hours:.1f}h)")
+            self.hits += 1
             return market_data
 
         except Exception as e:
             logger.error(f"Failed to deserialize cache data: {e}")
             self._delete_cache_entry(cache_key)
+            self.misses += 1
             return None
 
     def cache_market_data(self, market_data: MarketData) -> None:
@@ -246,11 +253,15 @@ class CacheManager:
         conn.close()
 
         stale_count = total_count - valid_count
+        lookups = self.hits + self.misses
 
         return {
             'total_entries': total_count,
             'valid_entries': valid_count,
-            'stale_entries': stale_count
+            'stale_entries': stale_count,
+            'session_hits': self.hits,
+            'session_misses': self.misses,
+            'session_hit_rate': self.hits / lookups if lookups else 0.0
         }
 
     def _serialize_market_data(self, market_data: MarketData) -> str:
@@ -325,8 +336,8 @@ _cache_instance = None
 
 
 def get_cache() -> CacheManager:
-    """Get or create global cache instance"""
+    """Get or create global cache instance (EBAY_PRICING_CACHE_DB overrides the path)"""
     global _cache_instance
     if _cache_instance is None:
-        _cache_instance = CacheManager()
+        _cache_instance = CacheManager(os.getenv('EBAY_PRICING_CACHE_DB') or None)
     return _cache_instance
@@ -17,6 +17,7 @@ from tavily import TavilyClient
 from openai import OpenAI
 
 from ebay_pricing import SoldListing
+from ebay_pricing.replay import provider_call, is_replaying
 from config import PRICING_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -37,7 +38,7 @@ def research_sold_comps_ai(brand: str, model: str, condition: str) -> List[SoldL
     tavily_key = os.getenv("TAVILY_API_KEY")
     openai_key = os.getenv("OPENAI_API_KEY")
 
-    if not tavily_key:
+    if not tavily_key and not is_replaying():
         logger.error("TAVILY_API_KEY not set in .env")
         return []
 
@@ -47,17 +48,20 @@ def research_sold_comps_ai(brand: str, model: str, condition: str) -> List[SoldL
         # Step 1: Use Tavily to search for eBay sold listings
         logger.info(f"Searching web for sold comps: {brand} {model} ({condition})")
 
-        tavily = TavilyClient(api_key=tavily_key)
-
         # Construct search query for eBay sold items
         search_query = f"{brand} {model} sold ebay completed listings price"
+        search_params = {
+            'query': search_query,
+            'search_depth': "advanced",  # More comprehensive search
+            'max_results': 10,
+            'include_domains': ["ebay.com"],  # Focus on eBay
+        }
 
-        # Search with Tavily
-        search_results = tavily.search(
-            query=search_query,
-            search_depth="advanced",  # More comprehensive search
-            max_results=10,
-            include_domains=["ebay.com"],  # Focus on eBay
+        # Search with Tavily (routed through the record/replay layer)
+        search_results = provider_call(
+            'tavily',
+            lambda: TavilyClient(api_key=tavily_key).search(**search_params),
+            **search_params
         )
 
         logger.info(f"Tavily found {len(search_results.get('results', []))} search results")
@@ -67,7 +71,7 @@ def research_sold_comps_ai(brand: str, model: str, condition: str) -> List[SoldL
             return []
 
         # Step 2: Use OpenAI to extract pricing data from search results
-        if not openai_key:
+        if not openai_key and not is_replaying():
             logger.warning("OPENAI_API_KEY not set, using basic parsing")
             return _parse_results_basic(search_results, brand, model, condition, lookback_days)
 
@@ -82,8 +86,6 @@ def _parse_results_with_ai(search_results: dict, brand: str, model: str,
                            condition: str, lookback_days: int) -> List[SoldListing]:
     """Use OpenAI to intelligently parse search results and extract pricing data"""
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
     # Compile search results into context
     context = "eBay Search Results:\n\n"
     for idx, result in enumerate(search_results.get('results', [])[:10], 1):
@@ -122,14 +124,19 @@ RULES:
 - If NO prices found, return empty listings array []
 """
 
-    try:
+    messages = [{"role": "user", "content": prompt}]
+
+    def _complete() -> str:
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         response = client.chat.completions.create(
             model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
             response_format={"type": "json_object"}
         )
+        return response.choices[0].message.content
 
-        result_text = response.choices[0].message.content
+    try:
+        result_text = provider_call('openai', _complete, model="gpt-4o", messages=messages)
         result_data = json.loads(result_text)
 
         listings_data = result_data.get('listings', [])
@@ -13,7 +13,8 @@ from ebay_pricing import MarketData, PricingRecommendation
 from ebay_pricing.cache_manager import get_cache
 from ebay_pricing.market_research import research_sold_comps_ai, calculate_sold_stats
 from ebay_pricing.browse_api import analyze_active_competition
-from config import PRICING_CONFIG, BEST_OFFER_CONFIG, CONDITION_MAPPINGS
+from config import PRICING_CONFIG, BEST_OFFER_CONFIG
+from condition_normalizer import normalize_condition
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +59,7 @@ def get_pricing_recommendation(brand: str, model: str, condition: str,
     logger.info(f"Calculating pricing for: {brand} {product_name} ({condition})")
 
     # Normalize condition to eBay standard
-    normalized_condition = CONDITION_MAPPINGS.get(condition.lower(), condition).upper()
+    normalized_condition = normalize_condition(condition)
 
     # Step 1: Try to get from cache
     cache = get_cache()
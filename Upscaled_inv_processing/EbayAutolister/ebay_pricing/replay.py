@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Record/Replay Layer for Pricing Providers
+
+Captures Tavily, OpenAI, Browse API and UPC provider responses to a JSONL
+cassette and plays them back offline, so pricing runs can be benchmarked
+without network access or API credits.
+
+Modes (EBAY_PRICING_REPLAY_MODE):
+    off     - call providers normally (default)
+    record  - call providers and append every response to the cassette
+    replay  - serve responses from the cassette, sleeping the recorded latency
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = 'off'
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+PROVIDERS = ('tavily', 'openai', 'browse_api', 'upc')
+
+
+class ReplayMissError(Exception):
+    """Raised in replay mode when a call has no recorded response"""
+
+
+class ProviderRecorder:
+    """Records and replays provider calls keyed by (provider, request key)"""
+
+    def __init__(self, mode: str = MODE_OFF, cassette_path: str = None,
+                 latency_scale: float = 1.0):
+        """
+        Initialize recorder.
+
+        Args:
+            mode: One of 'off', 'record', 'replay'
+            cassette_path: JSONL file holding recorded calls
+            latency_scale: Multiplier applied to recorded latency on replay
+                           (0 disables simulated latency)
+        """
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        if mode != MODE_OFF and not cassette_path:
+            raise ValueError(f"Replay mode '{mode}' requires a cassette path")
+
+        self.mode = mode
+        self.cassette_path = cassette_path
+        self.latency_scale = latency_scale
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.call_counts: Dict[str, int] = defaultdict(int)
+        self.miss_counts: Dict[str, int] = defaultdict(int)
+
+        if mode == MODE_REPLAY:
+            self._load_cassette()
+
+    @staticmethod
+    def make_key(provider: str, **request) -> str:
+        """Build a stable lookup key from provider name and request arguments"""
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return f"{provider}:{hashlib.sha1(payload.encode()).hexdigest()}"
+
+    def _load_cassette(self) -> None:
+        """Load recorded entries from the cassette file"""
+        if not os.path.exists(self.cassette_path):
+            raise FileNotFoundError(f"Cassette not found: {self.cassette_path}")
+
+        with open(self.cassette_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry['key'], []).append(entry)
+
+        logger.info(f"Loaded {sum(len(v) for v in self._entries.values())} recorded calls "
+                    f"from {self.cassette_path}")
+
+    def _append_entry(self, entry: Dict) -> None:
+        """Append a recorded entry to the cassette file"""
+        with self._lock:
+            with open(self.cassette_path, 'a') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+
+    def call(self, provider: str, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Route a provider call through the recorder.
+
+        Args:
+            provider: Provider name ('tavily', 'openai', 'browse_api', 'upc')
+            key: Request key from make_key()
+            fn: Zero-argument callable performing the live call; must return
+                a JSON-serializable value
+
+        Returns:
+            Live or recorded provider response
+        """
+        with self._lock:
+            self.call_counts[provider] += 1
+
+        if self.mode == MODE_OFF:
+            return fn()
+
+        if self.mode == MODE_RECORD:
+            started = time.perf_counter()
+            response = fn()
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._append_entry({
+                'provider': provider,
+                'key': key,
+                'latency_ms': round(latency_ms, 2),
+                'response': response
+            })
+            return response
+
+        # Replay: cycle through recorded responses for repeated keys
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.miss_counts[provider] += 1
+                raise ReplayMissError(f"No recorded response for {key}")
+            entry = entries[self._cursor[key] % len(entries)]
+            self._cursor[key] += 1
+
+        if self.latency_scale > 0:
+            time.sleep(entry.get('latency_ms', 0) / 1000 * self.latency_scale)
+
+        return entry['response']
+
+    def reset_counts(self) -> None:
+        """Reset call and miss counters"""
+        with self._lock:
+            self.call_counts.clear()
+            self.miss_counts.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Get call statistics.
+
+        Returns:
+            Dictionary with per-provider call and miss counts
+        """
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'calls': dict(self.call_counts),
+                'misses': dict(self.miss_counts),
+                'total_calls': sum(self.call_counts.values())
+            }
+
+
+# Global recorder instance
+_recorder = None
+
+
+def get_recorder() -> ProviderRecorder:
+    """Get or create global recorder configured from the environment"""
+    global _recorder
+    if _recorder is None:
+        _recorder = ProviderRecorder(
+            mode=os.getenv('EBAY_PRICING_REPLAY_MODE', MODE_OFF).lower(),
+            cassette_path=os.getenv('EBAY_PRICING_REPLAY_FILE'),
+            latency_scale=float(os.getenv('EBAY_PRICING_REPLAY_LATENCY_SCALE', '1.0'))
+        )
+    return _recorder
+
+
+def set_recorder(recorder: Optional[ProviderRecorder]) -> None:
+    """Install a recorder as the global instance (None restores env config)"""
+    global _recorder
+    _recorder = recorder
+
+
+def is_replaying() -> bool:
+    """True when provider calls are served from a cassette"""
+    return get_recorder().mode == MODE_REPLAY
+
+
+def provider_call(provider: str, fn: Callable[[], Any], **request) -> Any:
+    """
+    Convenience wrapper: key the request and route it through the recorder.
+
+    Args:
+        provider: Provider name
+        fn: Zero-argument callable performing the live call
+        **request: Arguments identifying the request
+
+    Returns:
+        Provider response
+    """
+    recorder = get_recorder()
+    return recorder.call(provider, ProviderRecorder.make_key(provider, **request), fn)
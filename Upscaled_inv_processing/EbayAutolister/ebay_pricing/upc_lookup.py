@@ -12,6 +12,8 @@ import requests
 from typing import Optional, Dict
 from datetime import datetime, timedelta
 
+from ebay_pricing.replay import provider_call
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,23 +56,19 @@ class UPCLookup:
             logger.debug(f"UPC cache hit: {upc}")
             return self.cache[upc]
 
-        # Try UPCitemdb first (free)
-        result = self._try_upcitemdb(upc)
-        if result:
-            self.cache[upc] = result
-            return result
-
-        # Try Barcode Lookup (paid)
-        result = self._try_barcodelookup(upc)
-        if result:
-            self.cache[upc] = result
-            return result
-
-        # Try OpenFoodFacts (free, but limited to food/consumer goods)
-        result = self._try_openfoodfacts(upc)
-        if result:
-            self.cache[upc] = result
-            return result
+        # Try providers in order: UPCitemdb (free), Barcode Lookup (paid),
+        # OpenFoodFacts (free, but limited to food/consumer goods)
+        providers = [
+            ('upcitemdb', self._try_upcitemdb),
+            ('barcodelookup', self._try_barcodelookup),
+            ('openfoodfacts', self._try_openfoodfacts),
+        ]
+
+        for source, try_provider in providers:
+            result = provider_call('upc', lambda: try_provider(upc), source=source, upc=upc)
+            if result:
+                self.cache[upc] = result
+                return result
 
         logger.warning(f"UPC not found in any database: {upc}")
         return None
@@ -6,31 +6,47 @@ Uses the Trading API which is more stable than the Inventory API
 
 import requests
 import logging
+import threading
 import time
 import pandas as pd
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List
 from xml.etree import ElementTree as ET
 import os
 from dotenv import load_dotenv
+from trading_xml import TradingRequestBuilder, parse_response, xml_escape
 
 load_dotenv()
 
+
 class EbayTradingAPI:
     """eBay Trading API client using XML requests"""
 
-    def __init__(self, dev_id: str, app_id: str, cert_id: str, auth_token: str, sandbox: bool = False):
+    # AddItems accepts at most this many items per call
+    ADD_ITEMS_LIMIT = 5
+
+    def __init__(self, dev_id: str, app_id: str, cert_id: str, auth_token: str, sandbox: bool = False,
+                 min_interval: float = 0.5, timeout: float = 60.0, pool_size: int = 8):
         self.dev_id = dev_id
         self.app_id = app_id
         self.cert_id = cert_id
         self.auth_token = auth_token
         self.sandbox = sandbox
+        self.builder = TradingRequestBuilder(auth_token)
 
         # API endpoint
         self.api_url = "https://api.sandbox.ebay.com/ws/api.dll" if sandbox else "https://api.ebay.com/ws/api.dll"
 
-        # Rate limiting
+        # Pooled HTTP session shared by concurrent workers
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.timeout = timeout
+
+        # Rate limiting (shared across threads: spaces out call starts, not completions)
         self.last_request = 0
-        self.min_interval = 0.5  # 500ms between requests for Trading API
+        self.min_interval = min_interval  # 500ms between requests for Trading API by default
+        self._rate_lock = threading.Lock()
 
         # Setup logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,13 +54,18 @@ class EbayTradingAPI:
 
     def _rate_limit(self):
         """Enforce rate limiting between API calls"""
-        elapsed = time.time() - self.last_request
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_request = time.time()
+        with self._rate_lock:
+            elapsed = time.time() - self.last_request
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+            self.last_request = time.time()
 
     def _make_xml_request(self, call_name: str, xml_body: str) -> Dict:
         """Make Trading API XML request"""
+        return self._parse_xml_response(self._post_xml(call_name, xml_body))
+
+    def _post_xml(self, call_name: str, xml_body: str) -> str:
+        """POST a Trading API call and return the raw XML response"""
         self._rate_limit()
 
         headers = {
@@ -57,167 +78,224 @@ class EbayTradingAPI:
             'Content-Type': 'text/xml'
         }
 
+        response = None
         try:
-            response = requests.post(self.api_url, headers=headers, data=xml_body)
+            response = self.session.post(self.api_url, headers=headers, data=xml_body.encode('utf-8'),
+                                         timeout=self.timeout)
             response.raise_for_status()
-            return self._parse_xml_response(response.text)
+            return response.text
         except Exception as e:
             self.logger.error(f"API request failed: {e}")
-            if hasattr(response, 'text'):
+            if response is not None:
                 self.logger.error(f"Response: {response.text}")
             raise
 
     def _parse_xml_response(self, xml_text: str) -> Dict:
         """Parse XML response and extract key data"""
         try:
-            root = ET.fromstring(xml_text)
-
-            # Find namespace
-            ns = {'ns': 'urn:ebay:apis:eBLBaseComponents'}
-
-            result = {
-                'Ack': root.find('.//ns:Ack', ns).text if root.find('.//ns:Ack', ns) is not None else None,
-                'ItemID': root.find('.//ns:ItemID', ns).text if root.find('.//ns:ItemID', ns) is not None else None,
-                'Errors': []
-            }
-
-            # Extract errors
-            for error in root.findall('.//ns:Errors', ns):
-                error_code = error.find('ns:ErrorCode', ns)
-                short_msg = error.find('ns:ShortMessage', ns)
-                long_msg = error.find('ns:LongMessage', ns)
-                severity = error.find('ns:SeverityCode', ns)
-
-                result['Errors'].append({
-                    'ErrorCode': error_code.text if error_code is not None else None,
-                    'ShortMessage': short_msg.text if short_msg is not None else None,
-                    'LongMessage': long_msg.text if long_msg is not None else None,
-                    'SeverityCode': severity.text if severity is not None else None
-                })
-
+            result = parse_response(xml_text)
+            result.pop('Containers')
             return result
         except Exception as e:
             self.logger.error(f"Failed to parse XML response: {e}")
             return {'Ack': 'Failure', 'Errors': [{'LongMessage': str(e)}]}
 
+    def _parse_add_items_response(self, xml_text: str, count: int) -> List[Dict]:
+        """
+        Map an AddItems response back to the request's items.
+
+        Each AddItemResponseContainer echoes the request container's MessageID
+        as CorrelationID; containers are matched on it, not on position.
+
+        Returns:
+            One result per requested item, in request order, shaped like
+            _parse_xml_response ({'Ack', 'ItemID', 'Errors'})
+        """
+        results = [None] * count
+        try:
+            parsed = parse_response(xml_text, container='AddItemResponseContainer')
+        except ET.ParseError as e:
+            self.logger.error(f"Failed to parse XML response: {e}")
+            return [{'Ack': 'Failure', 'ItemID': None, 'Errors': [{'LongMessage': str(e)}]}] * count
+
+        for position, container in enumerate(parsed['Containers']):
+            correlation = container['CorrelationID']
+            index = int(correlation) if correlation else position
+            if not 0 <= index < count:
+                continue
+            errors = container['Errors']
+            failed = not container['ItemID'] or any(e.get('SeverityCode') == 'Error' for e in errors)
+            results[index] = {
+                'Ack': 'Failure' if failed else ('Warning' if errors else 'Success'),
+                'ItemID': None if failed else container['ItemID'],
+                'Errors': errors
+            }
+
+        # Items without a container: the whole call failed (request-level errors)
+        call_errors = parsed['Errors'] or [{'LongMessage': 'No result returned for item'}]
+        return [r if r is not None else {'Ack': 'Failure', 'ItemID': None, 'Errors': call_errors}
+                for r in results]
+
     def add_fixed_price_item(self, item_data: Dict) -> Dict:
         """
-        Create a fixed-price listing using AddFixedPriceItem
-
-        item_data should contain:
-        - title: str
-        - description: str
-        - category_id: str
-        - price: float
-        - quantity: int
-        - condition: str (e.g., '3000' for Used)
-        - sku: str
-        - fulfillment_policy_id: str
-        - payment_policy_id: str
-        - return_policy_id: str
+        Create a fixed-price listing using AddFixedPriceItem (see TradingRequestBuilder.item for item_data)
         """
+        self.logger.info(f"Creating listing for: {item_data.get('title')[:50]}...")
+        return self._make_xml_request('AddFixedPriceItem', self.builder.add_fixed_price_item(item_data))
 
-        # Map condition codes
-        condition_map = {
-            'NEW': '1000',
-            'LIKE_NEW': '1500',
-            'USED_EXCELLENT': '2500',
-            'USED_VERY_GOOD': '2750',
-            'USED_GOOD': '3000',
-            'USED_ACCEPTABLE': '4000',
-            'FOR_PARTS_OR_NOT_WORKING': '7000'
-        }
+    def add_items(self, items: List[Dict]) -> List[Dict]:
+        """
+        Create up to ADD_ITEMS_LIMIT fixed-price listings in one AddItems call.
 
-        condition_id = condition_map.get(item_data.get('condition', 'USED_GOOD'), '3000')
-
-        # Extract brand and model from item_data
-        brand = self._escape_xml(item_data.get('brand', 'Samsung'))
-        model = self._escape_xml(item_data.get('model', 'SM-R890'))
-
-        # Determine case size based on model
-        case_size = '46mm' if 'R890' in model or 'R895' in model else '40mm'
-
-        xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<AddFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{self.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <Title>{self._escape_xml(item_data.get('title', 'Item'))}</Title>
-        <Description><![CDATA[{item_data.get('description', '')}]]></Description>
-        <PrimaryCategory>
-            <CategoryID>{item_data.get('category_id', '178')}</CategoryID>
-        </PrimaryCategory>
-        <StartPrice>{item_data.get('price', 10.00)}</StartPrice>
-        <CategoryMappingAllowed>true</CategoryMappingAllowed>
-        <ConditionID>{condition_id}</ConditionID>
-        <Country>US</Country>
-        <Currency>USD</Currency>
-        <DispatchTimeMax>3</DispatchTimeMax>
-        <ListingDuration>GTC</ListingDuration>
-        <ListingType>FixedPriceItem</ListingType>
-        <Location>United States</Location>
-        <Quantity>{item_data.get('quantity', 1)}</Quantity>
-        <SKU>{self._escape_xml(item_data.get('sku', ''))}</SKU>
-        <Site>US</Site>
-        <ItemSpecifics>
-            <NameValueList>
-                <Name>Brand</Name>
-                <Value>{brand}</Value>
-            </NameValueList>
-            <NameValueList>
-                <Name>Model</Name>
-                <Value>{model}</Value>
-            </NameValueList>
-            <NameValueList>
-                <Name>Case Size</Name>
-                <Value>{case_size}</Value>
-            </NameValueList>
-            <NameValueList>
-                <Name>Band Material</Name>
-                <Value>Silicone</Value>
-            </NameValueList>
-            <NameValueList>
-                <Name>Compatible Operating System</Name>
-                <Value>Wear OS</Value>
-            </NameValueList>
-        </ItemSpecifics>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-            <PictureURL>https://i.ebayimg.com/images/g/placeholder/s-l500.jpg</PictureURL>
-        </PictureDetails>
-        <SellerProfiles>
-            <SellerShippingProfile>
-                <ShippingProfileID>{item_data.get('fulfillment_policy_id', '')}</ShippingProfileID>
-            </SellerShippingProfile>
-            <SellerReturnProfile>
-                <ReturnProfileID>{item_data.get('return_policy_id', '')}</ReturnProfileID>
-            </SellerReturnProfile>
-            <SellerPaymentProfile>
-                <PaymentProfileID>{item_data.get('payment_policy_id', '')}</PaymentProfileID>
-            </SellerPaymentProfile>
-        </SellerProfiles>
-    </Item>
-</AddFixedPriceItemRequest>'''
+        Args:
+            items: item_data dicts (see TradingRequestBuilder.item)
 
-        self.logger.info(f"Creating listing for: {item_data.get('title')[:50]}...")
-        return self._make_xml_request('AddFixedPriceItem', xml_request)
+        Returns:
+            One result per item, in order, shaped like add_fixed_price_item's
+        """
+        if len(items) > self.ADD_ITEMS_LIMIT:
+            raise ValueError(f"AddItems takes at most {self.ADD_ITEMS_LIMIT} items, got {len(items)}")
+
+        self.logger.info(f"Creating {len(items)} listings with AddItems...")
+        return self._parse_add_items_response(self._post_xml('AddItems', self.builder.add_items(items)),
+                                              len(items))
+
+    def revise_item_pictures(self, item_id: str, image_urls: List[str]) -> Dict:
+        """Replace a listing's pictures (first MAX_PICTURES URLs) with ReviseFixedPriceItem"""
+        return self._make_xml_request('ReviseFixedPriceItem', self.builder.revise_pictures(item_id, image_urls))
+
+    def upload_items(self, items: List[Dict], batch_size: int = ADD_ITEMS_LIMIT, max_workers: int = 4,
+                     on_batch: Callable[[List[Dict], List[Dict]], None] = None) -> List[Dict]:
+        """
+        Upload many listings as AddItems batches on a bounded worker pool.
+
+        All workers share this client's rate limiter, so min_interval still
+        spaces out call starts; concurrency only overlaps the calls' latency.
+
+        Args:
+            items: item_data dicts
+            batch_size: Items per AddItems call (capped at ADD_ITEMS_LIMIT)
+            max_workers: Maximum calls in flight
+            on_batch: Optional callback (batch items, batch results) as each batch finishes
+
+        Returns:
+            One result per item, in input order
+        """
+        batch_size = max(1, min(batch_size, self.ADD_ITEMS_LIMIT))
+        batches = [(start, items[start:start + batch_size]) for start in range(0, len(items), batch_size)]
+        results: List[Dict] = [None] * len(items)
+
+        def _run(batch: List[Dict]) -> List[Dict]:
+            try:
+                return self.add_items(batch)
+            except Exception as e:
+                return [{'Ack': 'Failure', 'ItemID': None, 'Errors': [{'LongMessage': str(e)}]}] * len(batch)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(_run, batch): (start, batch) for start, batch in batches}
+            for future in as_completed(futures):
+                start, batch = futures[future]
+                batch_results = future.result()
+                results[start:start + len(batch)] = batch_results
+                if on_batch:
+                    on_batch(batch, batch_results)
+
+        return results
 
     def _escape_xml(self, text: str) -> str:
         """Escape XML special characters"""
-        if not text:
-            return ''
-        text = str(text)
-        text = text.replace('&', '&amp;')
-        text = text.replace('<', '&lt;')
-        text = text.replace('>', '&gt;')
-        text = text.replace('"', '&quot;')
-        text = text.replace("'", '&apos;')
-        return text
+        return xml_escape(text)
+
+def _row_to_item_data(row, fulfillment_policy: str, payment_policy: str, return_policy: str) -> Dict:
+    """Build Trading API item_data from an enriched CSV row"""
+    # Get title - handle empty/NaN values
+    title = row.get('title') if pd.notna(row.get('title')) else ''
+    if not title:
+        brand = row.get('brand') if pd.notna(row.get('brand')) else ''
+        model = row.get('model') if pd.notna(row.get('model')) else ''
+        title = f"{brand} {model}".strip()
+
+    # Get description - use a basic one if missing
+    description = row.get('description') if pd.notna(row.get('description')) else ''
+    if not description:
+        description = f"<h2>{title}</h2><p>Pre-owned {title} in good working condition.</p>"
+
+    # Category ID - default to Smart Watches (178893) for Samsung watches
+    category_id = row.get('category_id')
+    if pd.isna(category_id) or category_id == 0.0:
+        category_id = '178893'  # Smart Watches category
+    else:
+        category_id = str(int(float(category_id)))
+
+    # Price - default to $100 for Samsung smartwatches if not set
+    price = row.get('suggested_price')
+    if pd.isna(price) or price == 0.0:
+        price = row.get('market_price')
+    if pd.isna(price) or price == 0.0:
+        price = row.get('retail_price')
+    if pd.isna(price) or price == 0.0:
+        price = 100.00  # Default price for smartwatches
+    else:
+        price = float(price)
+
+    # Map condition to eBay format
+    condition = row.get('condition', 'USED_GOOD')
+    if condition == 'LN':
+        condition = 'LIKE_NEW'
+
+    return {
+        'title': title,
+        'description': description,
+        'category_id': category_id,
+        'price': price,
+        'quantity': 1,
+        'condition': condition,
+        'sku': row.get('sku', ''),
+        'brand': row.get('brand', 'Samsung'),
+        'model': row.get('model', 'SM-R890'),
+        'fulfillment_policy_id': fulfillment_policy,
+        'payment_policy_id': payment_policy,
+        'return_policy_id': return_policy
+    }
 
 
-def upload_from_csv(csv_path: str):
-    """Upload items from enriched CSV to eBay using Trading API"""
+def _record_result(results: Dict, item_data: Dict, response: Dict):
+    """Fold one Trading API result into the upload results dictionary"""
+    if response.get('Ack') in ['Success', 'Warning']:
+        item_id = response.get('ItemID')
+        print(f"  ✓ {item_data['title'][:60]} - Item ID: {item_id}")
+        results['success'].append({
+            'sku': item_data['sku'],
+            'item_id': item_id,
+            'title': item_data['title']
+        })
+
+        # Log warnings if any
+        for error in response.get('Errors') or []:
+            if error.get('SeverityCode') == 'Warning':
+                print(f"  ⚠ Warning: {error.get('ShortMessage')}")
+                results['warnings'].append({
+                    'sku': item_data['sku'],
+                    'warning': error.get('ShortMessage')
+                })
+    else:
+        print(f"  ✗ Failed: {item_data['title'][:60]}")
+        for error in response.get('Errors', []):
+            print(f"    Error: {error.get('LongMessage')}")
+        results['failed'].append({
+            'sku': item_data['sku'],
+            'error': (response.get('Errors') or [{}])[0].get('LongMessage', 'Unknown error')
+        })
+
+
+def upload_from_csv(csv_path: str, batch_size: int = None, max_workers: int = None):
+    """
+    Upload items from enriched CSV to eBay using Trading API
+
+    Items go up in AddItems batches (TRADING_API_BATCH_SIZE, max 5) with up to
+    TRADING_API_MAX_WORKERS calls in flight under one shared rate limiter
+    (TRADING_API_MIN_INTERVAL seconds between call starts).
+    """
 
     # Load environment variables
     dev_id = os.getenv('EBAY_DEV_ID')
@@ -230,8 +308,13 @@ def upload_from_csv(csv_path: str):
     payment_policy = os.getenv('DEFAULT_PAYMENT_POLICY')
     return_policy = os.getenv('DEFAULT_RETURN_POLICY')
 
+    batch_size = batch_size or int(os.getenv('TRADING_API_BATCH_SIZE', str(EbayTradingAPI.ADD_ITEMS_LIMIT)))
+    max_workers = max_workers or int(os.getenv('TRADING_API_MAX_WORKERS', '4'))
+    min_interval = float(os.getenv('TRADING_API_MIN_INTERVAL', '0.5'))
+
     # Initialize API
-    api = EbayTradingAPI(dev_id, app_id, cert_id, auth_token, sandbox)
+    api = EbayTradingAPI(dev_id, app_id, cert_id, auth_token, sandbox,
+                         min_interval=min_interval, pool_size=max_workers)
 
     # Load CSV
     df = pd.read_csv(csv_path)
@@ -243,92 +326,14 @@ def upload_from_csv(csv_path: str):
     }
 
     print(f"\n{'='*80}")
-    print(f"Starting upload of {len(df)} items to eBay")
+    print(f"Starting upload of {len(df)} items to eBay "
+          f"(batches of {batch_size}, {max_workers} calls in flight)")
     print(f"{'='*80}\n")
 
+    items = []
     for idx, row in df.iterrows():
         try:
-            # Get title - handle empty/NaN values
-            title = row.get('title') if pd.notna(row.get('title')) else ''
-            if not title:
-                brand = row.get('brand') if pd.notna(row.get('brand')) else ''
-                model = row.get('model') if pd.notna(row.get('model')) else ''
-                title = f"{brand} {model}".strip()
-
-            # Get description - use a basic one if missing
-            description = row.get('description') if pd.notna(row.get('description')) else ''
-            if not description:
-                description = f"<h2>{title}</h2><p>Pre-owned {title} in good working condition.</p>"
-
-            # Category ID - default to Smart Watches (178893) for Samsung watches
-            category_id = row.get('category_id')
-            if pd.isna(category_id) or category_id == 0.0:
-                category_id = '178893'  # Smart Watches category
-            else:
-                category_id = str(int(float(category_id)))
-
-            # Price - default to $100 for Samsung smartwatches if not set
-            price = row.get('suggested_price')
-            if pd.isna(price) or price == 0.0:
-                price = row.get('market_price')
-            if pd.isna(price) or price == 0.0:
-                price = row.get('retail_price')
-            if pd.isna(price) or price == 0.0:
-                price = 100.00  # Default price for smartwatches
-            else:
-                price = float(price)
-
-            # Map condition to eBay format
-            condition = row.get('condition', 'USED_GOOD')
-            if condition == 'LN':
-                condition = 'LIKE_NEW'
-
-            item_data = {
-                'title': title,
-                'description': description,
-                'category_id': category_id,
-                'price': price,
-                'quantity': 1,
-                'condition': condition,
-                'sku': row.get('sku', ''),
-                'brand': row.get('brand', 'Samsung'),
-                'model': row.get('model', 'SM-R890'),
-                'fulfillment_policy_id': fulfillment_policy,
-                'payment_policy_id': payment_policy,
-                'return_policy_id': return_policy
-            }
-
-            print(f"[{idx+1}/{len(df)}] Uploading: {item_data['title'][:60]}...")
-
-            response = api.add_fixed_price_item(item_data)
-
-            if response.get('Ack') in ['Success', 'Warning']:
-                item_id = response.get('ItemID')
-                print(f"  ✓ Success! Item ID: {item_id}")
-                results['success'].append({
-                    'sku': item_data['sku'],
-                    'item_id': item_id,
-                    'title': item_data['title']
-                })
-
-                # Log warnings if any
-                if response.get('Errors'):
-                    for error in response['Errors']:
-                        if error.get('SeverityCode') == 'Warning':
-                            print(f"  ⚠ Warning: {error.get('ShortMessage')}")
-                            results['warnings'].append({
-                                'sku': item_data['sku'],
-                                'warning': error.get('ShortMessage')
-                            })
-            else:
-                print(f"  ✗ Failed!")
-                for error in response.get('Errors', []):
-                    print(f"    Error: {error.get('LongMessage')}")
-                results['failed'].append({
-                    'sku': item_data['sku'],
-                    'error': response.get('Errors', [{}])[0].get('LongMessage', 'Unknown error')
-                })
-
+            items.append(_row_to_item_data(row, fulfillment_policy, payment_policy, return_policy))
         except Exception as e:
             print(f"  ✗ Exception: {e}")
             results['failed'].append({
@@ -336,6 +341,17 @@ def upload_from_csv(csv_path: str):
                 'error': str(e)
             })
 
+    done = 0
+
+    def _on_batch(batch: List[Dict], batch_results: List[Dict]):
+        nonlocal done
+        done += len(batch)
+        print(f"[{done}/{len(items)}] AddItems batch finished")
+        for item_data, response in zip(batch, batch_results):
+            _record_result(results, item_data, response)
+
+    api.upload_items(items, batch_size=batch_size, max_workers=max_workers, on_batch=_on_batch)
+
     # Print summary
     print(f"\n{'='*80}")
     print(f"Upload Complete!")
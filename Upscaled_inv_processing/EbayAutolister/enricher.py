@@ -2,57 +2,209 @@
 """
 CSV enricher for product metadata via OpenAI web search.
 Adds title, retail/used prices, source URL, confidence, and downloads a stock image per row.
+Rows are searched concurrently, paced by the OpenAI requests/tokens-per-minute limits.
+Each distinct brand/model is searched once and cached (enrichment_cache.py).
+Progress is checkpointed to the output CSV; interrupted runs can resume and failed rows be retried.
+Downloaded images are resized, stripped and recompressed on a process pool (image_processing.py).
 """
 
 import json
 import logging
 import os
+import threading
 import time
-from typing import Any, Dict, Optional, Union
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 import requests
 from openai import OpenAI
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from enrichment_cache import KIND_SEARCH, EnrichmentCache, get_enrichment_cache, product_key
+from image_processing import ImageProcessor
 
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
-RATE_LIMIT_SECONDS = float(os.getenv("OPENAI_RATE_LIMIT_SECONDS", "1.2"))
+# OpenAI usage tier limits; the worker pool is paced by these, not by fixed sleeps
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "8"))
+# Reserved per search before its real usage is known (web search results inflate input tokens)
+ESTIMATED_TOKENS_PER_CALL = 3000
+IMAGE_DOWNLOAD_WORKERS = int(os.getenv("IMAGE_DOWNLOAD_WORKERS", "4"))
+IMAGE_DOWNLOAD_MAX_MB = float(os.getenv("IMAGE_DOWNLOAD_MAX_MB", "25"))
+# Enriched rows between checkpoint writes of the output CSV
+ENRICH_CHECKPOINT_ROWS = int(os.getenv("ENRICH_CHECKPOINT_ROWS", "50"))
 
 
 class EnrichmentError(Exception):
     """Raised when enrichment fails for a row."""
 
 
-def _infer_extension(url: str) -> str:
-    try:
-        path = urlparse(url).path
-        ext = path.split(".")[-1].lower()
-        if ext in {"jpg", "jpeg", "png", "webp"}:
-            return f".{ext}"
-    except Exception:
-        pass
-    return ".jpg"
+# Leading bytes of the image formats eBay accepts
+_MAGIC_EXTENSIONS = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+_CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+def _sniff_extension(head: bytes, content_type: str = "") -> Optional[str]:
+    """File extension from an image's leading bytes, falling back to its Content-Type; None if not an image"""
+    for magic, ext in _MAGIC_EXTENSIONS:
+        if head.startswith(magic):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if len(head) >= 12:
+        # Enough bytes to recognize any supported format: this is not one
+        return None
+    return _CONTENT_TYPE_EXTENSIONS.get(content_type.split(";")[0].strip().lower())
 
 
-def _download_image(url: str, dest_dir: str, base_name: str) -> Optional[str]:
-    if not url:
-        return None
+class ImageDownloader:
+    """
+    Streams images to disk on a small thread pool while enrichment carries on.
 
-    os.makedirs(dest_dir, exist_ok=True)
-    ext = _infer_extension(url)
-    filename = base_name.replace(" ", "_") + ext
-    filepath = os.path.join(dest_dir, filename)
+    One pooled session is shared by all downloads. Bodies are written in
+    chunks to a temporary file and renamed when complete, the file type comes
+    from the image's magic bytes (not the URL), and downloads over the size
+    cap are abandoned.
+    """
 
-    try:
-        response = requests.get(url, timeout=30)
-        if response.status_code == 200:
-            with open(filepath, "wb") as f:
-                f.write(response.content)
-            return filename
-    except Exception as exc:
-        logging.warning("Image download failed for %s: %s", url, exc)
+    def __init__(self, dest_dir: str, max_workers: int = IMAGE_DOWNLOAD_WORKERS,
+                 max_mb: float = IMAGE_DOWNLOAD_MAX_MB, timeout: float = 30.0,
+                 session: Optional[requests.Session] = None):
+        self.dest_dir = dest_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.timeout = timeout
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
 
-    return None
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def submit(self, url: str, base_name: str) -> "Future[Optional[str]]":
+        """Queue a download; the future resolves to the saved filename or None"""
+        return self._pool.submit(self.download, url, base_name)
+
+    def download(self, url: str, base_name: str) -> Optional[str]:
+        """Download one image into dest_dir as <base_name><ext>; returns the filename or None"""
+        if not url:
+            return None
+
+        os.makedirs(self.dest_dir, exist_ok=True)
+        base_name = base_name.replace(" ", "_").replace("/", "_")
+        partial = os.path.join(self.dest_dir, base_name + ".part")
+
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    logging.warning("Image download failed for %s: HTTP %s", url, response.status_code)
+                    return None
+                if int(response.headers.get("Content-Length") or 0) > self.max_bytes:
+                    logging.warning("Image download skipped for %s: larger than %s bytes", url, self.max_bytes)
+                    return None
+
+                chunks = response.iter_content(64 * 1024)
+                head = b""
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= 12:
+                        break
+
+                ext = _sniff_extension(head, response.headers.get("Content-Type", ""))
+                if not ext:
+                    logging.warning("Image download failed for %s: not an image (%s)",
+                                    url, response.headers.get("Content-Type", "unknown type"))
+                    return None
+
+                size = len(head)
+                with open(partial, "wb") as f:
+                    f.write(head)
+                    for chunk in chunks:
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise EnrichmentError(f"larger than {self.max_bytes} bytes")
+                        f.write(chunk)
+        except (requests.RequestException, EnrichmentError, OSError) as exc:
+            logging.warning("Image download failed for %s: %s", url, exc)
+            if os.path.exists(partial):
+                os.remove(partial)
+            return None
+
+        filename = base_name + ext
+        os.replace(partial, os.path.join(self.dest_dir, filename))
+        return filename
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget shared by enrichment workers.
+
+    Two token buckets refill continuously over the window. A call reserves one
+    request and an estimated token count up front; once its real usage is
+    known, the difference is settled, so under-estimates slow later calls.
+    """
+
+    def __init__(self, rpm: int, tpm: int, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / self.window)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / self.window)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until one request and ``tokens`` tokens fit in the budget"""
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max((1 - self._requests) * self.window / self.rpm,
+                           (tokens - self._tokens) * self.window / self.tpm)
+            time.sleep(max(wait, 0.01))
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Correct a reservation with the tokens a call actually used"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.tpm, self._tokens - (used - reserved))
 
 
 def _clean_price(value: Any) -> Optional[float]:
@@ -69,6 +221,11 @@ def _clean_price(value: Any) -> Optional[float]:
         return None
 
 
+def _text(value: Any) -> str:
+    """Cell value for the all-string DataFrame (the model may return numbers)"""
+    return "" if value is None else str(value)
+
+
 def _get_cell(row: pd.Series, col: Union[int, str]) -> str:
     try:
         return str(row[col]).strip()
@@ -76,7 +233,9 @@ def _get_cell(row: pd.Series, col: Union[int, str]) -> str:
         return ""
 
 
-def query_openai_search(client: OpenAI, brand: str, model: str) -> Dict[str, Any]:
+def query_openai_search(
+    client: OpenAI, brand: str, model: str, limiter: Optional[RateLimiter] = None
+) -> Dict[str, Any]:
     query = f"{brand} {model}".strip()
     if not query:
         raise EnrichmentError("Brand/model missing")
@@ -96,6 +255,8 @@ Return ONLY valid JSON with fields:
 If you cannot find data, leave fields blank.
 """
 
+    if limiter:
+        limiter.acquire(ESTIMATED_TOKENS_PER_CALL)
     try:
         completion = client.responses.create(
             model=DEFAULT_MODEL,
@@ -106,6 +267,10 @@ If you cannot find data, leave fields blank.
     except Exception as exc:
         raise EnrichmentError(f"OpenAI request failed: {exc}") from exc
 
+    if limiter:
+        usage = getattr(completion, "usage", None)
+        limiter.settle(ESTIMATED_TOKENS_PER_CALL, getattr(usage, "total_tokens", None) or ESTIMATED_TOKENS_PER_CALL)
+
     raw_text = getattr(completion, "output_text", "") or ""
     try:
         return json.loads(raw_text)
@@ -113,6 +278,32 @@ If you cannot find data, leave fields blank.
         raise EnrichmentError(f"Invalid JSON from model: {raw_text[:200]}") from exc
 
 
+def _apply_result(df: pd.DataFrame, idx: Any, result: Dict[str, Any]) -> None:
+    """Write one search result into its row"""
+    df.at[idx, "title"] = _text(result.get("title"))
+    df.at[idx, "retail_price"] = _text(result.get("retail_price"))
+    df.at[idx, "used_price_low"] = _text(result.get("used_price_low"))
+    df.at[idx, "used_price_high"] = _text(result.get("used_price_high"))
+    df.at[idx, "source_url"] = _text(result.get("source_url"))
+    df.at[idx, "confidence"] = _text(result.get("confidence"))
+
+    retail_price = _clean_price(result.get("retail_price"))
+    if retail_price is not None:
+        df.at[idx, "price_40pct"] = f"{round(retail_price * 0.4, 2):.2f}"
+
+
+def _is_complete(values: Any) -> bool:
+    """True if a row (or search result) has both a title and a retail price"""
+    return bool(_text(values.get("title")).strip() and _text(values.get("retail_price")).strip())
+
+
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    """Write the CSV via a temp file so an interrupted write never truncates it"""
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
 def enrich_csv(
     input_csv: str,
     output_csv: str,
@@ -120,7 +311,23 @@ def enrich_csv(
     id_col: Union[int, str],
     brand_col: Union[int, str],
     model_col: Union[int, str],
+    process_images: bool = True,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+    cache: Optional[EnrichmentCache] = None,
+    resume: bool = False,
+    only_missing: bool = False,
+    checkpoint_every: Optional[int] = None,
 ) -> None:
+    """
+    Enrich every row of input_csv and write the result to output_csv.
+
+    The output is rewritten every checkpoint_every enriched rows (default
+    ENRICH_CHECKPOINT_ROWS), so an interrupted run keeps its progress.
+    resume=True continues from an existing output_csv; it implies
+    only_missing, which skips rows that already have a title and retail
+    price, so only new or failed rows are searched.
+    """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise EnrichmentError("OPENAI_API_KEY is not set")
@@ -128,6 +335,16 @@ def enrich_csv(
     client = OpenAI(api_key=api_key)
     df = pd.read_csv(input_csv, dtype=str, keep_default_na=False)
 
+    if resume and os.path.exists(output_csv):
+        previous = pd.read_csv(output_csv, dtype=str, keep_default_na=False)
+        if len(previous) != len(df):
+            raise EnrichmentError(
+                f"Cannot resume: {output_csv} has {len(previous)} rows but {input_csv} has {len(df)}"
+            )
+        logging.info("Resuming from %s", output_csv)
+        df = previous
+    only_missing = only_missing or resume
+
     # Ensure columns exist
     for col in [
         "title",
@@ -137,45 +354,131 @@ def enrich_csv(
         "source_url",
         "confidence",
         "image_filename",
+        "thumbnail_filename",
         "price_40pct",
     ]:
         if col not in df.columns:
             df[col] = ""
 
+    # Duplicate products are searched once and the result fanned out to every row
+    groups: Dict[Tuple[str, str, str], List[Tuple[Any, str]]] = {}
+    queries: Dict[Tuple[str, str, str], Tuple[str, str]] = {}
+    complete = 0
     for idx, row in df.iterrows():
         brand = _get_cell(row, brand_col)
         model = _get_cell(row, model_col)
-        item_id = _get_cell(row, id_col) or f"row_{idx}"
-
         if not brand and not model:
             logging.warning("Skipping row %s: missing brand/model", idx)
             continue
-
+        if only_missing and _is_complete(row):
+            complete += 1
+            continue
+        key = product_key(brand, model)
+        groups.setdefault(key, []).append((idx, _get_cell(row, id_col) or f"row_{idx}"))
+        queries.setdefault(key, (brand, model))
+
+    if use_cache and cache is None:
+        cache = get_enrichment_cache()
+    cached = cache.get_many(KIND_SEARCH, groups) if use_cache else {}
+    if only_missing:
+        # A cached result without a title or price would leave the rows incomplete again
+        cached = {key: result for key, result in cached.items() if _is_complete(result)}
+    to_search = [key for key in groups if key not in cached]
+    if complete:
+        logging.info("Skipping %s rows that are already enriched", complete)
+    logging.info("Enriching %s rows: %s unique products, %s cached, %s to search",
+                 sum(len(rows) for rows in groups.values()), len(groups), len(cached), len(to_search))
+
+    limiter = RateLimiter(OPENAI_RPM, OPENAI_TPM)
+
+    def _search(key):
+        brand, model = queries[key]
         try:
-            result = query_openai_search(client, brand, model)
+            result = query_openai_search(client, brand, model, limiter=limiter)
         except EnrichmentError as exc:
-            logging.warning("[WARN] Row %s (%s %s) failed: %s", idx, brand, model, exc)
-            continue
-
-        df.at[idx, "title"] = result.get("title", "")
-        df.at[idx, "retail_price"] = result.get("retail_price", "")
-        df.at[idx, "used_price_low"] = result.get("used_price_low", "")
-        df.at[idx, "used_price_high"] = result.get("used_price_high", "")
-        df.at[idx, "source_url"] = result.get("source_url", "")
-        df.at[idx, "confidence"] = result.get("confidence", "")
-
-        retail_price = _clean_price(result.get("retail_price"))
-        if retail_price is not None:
-            df.at[idx, "price_40pct"] = f"{round(retail_price * 0.4, 2):.2f}"
-
-        image_url = result.get("best_image_url", "")
-        filename = _download_image(image_url, images_dir, item_id) if image_url else None
+            return None, exc
+        # Cached as soon as it is paid for, so an interrupted run keeps it
+        if use_cache:
+            cache.put(KIND_SEARCH, key, result)
+        return result, None
+
+    # Searches run on a worker pool paced by the RPM/TPM limiter, at most
+    # 2 x workers ahead of the row being consumed so an interrupted run stops
+    # paying for searches quickly; results are consumed in row order, and each
+    # product's image downloads in the background
+    workers = max_workers or ENRICH_WORKERS
+    to_submit = iter(to_search)
+    searches = deque()  # (key, Future), in to_search order
+    pending: Dict[Tuple[str, str, str], Future] = {}
+    checkpoint_every = checkpoint_every or ENRICH_CHECKPOINT_ROWS
+    since_checkpoint = 0
+
+    def _checkpoint():
+        # Images that finished downloading are recorded too, so resumed rows keep them
+        for key, future in pending.items():
+            if future.done() and future.result():
+                for idx, _ in groups[key]:
+                    df.at[idx, "image_filename"] = future.result()
+        _write_csv(df, output_csv)
+
+    with ImageDownloader(images_dir) as downloader, ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for key, rows in groups.items():
+                if key in cached:
+                    result, error = cached[key], None
+                else:
+                    for next_key in to_submit:
+                        searches.append((next_key, pool.submit(_search, next_key)))
+                        if len(searches) >= workers * 2:
+                            break
+                    _, future = searches.popleft()
+                    result, error = future.result()
+
+                if error:
+                    logging.warning("[WARN] Rows %s (%s %s) failed: %s",
+                                    [idx for idx, _ in rows], *queries[key], error)
+                    continue
+
+                for idx, _ in rows:
+                    _apply_result(df, idx, result)
+                image_url = result.get("best_image_url", "")
+                if image_url:
+                    pending[key] = downloader.submit(image_url, rows[0][1])
+
+                since_checkpoint += len(rows)
+                if since_checkpoint >= checkpoint_every:
+                    _checkpoint()
+                    since_checkpoint = 0
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _checkpoint()
+            logging.warning("Enrichment interrupted; progress saved to %s (rerun with resume)", output_csv)
+            raise
+
+    downloaded: Dict[Tuple[str, str, str], str] = {}
+    for key, future in pending.items():
+        filename = future.result()
         if filename:
+            downloaded[key] = filename
+
+    processor = ImageProcessor.from_config(Config()) if process_images else None
+    thumbnails: Dict[Tuple[str, str, str], str] = {}
+    if processor and downloaded:
+        paths = [os.path.join(images_dir, name) for name in downloaded.values()]
+        for key, result in zip(list(downloaded), processor.process(paths)):
+            if "error" in result:
+                continue
+            downloaded[key] = os.path.basename(result["path"])
+            if result["thumbnail"]:
+                thumbnails[key] = os.path.basename(result["thumbnail"])
+
+    # Rows of the same product share its image file
+    for key, filename in downloaded.items():
+        for idx, _ in groups[key]:
             df.at[idx, "image_filename"] = filename
+            df.at[idx, "thumbnail_filename"] = thumbnails.get(key, "")
 
-        time.sleep(RATE_LIMIT_SECONDS)
-
-    df.to_csv(output_csv, index=False)
+    _write_csv(df, output_csv)
     logging.info("Saved enriched CSV → %s", output_csv)
     logging.info("Images directory → %s", images_dir)
 
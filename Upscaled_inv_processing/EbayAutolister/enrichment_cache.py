@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Enrichment Cache for eBay Autolister
+
+Manifests often list the same brand/model many times. Enrichment results
+are stored per normalized (brand, model) so each product is researched
+once: duplicate rows in a run fan out from one LLM call, and later runs
+reuse results until they expire.
+
+Entries are namespaced by kind (the web-search enricher and the agent
+enricher store different shapes) and an optional variant for results that
+depend on more than the product, such as the agent's condition-specific
+pricing.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Result kinds
+KIND_SEARCH = "search"
+KIND_AGENT = "agent"
+
+# SQLite limits bound parameters per statement; look products up in chunks
+_LOOKUP_CHUNK = 250
+
+
+def product_key(brand: str, model: str, variant: str = "") -> Tuple[str, str, str]:
+    """Normalized (brand, model, variant): case and whitespace do not matter"""
+    return tuple(' '.join(str(value or '').split()).upper() for value in (brand, model, variant))
+
+
+class EnrichmentCache:
+    """SQLite cache of enrichment results per (kind, brand, model, variant)"""
+
+    def __init__(self, db_path: str = None, ttl_days: float = 30.0):
+        """Initialize the cache, defaulting to enrichment_cache.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "enrichment_cache.db"
+
+        self.db_path = str(db_path)
+        self.ttl_seconds = ttl_days * 86400
+        self._init_database()
+        logger.debug(f"Enrichment cache initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and table if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS enrichments (
+                kind TEXT NOT NULL,
+                brand TEXT NOT NULL,
+                model TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                data_json TEXT NOT NULL,
+                enriched_at REAL NOT NULL,
+                PRIMARY KEY (kind, brand, model, variant)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def get_many(self, kind: str, keys: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Dict]:
+        """
+        Look up unexpired results for product keys (from product_key).
+
+        Returns:
+            Dict of key -> stored result, for keys that are cached
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        cutoff = time.time() - self.ttl_seconds
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for i in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[i:i + _LOOKUP_CHUNK]
+            clauses = ' OR '.join(['(brand = ? AND model = ? AND variant = ?)'] * len(chunk))
+            cursor.execute(
+                f"SELECT brand, model, variant, data_json FROM enrichments "
+                f"WHERE kind = ? AND enriched_at >= ? AND ({clauses})",
+                [kind, cutoff] + [part for key in chunk for part in key]
+            )
+            for brand, model, variant, data_json in cursor.fetchall():
+                found[(brand, model, variant)] = json.loads(data_json)
+        conn.close()
+
+        return found
+
+    def get(self, kind: str, key: Tuple[str, str, str]) -> Optional[Dict]:
+        """Unexpired result for one product key, or None"""
+        return self.get_many(kind, [key]).get(key)
+
+    def put(self, kind: str, key: Tuple[str, str, str], data: Dict):
+        """Store the result for a product key"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO enrichments (kind, brand, model, variant, data_json, enriched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (kind,) + tuple(key) + (json.dumps(data, default=str), time.time())
+        )
+        conn.commit()
+        conn.close()
+
+    def forget(self, brand: str, model: str, kind: str = None):
+        """Drop every cached result for a product so it is researched again"""
+        brand, model, _ = product_key(brand, model)
+        conn = sqlite3.connect(self.db_path)
+        if kind:
+            conn.execute("DELETE FROM enrichments WHERE kind = ? AND brand = ? AND model = ?", (kind, brand, model))
+        else:
+            conn.execute("DELETE FROM enrichments WHERE brand = ? AND model = ?", (brand, model))
+        conn.commit()
+        conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Count cached products per kind"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT kind, COUNT(*) FROM enrichments GROUP BY kind")
+        stats = dict(cursor.fetchall())
+        conn.close()
+        return stats
+
+
+# Global enrichment cache instance
+_enrichment_cache_instance = None
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """Get or create global enrichment cache (ENRICHMENT_CACHE_DB overrides the path,
+    ENRICHMENT_CACHE_TTL_DAYS how long results are reused)"""
+    global _enrichment_cache_instance
+    if _enrichment_cache_instance is None:
+        _enrichment_cache_instance = EnrichmentCache(os.getenv('ENRICHMENT_CACHE_DB') or None,
+                                                     float(os.getenv('ENRICHMENT_CACHE_TTL_DAYS', '30')))
+    return _enrichment_cache_instance
@@ -11,17 +11,7 @@ import pandas as pd
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ebay_pricing.pricing_engine import get_pricing_recommendation
-from config import CONDITION_MAPPINGS
-
-def normalize_condition(grade):
-    grade_map = {
-        'LN': 'LIKE_NEW',
-        'VG': 'USED_VERY_GOOD',
-        'G': 'USED_GOOD',
-        'AC': 'USED_ACCEPTABLE',
-        'SA': 'FOR_PARTS_OR_NOT_WORKING'
-    }
-    return grade_map.get(grade.upper(), 'USED_GOOD')
+from condition_normalizer import normalize_condition
 
 def estimate_retail_price(brand: str, model: str) -> float:
     """Estimate retail price based on brand and model patterns"""
@@ -169,7 +159,7 @@ for item in b2_items:
     brand = item['brand']
     model = item['model']
     grade = item['grade']
-    condition = normalize_condition(grade)
+    condition = normalize_condition(grade=grade)
 
     # Estimate retail price
     retail_price = estimate_retail_price(brand, model)
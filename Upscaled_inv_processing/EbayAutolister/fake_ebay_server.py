@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the eBay Inventory, Offer, Feed, Metadata and Browse APIs.
+
+Runs an in-process HTTP server that answers the endpoints EbayAPI,
+FeedUploader and EbayBrowseAPI call, with eBay's bulk limits (25 requests per
+bulk call), LMS feed tasks that process uploaded files into zipped result
+files, a token-bucket call limit that answers 429 + Retry-After, log-normal
+response latency and per-SKU failure injection. Point the clients at it with
+EBAY_API_BASE_URL (or Config.ebay_api_base_url) to load test without the
+network or sandbox credentials.
+
+Usage:
+    with FakeEbayServer(latency_ms=(40, 0.5), rate_limit=200) as server:
+        os.environ['EBAY_API_BASE_URL'] = server.base_url
+        ...
+"""
+
+import gzip
+import io
+import json
+import logging
+import random
+import re
+import socket
+import threading
+import time
+import zipfile
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+BULK_LIMIT = 25
+
+# errorIds used in injected failures (same classification as the live API)
+ERROR_TOO_MANY_REQUESTS = 2001
+ERROR_INVALID_REQUEST = 2004
+ERROR_SYSTEM = 25001
+ERROR_INVALID_DATA = 25002
+ERROR_NOT_FOUND = 25710
+
+EBAY_NS = 'urn:ebay:apis:eBLBaseComponents'
+
+_ALL_CONDITION_IDS = ('1000', '1500', '1750', '2000', '2010', '2020', '2030', '2500',
+                      '2750', '3000', '4000', '5000', '6000', '7000')
+
+
+class FakeEbayServer:
+    """
+    In-memory eBay API stand-in served from a background thread.
+
+    Args:
+        port: Port to bind (0 picks a free one)
+        latency_ms: (median, sigma) of the log-normal per-call latency
+        latency_scale: Multiplier on sampled latency (0 disables sleeping)
+        rate_limit: Sustained calls/sec before 429s (None for unlimited)
+        burst: Token bucket size for rate_limit
+        transient_rate: Share of SKUs whose first bulk attempt fails with a system error
+        permanent_rate: Share of SKUs that always fail with invalid data
+        seed: Seed for latency sampling
+        feed_polls: Status polls a feed task reports IN_PROCESS before it completes
+
+    Tests can also set ``rejected[endpoint]`` to SKUs that a bulk endpoint
+    always fails, ``unavailable[endpoint]`` to SKUs that fail with a system
+    error until removed, and read ``sent`` (request entries received per
+    endpoint) and ``peak_in_flight`` (most calls answered at once).
+    """
+
+    def __init__(self, port: int = 0, latency_ms: Tuple[float, float] = (40.0, 0.5),
+                 latency_scale: float = 1.0, rate_limit: float = None, burst: int = None,
+                 transient_rate: float = 0.0, permanent_rate: float = 0.0, seed: int = 0,
+                 feed_polls: int = 1):
+        self.latency_ms = latency_ms
+        self.latency_scale = latency_scale
+        self.rate_limit = rate_limit
+        self.burst = burst or (max(1, int(rate_limit)) if rate_limit else 0)
+        self.transient_rate = transient_rate
+        self.permanent_rate = permanent_rate
+
+        self.inventory: Dict[str, Dict] = {}
+        self.offers: Dict[str, Dict] = {}
+        self.offer_ids_by_sku: Dict[str, str] = {}
+        self.listings: Dict[str, Dict] = {}     # sku -> feed-created listing
+        self.feed_tasks: Dict[str, Dict] = {}
+        self.feed_polls = feed_polls
+        self.stats = Counter()
+        self.sent = Counter()
+        self.rejected: Dict[str, Set[str]] = {}
+        self.unavailable: Dict[str, Set[str]] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._attempts = Counter()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> 'FakeEbayServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake eBay API listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Behaviour models
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering a call"""
+        if not self.latency_scale:
+            return 0.0
+        median, sigma = self.latency_ms
+        with self._lock:
+            ms = median * self._random.lognormvariate(0, sigma)
+        return ms / 1000 * self.latency_scale
+
+    def take_token(self) -> Optional[float]:
+        """Consume a rate-limit token; returns seconds to wait when none is left"""
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate_limit
+
+    def sku_failure(self, sku: str) -> Optional[Dict]:
+        """Injected failure for a SKU's bulk request entry, if any"""
+        bucket = zlib.crc32(sku.encode('utf-8')) / 2 ** 32
+        if bucket < self.permanent_rate:
+            return {"statusCode": 400, "errors": [{"errorId": ERROR_INVALID_DATA,
+                                                   "message": "Injected invalid data"}]}
+        if bucket < self.permanent_rate + self.transient_rate:
+            with self._lock:
+                self._attempts[sku] += 1
+                first = self._attempts[sku] == 1
+            if first:
+                return {"statusCode": 500, "errors": [{"errorId": ERROR_SYSTEM,
+                                                       "message": "Injected system error"}]}
+        return None
+
+    def injected_failure(self, endpoint: str, sku: str) -> Optional[Dict]:
+        """Failure a test asked for on this SKU's bulk request entry, if any"""
+        if sku in self.rejected.get(endpoint, ()):
+            return {"statusCode": 400, "errors": [{"errorId": ERROR_INVALID_DATA,
+                                                   "message": "Injected rejection"}]}
+        if sku in self.unavailable.get(endpoint, ()):
+            return {"statusCode": 500, "errors": [{"errorId": ERROR_SYSTEM,
+                                                   "message": "Injected system error"}]}
+        return None
+
+    def count(self, key: str, n: int = 1):
+        """Bump a stats counter (handler threads share it)"""
+        with self._lock:
+            self.stats[key] += n
+
+    def count_sent(self, endpoint: str, n: int):
+        with self._lock:
+            self.sent[endpoint] += n
+
+    def enter_call(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def exit_call(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def new_id(self, prefix: str) -> str:
+        with self._lock:
+            value = self._next_id
+            self._next_id += 1
+        return f"{prefix}{value}"
+
+
+def _error(status: int, error_id: int, message: str) -> Tuple[int, Dict]:
+    return status, {"errors": [{"errorId": error_id, "message": message}]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the FakeEbayServer state"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str):
+        fake: FakeEbayServer = self.server.fake
+        fake.enter_call()
+        try:
+            self._answer(fake, method)
+        finally:
+            fake.exit_call()
+
+    def _answer(self, fake: 'FakeEbayServer', method: str):
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        route = re.sub(r'(inventory_item|offer|task)/[^/]+', r'\1/{id}', parsed.path)
+        fake.count('calls')
+        fake.count(f"{method} {route}")
+
+        wait = fake.take_token()
+        if wait is not None:
+            fake.count('throttled')
+            status, body = _error(429, ERROR_TOO_MANY_REQUESTS, "Too many requests")
+            return self._send(status, body, {'Retry-After': f"{wait:.3f}"})
+
+        delay = fake.sample_latency()
+        if delay:
+            time.sleep(delay)
+
+        try:
+            if parsed.path == '/identity/v1/oauth2/token':
+                status, body = 200, {"access_token": "fake-token", "expires_in": 7200, "token_type": "Bearer"}
+            elif parsed.path.startswith('/sell/inventory/v1/'):
+                data = json.loads(raw) if raw else {}
+                status, body = self._inventory(fake, method, parsed.path[len('/sell/inventory/v1/'):], query, data)
+            elif parsed.path.startswith('/sell/feed/v1/'):
+                endpoint = parsed.path[len('/sell/feed/v1/'):]
+                if endpoint.endswith('/download_result_file'):
+                    return self._download_result(fake, endpoint.split('/')[1])
+                status, body, headers = self._feed(fake, method, endpoint, raw)
+                if status >= 400:
+                    fake.count('errors')
+                return self._send(status, body, headers)
+            elif parsed.path.startswith('/sell/metadata/v1/'):
+                status, body = self._metadata(query)
+            elif parsed.path == '/buy/browse/v1/item_summary/search':
+                status, body = self._browse(query)
+            else:
+                status, body = _error(404, ERROR_NOT_FOUND, f"No route for {parsed.path}")
+        except ValueError as e:
+            status, body = _error(400, ERROR_INVALID_REQUEST, f"Malformed request: {e}")
+
+        if status >= 400:
+            fake.count('errors')
+        self._send(status, body)
+
+    def _send(self, status: int, body: Optional[Dict], headers: Dict = None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Inventory API
+
+    def _inventory(self, fake: FakeEbayServer, method: str, endpoint: str, query: Dict, data: Dict):
+        requests_ = data.get('requests', []) if isinstance(data, dict) else []
+        if endpoint.startswith('bulk_') and len(requests_) > BULK_LIMIT:
+            return _error(400, ERROR_INVALID_REQUEST,
+                          f"The number of requests exceeds the limit of {BULK_LIMIT}")
+        if method != 'GET':
+            route = re.sub(r'(inventory_item|offer)/[^/]+', r'\1/{id}', endpoint)
+            fake.count_sent(route, len(requests_) if endpoint.startswith('bulk_') else 1)
+
+        if endpoint == 'bulk_create_or_replace_inventory_item':
+            responses = []
+            for entry in requests_:
+                sku = entry.get('sku', '')
+                failure = fake.injected_failure(endpoint, sku) or fake.sku_failure(sku)
+                if failure:
+                    responses.append({"sku": sku, **failure})
+                    continue
+                with fake._lock:
+                    fake.inventory[sku] = {k: v for k, v in entry.items() if k != 'sku'}
+                responses.append({"statusCode": 200, "sku": sku})
+            return self._multi(responses)
+
+        if endpoint == 'bulk_update_price_quantity':
+            responses = []
+            for entry in requests_:
+                sku = entry.get('sku', '')
+                ok = sku in fake.inventory
+                responses.append({"statusCode": 200 if ok else 404, "sku": sku})
+                if ok and 'shipToLocationAvailability' in entry:
+                    fake.inventory[sku].setdefault('availability', {})['shipToLocationAvailability'] = \
+                        entry['shipToLocationAvailability']
+                for offer in entry.get('offers', []):
+                    stored = fake.offers.get(offer.get('offerId'))
+                    responses.append({"statusCode": 200 if stored else 404,
+                                      "sku": sku, "offerId": offer.get('offerId')})
+                    if stored and 'price' in offer:
+                        stored.setdefault('pricingSummary', {})['price'] = offer['price']
+            return self._multi(responses)
+
+        if endpoint == 'bulk_create_offer':
+            responses = []
+            for entry in requests_:
+                sku = entry.get('sku', '')
+                if sku not in fake.inventory:
+                    responses.append({"statusCode": 400, "sku": sku, "errors": [
+                        {"errorId": ERROR_NOT_FOUND, "message": "Inventory item not found"}]})
+                    continue
+                failure = fake.injected_failure(endpoint, sku)
+                if failure:
+                    responses.append({"sku": sku, **failure})
+                    continue
+                if sku in fake.offer_ids_by_sku:
+                    responses.append({"statusCode": 400, "sku": sku, "errors": [
+                        {"errorId": ERROR_INVALID_DATA, "message": "Offer entity already exists",
+                         "parameters": [{"name": "offerId", "value": fake.offer_ids_by_sku[sku]}]}]})
+                    continue
+                offer_id = fake.new_id('O')
+                with fake._lock:
+                    fake.offers[offer_id] = {**entry, "offerId": offer_id, "status": "UNPUBLISHED"}
+                    fake.offer_ids_by_sku[sku] = offer_id
+                responses.append({"statusCode": 200, "sku": sku, "offerId": offer_id})
+            return self._multi(responses)
+
+        if endpoint == 'bulk_publish_offer':
+            responses = []
+            for entry in requests_:
+                offer_id = entry.get('offerId')
+                offer = fake.offers.get(offer_id)
+                if not offer:
+                    responses.append({"statusCode": 404, "offerId": offer_id, "errors": [
+                        {"errorId": ERROR_NOT_FOUND, "message": "Offer not found"}]})
+                    continue
+                failure = fake.injected_failure(endpoint, offer.get('sku', ''))
+                if failure:
+                    responses.append({"offerId": offer_id, **failure})
+                    continue
+                offer["status"] = "PUBLISHED"
+                offer.setdefault("listingId", fake.new_id('L'))
+                responses.append({"statusCode": 200, "offerId": offer_id, "listingId": offer["listingId"]})
+            return self._multi(responses)
+
+        if endpoint == 'inventory_item' and method == 'GET':
+            limit, offset = int(query.get('limit', 25)), int(query.get('offset', 0))
+            skus = sorted(fake.inventory)
+            page = [{"sku": sku, **fake.inventory[sku]} for sku in skus[offset:offset + limit]]
+            return 200, {"total": len(skus), "inventoryItems": page}
+
+        match = re.fullmatch(r'inventory_item/([^/]+)', endpoint)
+        if match:
+            sku = match.group(1)
+            if method == 'PUT':
+                with fake._lock:
+                    fake.inventory[sku] = data
+                return 204, None
+            if method == 'DELETE':
+                fake.inventory.pop(sku, None)
+                return 204, None
+            if sku not in fake.inventory:
+                return _error(404, ERROR_NOT_FOUND, f"SKU {sku} not found")
+            return 200, {"sku": sku, **fake.inventory[sku]}
+
+        if endpoint == 'offer' and method == 'GET':
+            offer_id = fake.offer_ids_by_sku.get(query.get('sku', ''))
+            offers = [fake.offers[offer_id]] if offer_id else []
+            return 200, {"total": len(offers), "offers": offers}
+
+        if endpoint == 'offer' and method == 'POST':
+            offer_id = fake.new_id('O')
+            fake.offers[offer_id] = {**data, "offerId": offer_id, "status": "UNPUBLISHED"}
+            fake.offer_ids_by_sku[data.get('sku', '')] = offer_id
+            return 201, {"offerId": offer_id}
+
+        match = re.fullmatch(r'offer/([^/]+)(/publish)?', endpoint)
+        if match:
+            offer = fake.offers.get(match.group(1))
+            if not offer:
+                return _error(404, ERROR_NOT_FOUND, "Offer not found")
+            if match.group(2):
+                offer["status"] = "PUBLISHED"
+                offer.setdefault("listingId", fake.new_id('L'))
+                return 200, {"listingId": offer["listingId"]}
+            if method == 'PUT':
+                offer.update(data)
+                return 204, None
+            return 200, offer
+
+        return _error(404, ERROR_NOT_FOUND, f"Unknown inventory endpoint {endpoint}")
+
+    @staticmethod
+    def _multi(responses):
+        """200 when every entry succeeded, 207 Multi-Status otherwise (like eBay)"""
+        status = 200 if all(r["statusCode"] < 300 for r in responses) else 207
+        return status, {"responses": responses}
+
+    # Feed API
+
+    def _feed(self, fake: FakeEbayServer, method: str, endpoint: str, raw: bytes):
+        if endpoint == 'task' and method == 'POST':
+            data = json.loads(raw) if raw else {}
+            if not data.get('feedType') or not data.get('schemaVersion'):
+                return (*_error(400, ERROR_INVALID_REQUEST, "feedType and schemaVersion are required"), None)
+            task_id = fake.new_id('task-')
+            with fake._lock:
+                fake.feed_tasks[task_id] = {"taskId": task_id, "status": "CREATED",
+                                            "feedType": data['feedType'], "polls": 0, "result": None}
+            return 202, None, {'Location': f"{fake.base_url}/sell/feed/v1/task/{task_id}"}
+
+        match = re.fullmatch(r'task/([^/]+)(/upload_file)?', endpoint)
+        task = fake.feed_tasks.get(match.group(1)) if match else None
+        if not task:
+            return (*_error(404, ERROR_NOT_FOUND, f"Unknown feed endpoint {endpoint}"), None)
+
+        if match.group(2):
+            content = self._multipart_file(raw)
+            if content is None:
+                return (*_error(400, ERROR_INVALID_REQUEST, "Missing file part"), None)
+            task["result"], task["summary"] = self._process_feed(fake, content)
+            task["status"] = "QUEUED"
+            return 200, {}, None
+
+        # Status poll: IN_PROCESS for feed_polls polls after upload, then final
+        with fake._lock:
+            if task["status"] in ("QUEUED", "IN_PROCESS"):
+                task["polls"] += 1
+                task["status"] = "IN_PROCESS" if task["polls"] <= fake.feed_polls else (
+                    "COMPLETED_WITH_ERROR" if task["summary"]["failureCount"] else "COMPLETED")
+        body = {k: v for k, v in task.items() if k in ("taskId", "status", "feedType")}
+        if task.get("summary") and body["status"].startswith("COMPLETED"):
+            body["uploadSummary"] = task["summary"]
+        return 200, body, None
+
+    def _multipart_file(self, raw: bytes) -> Optional[bytes]:
+        """Content of the 'file' part of a multipart/form-data body"""
+        match = re.search(r'boundary="?([^";]+)"?', self.headers.get('Content-Type', ''))
+        if not match:
+            return None
+        for part in raw.split(b'--' + match.group(1).encode('ascii')):
+            head, _, content = part.partition(b'\r\n\r\n')
+            if b'name="file"' in head:
+                return content[:-2] if content.endswith(b'\r\n') else content
+        return None
+
+    @staticmethod
+    def _process_feed(fake: FakeEbayServer, content: bytes) -> Tuple[bytes, Dict]:
+        """Apply an LMS_ADD_FIXED_PRICE_ITEM feed; returns (zipped result file, upload summary)"""
+        if content[:2] == b'\x1f\x8b':
+            content = gzip.decompress(content)
+        responses = []
+        success = failure = 0
+        for _, element in ET.iterparse(io.BytesIO(content), events=('end',)):
+            if element.tag != f"{{{EBAY_NS}}}AddFixedPriceItemRequest":
+                continue
+            message_id = element.findtext(f"{{{EBAY_NS}}}MessageID") or ''
+            item = element.find(f"{{{EBAY_NS}}}Item")
+            sku = item.findtext(f"{{{EBAY_NS}}}SKU") if item is not None else ''
+            failure_info = fake.sku_failure(sku)
+            if item is None or not item.findtext(f"{{{EBAY_NS}}}Title") or failure_info:
+                message = failure_info["errors"][0]["message"] if failure_info else "Item is missing required fields"
+                code = failure_info["errors"][0]["errorId"] if failure_info else ERROR_INVALID_DATA
+                failure += 1
+                responses.append(
+                    f"<AddFixedPriceItemResponse xmlns=\"{EBAY_NS}\"><Ack>Failure</Ack>"
+                    f"<CorrelationID>{escape(message_id)}</CorrelationID>"
+                    f"<Errors><ShortMessage>{escape(message)}</ShortMessage><LongMessage>{escape(message)}"
+                    f"</LongMessage><ErrorCode>{code}</ErrorCode><SeverityCode>Error</SeverityCode></Errors>"
+                    f"</AddFixedPriceItemResponse>")
+            else:
+                listing_id = fake.new_id('11000')
+                with fake._lock:
+                    fake.listings[sku] = {"itemId": listing_id, "title": item.findtext(f"{{{EBAY_NS}}}Title")}
+                success += 1
+                responses.append(
+                    f"<AddFixedPriceItemResponse xmlns=\"{EBAY_NS}\"><Ack>Success</Ack>"
+                    f"<CorrelationID>{escape(message_id)}</CorrelationID><ItemID>{listing_id}</ItemID>"
+                    f"</AddFixedPriceItemResponse>")
+            element.clear()
+
+        xml = ('<?xml version="1.0" encoding="UTF-8"?><BulkDataExchangeResponses>'
+               + ''.join(responses) + '</BulkDataExchangeResponses>')
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('result.xml', xml)
+        return buffer.getvalue(), {"successCount": success, "failureCount": failure}
+
+    def _download_result(self, fake: FakeEbayServer, task_id: str):
+        task = fake.feed_tasks.get(task_id)
+        if not task or not task.get("result") or not task["status"].startswith("COMPLETED"):
+            fake.count('errors')
+            return self._send(*_error(404, ERROR_NOT_FOUND, f"No result file for task {task_id}"))
+        payload = task["result"]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Metadata / Browse APIs
+
+    @staticmethod
+    def _metadata(query: Dict):
+        category_ids = re.findall(r'\d+', query.get('filter', ''))
+        return 200, {"itemConditionPolicies": [
+            {"categoryId": category_id, "itemConditionRequired": True,
+             "itemConditions": [{"conditionId": cid} for cid in _ALL_CONDITION_IDS]}
+            for category_id in category_ids
+        ]}
+
+    @staticmethod
+    def _browse(query: Dict):
+        q = query.get('q', '')
+        limit = int(query.get('limit', 50))
+        rng = random.Random(q)
+        base = 50 + zlib.crc32(q.encode('utf-8')) % 950
+        items = [{
+            "itemId": f"v1|{zlib.crc32(f'{q}{i}'.encode('utf-8'))}|0",
+            "title": f"{q} #{i}",
+            "price": {"value": f"{base * rng.uniform(0.8, 1.2):.2f}", "currency": "USD"},
+            "condition": "Used",
+            "buyingOptions": ["FIXED_PRICE"]
+        } for i in range(min(limit, 20))]
+        return 200, {"total": len(items), "itemSummaries": items}
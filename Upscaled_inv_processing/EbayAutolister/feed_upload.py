@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Bulk Feed-File Upload for eBay Autolister
+
+For catalog-scale pushes (tens of thousands of SKUs) the per-call Inventory
+API spends most of its time on round trips. Feed mode instead streams item
+batches into gzip-compressed LMS feed files (LMS_ADD_FIXED_PRICE_ITEM, one
+AddFixedPriceItemRequest per SKU), hands each file to the Sell Feed API task
+workflow (create task -> upload_file -> poll -> download_result_file) and
+parses the result files back into per-SKU outcomes.
+
+Files are written and uploaded one after another while eBay processes the
+earlier ones, then all tasks are polled; memory stays flat because items are
+serialized as they stream out of the CSV and results are parsed with iterparse.
+Tasks still processing when polling gives up are reported as in flight, not
+failed: eBay keeps working on them, and a later run can collect their results
+instead of uploading the same items again.
+"""
+
+import gzip
+import io
+import logging
+import os
+import tempfile
+import time
+import zipfile
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+from ebay_autolister import ConditionMapper, EbayAPI, InventoryItem
+from payload_validator import CONDITION_ENUMS_BY_ID
+
+logger = logging.getLogger(__name__)
+
+FEED_TYPE_ADD_FIXED_PRICE = "LMS_ADD_FIXED_PRICE_ITEM"
+FEED_SCHEMA_VERSION = "1149"
+
+# Feed API task statuses after which nothing else will change
+TASK_STATUS_TIMED_OUT = "TIMED_OUT"  # local status: still running when we stopped polling
+TASK_FINAL_STATUSES = {"COMPLETED", "COMPLETED_WITH_ERROR", "PARTIALLY_PROCESSED", "FAILED"}
+
+# Inventory API condition enums -> Trading/LMS condition IDs
+CONDITION_IDS_BY_ENUM = {enum: condition_id for condition_id, enum in CONDITION_ENUMS_BY_ID.items()}
+
+_XML_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<BulkDataExchangeRequests>\n'
+               '<Header><SiteID>0</SiteID><Version>{version}</Version></Header>\n')
+_XML_FOOTER = '</BulkDataExchangeRequests>\n'
+
+
+def _local(tag: str) -> str:
+    """Element tag without its namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class FeedFileWriter:
+    """
+    Streams items into one gzip-compressed LMS feed file.
+
+    Usage:
+        with FeedFileWriter(path, listing_defaults) as writer:
+            for item in items:
+                writer.write(item)
+    """
+
+    def __init__(self, path: str, listing_defaults: Dict = None, max_images: int = 12,
+                 schema_version: str = FEED_SCHEMA_VERSION):
+        self.path = path
+        self.listing_defaults = listing_defaults or {}
+        self.max_images = max_images
+        self.schema_version = schema_version
+        self.skus: List[str] = []
+        self._stream = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self) -> 'FeedFileWriter':
+        self._stream = io.TextIOWrapper(gzip.open(self.path, 'wb'), encoding='utf-8')
+        self._stream.write(_XML_HEADER.format(version=self.schema_version))
+        return self
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.write(_XML_FOOTER)
+            self._stream.close()
+            self._stream = None
+
+    def write(self, item: InventoryItem):
+        """Append one AddFixedPriceItemRequest (MessageID = SKU, echoed back as CorrelationID)"""
+        self._stream.write(self.request_xml(item))
+        self.skus.append(item.sku)
+
+    def request_xml(self, item: InventoryItem) -> str:
+        """AddFixedPriceItemRequest element for an inventory item"""
+        defaults = self.listing_defaults
+        condition, condition_description = ConditionMapper.condition_fields(item.condition, item.grade or "")
+        condition_id = CONDITION_IDS_BY_ENUM.get(condition, '5000')
+
+        specifics = [('Brand', item.brand or 'Unbranded'), ('MPN', item.mpn or item.sku)]
+        if item.grade:
+            specifics.append(('Grade', item.grade))
+        specifics_xml = ''.join(
+            f"<NameValueList><Name>{escape(name)}</Name><Value>{escape(str(value))}</Value></NameValueList>"
+            for name, value in specifics
+        )
+        pictures_xml = ''.join(f"<PictureURL>{escape(url)}</PictureURL>"
+                               for url in item.images[:self.max_images])
+        upc_xml = f"<ProductListingDetails><UPC>{escape(item.upc)}</UPC></ProductListingDetails>" if item.upc else ''
+
+        return (
+            '<AddFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">'
+            '<ErrorLanguage>en_US</ErrorLanguage><WarningLevel>High</WarningLevel>'
+            f"<MessageID>{escape(item.sku)}</MessageID>"
+            '<Item>'
+            f"<SKU>{escape(item.sku)}</SKU>"
+            f"<Title>{escape(item.title)}</Title>"
+            f"<Description>{escape(item.description or item.title)}</Description>"
+            f"<PrimaryCategory><CategoryID>{escape(str(item.category_id))}</CategoryID></PrimaryCategory>"
+            f"<StartPrice currencyID=\"{defaults.get('currency', 'USD')}\">{item.price:.2f}</StartPrice>"
+            f"<Quantity>{int(item.quantity)}</Quantity>"
+            f"<ConditionID>{condition_id}</ConditionID>"
+            f"<ConditionDescription>{escape(condition_description)}</ConditionDescription>"
+            f"<Country>{defaults.get('country', 'US')}</Country>"
+            f"<Currency>{defaults.get('currency', 'USD')}</Currency>"
+            f"<Location>{escape(defaults.get('location', 'United States'))}</Location>"
+            f"<DispatchTimeMax>{defaults.get('dispatch_days', 3)}</DispatchTimeMax>"
+            '<ListingDuration>GTC</ListingDuration><ListingType>FixedPriceItem</ListingType>'
+            f"<ItemSpecifics>{specifics_xml}</ItemSpecifics>"
+            f"{upc_xml}"
+            f"<PictureDetails>{pictures_xml}</PictureDetails>"
+            '<SellerProfiles>'
+            f"<SellerShippingProfile><ShippingProfileID>{escape(defaults.get('fulfillment_policy_id', ''))}"
+            '</ShippingProfileID></SellerShippingProfile>'
+            f"<SellerReturnProfile><ReturnProfileID>{escape(defaults.get('return_policy_id', ''))}"
+            '</ReturnProfileID></SellerReturnProfile>'
+            f"<SellerPaymentProfile><PaymentProfileID>{escape(defaults.get('payment_policy_id', ''))}"
+            '</PaymentProfileID></SellerPaymentProfile>'
+            '</SellerProfiles>'
+            '</Item>'
+            '</AddFixedPriceItemRequest>\n'
+        )
+
+
+def _open_result_stream(path: str):
+    """Open a result file that may be zipped, gzipped or plain XML"""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(b'PK'):
+        archive = zipfile.ZipFile(path)
+        return archive.open(archive.namelist()[0])
+    if magic.startswith(b'\x1f\x8b'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def parse_result_file(path: str) -> Iterator[Dict]:
+    """
+    Stream per-SKU outcomes out of an LMS result file.
+
+    Yields:
+        {'sku', 'ack', 'item_id', 'errors': [{'code', 'message', 'severity'}]}
+    """
+    with _open_result_stream(path) as stream:
+        for _, element in ET.iterparse(stream, events=('end',)):
+            if not _local(element.tag).endswith('ItemResponse'):
+                continue
+            fields = {'errors': []}
+            for child in element:
+                name = _local(child.tag)
+                if name == 'Errors':
+                    error = {_local(e.tag): (e.text or '') for e in child}
+                    fields['errors'].append({
+                        'code': error.get('ErrorCode'),
+                        'message': error.get('LongMessage') or error.get('ShortMessage', ''),
+                        'severity': error.get('SeverityCode', 'Error')
+                    })
+                else:
+                    fields[name] = child.text
+            yield {
+                'sku': fields.get('CorrelationID') or fields.get('SKU'),
+                'ack': fields.get('Ack'),
+                'item_id': fields.get('ItemID'),
+                'errors': fields['errors']
+            }
+            element.clear()
+
+
+class FeedUploader:
+    """
+    Runs LMS feed files through the Sell Feed API task workflow.
+
+    Args:
+        api: Authenticated EbayAPI client (needs a user token with sell.inventory scope)
+        listing_defaults: Currency, country, location, dispatch days and business policy IDs
+        max_items_per_file: Items per feed file/task
+        poll_interval: Seconds between task status polls
+        timeout: Seconds to wait for all tasks before giving up
+        work_dir: Where feed and result files are written (temp dir by default)
+    """
+
+    def __init__(self, api: EbayAPI, listing_defaults: Dict = None, max_items_per_file: int = 10000,
+                 max_images: int = 12, poll_interval: float = 30.0, timeout: float = 7200.0,
+                 work_dir: str = None, feed_type: str = FEED_TYPE_ADD_FIXED_PRICE,
+                 schema_version: str = FEED_SCHEMA_VERSION):
+        self.api = api
+        self.listing_defaults = listing_defaults or {}
+        self.max_items_per_file = max_items_per_file
+        self.max_images = max_images
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='ebay_feed_')
+        self.feed_type = feed_type
+        self.schema_version = schema_version
+
+    # Feed API task workflow
+
+    def create_task(self) -> str:
+        """Create a feed task; eBay returns its ID in the Location header"""
+        response = self.api._make_request('POST', 'task', data={
+            "feedType": self.feed_type, "schemaVersion": self.schema_version
+        }, base_url=self.api.feed_url, raw=True)
+        return response.headers['Location'].rstrip('/').rsplit('/', 1)[-1]
+
+    def upload_file(self, task_id: str, path: str):
+        """Upload a feed file to its task (multipart/form-data)"""
+        file_name = os.path.basename(path)
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.api._make_request('POST', f"task/{task_id}/upload_file",
+                               data={"fileName": file_name, "name": "file", "type": "form-data"},
+                               files={"file": (file_name, content, 'application/gzip')},
+                               base_url=self.api.feed_url)
+
+    def get_task(self, task_id: str) -> Dict:
+        return self.api._make_request('GET', f"task/{task_id}", base_url=self.api.feed_url)
+
+    def download_result(self, task_id: str) -> str:
+        """Save a task's result file into work_dir and return its path"""
+        response = self.api._make_request('GET', f"task/{task_id}/download_result_file",
+                                          base_url=self.api.feed_url, raw=True)
+        path = os.path.join(self.work_dir, f"result_{task_id}")
+        with open(path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+        return path
+
+    def wait_for_tasks(self, task_ids: List[str]) -> Dict[str, Dict]:
+        """Poll until every task reaches a final status (or the timeout passes)"""
+        deadline = time.monotonic() + self.timeout
+        pending = list(task_ids)
+        finished: Dict[str, Dict] = {}
+        while pending:
+            for task_id in list(pending):
+                task = self.get_task(task_id)
+                if task.get('status') in TASK_FINAL_STATUSES:
+                    finished[task_id] = task
+                    pending.remove(task_id)
+                    logger.info(f"Feed task {task_id}: {task.get('status')} {task.get('uploadSummary', {})}")
+            if pending:
+                if time.monotonic() >= deadline:
+                    logger.error(f"Timed out waiting for feed tasks: {pending}")
+                    for task_id in pending:
+                        finished[task_id] = {'taskId': task_id, 'status': TASK_STATUS_TIMED_OUT}
+                    break
+                time.sleep(self.poll_interval)
+        return finished
+
+    # Feed files
+
+    def write_feed_files(self, items: Iterable[InventoryItem]) -> Iterator[FeedFileWriter]:
+        """Stream items into feed files of up to max_items_per_file, yielding each closed file"""
+        writer = None
+        file_number = 0
+        for item in items:
+            if writer is None:
+                file_number += 1
+                path = os.path.join(self.work_dir, f"feed_{file_number:04d}.xml.gz")
+                writer = FeedFileWriter(path, self.listing_defaults, self.max_images,
+                                        self.schema_version).open()
+            writer.write(item)
+            if len(writer.skus) >= self.max_items_per_file:
+                writer.close()
+                yield writer
+                writer = None
+        if writer is not None:
+            writer.close()
+            yield writer
+
+    def upload_batches(self, batches: Iterable[List[InventoryItem]],
+                       on_results: Callable[[Dict], None] = None,
+                       on_uploaded: Callable[[str, List[str]], None] = None,
+                       in_flight: Dict[str, List[str]] = None) -> Dict:
+        """
+        Push item batches through feed files and map results back per SKU.
+
+        Args:
+            batches: Item batches (e.g. CSVProcessor.iter_item_batches)
+            on_results: Optional callback with each finished task's {"successful", "failed"} results
+            on_uploaded: Optional callback (task_id, skus) as soon as a file is uploaded
+            in_flight: task_id -> SKUs of tasks uploaded by an earlier run; these are
+                polled and collected along with the new tasks
+
+        Returns:
+            {"successful": [{"sku", "listing_id"}], "failed": [{"sku", "error", "error_codes"}],
+             "warnings": [{"sku", "warning"}], "in_flight": [{"sku", "task_id"}],
+             "tasks": [{"task_id", "status", "items", "file"}]}
+        """
+        results = {"successful": [], "failed": [], "warnings": [], "in_flight": [], "tasks": []}
+        uploaded = [(task_id, skus, None) for task_id, skus in (in_flight or {}).items()]
+
+        items = (item for batch in batches for item in batch)
+        for writer in self.write_feed_files(items):
+            try:
+                task_id = self.create_task()
+                self.upload_file(task_id, writer.path)
+            except Exception as e:
+                logger.error(f"Feed upload of {writer.path} failed: {e}")
+                task_results = {"successful": [], "failed": [
+                    {"sku": sku, "error": f"Feed upload failed: {e}", "error_codes": []} for sku in writer.skus
+                ]}
+                self._merge(results, task_results, on_results)
+                results["tasks"].append({"task_id": None, "status": "UPLOAD_FAILED",
+                                         "items": len(writer.skus), "file": writer.path})
+                continue
+            logger.info(f"Uploaded {len(writer.skus)} items in {writer.path} as feed task {task_id}")
+            if on_uploaded:
+                on_uploaded(task_id, writer.skus)
+            uploaded.append((task_id, writer.skus, writer.path))
+
+        tasks = self.wait_for_tasks([task_id for task_id, _, _ in uploaded])
+        for task_id, skus, path in uploaded:
+            task = tasks[task_id]
+            results["tasks"].append({"task_id": task_id, "status": task.get('status'),
+                                     "items": len(skus), "file": path})
+            if task.get('status') not in TASK_FINAL_STATUSES:
+                logger.warning(f"Feed task {task_id} is still processing; {len(skus)} SKUs left in flight")
+                results["in_flight"].extend({"sku": sku, "task_id": task_id} for sku in skus)
+                continue
+            task_results = self._task_results(task_id, task, skus)
+            results["warnings"].extend(task_results.pop("warnings", []))
+            self._merge(results, task_results, on_results)
+        return results
+
+    @staticmethod
+    def _merge(results: Dict, task_results: Dict, on_results: Optional[Callable]):
+        results["successful"].extend(task_results["successful"])
+        results["failed"].extend(task_results["failed"])
+        if on_results:
+            on_results(task_results)
+
+    def _task_results(self, task_id: str, task: Dict, skus: List[str]) -> Dict:
+        """Per-SKU outcomes for one finished task; SKUs missing from the result file count as failed"""
+        task_results = {"successful": [], "failed": [], "warnings": []}
+        seen = set()
+
+        # Even FAILED tasks may carry a result file with per-item errors
+        try:
+            for outcome in parse_result_file(self.download_result(task_id)):
+                sku = outcome['sku']
+                seen.add(sku)
+                errors = [e for e in outcome['errors'] if e['severity'] == 'Error']
+                if outcome['item_id'] and outcome['ack'] != 'Failure' and not errors:
+                    task_results["successful"].append({"sku": sku, "listing_id": outcome['item_id']})
+                    task_results["warnings"].extend({"sku": sku, "warning": e['message']}
+                                                    for e in outcome['errors'])
+                else:
+                    task_results["failed"].append({
+                        "sku": sku,
+                        "error": '; '.join(e['message'] for e in errors) or 'Listing not created',
+                        "error_codes": [e['code'] for e in errors]
+                    })
+        except Exception as e:
+            logger.error(f"Could not read results for feed task {task_id}: {e}")
+
+        missing_error = f"No result for SKU in feed task {task_id} (status {task.get('status')})"
+        task_results["failed"].extend({"sku": sku, "error": missing_error, "error_codes": []}
+                                      for sku in skus if sku not in seen)
+        return task_results
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Perceptual hashing of candidate product images
+
+Image sources often return the same photo at several URLs and sizes. A
+64-bit difference hash (dHash) of each candidate lets the image pipeline
+keep one copy of every photo, and lets known-bad photos (placeholders,
+"image not available" tiles) be rejected wherever they are served from.
+
+Hashes are stored per URL in image_hashes.db, so a URL seen in an earlier
+run is never downloaded again until its entry expires; URLs that failed to
+download or decode are remembered too.
+"""
+
+import io
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Hashes this many bits apart (out of 64) or closer are the same photo
+DEFAULT_THRESHOLD = 6
+
+# SQLite limits bound parameters per statement; look URLs up in chunks
+_LOOKUP_CHUNK = 500
+
+
+def dhash(image: Image.Image, size: int = 8) -> str:
+    """Difference hash of an image as a hex string (size*size bits)"""
+    # JPEG decoders can skip most of the work when only a tiny image is needed
+    image.draft("L", (size * 8, size * 8))
+    small = image.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = small.tobytes()
+
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{size * size // 4}x}"
+
+
+def dhash_bytes(data: bytes) -> Optional[str]:
+    """dHash of encoded image bytes, or None if they are not a readable image"""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return dhash(image)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return None
+
+
+def hamming(a: str, b: str) -> int:
+    """Number of differing bits between two hex hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def is_near(image_hash: str, others: Iterable[str], threshold: int = DEFAULT_THRESHOLD) -> bool:
+    """True if image_hash is within threshold bits of any hash in others"""
+    return any(hamming(image_hash, other) <= threshold for other in others)
+
+
+class ImageHashIndex:
+    """SQLite index of dHashes per image URL, plus a list of known-bad hashes"""
+
+    def __init__(self, db_path: str = None, ttl_days: float = 30.0, threshold: int = DEFAULT_THRESHOLD):
+        """Initialize the index, defaulting to image_hashes.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "image_hashes.db"
+
+        self.db_path = str(db_path)
+        self.ttl_seconds = ttl_days * 86400
+        self.threshold = threshold
+        self._bad: Optional[List[str]] = None
+        self._init_database()
+        logger.debug(f"Image hash index initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and tables if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # image_hash is NULL for URLs that could not be downloaded or decoded
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS url_hashes (
+                url TEXT PRIMARY KEY,
+                image_hash TEXT,
+                checked_at REAL NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bad_hashes (
+                image_hash TEXT PRIMARY KEY,
+                reason TEXT,
+                added_at REAL NOT NULL
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Known hashes for URLs checked within the TTL.
+
+        Returns:
+            Dict of url -> hash, or url -> None for URLs known to be unusable
+            (failed download, or a photo near a known-bad hash). URLs not in
+            the dict need downloading.
+        """
+        urls = list(urls)
+        known = {}
+        cutoff = time.time() - self.ttl_seconds
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for i in range(0, len(urls), _LOOKUP_CHUNK):
+            chunk = urls[i:i + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(
+                f"SELECT url, image_hash FROM url_hashes WHERE checked_at >= ? AND url IN ({placeholders})",
+                [cutoff] + chunk
+            )
+            known.update(dict(cursor.fetchall()))
+        conn.close()
+
+        return {url: (None if image_hash and self.is_bad(image_hash) else image_hash)
+                for url, image_hash in known.items()}
+
+    def record(self, url: str, image_hash: Optional[str]):
+        """Store the hash of a downloaded URL (None if it was unusable)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT OR REPLACE INTO url_hashes (url, image_hash, checked_at) VALUES (?, ?, ?)",
+                     (url, image_hash, time.time()))
+        conn.commit()
+        conn.close()
+
+    def bad_hashes(self) -> List[str]:
+        """Known-bad hashes (loaded once per index)"""
+        if self._bad is None:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("SELECT image_hash FROM bad_hashes")
+            self._bad = [row[0] for row in cursor.fetchall()]
+            conn.close()
+        return self._bad
+
+    def is_bad(self, image_hash: str) -> bool:
+        """True if a hash is near a known-bad photo"""
+        return is_near(image_hash, self.bad_hashes(), self.threshold)
+
+    def mark_bad(self, image_hash: str, reason: str = ""):
+        """Reject this photo (and near copies of it) from now on"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT OR REPLACE INTO bad_hashes (image_hash, reason, added_at) VALUES (?, ?, ?)",
+                     (image_hash, reason, time.time()))
+        conn.commit()
+        conn.close()
+        self._bad = None
+
+    def mark_bad_url(self, url: str, reason: str = "") -> bool:
+        """Reject the photo a previously hashed URL serves; False if the URL has no stored hash"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT image_hash FROM url_hashes WHERE url = ?", (url,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row or not row[0]:
+            return False
+        self.mark_bad(row[0], reason or url)
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Count hashed, unusable and known-bad entries"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(image_hash), COUNT(*) - COUNT(image_hash) FROM url_hashes")
+        hashed, unusable = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM bad_hashes")
+        bad = cursor.fetchone()[0]
+        conn.close()
+        return {'hashed': hashed, 'unusable': unusable, 'bad': bad}
+
+
+# Global hash index instance
+_hash_index_instance = None
+
+
+def get_hash_index() -> ImageHashIndex:
+    """Get or create global image hash index (IMAGE_HASH_DB overrides the path)"""
+    global _hash_index_instance
+    if _hash_index_instance is None:
+        _hash_index_instance = ImageHashIndex(os.getenv('IMAGE_HASH_DB') or None)
+    return _hash_index_instance
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Concurrent image pipeline for refreshing listing pictures
+
+The image scripts (upload_stock_images, scrape_product_images,
+auto_add_images, samsung_official_images, copy_ebay_listing_images) differ
+only in where candidate image URLs come from. This module runs the shared
+part for all of them:
+
+1. listings are grouped by normalized (brand, model), so each model is
+   searched once;
+2. models are searched concurrently; each model tries its candidate
+   sources in order until enough images validate;
+3. candidate URLs are HEAD-checked concurrently on a pooled session, and
+   each URL is checked only once per run;
+4. ReviseFixedPriceItem updates start as soon as a model's images are
+   known. They run on a bounded pool under the Trading API client's
+   shared rate limiter.
+
+Validated images are remembered per model in image_cache.db, so models
+seen in earlier runs need no search at all; entries older than the
+re-check interval are HEAD-checked again before reuse.
+
+With an ImageHashIndex, candidates are downloaded and perceptually hashed
+instead of HEAD-checked: near-duplicate photos collapse to one, known-bad
+photos are rejected, and URLs hashed in earlier runs are not fetched again.
+
+Usage:
+    pipeline = ImagePipeline(api, [ImageSource('samsung', samsung_candidates)])
+    results = pipeline.run(listings)   # [{'sku', 'item_id', 'brand', 'model'}]
+"""
+
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from image_hashing import ImageHashIndex, dhash_bytes, is_near
+
+logger = logging.getLogger(__name__)
+
+# item_mapping.csv placeholder for listings that are not on eBay yet
+PLACEHOLDER_ITEM_ID = 'ITEM_ID_HERE'
+
+
+class ImageSource:
+    """
+    A named provider of candidate image URLs for a (brand, model).
+
+    Candidates do not need to be checked; the pipeline validates them.
+
+    Args:
+        name: Label used in logs and results
+        find: Callable (brand, model) -> list of candidate URLs
+    """
+
+    def __init__(self, name: str, find: Callable[[str, str], List[str]]):
+        self.name = name
+        self.find = find
+
+    def candidates(self, brand: str, model: str) -> List[str]:
+        try:
+            return [url for url in (self.find(brand, model) or [])
+                    if isinstance(url, str) and url.startswith('http')]
+        except Exception as e:
+            logger.warning(f"Image source {self.name} failed for {brand} {model}: {e}")
+            return []
+
+
+def model_key(brand: str, model: str) -> Tuple[str, str]:
+    """Normalized (brand, model) used to share image searches between listings"""
+    return (' '.join((brand or '').split()).upper(), ' '.join((model or '').split()).upper())
+
+
+class ImageCacheStore:
+    """SQLite cache of validated image URLs per normalized (brand, model)"""
+
+    def __init__(self, db_path: str = None, recheck_days: float = 7.0):
+        """Initialize the cache, defaulting to image_cache.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "image_cache.db"
+
+        self.db_path = str(db_path)
+        self.recheck_seconds = recheck_days * 86400
+        self._init_database()
+        logger.debug(f"Image cache initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and table if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS model_images (
+                brand TEXT NOT NULL,
+                model TEXT NOT NULL,
+                images_json TEXT NOT NULL,
+                sources_json TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (brand, model)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def get(self, brand: str, model: str) -> Optional[Dict]:
+        """
+        Cached images for a model, or None if never found.
+
+        Returns:
+            {'images': [...], 'sources': [...], 'fresh': bool}, where fresh is
+            False once the URLs are due for a liveness re-check
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT images_json, sources_json, checked_at FROM model_images WHERE brand = ? AND model = ?",
+            model_key(brand, model)
+        )
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+        return {'images': json.loads(row[0]), 'sources': json.loads(row[1]),
+                'fresh': time.time() - row[2] < self.recheck_seconds}
+
+    def put(self, brand: str, model: str, images: List[str], sources: List[str]):
+        """Store validated images for a model (checked now)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO model_images (brand, model, images_json, sources_json, checked_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            model_key(brand, model) + (json.dumps(images), json.dumps(sources), time.time())
+        )
+        conn.commit()
+        conn.close()
+
+    def touch(self, brand: str, model: str):
+        """Mark a model's cached images as re-checked now"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE model_images SET checked_at = ? WHERE brand = ? AND model = ?",
+                     (time.time(),) + model_key(brand, model))
+        conn.commit()
+        conn.close()
+
+    def forget(self, brand: str, model: str):
+        """Drop a model so the next run searches for it again"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM model_images WHERE brand = ? AND model = ?", model_key(brand, model))
+        conn.commit()
+        conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Count cached models, and how many are due for a re-check"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(checked_at < ?), 0) FROM model_images",
+                       (time.time() - self.recheck_seconds,))
+        total, stale = cursor.fetchone()
+        conn.close()
+        return {'models': total, 'stale': stale}
+
+
+class ImagePipeline:
+    """
+    Finds, validates and applies pictures for many listings at once.
+
+    Args:
+        api: EbayTradingAPI (anything with revise_item_pictures)
+        sources: Candidate sources, tried in order per model
+        max_images: Pictures per listing
+        max_candidates: Candidates validated per source per model
+        search_workers: Models searched at once
+        validate_workers: HEAD checks in flight
+        update_workers: ReviseFixedPriceItem calls in flight
+        validate_timeout: Seconds per HEAD check
+        session: HTTP session for validation (a pooled one by default)
+        cache: Optional ImageCacheStore consulted before searching
+        hash_index: Optional ImageHashIndex; candidates are then downloaded and
+            hashed so near-duplicate and known-bad photos can be dropped
+        max_download_mb: Largest candidate downloaded for hashing
+    """
+
+    def __init__(self, api, sources: Iterable[ImageSource], max_images: int = 3, max_candidates: int = 6,
+                 search_workers: int = 8, validate_workers: int = 16, update_workers: int = 4,
+                 validate_timeout: float = 5.0, session: requests.Session = None,
+                 cache: ImageCacheStore = None, hash_index: ImageHashIndex = None,
+                 max_download_mb: float = 15.0):
+        self.api = api
+        self.cache = cache
+        self.hash_index = hash_index
+        self.max_download_bytes = int(max_download_mb * 1024 * 1024)
+        self.sources = list(sources)
+        self.max_images = max_images
+        self.max_candidates = max_candidates
+        self.search_workers = search_workers
+        self.validate_workers = validate_workers
+        self.update_workers = update_workers
+        self.validate_timeout = validate_timeout
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=validate_workers, pool_maxsize=validate_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        self._validated: Dict[Tuple[str, str], Future] = {}
+        self._validated_lock = threading.Lock()
+        self._validate_pool: Optional[ThreadPoolExecutor] = None
+
+    # Validation
+
+    def check_url(self, url: str) -> bool:
+        """HEAD-check one URL: 200 and not an HTML page"""
+        try:
+            response = self.session.head(url, timeout=self.validate_timeout, allow_redirects=True)
+        except requests.RequestException:
+            return False
+        content_type = response.headers.get('Content-Type', '')
+        return response.status_code == 200 and not content_type.startswith('text/')
+
+    def fingerprint(self, url: str) -> Optional[str]:
+        """Download one candidate and return its perceptual hash (None if unusable or known bad)"""
+        image_hash = None
+        try:
+            with self.session.get(url, timeout=self.validate_timeout, stream=True) as response:
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code == 200 and not content_type.startswith('text/'):
+                    data = bytearray()
+                    for chunk in response.iter_content(64 * 1024):
+                        data.extend(chunk)
+                        if len(data) > self.max_download_bytes:
+                            break
+                    else:
+                        image_hash = dhash_bytes(bytes(data))
+        except requests.RequestException:
+            pass
+
+        self.hash_index.record(url, image_hash)
+        if image_hash and self.hash_index.is_bad(image_hash):
+            return None
+        return image_hash
+
+    def _checks(self, urls: List[str], live: bool = False) -> List[Tuple[str, object]]:
+        """
+        (url, verdict) for each distinct URL, in order; a verdict is falsy for
+        unusable URLs and is the perceptual hash when hashing.
+
+        Each URL is checked once per run, and checks in flight are shared, so
+        models racing on one URL wait for a single request. With a hash index,
+        URLs it already knows are answered without any request unless live.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return []
+        if self._validate_pool is None:
+            with ThreadPoolExecutor(max_workers=self.validate_workers) as pool:
+                self._validate_pool = pool
+                try:
+                    return self._checks(urls, live)
+                finally:
+                    self._validate_pool = None
+
+        hashing = self.hash_index is not None and not live
+        mode = 'hash' if hashing else 'head'
+        known = self.hash_index.lookup(urls) if hashing else {}
+
+        with self._validated_lock:
+            checks = []
+            for url in urls:
+                key = (mode, url)
+                if key not in self._validated:
+                    if url in known:
+                        self._validated[key] = Future()
+                        self._validated[key].set_result(known[url])
+                    else:
+                        check = self.fingerprint if hashing else self.check_url
+                        self._validated[key] = self._validate_pool.submit(check, url)
+                checks.append(self._validated[key])
+        return [(url, check.result()) for url, check in zip(urls, checks)]
+
+    def validate(self, urls: List[str], live: bool = False) -> List[str]:
+        """Usable URLs out of urls, in order (live forces a HEAD check even when hashing)"""
+        return [url for url, verdict in self._checks(urls, live) if verdict]
+
+    # Search
+
+    def find_images(self, brand: str, model: str) -> Dict:
+        """
+        Images for a model: from the cache if possible, otherwise try each
+        source in order until max_images candidates validate.
+
+        Cached images due for a re-check are HEAD-checked again; if any have
+        died, the survivors are topped up from the sources. With a hash index,
+        candidates that are near copies of an already chosen photo are skipped.
+
+        Returns:
+            {'images': [...], 'sources': [names that contributed], 'cached': bool}
+        """
+        images: List[str] = []
+        used = []
+        if self.cache is not None:
+            cached = self.cache.get(brand, model)
+            if cached and cached['fresh']:
+                return {'images': cached['images'], 'sources': cached['sources'], 'cached': True}
+            if cached:
+                images = self.validate(cached['images'], live=True)
+                if len(images) == len(cached['images']):
+                    self.cache.touch(brand, model)
+                    return {'images': images, 'sources': cached['sources'], 'cached': True}
+                used = list(cached['sources']) if images else []
+
+        # Hashes of kept photos, so copies of them at other URLs or sizes are skipped
+        kept = [verdict for _, verdict in self._checks(images)] if self.hash_index else []
+        kept = [h for h in kept if isinstance(h, str)]
+
+        for source in self.sources:
+            if len(images) >= self.max_images:
+                break
+            candidates = [url for url in source.candidates(brand, model) if url not in images]
+            added = False
+            for url, verdict in self._checks(candidates[:self.max_candidates]):
+                if not verdict:
+                    continue
+                if self.hash_index is not None:
+                    if is_near(verdict, kept, self.hash_index.threshold):
+                        continue
+                    kept.append(verdict)
+                images.append(url)
+                added = True
+                if len(images) >= self.max_images:
+                    break
+            if added:
+                used.append(source.name)
+
+        if images and self.cache is not None:
+            self.cache.put(brand, model, images, used)
+        return {'images': images, 'sources': used, 'cached': False}
+
+    # Orchestration
+
+    @staticmethod
+    def _skip_reason(listing: Dict) -> Optional[str]:
+        item_id = (listing.get('item_id') or '').strip()
+        if not item_id or item_id == PLACEHOLDER_ITEM_ID:
+            return 'No eBay item ID'
+        if not (listing.get('model') or '').strip():
+            return 'No model'
+        return None
+
+    def _update(self, listing: Dict, images: List[str]) -> Dict:
+        record = {'sku': listing.get('sku'), 'item_id': listing['item_id'].strip()}
+        try:
+            response = self.api.revise_item_pictures(record['item_id'], images)
+        except Exception as e:
+            return {**record, 'error': str(e)}
+        if response.get('Ack') in ['Success', 'Warning']:
+            return {**record, 'images': images}
+        errors = response.get('Errors') or [{}]
+        return {**record, 'error': errors[0].get('LongMessage') or 'Unknown error'}
+
+    def run(self, listings: Iterable[Dict], dry_run: bool = False,
+            on_result: Callable[[str, Dict], None] = None) -> Dict:
+        """
+        Refresh pictures for listings.
+
+        Args:
+            listings: Dicts with 'item_id', 'brand', 'model' (and optionally 'sku')
+            dry_run: Find and validate images but do not revise listings
+            on_result: Optional callback (status, record) per listing, status one
+                of 'updated', 'failed', 'skipped' (called from the calling thread)
+
+        Returns:
+            {"successful": [{"sku", "item_id", "images"}], "failed": [{"sku", "item_id", "error"}],
+             "skipped": [{"sku", "item_id", "error"}], "images": {"BRAND MODEL": {"images", "sources", "cached"}}}
+        """
+        results = {"successful": [], "failed": [], "skipped": [], "images": {}}
+
+        def _record(status: str, record: Dict):
+            results[{'updated': 'successful', 'failed': 'failed', 'skipped': 'skipped'}[status]].append(record)
+            if on_result:
+                on_result(status, record)
+
+        by_model: Dict[Tuple[str, str], List[Dict]] = {}
+        for listing in listings:
+            reason = self._skip_reason(listing)
+            if reason:
+                _record('skipped', {'sku': listing.get('sku'), 'item_id': listing.get('item_id'), 'error': reason})
+                continue
+            by_model.setdefault(model_key(listing.get('brand'), listing['model']), []).append(listing)
+
+        with ThreadPoolExecutor(max_workers=self.validate_workers) as validate_pool, \
+                ThreadPoolExecutor(max_workers=self.search_workers) as search_pool, \
+                ThreadPoolExecutor(max_workers=self.update_workers) as update_pool:
+            self._validate_pool = validate_pool
+            try:
+                searches = {
+                    search_pool.submit(self.find_images, group[0].get('brand', '').strip(),
+                                       group[0]['model'].strip()): key
+                    for key, group in by_model.items()
+                }
+                updates = []
+                for future in as_completed(searches):
+                    key = searches[future]
+                    found = future.result()
+                    results["images"][' '.join(key).strip()] = found
+                    for listing in by_model[key]:
+                        if not found['images']:
+                            _record('failed', {'sku': listing.get('sku'), 'item_id': listing['item_id'],
+                                               'error': 'No valid images found'})
+                        elif dry_run:
+                            _record('updated', {'sku': listing.get('sku'), 'item_id': listing['item_id'],
+                                                'images': found['images']})
+                        else:
+                            updates.append(update_pool.submit(self._update, listing, found['images']))
+
+                for future in as_completed(updates):
+                    record = future.result()
+                    _record('failed' if 'error' in record else 'updated', record)
+            finally:
+                self._validate_pool = None
+
+        cached = sum(1 for found in results['images'].values() if found['cached'])
+        logger.info(f"Image pipeline: {len(results['successful'])} updated, {len(results['failed'])} failed, "
+                    f"{len(results['skipped'])} skipped ({len(by_model)} models, {cached} from cache)")
+        return results
+
+
+# Global image cache instance
+_image_cache_instance = None
+
+
+def get_image_cache() -> ImageCacheStore:
+    """Get or create global image cache (IMAGE_CACHE_DB overrides the path,
+    IMAGE_CACHE_RECHECK_DAYS the liveness re-check interval)"""
+    global _image_cache_instance
+    if _image_cache_instance is None:
+        _image_cache_instance = ImageCacheStore(os.getenv('IMAGE_CACHE_DB') or None,
+                                                float(os.getenv('IMAGE_CACHE_RECHECK_DAYS', '7')))
+    return _image_cache_instance
+
+
+def read_item_mapping(mapping_file: str) -> List[Dict]:
+    """Rows of an item_mapping.csv (sku, item_id, brand, model)"""
+    with open(mapping_file, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def print_summary(results: Dict, total: int) -> None:
+    """Summary block shared by the image scripts"""
+    print(f"\n{'='*80}")
+    print("Summary:")
+    print(f"  ✓ Updated: {len(results['successful'])}")
+    print(f"  ✗ Failed: {len(results['failed'])}")
+    print(f"  ⊝ Skipped: {len(results['skipped'])}")
+    print(f"  Total: {total}")
+    print(f"{'='*80}\n")
+
+
+def print_result(status: str, record: Dict) -> None:
+    """Per-listing progress line for ImagePipeline.run(on_result=...)"""
+    if status == 'updated':
+        print(f"  ✓ {record['item_id']} ({record.get('sku')}): {len(record['images'])} images")
+    elif status == 'failed':
+        print(f"  ✗ {record['item_id']} ({record.get('sku')}): {record['error']}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local image processing for product photos
+
+Normalizes downloaded images before they are uploaded: applies the EXIF
+orientation, downsizes to eBay's recommended 1600px on the longest side
+(never upscaling), strips metadata, recompresses as progressive JPEG under
+the configured size cap, and writes a small thumbnail next to each image.
+
+Work runs on a process pool, so a large batch of images uses every core.
+
+Usage:
+    processor = ImageProcessor.from_config(Config())
+    results = processor.process(["product_images/SKU-1.png", ...])
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# eBay recommends 1600px on the longest side and requires at least 500px
+EBAY_MAX_DIMENSION = 1600
+EBAY_MIN_DIMENSION = 500
+
+# Matches eBay's own gallery thumbnail size (s-l225)
+THUMBNAIL_SIZE = 225
+THUMBNAIL_SUFFIX = "_thumb"
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+# Lowest JPEG quality tried when shrinking an image under the size cap
+_MIN_QUALITY = 60
+
+# Image.info keys that mean a JPEG still carries metadata to strip
+_METADATA_KEYS = ("exif", "xmp", "comment")
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB copy of an image, with any transparency composited onto white"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _save_jpeg(image: Image.Image, path: str, quality: int, max_bytes: int) -> int:
+    """Save without metadata, stepping quality down until under max_bytes; returns the file size"""
+    while True:
+        image.save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+        size = os.path.getsize(path)
+        if size <= max_bytes or quality <= _MIN_QUALITY:
+            return size
+        quality -= 10
+
+
+def _is_processed(image: Image.Image, bytes_before: int, max_dimension: int, max_bytes: int) -> bool:
+    """True if a file already meets the targets, so re-encoding would only lose quality"""
+    return (image.format == "JPEG" and image.mode in ("RGB", "L")
+            and max(image.size) <= max_dimension and bytes_before <= max_bytes
+            and not any(key in image.info for key in _METADATA_KEYS))
+
+
+def process_image(path: str, max_dimension: int = EBAY_MAX_DIMENSION, max_bytes: int = 10 * 1024 * 1024,
+                  quality: int = 85, thumbnail_size: Optional[int] = THUMBNAIL_SIZE,
+                  force: bool = False) -> Dict:
+    """
+    Normalize one image file in place (a non-JPEG source is replaced by a .jpg).
+
+    JPEGs that are already within the size and dimension targets and carry no
+    metadata are left as they are (only a missing thumbnail is written), so
+    running over the same folder again does not degrade them; force=True
+    re-encodes anyway.
+
+    Runs in worker processes, so it takes and returns plain values only.
+
+    Returns:
+        {'source', 'path', 'thumbnail', 'width', 'height', 'bytes_before', 'bytes_after', 'skipped'},
+        or {'source', 'error'} if the file is not a readable image
+    """
+    try:
+        bytes_before = os.path.getsize(path)
+        with Image.open(path) as opened:
+            skipped = not force and _is_processed(opened, bytes_before, max_dimension, max_bytes)
+            image = _flatten(ImageOps.exif_transpose(opened))
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        return {'source': path, 'error': str(e)}
+
+    if skipped:
+        target, bytes_after = path, bytes_before
+    else:
+        if max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        target = os.path.splitext(path)[0] + ".jpg"
+        bytes_after = _save_jpeg(image, target, quality, max_bytes)
+        # X.JPG -> X.jpg is the same file on case-insensitive filesystems (macOS)
+        if os.path.exists(path) and not os.path.samefile(path, target):
+            os.remove(path)
+
+    thumbnail = None
+    if thumbnail_size:
+        thumbnail = os.path.splitext(path)[0] + THUMBNAIL_SUFFIX + ".jpg"
+    if thumbnail and not (skipped and os.path.exists(thumbnail)):
+        small = image.copy()
+        small.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
+        small.save(thumbnail, "JPEG", quality=quality, optimize=True)
+
+    if min(image.size) < EBAY_MIN_DIMENSION:
+        logger.warning(f"{target} is {image.size[0]}x{image.size[1]}, below eBay's {EBAY_MIN_DIMENSION}px minimum")
+
+    return {'source': path, 'path': target, 'thumbnail': thumbnail, 'width': image.size[0],
+            'height': image.size[1], 'bytes_before': bytes_before, 'bytes_after': bytes_after,
+            'skipped': skipped}
+
+
+class ImageProcessor:
+    """
+    Runs process_image over many files on a process pool.
+
+    Args:
+        max_dimension: Longest side after resizing
+        max_image_size_mb: Size cap for each processed image
+        quality: Starting JPEG quality
+        thumbnails: Also write <name>_thumb.jpg
+        max_workers: Worker processes (default: one per core)
+        force: Re-encode images that already meet the targets
+    """
+
+    def __init__(self, max_dimension: int = EBAY_MAX_DIMENSION, max_image_size_mb: float = 10.0,
+                 quality: int = 85, thumbnails: bool = True, max_workers: int = None,
+                 force: bool = False):
+        self.max_dimension = max_dimension
+        self.force = force
+        self.max_bytes = int(max_image_size_mb * 1024 * 1024)
+        self.quality = quality
+        self.thumbnail_size = THUMBNAIL_SIZE if thumbnails else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    @classmethod
+    def from_config(cls, config) -> Optional['ImageProcessor']:
+        """Processor for the configured size cap, or None when IMAGE_RESIZE_ENABLED is off"""
+        if not config.image_resize_enabled:
+            return None
+        return cls(max_image_size_mb=config.max_image_size_mb)
+
+    def process(self, paths: Iterable[str]) -> List[Dict]:
+        """Process files and return one result per path, in input order"""
+        paths = [p for p in paths if not os.path.splitext(p)[0].endswith(THUMBNAIL_SUFFIX)]
+        args = (self.max_dimension, self.max_bytes, self.quality, self.thumbnail_size, self.force)
+
+        if len(paths) <= 1 or self.max_workers == 1:
+            results = [process_image(path, *args) for path in paths]
+        else:
+            chunksize = max(1, len(paths) // (self.max_workers * 4))
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(paths))) as pool:
+                results = list(pool.map(process_image, paths, *[[a] * len(paths) for a in args],
+                                        chunksize=chunksize))
+
+        done = [r for r in results if 'error' not in r]
+        saved = sum(r['bytes_before'] - r['bytes_after'] for r in done)
+        skipped = sum(1 for r in done if r['skipped'])
+        logger.info(f"Processed {len(done) - skipped}/{len(paths)} images ({skipped} already done), "
+                    f"saved {saved / 1024 / 1024:.1f} MB")
+        for result in results:
+            if 'error' in result:
+                logger.warning(f"Could not process {result['source']}: {result['error']}")
+        return results
+
+    def process_directory(self, directory: str) -> List[Dict]:
+        """Process every image file directly inside a directory (thumbnails excluded)"""
+        paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+        )
+        return self.process(paths)
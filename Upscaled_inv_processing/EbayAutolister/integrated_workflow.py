@@ -11,9 +11,9 @@ This script orchestrates the complete process:
 
 import os
 import sys
-import json
 import logging
 from typing import List, Dict, Optional
+from dataclasses import asdict
 from datetime import datetime
 import pandas as pd
 from pathlib import Path
@@ -24,9 +24,11 @@ from ebay_autolister import (
     InventoryItem,
     EbayAPI,
     InventoryManager,
-    ListingManager
+    ListingManager,
+    CSVProcessor
 )
 from config import Config
+from job_journal import get_journal, STAGE_ENRICHED, STAGE_INVENTORY, STAGE_OFFER, STATUS_OK, STATUS_FAILED
 
 # Configure logging
 logging.basicConfig(
@@ -80,26 +82,39 @@ class IntegratedEbayWorkflow:
         input_csv: str,
         enriched_csv: Optional[str] = None,
         create_listings: bool = False,
-        batch_size: int = 25
+        batch_size: int = 25,
+        resume: bool = False
     ) -> Dict:
         """
         Complete workflow: enrich products and create eBay listings.
 
+        Every stage is checkpointed per SKU in the job journal, so a run that
+        dies partway through can be continued with ``resume=True`` without
+        repeating enrichment or API calls that already succeeded.
+
         Args:
             input_csv: Path to input CSV with basic product data
             enriched_csv: Path to save enriched data (optional)
             create_listings: Whether to publish listings (vs inventory only)
             batch_size: Number of items to process in each batch
+            resume: Continue the last unfinished job for this CSV
 
         Returns:
-            Dictionary with results summary
+            Dictionary with results summary (built from the journal)
         """
         logger.info(f"Starting integrated workflow for {input_csv}")
 
-        # Generate output filenames
+        journal = get_journal()
+        job_id = journal.start_or_resume('integrated', input_csv, resume)
+        job_options = journal.get_job(job_id)["options"]
+
+        # Generate output filenames (a resumed job keeps its original file)
+        if enriched_csv is None:
+            enriched_csv = job_options.get("enriched_csv")
         if enriched_csv is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             enriched_csv = f"enriched_{timestamp}.csv"
+        journal.update_options(job_id, enriched_csv=enriched_csv, create_listings=create_listings)
 
         # Step 1: Load input CSV
         logger.info("Step 1: Loading input CSV")
@@ -108,12 +123,13 @@ class IntegratedEbayWorkflow:
 
         # Step 2: Enrich products using AI agents
         logger.info("Step 2: Enriching products with AI agents")
-        enriched_products = self._enrich_products(df)
+        enriched_products = self._enrich_products(df, journal=journal, job_id=job_id)
 
         if not enriched_products:
             logger.error("No products were successfully enriched")
             return {
                 "success": False,
+                "job_id": job_id,
                 "message": "Enrichment failed for all products"
             }
 
@@ -126,51 +142,47 @@ class IntegratedEbayWorkflow:
         logger.info("Step 3: Converting to eBay inventory items")
         inventory_items = self._convert_to_inventory_items(enriched_products)
 
-        # Step 4: Create eBay inventory items
-        logger.info("Step 4: Creating eBay inventory items")
-        inventory_results = self.autolister.inventory.bulk_create_inventory_items(
-            inventory_items,
-            batch_size=batch_size
-        )
-
-        results = {
-            "success": True,
-            "products_enriched": len(enriched_products),
-            "enriched_csv": enriched_csv,
-            "inventory_created": len(inventory_results["successful"]),
-            "inventory_failed": len(inventory_results["failed"]),
-            "failed_items": inventory_results["failed"]
+        # Steps 4-5: Create inventory items, then create and publish listings (if requested)
+        steps = {
+            STAGE_INVENTORY: "Step 4: Creating eBay inventory items",
+            STAGE_OFFER: "Step 5: Creating and publishing listings"
         }
 
-        # Step 5: Create and publish listings (if requested)
-        if create_listings:
-            logger.info("Step 5: Creating and publishing listings")
-            listing_results = self._create_listings(
-                enriched_products,
-                inventory_results["successful"]
-            )
-
-            results.update({
-                "listings_created": listing_results["created"],
-                "listings_failed": listing_results["failed"],
-                "successful_listings": listing_results.get("successful_listings", []),
-                "failed_listings": listing_results.get("failed_listings", [])
-            })
+        # Listings record the title and price the inventory item was created with
+        items_by_sku = {item.sku: item for item in inventory_items}
+        self.autolister.run_listing_job(
+            CSVProcessor.batched(inventory_items, batch_size),
+            create_listings,
+            journal,
+            job_id,
+            listing_details=lambda sku: {
+                "title": items_by_sku[sku].title if sku in items_by_sku else "",
+                "price": items_by_sku[sku].price if sku in items_by_sku else None
+            },
+            on_stage=lambda stage: logger.info(steps[stage])
+        )
+        journal.finish_job(job_id)
 
         logger.info("Integrated workflow completed")
-        return results
+        return journal.build_results(job_id)
 
-    def _enrich_products(self, df: pd.DataFrame) -> List[EnrichedProduct]:
+    def _enrich_products(self, df: pd.DataFrame, journal=None, job_id: str = None) -> List[EnrichedProduct]:
         """
         Enrich all products in the DataFrame using AI agents.
 
         Args:
             df: DataFrame with product data
+            journal: Optional job journal; products it already holds are reused
+                and each newly enriched product is checkpointed immediately
+            job_id: Job ID within the journal
 
         Returns:
             List of EnrichedProduct objects
         """
         enriched_products = []
+        already_enriched = journal.completed(job_id, STAGE_ENRICHED) if journal else {}
+        if already_enriched:
+            logger.info(f"Reusing {len(already_enriched)} products enriched in job {job_id}")
 
         for idx, row in df.iterrows():
             try:
@@ -184,9 +196,13 @@ class IntegratedEbayWorkflow:
                     logger.warning(f"Row {idx}: Missing brand and model, skipping")
                     continue
 
-                # Enrich using AI agents
+                if already_enriched.get(sku):
+                    enriched_products.append(EnrichedProduct(**already_enriched[sku]))
+                    continue
+
+                # Enrich using AI agents; repeats of a product reuse its result
                 logger.info(f"Enriching {idx + 1}/{len(df)}: {brand} {model}")
-                enriched = self.enricher.enrich_product(
+                enriched = self.enricher.enrich_product_cached(
                     sku=sku,
                     brand=brand,
                     model=model,
@@ -194,9 +210,15 @@ class IntegratedEbayWorkflow:
                 )
 
                 enriched_products.append(enriched)
+                if journal:
+                    journal.record(job_id, STAGE_ENRICHED,
+                                   [{"sku": sku, "status": STATUS_OK, "data": asdict(enriched)}])
 
             except Exception as e:
                 logger.error(f"Failed to enrich row {idx}: {e}")
+                if journal:
+                    journal.record(job_id, STAGE_ENRICHED,
+                                   [{"sku": sku, "status": STATUS_FAILED, "error": str(e)}])
                 continue
 
         logger.info(f"Successfully enriched {len(enriched_products)}/{len(df)} products")
@@ -226,7 +248,7 @@ class IntegratedEbayWorkflow:
                     description=product.description,
                     condition=product.condition,
                     category_id=product.category_id or "58058",  # Default category
-                    price=product.suggested_price or 0.0,
+                    price=product.suggested_price or product.market_price or 0.0,
                     quantity=1,  # Default quantity
                     brand=product.brand,
                     mpn=product.mpn or product.sku,
@@ -246,83 +268,6 @@ class IntegratedEbayWorkflow:
         logger.info(f"Converted {len(inventory_items)} products to inventory items")
         return inventory_items
 
-    def _create_listings(
-        self,
-        enriched_products: List[EnrichedProduct],
-        successful_skus: List[str]
-    ) -> Dict:
-        """
-        Create and publish eBay listings for successful inventory items.
-
-        Args:
-            enriched_products: List of enriched products
-            successful_skus: List of SKUs that were successfully created in inventory
-
-        Returns:
-            Dictionary with detailed results including successful and failed SKUs
-        """
-        created = 0
-        failed = 0
-        successful_listings = []
-        failed_listings = []
-
-        logger.info(f"Creating listings for {len(successful_skus)} inventory items...")
-
-        for product in enriched_products:
-            if product.sku not in successful_skus:
-                continue
-
-            try:
-                # Create offer
-                logger.info(f"Creating offer for {product.sku} - {product.title[:50]}...")
-                offer_id = self.autolister.listings.create_offer(
-                    sku=product.sku,
-                    category_id=product.category_id or "58058",
-                    price=product.suggested_price or product.market_price or 0.0
-                )
-
-                if offer_id:
-                    # Publish offer
-                    logger.info(f"Publishing offer {offer_id} for {product.sku}...")
-                    if self.autolister.listings.publish_offer(offer_id):
-                        created += 1
-                        successful_listings.append({
-                            "sku": product.sku,
-                            "title": product.title,
-                            "price": product.suggested_price,
-                            "offer_id": offer_id
-                        })
-                        logger.info(f"✓ Successfully published {product.sku} at ${product.suggested_price:.2f}")
-                    else:
-                        failed += 1
-                        failed_listings.append({
-                            "sku": product.sku,
-                            "error": "Failed to publish offer"
-                        })
-                        logger.error(f"✗ Failed to publish listing for {product.sku}")
-                else:
-                    failed += 1
-                    failed_listings.append({
-                        "sku": product.sku,
-                        "error": "Failed to create offer"
-                    })
-                    logger.error(f"✗ Failed to create offer for {product.sku}")
-
-            except Exception as e:
-                failed += 1
-                failed_listings.append({
-                    "sku": product.sku,
-                    "error": str(e)
-                })
-                logger.error(f"✗ Listing creation failed for {product.sku}: {e}")
-
-        return {
-            "created": created,
-            "failed": failed,
-            "successful_listings": successful_listings,
-            "failed_listings": failed_listings
-        }
-
     def print_summary_report(self, results: Dict):
         """
         Print a detailed summary report of the workflow results.
@@ -358,7 +303,8 @@ class IntegratedEbayWorkflow:
                 print("\n✓ SUCCESSFULLY PUBLISHED LISTINGS:")
                 for listing in results['successful_listings']:
                     print(f"  • {listing['sku']}: {listing['title'][:60]}")
-                    print(f"    Price: ${listing['price']:.2f} | Offer ID: {listing['offer_id']}")
+                    price = f"${listing['price']:.2f}" if listing.get('price') is not None else "n/a"
+                    print(f"    Price: {price} | Offer ID: {listing['offer_id']}")
 
             # Show failed listings
             if results.get('failed_listings'):
@@ -407,15 +353,17 @@ def main():
         print("\n" + "=" * 80 + "\n")
         sys.exit(1)
 
-    # Get input file
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    # Get input file (--resume continues the last unfinished job for it)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    resume = '--resume' in sys.argv[1:]
+    if args:
+        input_file = args[0]
     else:
         input_file = "B1.csv"  # Default file
 
     if not os.path.exists(input_file):
         print(f"\n✗ Error: Input file '{input_file}' not found")
-        print(f"Usage: python integrated_workflow.py [input_file.csv]\n")
+        print(f"Usage: python integrated_workflow.py [input_file.csv] [--resume]\n")
         sys.exit(1)
 
     # Initialize workflow
@@ -474,18 +422,15 @@ def main():
     results = workflow.enrich_and_list(
         input_csv=input_file,
         create_listings=create_listings,
-        batch_size=25
+        batch_size=25,
+        resume=resume
     )
 
     # Display detailed summary report
     workflow.print_summary_report(results)
 
-    # Save results to JSON for record-keeping
-    results_file = f"workflow_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(results_file, 'w') as f:
-        # Convert results to JSON-serializable format
-        json_results = {k: v for k, v in results.items() if k != 'failed_items'}
-        json.dump(json_results, f, indent=2)
+    # Save results to JSON for record-keeping (generated from the job journal)
+    results_file = get_journal().export_results(results['job_id'])
 
     print(f"\n💾 Results saved to: {results_file}\n")
 
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Local Inventory Mirror for eBay Autolister
+
+Keeps an indexed SQLite copy of the account's inventory items and offers so
+status checks, duplicate detection and CSV reconciliation run locally instead
+of making one live GET per SKU.
+
+Inventory items are paged through getInventoryItems. The Offer API only lists
+offers per SKU, so offers are fetched for SKUs that are new or whose inventory
+item changed since the last refresh (or for every SKU on a full refresh).
+Page hashes are remembered, so an incremental refresh writes only pages that
+changed and fetches offers only for the SKUs on them. Items and offers the
+listing code creates or changes are written through with record_items /
+record_offer_changes / record_quantities as they succeed, so the mirror does
+not go stale between refreshes (offer-only changes such as repricing and
+publishing never show up in a refresh at all).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# getInventoryItems page size (API maximum is 200)
+MIRROR_PAGE_SIZE = 100
+
+
+def _hash(data) -> str:
+    """Stable hash of a JSON-serializable value"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class InventoryMirror:
+    """SQLite mirror of eBay inventory items and offers"""
+
+    def __init__(self, db_path: str = None):
+        """Initialize the mirror, defaulting to inventory_mirror.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "inventory_mirror.db"
+
+        self.db_path = str(db_path)
+        self._init_database()
+        logger.debug(f"Inventory mirror initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and tables if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS inventory_items (
+                sku TEXT PRIMARY KEY,
+                title TEXT,
+                condition TEXT,
+                quantity INTEGER,
+                item_hash TEXT NOT NULL,
+                data_json TEXT NOT NULL,
+                fetched_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS offers (
+                offer_id TEXT PRIMARY KEY,
+                sku TEXT NOT NULL,
+                status TEXT,
+                price REAL,
+                listing_id TEXT,
+                data_json TEXT NOT NULL,
+                fetched_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS mirror_pages (
+                kind TEXT NOT NULL,
+                page_offset INTEGER NOT NULL,
+                page_hash TEXT NOT NULL,
+                fetched_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (kind, page_offset)
+            )
+        """)
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_offers_sku ON offers(sku)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_title ON inventory_items(title)")
+
+        conn.commit()
+        conn.close()
+
+    def refresh(self, api, full: bool = False, page_size: int = MIRROR_PAGE_SIZE) -> Dict:
+        """
+        Refresh the mirror from the Inventory API.
+
+        Args:
+            api: EbayAPI instance
+            full: Re-write every page and re-fetch offers for every SKU
+            page_size: Inventory items per page
+
+        Returns:
+            Stats dict (pages fetched/changed, items changed/removed, offer calls)
+        """
+        stats = {"pages": 0, "pages_changed": 0, "items_changed": 0,
+                 "items_removed": 0, "offer_calls": 0}
+        stored_pages = {} if full else self._page_hashes('inventory')
+        stored_items = self._item_hashes()
+        seen_skus = set()
+        changed_skus = []
+
+        offset = 0
+        while True:
+            page = api._make_request('GET', 'inventory_item', {'limit': page_size, 'offset': offset})
+            items = page.get('inventoryItems', [])
+            stats["pages"] += 1
+            seen_skus.update(item.get('sku') for item in items)
+
+            page_hash = _hash(items)
+            if stored_pages.get(offset) != page_hash:
+                stats["pages_changed"] += 1
+                changed = [item for item in items if stored_items.get(item.get('sku')) != _hash(item)]
+                self._store_items(changed)
+                self._store_page('inventory', offset, page_hash)
+                changed_skus.extend(item['sku'] for item in changed)
+
+            offset += page_size
+            if not items or offset >= page.get('total', 0):
+                break
+
+        # Items deleted on eBay since the last refresh
+        removed = [sku for sku in stored_items if sku not in seen_skus]
+        self.remove_skus(removed)
+        stats["items_removed"] = len(removed)
+        stats["items_changed"] = len(changed_skus)
+
+        offer_skus = list(seen_skus) if full else changed_skus
+        for sku in offer_skus:
+            try:
+                response = api._make_request('GET', 'offer', {'sku': sku})
+                self._store_offers(sku, response.get('offers', []))
+            except Exception as e:
+                logger.warning(f"Could not fetch offers for {sku}: {e}")
+            stats["offer_calls"] += 1
+
+        logger.info(f"Mirror refreshed: {stats}")
+        return stats
+
+    def _page_hashes(self, kind: str) -> Dict[int, str]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT page_offset, page_hash FROM mirror_pages WHERE kind = ?", (kind,))
+        hashes = dict(cursor.fetchall())
+        conn.close()
+        return hashes
+
+    def _item_hashes(self) -> Dict[str, str]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT sku, item_hash FROM inventory_items")
+        hashes = dict(cursor.fetchall())
+        conn.close()
+        return hashes
+
+    def _store_page(self, kind: str, offset: int, page_hash: str):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT OR REPLACE INTO mirror_pages (kind, page_offset, page_hash, fetched_at) "
+                     "VALUES (?, ?, ?, ?)", (kind, offset, page_hash, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def _store_items(self, items: List[Dict]):
+        """Upsert inventory items as returned by the API"""
+        if not items:
+            return
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT OR REPLACE INTO inventory_items
+                (sku, title, condition, quantity, item_hash, data_json, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (item['sku'],
+             item.get('product', {}).get('title'),
+             item.get('condition'),
+             item.get('availability', {}).get('shipToLocationAvailability', {}).get('quantity'),
+             _hash(item), json.dumps(item), now)
+            for item in items
+        ])
+        conn.commit()
+        conn.close()
+
+    def _store_offers(self, sku: str, offers: List[Dict]):
+        """Replace the stored offers for a SKU"""
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM offers WHERE sku = ?", (sku,))
+        conn.executemany("""
+            INSERT OR REPLACE INTO offers (offer_id, sku, status, price, listing_id, data_json, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (offer['offerId'], sku, offer.get('status'),
+             float(offer.get('pricingSummary', {}).get('price', {}).get('value') or 0) or None,
+             offer.get('listing', {}).get('listingId'), json.dumps(offer), now)
+            for offer in offers if offer.get('offerId')
+        ])
+        conn.commit()
+        conn.close()
+
+    def record_items(self, items: List[Dict]):
+        """Write inventory items upserted through the API (bulk request entries, with 'sku') into the mirror"""
+        self._store_items(items)
+
+    def record_offer_changes(self, changes: List[Dict]):
+        """
+        Write offer changes made through the API into the mirror.
+
+        Args:
+            changes: Dicts with 'offer_id' plus any of 'sku', 'price', 'status'
+                and 'listing_id'. Offers not mirrored yet are added when the
+                change carries their SKU.
+        """
+        if not changes:
+            return
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for change in changes:
+            cursor.execute("SELECT sku, data_json FROM offers WHERE offer_id = ?", (change['offer_id'],))
+            row = cursor.fetchone()
+            sku = row[0] if row else change.get('sku')
+            if not sku:
+                continue
+            offer = json.loads(row[1]) if row else {"offerId": change['offer_id'], "sku": sku}
+            if change.get('price') is not None:
+                price = offer.setdefault('pricingSummary', {}).setdefault('price', {})
+                price['value'] = f"{float(change['price']):.2f}"
+            if change.get('status'):
+                offer['status'] = change['status']
+            if change.get('listing_id'):
+                offer.setdefault('listing', {})['listingId'] = change['listing_id']
+            cursor.execute("""
+                INSERT OR REPLACE INTO offers (offer_id, sku, status, price, listing_id, data_json, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (change['offer_id'], sku, offer.get('status'),
+                  float(offer.get('pricingSummary', {}).get('price', {}).get('value') or 0) or None,
+                  offer.get('listing', {}).get('listingId'), json.dumps(offer), now))
+        conn.commit()
+        conn.close()
+
+    def record_quantities(self, quantities: Dict[str, int]):
+        """Write quantity changes made through the API into mirrored inventory items"""
+        if not quantities:
+            return
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for sku, quantity in quantities.items():
+            cursor.execute("SELECT data_json FROM inventory_items WHERE sku = ?", (sku,))
+            row = cursor.fetchone()
+            if not row:
+                continue
+            item = json.loads(row[0])
+            item.setdefault('availability', {})['shipToLocationAvailability'] = {'quantity': quantity}
+            cursor.execute("UPDATE inventory_items SET quantity = ?, data_json = ? WHERE sku = ?",
+                           (quantity, json.dumps(item), sku))
+        conn.commit()
+        conn.close()
+
+    def remove_skus(self, skus: List[str]):
+        """Drop SKUs (and their offers) from the mirror"""
+        if not skus:
+            return
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("DELETE FROM inventory_items WHERE sku = ?", [(sku,) for sku in skus])
+        conn.executemany("DELETE FROM offers WHERE sku = ?", [(sku,) for sku in skus])
+        conn.commit()
+        conn.close()
+
+    def get_item(self, sku: str) -> Optional[Dict]:
+        """Return the mirrored inventory item for a SKU, or None"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT data_json FROM inventory_items WHERE sku = ?", (sku,))
+        row = cursor.fetchone()
+        conn.close()
+        return json.loads(row[0]) if row else None
+
+    def item_updated_at(self, sku: str) -> Optional[str]:
+        """When the mirrored copy of a SKU was last fetched or written through, or None"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT fetched_at FROM inventory_items WHERE sku = ?", (sku,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def get_offers(self, sku: str) -> List[Dict]:
+        """Return mirrored offers for a SKU"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT data_json FROM offers WHERE sku = ?", (sku,))
+        offers = [json.loads(row[0]) for row in cursor.fetchall()]
+        conn.close()
+        return offers
+
+    def find_duplicates(self) -> Dict[str, List]:
+        """
+        Find likely duplicates in the mirror.
+
+        Returns:
+            {"multiple_offers": [{"sku", "offer_ids"}],
+             "duplicate_titles": [{"title", "skus"}]}
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT sku, GROUP_CONCAT(offer_id) FROM offers
+            GROUP BY sku HAVING COUNT(*) > 1 ORDER BY sku
+        """)
+        multiple_offers = [{"sku": sku, "offer_ids": ids.split(',')} for sku, ids in cursor.fetchall()]
+        cursor.execute("""
+            SELECT title, GROUP_CONCAT(sku) FROM inventory_items
+            WHERE title IS NOT NULL AND title != ''
+            GROUP BY LOWER(title) HAVING COUNT(*) > 1 ORDER BY title
+        """)
+        duplicate_titles = [{"title": title, "skus": skus.split(',')} for title, skus in cursor.fetchall()]
+        conn.close()
+        return {"multiple_offers": multiple_offers, "duplicate_titles": duplicate_titles}
+
+    def reconcile(self, items: Iterable) -> Dict:
+        """
+        Compare CSV items against the mirror.
+
+        Args:
+            items: InventoryItem objects (or anything with sku/price/quantity)
+
+        Returns:
+            Report dict: duplicate_csv_skus, missing_on_ebay, not_in_csv,
+            quantity_mismatch, price_mismatch, unpublished
+        """
+        items = list(items)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT sku, quantity FROM inventory_items")
+        mirrored = dict(cursor.fetchall())
+        cursor.execute("SELECT sku, price, status FROM offers")
+        offers = {}
+        for sku, price, status in cursor.fetchall():
+            offers.setdefault(sku, []).append((price, status))
+        conn.close()
+
+        seen = set()
+        report = {"duplicate_csv_skus": [], "missing_on_ebay": [], "not_in_csv": [],
+                  "quantity_mismatch": [], "price_mismatch": [], "unpublished": []}
+
+        for item in items:
+            if item.sku in seen:
+                report["duplicate_csv_skus"].append(item.sku)
+                continue
+            seen.add(item.sku)
+
+            if item.sku not in mirrored:
+                report["missing_on_ebay"].append(item.sku)
+                continue
+            if mirrored[item.sku] is not None and mirrored[item.sku] != item.quantity:
+                report["quantity_mismatch"].append(
+                    {"sku": item.sku, "csv": item.quantity, "ebay": mirrored[item.sku]})
+
+            sku_offers = offers.get(item.sku, [])
+            if not any(status == 'PUBLISHED' for _, status in sku_offers):
+                report["unpublished"].append(item.sku)
+            for price, _ in sku_offers:
+                if price is not None and abs(price - float(item.price)) > 0.005:
+                    report["price_mismatch"].append({"sku": item.sku, "csv": item.price, "ebay": price})
+                    break
+
+        report["not_in_csv"] = sorted(sku for sku in mirrored if sku not in seen)
+        return report
+
+    def get_stats(self) -> Dict:
+        """Counts and last refresh time"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), MAX(fetched_at) FROM inventory_items")
+        items, last_item = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM offers")
+        offers = cursor.fetchone()[0]
+        cursor.execute("SELECT MAX(fetched_at) FROM mirror_pages")
+        last_refresh = cursor.fetchone()[0]
+        conn.close()
+        return {"inventory_items": items, "offers": offers, "last_refresh": last_refresh or last_item}
+
+
+# Global mirror instance
+_mirror_instance = None
+
+
+def get_mirror() -> InventoryMirror:
+    """Get or create global inventory mirror (INVENTORY_MIRROR_DB overrides the path)"""
+    global _mirror_instance
+    if _mirror_instance is None:
+        _mirror_instance = InventoryMirror(os.getenv('INVENTORY_MIRROR_DB') or None)
+    return _mirror_instance
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Job Journal for eBay Autolister
+
+Checkpoints every stage of a listing job per SKU (enriched, inventory created,
+offer created, published) in SQLite as each batch completes. A job that dies
+partway through a large CSV can be resumed without repeating paid enrichment
+or any API call that already succeeded, and the workflow results summary is
+generated from the journal rather than from in-memory state.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-SKU stages in pipeline order
+STAGE_ENRICHED = "enriched"
+STAGE_VALIDATED = "validated"  # only journaled for items auto-fixed before upload
+STAGE_INVENTORY = "inventory"
+STAGE_OFFER = "offer"
+STAGE_PUBLISHED = "published"
+
+# Feed mode: the Feed API task each SKU was uploaded in
+STAGE_FEED_TASK = "feed_task"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_IN_FLIGHT = "in_flight"  # handed off (e.g. to a feed task), outcome not known yet
+
+JOB_RUNNING = "running"
+JOB_PARTIAL = "partial"      # finished with failures; --resume retries them
+JOB_COMPLETED = "completed"
+
+
+class JobJournal:
+    """SQLite journal of per-SKU stage outcomes for resumable listing jobs"""
+
+    def __init__(self, db_path: str = None):
+        """Initialize the journal, defaulting to job_journal.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "job_journal.db"
+
+        self.db_path = str(db_path)
+        self._init_database()
+        logger.debug(f"Job journal initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and tables if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                options_json TEXT,
+                created_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                sku TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                data_json TEXT,
+                error TEXT,
+                updated_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (job_id, sku, stage)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(kind, source, status)
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def start_job(self, kind: str, source: str, options: Dict = None) -> str:
+        """
+        Open a new job.
+
+        Args:
+            kind: Job type (e.g. 'process_csv', 'integrated')
+            source: Input the job works on, normally the CSV path
+            options: Run options to keep with the job (e.g. create_listings)
+
+        Returns:
+            New job ID
+        """
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        now = datetime.now().isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT INTO jobs (job_id, kind, source, status, options_json, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, os.path.abspath(source), JOB_RUNNING, json.dumps(options or {}), now, now)
+        )
+        conn.commit()
+        conn.close()
+
+        logger.info(f"Started job {job_id} ({kind}) for {source}")
+        return job_id
+
+    def find_resumable(self, kind: str, source: str) -> Optional[str]:
+        """Return the most recent unfinished job for this input, if any"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT job_id FROM jobs WHERE kind = ? AND source = ? AND status != ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (kind, os.path.abspath(source), JOB_COMPLETED)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def start_or_resume(self, kind: str, source: str, resume: bool, options: Dict = None) -> str:
+        """Resume the latest unfinished job for this input when asked, else start a new one"""
+        if resume:
+            job_id = self.find_resumable(kind, source)
+            if job_id:
+                logger.info(f"Resuming job {job_id} for {source}")
+                return job_id
+            logger.info(f"No unfinished {kind} job for {source}; starting a new one")
+        return self.start_job(kind, source, options)
+
+    def get_job(self, job_id: str) -> Dict:
+        """Return job metadata"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT job_id, kind, source, status, options_json, created_at, updated_at "
+            "FROM jobs WHERE job_id = ?", (job_id,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return {}
+        return {
+            "job_id": row[0], "kind": row[1], "source": row[2], "status": row[3],
+            "options": json.loads(row[4] or '{}'), "created_at": row[5], "updated_at": row[6]
+        }
+
+    def update_options(self, job_id: str, **options):
+        """Merge extra options into the job record (e.g. output paths chosen mid-run)"""
+        merged = self.get_job(job_id).get("options", {})
+        merged.update(options)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE jobs SET options_json = ?, updated_at = ? WHERE job_id = ?",
+                     (json.dumps(merged), datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def finish_job(self, job_id: str, status: str = None):
+        """
+        Mark a job finished. Jobs with outstanding failures are marked partial
+        and stay resumable; fully successful jobs are no longer picked up.
+        """
+        if status is None:
+            results = self.build_results(job_id)
+            outstanding = (results.get("inventory_failed", 0) + results.get("listings_failed", 0)
+                           + results.get("feed_in_flight", 0))
+            status = JOB_PARTIAL if outstanding else JOB_COMPLETED
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                     (status, datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def record(self, job_id: str, stage: str, entries: List[Dict]):
+        """
+        Record stage outcomes for a batch of SKUs in one transaction.
+
+        Args:
+            job_id: Job ID
+            stage: Stage name
+            entries: Dicts with 'sku', 'status' and optional 'data' / 'error'
+        """
+        if not entries:
+            return
+
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT OR REPLACE INTO job_items (job_id, sku, stage, status, data_json, error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (job_id, e["sku"], stage, e["status"],
+             json.dumps(e.get("data"), default=str) if e.get("data") is not None else None,
+             str(e["error"]) if e.get("error") is not None else None, now)
+            for e in entries
+        ])
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+        conn.commit()
+        conn.close()
+
+    def checkpoint(self, job_id: str, stage: str) -> Callable[[Dict], None]:
+        """
+        Build an on_batch callback that journals a {"successful", "failed"} batch result.
+
+        Successful entries may be plain SKUs or dicts carrying a 'sku' key; dict
+        entries are stored as the stage data (e.g. offer_id, listing_id).
+        """
+        def _record(batch_results: Dict):
+            entries = []
+            for entry in batch_results.get("successful", []):
+                if isinstance(entry, dict):
+                    entries.append({"sku": entry["sku"], "status": STATUS_OK, "data": entry})
+                else:
+                    entries.append({"sku": entry, "status": STATUS_OK})
+            for entry in batch_results.get("failed", []):
+                entries.append({"sku": entry["sku"], "status": STATUS_FAILED, "error": entry.get("error")})
+            self.record(job_id, stage, entries)
+
+        return _record
+
+    def completed(self, job_id: str, stage: str) -> Dict[str, Optional[Dict]]:
+        """Return sku -> stored data for every SKU that completed the stage"""
+        return self._with_status(job_id, stage, STATUS_OK)
+
+    def in_flight(self, job_id: str, stage: str) -> Dict[str, Optional[Dict]]:
+        """Return sku -> stored data for every SKU still in flight at the stage"""
+        return self._with_status(job_id, stage, STATUS_IN_FLIGHT)
+
+    def _with_status(self, job_id: str, stage: str, status: str) -> Dict[str, Optional[Dict]]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT sku, data_json FROM job_items WHERE job_id = ? AND stage = ? AND status = ?",
+            (job_id, stage, status)
+        )
+        rows = {sku: json.loads(data) if data else None for sku, data in cursor.fetchall()}
+        conn.close()
+        return rows
+
+    def failed(self, job_id: str, stage: str) -> List[Dict]:
+        """Return [{"sku", "error"}] for SKUs whose latest attempt at the stage failed"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT sku, error FROM job_items WHERE job_id = ? AND stage = ? AND status = ? ORDER BY sku",
+            (job_id, stage, STATUS_FAILED)
+        )
+        failures = [{"sku": sku, "error": error} for sku, error in cursor.fetchall()]
+        conn.close()
+        return failures
+
+    def build_results(self, job_id: str) -> Dict:
+        """
+        Summarize a job from its journal.
+
+        Returns:
+            Results dictionary in the workflow_results_*.json layout
+        """
+        job = self.get_job(job_id)
+        options = job.get("options", {})
+
+        enriched = self.completed(job_id, STAGE_ENRICHED)
+        inventory = self.completed(job_id, STAGE_INVENTORY)
+        published = self.completed(job_id, STAGE_PUBLISHED)
+
+        failed_listings = [
+            f for f in self.failed(job_id, STAGE_OFFER) + self.failed(job_id, STAGE_PUBLISHED)
+            if f["sku"] not in published
+        ]
+
+        results = {
+            "success": True,
+            "job_id": job_id,
+            "job_status": job.get("status"),
+            "inventory_created": len(inventory),
+            "inventory_failed": len(self.failed(job_id, STAGE_INVENTORY)),
+            "failed_items": self.failed(job_id, STAGE_INVENTORY)
+        }
+
+        auto_fixed = self.completed(job_id, STAGE_VALIDATED)
+        if auto_fixed:
+            results["auto_fixed"] = list(auto_fixed.values())
+
+        if job.get("kind") == "integrated":
+            results["products_enriched"] = len(enriched)
+            results["enriched_csv"] = options.get("enriched_csv")
+        elif job.get("kind") == "process_feed":
+            results["feed_in_flight"] = len(self.in_flight(job_id, STAGE_FEED_TASK))
+
+        if options.get("create_listings"):
+            results.update({
+                "listings_created": len(published),
+                "listings_failed": len(failed_listings),
+                "successful_listings": [data for data in published.values() if data],
+                "failed_listings": failed_listings
+            })
+
+        return results
+
+    def export_results(self, job_id: str, path: str = None) -> str:
+        """
+        Write the journal summary for a job to a workflow_results_*.json file.
+
+        Returns:
+            Path of the written file
+        """
+        if path is None:
+            path = f"workflow_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        results = self.build_results(job_id)
+        json_results = {k: v for k, v in results.items() if k != 'failed_items'}
+        with open(path, 'w') as f:
+            json.dump(json_results, f, indent=2)
+
+        return path
+
+
+# Global journal instance
+_journal_instance = None
+
+
+def get_journal() -> JobJournal:
+    """Get or create global job journal (JOB_JOURNAL_DB overrides the path)"""
+    global _journal_instance
+    if _journal_instance is None:
+        _journal_instance = JobJournal(os.getenv('JOB_JOURNAL_DB') or None)
+    return _journal_instance
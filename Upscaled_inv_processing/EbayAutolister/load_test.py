@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the listing pipeline.
+
+Generates a synthetic catalog, starts fake_ebay_server.FakeEbayServer with
+eBay-like bulk limits, throttling, latency and injected failures, and pushes
+the catalog through EbayAutolister.process_csv_file (plus a dead-letter retry
+pass). Reports items/sec, API calls, throttling and how failures were handled.
+All local state (journal, sync state, dead letters, mirror, policy cache) goes
+to a temp directory.
+
+Usage:
+    python load_test.py --items 10000 --create-listings
+    python load_test.py --items 20000 --rate-limit 100 --transient-rate 0.02 --latency-scale 0.5
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dead_letter
+from fake_ebay_server import FakeEbayServer
+from test_helpers import fake_autolister
+
+SYNTHETIC_PRODUCTS = [
+    ('Apple', 'iPad 9th Gen A2602', '171485', 220.0),
+    ('Apple', 'MacBook Air A2337', '111422', 650.0),
+    ('Samsung', 'Galaxy Tab S6 Lite SM-P610', '171485', 210.0),
+    ('Dell', 'Latitude 5420', '177', 380.0),
+    ('Lenovo', 'ThinkPad T14 Gen 2', '177', 420.0),
+    ('Sony', 'WH-1000XM4', '112529', 180.0),
+    ('Nintendo', 'Switch OLED HEG-001', '139971', 260.0),
+    ('', 'USB-C Charger 65W', '58058', 25.0),
+]
+SYNTHETIC_CONDITIONS = [('like new', ''), ('very good', ''), ('good', ''), ('used', 'LN'),
+                        ('used', 'VG'), ('acceptable', ''), ('open box', ''), ('for parts', '')]
+
+def synthesize_catalog(path: str, items: int, seed: int = 42) -> str:
+    """Write a synthetic product CSV with realistic variety (including rows validation fixes)"""
+    rng = random.Random(seed)
+    fields = ['sku', 'title', 'description', 'condition', 'grade', 'category_id', 'price',
+              'quantity', 'brand', 'mpn', 'weight', 'dimensions', 'images']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i in range(items):
+            brand, model, category_id, retail = rng.choice(SYNTHETIC_PRODUCTS)
+            condition, grade = rng.choice(SYNTHETIC_CONDITIONS)
+            sku = f"LT-{i:06d}"
+            writer.writerow({
+                'sku': sku,
+                'title': f"{brand} {model} {condition.title()} #{i}".strip(),
+                'description': f"{brand} {model} in {condition} condition.",
+                'condition': condition,
+                'grade': grade,
+                'category_id': category_id,
+                'price': f"{retail * rng.uniform(0.4, 0.9):.2f}",
+                'quantity': rng.choice([1, 1, 1, 2, 3]),
+                'brand': brand,
+                'mpn': model.split()[-1],
+                'weight': f"{rng.uniform(0.5, 6.0):.1f}",
+                'dimensions': rng.choice(['12x9x2', '14x10x3', '8x6x4', '']),
+                'images': ','.join(f"https://img.example.com/{sku}/{n}.jpg" for n in range(rng.randint(1, 14)))
+            })
+    return path
+
+
+def run_load_test(items: int = 10000, create_listings: bool = True, concurrency: int = 4,
+                  batch_size: int = 25, latency_ms=(40.0, 0.5), latency_scale: float = 1.0,
+                  rate_limit: float = None, transient_rate: float = 0.01,
+                  permanent_rate: float = 0.002, retry: bool = True, seed: int = 42,
+                  work_dir: str = None) -> Dict:
+    """
+    Run one load test against a fresh fake eBay server.
+
+    Returns:
+        Report dictionary (see print_report)
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='ebay_load_test_')
+    csv_path = synthesize_catalog(os.path.join(work_dir, 'catalog.csv'), items, seed)
+
+    with FakeEbayServer(latency_ms=latency_ms, latency_scale=latency_scale, rate_limit=rate_limit,
+                        transient_rate=transient_rate, permanent_rate=permanent_rate, seed=seed) as server:
+        # The synthetic catalog includes rows validation fixes, so exercise auto-fix
+        autolister = fake_autolister(server, work_dir, batch_size=batch_size,
+                                     max_concurrent_batches=concurrency, validation_auto_fix=True)
+
+        started = time.perf_counter()
+        results = autolister.process_csv_file(csv_path, create_listings=create_listings)
+        elapsed = time.perf_counter() - started
+
+        retry_results = None
+        if retry:
+            retry_results = autolister.retry_dead_letters(batch_size=batch_size)
+
+        server_stats = dict(server.stats)
+        stored = len(server.inventory)
+        published = sum(1 for offer in server.offers.values() if offer.get('status') == 'PUBLISHED')
+
+    return {
+        "items": items,
+        "create_listings": create_listings,
+        "concurrency": concurrency,
+        "latency_scale": latency_scale,
+        "rate_limit": rate_limit,
+        "wall_time_s": elapsed,
+        "items_per_sec": items / elapsed if elapsed else 0.0,
+        "inventory_created": results.get("inventory_created", 0),
+        "inventory_failed": results.get("inventory_failed", 0),
+        "listings_created": results.get("listings_created", 0),
+        "listings_failed": results.get("listings_failed", 0),
+        "validation": results.get("validation", {}),
+        "auto_fixed": len(results.get("auto_fixed", [])),
+        "dead_letters": dead_letter.get_dead_letters().get_stats(),
+        "retried": retry_results["retried"] if retry_results else 0,
+        "retry_recovered": len(retry_results["successful"]) if retry_results else 0,
+        "server": {
+            "calls": server_stats.get("calls", 0),
+            "throttled": server_stats.get("throttled", 0),
+            "errors": server_stats.get("errors", 0),
+            "items_stored": stored,
+            "listings_published": published,
+            "by_endpoint": {k: v for k, v in sorted(server_stats.items()) if ' ' in k}
+        },
+        "work_dir": work_dir
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Pretty-print a load test report"""
+    server = report["server"]
+    validation = report["validation"]
+    print("\n" + "=" * 80)
+    print("LISTING PIPELINE LOAD TEST")
+    print("=" * 80)
+    print(f"Items:             {report['items']} (listings: {'yes' if report['create_listings'] else 'no'})")
+    print(f"Concurrency:       {report['concurrency']} batches in flight")
+    print(f"Wall time:         {report['wall_time_s']:.2f}s")
+    print(f"Throughput:        {report['items_per_sec']:.1f} items/sec")
+    print(f"Inventory:         {report['inventory_created']} created, {report['inventory_failed']} failed")
+    if report['create_listings']:
+        print(f"Listings:          {report['listings_created']} published, {report['listings_failed']} failed")
+    if validation:
+        print(f"Validation:        {validation.get('fixed', 0)} auto-fixed, {validation.get('rejected', 0)} rejected")
+    print(f"Dead letters:      {report['dead_letters']['retryable']} retryable, "
+          f"{report['dead_letters']['permanent']} permanent")
+    print(f"Retry pass:        {report['retry_recovered']} of {report['retried']} recovered")
+    print(f"API calls:         {server['calls']} ({server['throttled']} throttled with 429, "
+          f"{server['errors']} other errors)")
+    for endpoint, count in server['by_endpoint'].items():
+        print(f"  {endpoint:<60} {count}")
+    print(f"State directory:   {report['work_dir']}")
+    print("=" * 80 + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test against a fake eBay API")
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--create-listings', action='store_true', help='Also create and publish offers')
+    parser.add_argument('--concurrency', type=int, default=4, help='Inventory batches in flight')
+    parser.add_argument('--batch-size', type=int, default=25)
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='Median server latency per call')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Log-normal latency spread')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='Multiplier on simulated latency (0 = none)')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Server calls/sec before 429s')
+    parser.add_argument('--transient-rate', type=float, default=0.01,
+                        help='Share of SKUs whose first attempt fails with a system error')
+    parser.add_argument('--permanent-rate', type=float, default=0.002,
+                        help='Share of SKUs that always fail')
+    parser.add_argument('--no-retry', action='store_true', help='Skip the dead-letter retry pass')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json-out', default=None, help='Write report JSON to this path')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show pipeline logs')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    report = run_load_test(
+        items=args.items, create_listings=args.create_listings, concurrency=args.concurrency,
+        batch_size=args.batch_size, latency_ms=(args.latency_ms, args.latency_sigma),
+        latency_scale=args.latency_scale, rate_limit=args.rate_limit,
+        transient_rate=args.transient_rate, permanent_rate=args.permanent_rate,
+        retry=not args.no_retry, seed=args.seed
+    )
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.json_out}")
+
+
+if __name__ == '__main__':
+    main()
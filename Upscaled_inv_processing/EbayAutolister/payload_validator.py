@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Offline Payload Validator for eBay Autolister
+
+Checks inventory items between CSVProcessor and InventoryManager so that
+predictable failures (bad titles, missing dimensions, too many images, a
+condition the category does not accept, empty brand...) are fixed or rejected
+locally instead of costing an API round trip and a bulk batch slot.
+
+Category condition policies come from the eBay Metadata API and are cached in
+SQLite; without credentials the condition rule only applies to categories
+already in the cache.
+"""
+
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from condition_normalizer import get_normalizer
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_ERROR = "error"      # item rejected
+SEVERITY_FIXED = "fixed"      # item changed in place
+SEVERITY_WARNING = "warning"  # item sent as is
+
+MAX_SKU_LENGTH = 50
+MAX_TITLE_LENGTH = 80
+MAX_DESCRIPTION_LENGTH = 500000
+DEFAULT_DIMENSION = 10.0
+
+# eBay condition IDs (Metadata API) -> Inventory API condition enums
+CONDITION_ENUMS_BY_ID = {
+    '1000': 'NEW',
+    '1500': 'NEW_OTHER',
+    '1750': 'NEW_WITH_DEFECTS',
+    '2000': 'CERTIFIED_REFURBISHED',
+    '2010': 'EXCELLENT_REFURBISHED',
+    '2020': 'VERY_GOOD_REFURBISHED',
+    '2030': 'GOOD_REFURBISHED',
+    '2500': 'SELLER_REFURBISHED',
+    '2750': 'LIKE_NEW',
+    '2990': 'PRE_OWNED_EXCELLENT',
+    '3000': 'USED_EXCELLENT',
+    '3010': 'PRE_OWNED_FAIR',
+    '4000': 'USED_VERY_GOOD',
+    '5000': 'USED_GOOD',
+    '6000': 'USED_ACCEPTABLE',
+    '7000': 'FOR_PARTS_OR_NOT_WORKING'
+}
+
+# Best to worst; a disallowed condition is only ever fixed downwards
+CONDITION_LADDERS = (
+    ('NEW', 'NEW_OTHER', 'NEW_WITH_DEFECTS', 'LIKE_NEW', 'USED_EXCELLENT', 'PRE_OWNED_EXCELLENT',
+     'USED_VERY_GOOD', 'USED_GOOD', 'USED_ACCEPTABLE', 'PRE_OWNED_FAIR', 'FOR_PARTS_OR_NOT_WORKING'),
+    ('CERTIFIED_REFURBISHED', 'EXCELLENT_REFURBISHED', 'VERY_GOOD_REFURBISHED',
+     'GOOD_REFURBISHED', 'SELLER_REFURBISHED'),
+)
+
+_UPC_PATTERN = re.compile(r'^\d{12,14}$')
+
+
+class CategoryPolicyStore:
+    """SQLite cache of allowed item conditions per (marketplace, category)"""
+
+    def __init__(self, db_path: str = None, ttl_days: float = 7.0):
+        """Initialize the cache, defaulting to category_policies.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "category_policies.db"
+
+        self.db_path = str(db_path)
+        self.ttl_seconds = ttl_days * 86400
+        self._memory: Dict[tuple, Optional[frozenset]] = {}
+        self._init_database()
+        logger.debug(f"Category policy store initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and table if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS condition_policies (
+                marketplace_id TEXT NOT NULL,
+                category_id TEXT NOT NULL,
+                conditions_json TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (marketplace_id, category_id)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def set_policy(self, category_id: str, conditions: Iterable[str], marketplace_id: str = "EBAY_US"):
+        """Store the allowed condition enums for a category"""
+        conditions = sorted(set(conditions))
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO condition_policies (marketplace_id, category_id, conditions_json, fetched_at) "
+            "VALUES (?, ?, ?, ?)",
+            (marketplace_id, str(category_id), json.dumps(conditions), time.time())
+        )
+        conn.commit()
+        conn.close()
+        self._memory[(marketplace_id, str(category_id))] = frozenset(conditions)
+
+    def get_policy(self, category_id: str, marketplace_id: str = "EBAY_US",
+                   fetch: Callable[[str], Optional[List[str]]] = None) -> Optional[frozenset]:
+        """
+        Allowed condition enums for a category, or None if unknown.
+
+        Looks in memory, then SQLite (within the TTL), then calls ``fetch`` and
+        caches what it returns. Unknown categories are remembered for the
+        lifetime of the store so they are only fetched once per run.
+        """
+        key = (marketplace_id, str(category_id))
+        if key in self._memory:
+            return self._memory[key]
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT conditions_json, fetched_at FROM condition_policies "
+            "WHERE marketplace_id = ? AND category_id = ?", key
+        )
+        row = cursor.fetchone()
+        conn.close()
+
+        if row and time.time() - row[1] < self.ttl_seconds:
+            self._memory[key] = frozenset(json.loads(row[0]))
+            return self._memory[key]
+
+        conditions = None
+        if fetch is not None:
+            try:
+                conditions = fetch(str(category_id))
+            except Exception as e:
+                logger.warning(f"Could not fetch condition policy for category {category_id}: {e}")
+
+        if conditions:
+            self.set_policy(category_id, conditions, marketplace_id)
+        elif row:
+            # Stale beats nothing when the refresh fails
+            self._memory[key] = frozenset(json.loads(row[0]))
+        else:
+            self._memory[key] = None
+        return self._memory[key]
+
+
+def fetch_condition_policy(api, category_id: str, marketplace_id: str = "EBAY_US") -> List[str]:
+    """Fetch allowed condition enums for a category from the eBay Metadata API"""
+    response = api._make_request(
+        'GET', f"marketplace/{marketplace_id}/get_item_condition_policies",
+        {"filter": f"categoryIds:{{{category_id}}}"}, base_url=api.metadata_url
+    )
+    conditions = []
+    for policy in response.get('itemConditionPolicies', []):
+        for condition in policy.get('itemConditions', []):
+            enum = CONDITION_ENUMS_BY_ID.get(str(condition.get('conditionId')))
+            if enum:
+                conditions.append(enum)
+    return conditions
+
+
+class ValidationReport:
+    """Counts and per-SKU issues collected while validating"""
+
+    def __init__(self):
+        self.checked = 0
+        self.passed = 0
+        self.fixed = 0
+        self.rejected = 0
+        self.by_rule = Counter()
+        self.issues: List[Dict] = []
+
+    def add(self, sku: str, issues: List[Dict]):
+        """Record the outcome for one item"""
+        self.checked += 1
+        severities = {issue["severity"] for issue in issues}
+        if SEVERITY_ERROR in severities:
+            self.rejected += 1
+        elif SEVERITY_FIXED in severities:
+            self.fixed += 1
+        else:
+            self.passed += 1
+
+        for issue in issues:
+            self.by_rule[(issue["rule"], issue["severity"])] += 1
+            self.issues.append({"sku": sku, **issue})
+
+    def summary(self) -> Dict:
+        """Totals plus issue counts per rule"""
+        return {
+            "checked": self.checked,
+            "passed": self.passed,
+            "fixed": self.fixed,
+            "rejected": self.rejected,
+            "by_rule": {f"{rule}:{severity}": count for (rule, severity), count in sorted(self.by_rule.items())}
+        }
+
+    def write_csv(self, path: str) -> str:
+        """Write one row per issue (sku, rule, severity, message)"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=["sku", "rule", "severity", "message"], extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.issues)
+        return path
+
+
+class PayloadValidator:
+    """
+    Rule-based validator for inventory items.
+
+    Each rule inspects one item, may fix it in place (when auto_fix is on) and
+    returns issue dicts with 'rule', 'severity' and 'message'. Items with any
+    error are rejected. auto_fix is off by default, since fixes change seller
+    data; when it is on, every fix is logged per SKU and reported through
+    filter_batches' on_fixed callback so it can be journaled for review.
+    """
+
+    def __init__(self, policies: CategoryPolicyStore = None, auto_fix: bool = False,
+                 max_images: int = 12, marketplace_id: str = "EBAY_US",
+                 fetch_policy: Callable[[str], Optional[List[str]]] = None):
+        self.policies = policies
+        self.auto_fix = auto_fix
+        self.max_images = max_images
+        self.marketplace_id = marketplace_id
+        self.fetch_policy = fetch_policy
+        self.report = ValidationReport()
+        self.rules = [
+            self.check_sku,
+            self.check_title,
+            self.check_description,
+            self.check_brand,
+            self.check_price_quantity,
+            self.check_category,
+            self.check_images,
+            self.check_package,
+            self.check_upc,
+            self.check_condition,
+        ]
+
+    def _fixable(self, rule: str, fixed_message: str, error_message: str) -> Dict:
+        """Issue for a problem that auto_fix repairs; callers apply the fix when it is on"""
+        if self.auto_fix:
+            return {"rule": rule, "severity": SEVERITY_FIXED, "message": fixed_message}
+        return {"rule": rule, "severity": SEVERITY_ERROR, "message": error_message, "fixable": True}
+
+    # Rules
+
+    def check_sku(self, item) -> List[Dict]:
+        if len(item.sku) > MAX_SKU_LENGTH:
+            return [{"rule": "sku", "severity": SEVERITY_ERROR,
+                     "message": f"SKU longer than {MAX_SKU_LENGTH} characters"}]
+        return []
+
+    def check_title(self, item) -> List[Dict]:
+        title = ' '.join(str(item.title).split())
+        if not title:
+            return [{"rule": "title", "severity": SEVERITY_ERROR, "message": "Empty title"}]
+        if len(title) > MAX_TITLE_LENGTH:
+            issue = self._fixable("title", f"Title truncated to {MAX_TITLE_LENGTH} characters",
+                                  f"Title longer than {MAX_TITLE_LENGTH} characters")
+            if self.auto_fix:
+                cut = title[:MAX_TITLE_LENGTH + 1].rsplit(' ', 1)[0]
+                item.title = (cut if 0 < len(cut) <= MAX_TITLE_LENGTH else title[:MAX_TITLE_LENGTH]).rstrip()
+            return [issue]
+        if self.auto_fix:
+            item.title = title
+        return []
+
+    def check_description(self, item) -> List[Dict]:
+        if len(item.description or '') > MAX_DESCRIPTION_LENGTH:
+            return [{"rule": "description", "severity": SEVERITY_ERROR,
+                     "message": f"Description longer than {MAX_DESCRIPTION_LENGTH} characters"}]
+        if not str(item.description or '').strip():
+            issue = self._fixable("description", "Empty description replaced with title", "Empty description")
+            if self.auto_fix:
+                item.description = item.title
+            return [issue]
+        return []
+
+    def check_brand(self, item) -> List[Dict]:
+        if not str(item.brand or '').strip():
+            issue = self._fixable("brand", "Empty brand set to 'Unbranded'", "Empty brand")
+            if self.auto_fix:
+                item.brand = "Unbranded"
+            return [issue]
+        return []
+
+    def check_price_quantity(self, item) -> List[Dict]:
+        issues = []
+        if not item.price or item.price <= 0:
+            issues.append({"rule": "price", "severity": SEVERITY_ERROR, "message": f"Invalid price {item.price}"})
+        if item.quantity is None or item.quantity < 0:
+            issues.append({"rule": "quantity", "severity": SEVERITY_ERROR,
+                           "message": f"Invalid quantity {item.quantity}"})
+        return issues
+
+    def check_category(self, item) -> List[Dict]:
+        if not str(item.category_id or '').strip().isdigit():
+            return [{"rule": "category", "severity": SEVERITY_ERROR,
+                     "message": f"Invalid category ID '{item.category_id}'"}]
+        return []
+
+    def check_images(self, item) -> List[Dict]:
+        issues = []
+        images = item.images or []
+        valid = [url for url in images if url.lower().startswith(('https://', 'http://'))]
+        if len(valid) != len(images):
+            issues.append(self._fixable("images", f"Dropped {len(images) - len(valid)} non-URL images",
+                                        "Image entries that are not URLs"))
+        if len(valid) > self.max_images:
+            issues.append(self._fixable("images", f"Kept the first {self.max_images} of {len(valid)} images",
+                                        f"More than {self.max_images} images"))
+            valid = valid[:self.max_images]
+        if self.auto_fix:
+            item.images = valid
+        if not valid:
+            issues.append({"rule": "images", "severity": SEVERITY_WARNING,
+                           "message": "No images; the offer cannot be published without one"})
+        return issues
+
+    def check_package(self, item) -> List[Dict]:
+        dimensions = item.dimensions or {}
+        missing = [axis for axis in ("length", "width", "height") if not dimensions.get(axis)]
+        issues = []
+        if any((dimensions.get(axis) or 0) < 0 for axis in ("length", "width", "height")):
+            return [{"rule": "dimensions", "severity": SEVERITY_ERROR, "message": "Negative package dimension"}]
+        if missing:
+            issues.append(self._fixable("dimensions",
+                                        f"Missing {'/'.join(missing)} set to {DEFAULT_DIMENSION} in",
+                                        f"Missing package {'/'.join(missing)}"))
+            if self.auto_fix:
+                item.dimensions = {**dimensions, **{axis: DEFAULT_DIMENSION for axis in missing}}
+        if not item.weight or item.weight <= 0:
+            issues.append({"rule": "weight", "severity": SEVERITY_ERROR, "message": f"Invalid weight {item.weight}"})
+        return issues
+
+    def check_upc(self, item) -> List[Dict]:
+        if item.upc and not _UPC_PATTERN.match(str(item.upc).strip()):
+            issue = self._fixable("upc", f"Dropped malformed UPC '{item.upc}'", f"Malformed UPC '{item.upc}'")
+            if self.auto_fix:
+                item.upc = ""
+            return [issue]
+        return []
+
+    def check_condition(self, item) -> List[Dict]:
+        if self.policies is None:
+            return []
+        allowed = self.policies.get_policy(item.category_id, self.marketplace_id, self.fetch_policy)
+        if not allowed:
+            return []
+
+        condition = get_normalizer().normalize(item.condition, item.grade)
+        if condition in allowed:
+            return []
+
+        replacement = None
+        for ladder in CONDITION_LADDERS:
+            if condition in ladder:
+                replacement = next((c for c in ladder[ladder.index(condition):] if c in allowed), None)
+                break
+
+        message = f"{condition} not allowed in category {item.category_id}"
+        if replacement is None:
+            return [{"rule": "condition", "severity": SEVERITY_ERROR, "message": message}]
+        issue = self._fixable("condition", f"{message}; listed as {replacement}", message)
+        if self.auto_fix:
+            # The grade would override the condition again, so it gives way too
+            item.condition = replacement
+            item.grade = ""
+        return [issue]
+
+    # Bulk helpers
+
+    def validate(self, item) -> List[Dict]:
+        """Run every rule on an item, fixing it in place where allowed, and record the outcome"""
+        issues = []
+        for rule in self.rules:
+            issues.extend(rule(item))
+        self.report.add(item.sku, issues)
+        for issue in issues:
+            if issue["severity"] == SEVERITY_FIXED:
+                logger.info(f"Auto-fixed {item.sku}: {issue['message']}")
+        return issues
+
+    def validate_batch(self, items: Iterable) -> tuple:
+        """
+        Validate a batch of items.
+
+        Returns:
+            (clean items, [{"sku", "error", "validation": issues}] for rejected items)
+        """
+        clean, rejected, _ = self._validate_batch(items)
+        return clean, rejected
+
+    def _validate_batch(self, items: Iterable) -> tuple:
+        """validate_batch plus [{"sku", "fixes"}] for clean items that were auto-fixed"""
+        clean, rejected, fixed = [], [], []
+        for item in items:
+            issues = self.validate(item)
+            errors = [issue for issue in issues if issue["severity"] == SEVERITY_ERROR]
+            if errors:
+                error = "Validation failed: " + "; ".join(issue["message"] for issue in errors)
+                if any(issue.get("fixable") for issue in errors):
+                    error += " (VALIDATION_AUTO_FIX=true would fix some of these)"
+                rejected.append({"sku": item.sku, "error": error, "validation": issues})
+            else:
+                clean.append(item)
+                fixes = [issue["message"] for issue in issues if issue["severity"] == SEVERITY_FIXED]
+                if fixes:
+                    fixed.append({"sku": item.sku, "fixes": fixes})
+        return clean, rejected, fixed
+
+    def filter_batches(self, batches: Iterable[List], batch_size: int = None,
+                       on_rejected: Callable[[Dict], None] = None,
+                       on_fixed: Callable[[Dict], None] = None) -> Iterator[List]:
+        """
+        Validate a stream of batches and yield only clean items, re-batched so
+        rejections don't leave half-empty API calls.
+
+        Args:
+            batches: Iterable of item batches (e.g. CSVProcessor.iter_item_batches)
+            batch_size: Size of the yielded batches (default: size of the first input batch)
+            on_rejected: Called with {"successful": [], "failed": [...]} per input batch
+                that had rejections, e.g. a job journal checkpoint
+            on_fixed: Called with {"successful": [{"sku", "fixes"}], "failed": []} per
+                input batch with auto-fixed items that passed
+        """
+        pending = []
+        for batch in batches:
+            batch_size = batch_size or len(batch)
+            clean, rejected, fixed = self._validate_batch(batch)
+            if rejected:
+                logger.warning(f"Validation rejected {len(rejected)} of {len(batch)} items")
+                if on_rejected:
+                    on_rejected({"successful": [], "failed": rejected})
+            if fixed and on_fixed:
+                on_fixed({"successful": fixed, "failed": []})
+            pending.extend(clean)
+            while len(pending) >= batch_size:
+                yield pending[:batch_size]
+                pending = pending[batch_size:]
+        if pending:
+            yield pending
+
+
+# Global policy store instance
+_policy_store_instance = None
+
+
+def get_policy_store(ttl_days: float = 7.0) -> CategoryPolicyStore:
+    """Get or create global category policy store (CATEGORY_POLICY_DB overrides the path)"""
+    global _policy_store_instance
+    if _policy_store_instance is None:
+        _policy_store_instance = CategoryPolicyStore(os.getenv('CATEGORY_POLICY_DB') or None, ttl_days)
+    return _policy_store_instance
@@ -11,7 +11,7 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ebay_pricing.pricing_engine import get_pricing_recommendation
-from config import CONDITION_MAPPINGS
+from condition_normalizer import normalize_condition
 
 # Set up detailed logging
 logging.basicConfig(
@@ -19,17 +19,6 @@ logging.basicConfig(
     format='%(levelname)s - %(message)s'
 )
 
-def normalize_condition(grade):
-    """Convert grade codes to eBay conditions"""
-    grade_map = {
-        'LN': 'LIKE_NEW',
-        'VG': 'USED_VERY_GOOD',
-        'G': 'USED_GOOD',
-        'AC': 'USED_ACCEPTABLE',
-        'SA': 'FOR_PARTS_OR_NOT_WORKING'
-    }
-    return grade_map.get(grade.upper(), 'USED_GOOD')
-
 # B2 Batch Data
 b2_items = [
     {'sku': 'LN-DEN001-B2UID001', 'brand': 'Apple', 'model': 'A2449', 'grade': 'LN', 'notes': 'like new'},
@@ -53,7 +42,7 @@ for item in b2_items:
     brand = item['brand']
     model = item['model']
     grade = item['grade']
-    condition = normalize_condition(grade)
+    condition = normalize_condition(grade=grade)
 
     print(f"\n{'='*100}")
     print(f"  SKU: {sku}")
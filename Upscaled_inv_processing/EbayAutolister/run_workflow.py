@@ -5,6 +5,7 @@ Simple script to run the eBay listing workflow with your batch file.
 Usage:
     python run_workflow.py                    # Uses B1.csv by default
     python run_workflow.py your_file.csv      # Uses specified CSV file
+    python run_workflow.py your_file.csv --resume   # Continue an interrupted run
 """
 
 import sys
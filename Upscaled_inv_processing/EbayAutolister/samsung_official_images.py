@@ -4,12 +4,12 @@ Use Samsung's official product images directly
 Constructs URLs based on Samsung's image CDN patterns
 """
 
-import requests
 import os
-import csv
-import time
 from dotenv import load_dotenv
 from ebay_trading_uploader import EbayTradingAPI
+from image_hashing import get_hash_index
+from image_pipeline import (ImagePipeline, ImageSource, get_image_cache, print_result, print_summary,
+                            read_item_mapping)
 
 load_dotenv()
 
@@ -162,71 +162,13 @@ def get_model_base(model: str) -> str:
     return model
 
 
-def validate_image_url(url: str) -> bool:
-    """Quick check if image URL is accessible"""
-    try:
-        response = requests.head(url, timeout=5, allow_redirects=True)
-        return response.status_code == 200
-    except:
-        return False
-
-
 def get_images_for_model(model: str) -> list:
-    """Get Samsung official images for a model"""
+    """Get Samsung official image URLs for a model (validated by the image pipeline)"""
     # Try exact match
     if model in SAMSUNG_PRODUCT_IMAGES:
-        images = SAMSUNG_PRODUCT_IMAGES[model]
-    else:
-        # Try base model
-        base = get_model_base(model)
-        images = SAMSUNG_PRODUCT_IMAGES.get(base, [])
-
-    # Validate URLs
-    valid_images = []
-    for url in images[:3]:  # Max 3 images
-        if validate_image_url(url):
-            valid_images.append(url)
-            print(f"    ✓ Valid: {url[:80]}...")
-        else:
-            print(f"    ✗ Invalid: {url[:80]}...")
-
-    return valid_images
-
-
-def update_listing_images(api: EbayTradingAPI, item_id: str, image_urls: list) -> bool:
-    """Update eBay listing with product images"""
-
-    if not image_urls:
-        return False
-
-    picture_urls = '\n'.join([f'            <PictureURL>{url}</PictureURL>' for url in image_urls[:12]])
-
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<ReviseFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <ItemID>{item_id}</ItemID>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-{picture_urls}
-        </PictureDetails>
-    </Item>
-</ReviseFixedPriceItemRequest>'''
-
-    try:
-        response = api._make_xml_request('ReviseFixedPriceItem', xml_request)
-        if response.get('Ack') in ['Success', 'Warning']:
-            return True
-        else:
-            errors = response.get('Errors', [])
-            if errors:
-                print(f"    Error: {errors[0].get('LongMessage', 'Unknown')}")
-            return False
-    except Exception as e:
-        print(f"    Exception: {e}")
-        return False
+        return SAMSUNG_PRODUCT_IMAGES[model]
+    # Try base model
+    return SAMSUNG_PRODUCT_IMAGES.get(get_model_base(model), [])
 
 
 def main():
@@ -238,65 +180,15 @@ def main():
 
     api = EbayTradingAPI(dev_id, app_id, cert_id, auth_token, sandbox)
 
-    with open('item_mapping.csv', 'r') as f:
-        items = list(csv.DictReader(f))
+    items = read_item_mapping('item_mapping.csv')
 
     print(f"Processing {len(items)} items with Samsung official images...")
     print("="*80)
 
-    model_cache = {}
-    updated = 0
-    failed = 0
-
-    for idx, item in enumerate(items, 1):
-        sku = item['sku']
-        item_id = item['item_id']
-        brand = item['brand'].strip()
-        model = item['model'].strip()
-
-        if not model:
-            print(f"\n[{idx}/{len(items)}] Skipping - no model")
-            failed += 1
-            continue
-
-        print(f"\n[{idx}/{len(items)}] {brand} {model}")
-        print(f"  Item ID: {item_id}")
-
-        # Check cache
-        cache_key = model.upper()
-        if cache_key in model_cache:
-            print(f"  Using cached images")
-            images = model_cache[cache_key]
-        else:
-            print(f"  Looking up Samsung official images...")
-            images = get_images_for_model(model)
-            model_cache[cache_key] = images
-
-            if images:
-                print(f"  ✓ Found {len(images)} valid Samsung official images")
-            else:
-                print(f"  ✗ No images found for this model")
-
-        if not images:
-            failed += 1
-            continue
-
-        print(f"  Updating eBay listing...")
-        if update_listing_images(api, item_id, images):
-            print(f"  ✓ Successfully updated!")
-            updated += 1
-        else:
-            print(f"  ✗ Failed to update")
-            failed += 1
-
-        time.sleep(1)
-
-    print(f"\n{'='*80}")
-    print(f"Summary:")
-    print(f"  ✓ Updated: {updated}")
-    print(f"  ✗ Failed: {failed}")
-    print(f"  Total: {len(items)}")
-    print(f"{'='*80}\n")
+    sources = [ImageSource('samsung', lambda brand, model: get_images_for_model(model))]
+    pipeline = ImagePipeline(api, sources, cache=get_image_cache(), hash_index=get_hash_index())
+    results = pipeline.run(items, on_result=print_result)
+    print_summary(results, len(items))
 
 
 if __name__ == '__main__':
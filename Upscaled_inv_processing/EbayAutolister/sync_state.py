@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Sync State Store for eBay Autolister
+
+Remembers a hash of the last payload successfully pushed to eBay for every
+SKU, separately for the inventory item, the offer and the price/quantity.
+Sync mode compares freshly built payloads against these hashes and only sends
+what is new or changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Payload kinds tracked per SKU
+KIND_INVENTORY = "inventory"
+KIND_OFFER = "offer"
+KIND_PRICE = "price"
+
+# Stored in place of a hash for remote objects created but not yet fully
+# pushed (an offer whose publish failed); never equal to a real payload hash
+PENDING_HASH = ""
+
+# SQLite limits bound parameters per statement; look SKUs up in chunks
+_LOOKUP_CHUNK = 500
+
+
+def payload_hash(payload) -> str:
+    """Stable hash of a JSON-serializable payload (key order independent)"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class SyncStateStore:
+    """SQLite store of the last pushed payload hash per (SKU, kind)"""
+
+    def __init__(self, db_path: str = None):
+        """Initialize the store, defaulting to sync_state.db next to this module"""
+        if db_path is None:
+            db_path = Path(__file__).parent / "sync_state.db"
+
+        self.db_path = str(db_path)
+        self._init_database()
+        logger.debug(f"Sync state store initialized: {self.db_path}")
+
+    def _init_database(self):
+        """Create database and table if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                sku TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload_hash TEXT NOT NULL,
+                remote_id TEXT,
+                synced_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (sku, kind)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def get_hashes(self, kind: str, skus: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up stored hashes for a set of SKUs.
+
+        Args:
+            kind: Payload kind (inventory, offer or price)
+            skus: SKUs to look up
+
+        Returns:
+            Dict of sku -> payload hash for SKUs that have been synced
+        """
+        skus = list(skus)
+        hashes = {}
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for i in range(0, len(skus), _LOOKUP_CHUNK):
+            chunk = skus[i:i + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(
+                f"SELECT sku, payload_hash FROM sync_state WHERE kind = ? AND sku IN ({placeholders})",
+                [kind] + chunk
+            )
+            hashes.update(dict(cursor.fetchall()))
+        conn.close()
+
+        return hashes
+
+    def get_remote_ids(self, kind: str, skus: Iterable[str]) -> Dict[str, str]:
+        """Look up stored remote IDs (e.g. offerId) for a set of SKUs"""
+        skus = list(skus)
+        remote_ids = {}
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for i in range(0, len(skus), _LOOKUP_CHUNK):
+            chunk = skus[i:i + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(
+                f"SELECT sku, remote_id FROM sync_state "
+                f"WHERE kind = ? AND remote_id IS NOT NULL AND sku IN ({placeholders})",
+                [kind] + chunk
+            )
+            remote_ids.update(dict(cursor.fetchall()))
+        conn.close()
+
+        return remote_ids
+
+    def get_pending(self, kind: str, skus: Iterable[str]) -> Dict[str, str]:
+        """Remote IDs of SKUs recorded with mark_pending and not synced since"""
+        skus = list(skus)
+        pending = {}
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for i in range(0, len(skus), _LOOKUP_CHUNK):
+            chunk = skus[i:i + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(
+                f"SELECT sku, remote_id FROM sync_state WHERE kind = ? AND payload_hash = ? "
+                f"AND remote_id IS NOT NULL AND sku IN ({placeholders})",
+                [kind, PENDING_HASH] + chunk
+            )
+            pending.update(dict(cursor.fetchall()))
+        conn.close()
+
+        return pending
+
+    def changed(self, kind: str, payloads: Dict[str, object]) -> Dict[str, str]:
+        """
+        Find SKUs whose payload differs from the last pushed one.
+
+        Args:
+            kind: Payload kind
+            payloads: Dict of sku -> freshly built payload
+
+        Returns:
+            Dict of sku -> new hash, for new or changed SKUs only
+        """
+        new_hashes = {sku: payload_hash(payload) for sku, payload in payloads.items()}
+        stored = self.get_hashes(kind, new_hashes)
+        return {sku: h for sku, h in new_hashes.items() if stored.get(sku) != h}
+
+    def mark_synced(self, kind: str, hashes: Dict[str, str],
+                    remote_ids: Optional[Dict[str, str]] = None):
+        """
+        Record hashes for SKUs that were pushed successfully.
+
+        Args:
+            kind: Payload kind
+            hashes: Dict of sku -> payload hash
+            remote_ids: Optional dict of sku -> remote ID to store alongside
+        """
+        if not hashes:
+            return
+
+        remote_ids = remote_ids or {}
+        now = datetime.now().isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO sync_state (sku, kind, payload_hash, remote_id, synced_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(sku, kind) DO UPDATE SET
+                payload_hash = excluded.payload_hash,
+                remote_id = COALESCE(excluded.remote_id, sync_state.remote_id),
+                synced_at = excluded.synced_at
+        """, [(sku, kind, h, remote_ids.get(sku), now) for sku, h in hashes.items()])
+        conn.commit()
+        conn.close()
+
+    def mark_pending(self, kind: str, remote_ids: Dict[str, str]):
+        """
+        Record remote IDs of objects that exist on eBay but are not fully
+        pushed yet (e.g. offers created but not published), so the next sync
+        finishes them instead of creating them again.
+        """
+        if not remote_ids:
+            return
+
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO sync_state (sku, kind, payload_hash, remote_id, synced_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(sku, kind) DO UPDATE SET
+                payload_hash = excluded.payload_hash,
+                remote_id = excluded.remote_id,
+                synced_at = excluded.synced_at
+        """, [(sku, kind, PENDING_HASH, remote_id, now) for sku, remote_id in remote_ids.items()])
+        conn.commit()
+        conn.close()
+
+    def forget(self, skus: List[str], kind: str = None):
+        """Drop stored state so the SKUs are pushed again on the next sync"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        for sku in skus:
+            if kind:
+                cursor.execute("DELETE FROM sync_state WHERE sku = ? AND kind = ?", (sku, kind))
+            else:
+                cursor.execute("DELETE FROM sync_state WHERE sku = ?", (sku,))
+        conn.commit()
+        conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Count tracked SKUs per payload kind"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT kind, COUNT(*) FROM sync_state GROUP BY kind")
+        stats = dict(cursor.fetchall())
+        conn.close()
+        return stats
+
+
+# Global sync state instance
+_sync_state_instance = None
+
+
+def get_sync_state() -> SyncStateStore:
+    """Get or create global sync state store (SYNC_STATE_DB overrides the path)"""
+    global _sync_state_instance
+    if _sync_state_instance is None:
+        _sync_state_instance = SyncStateStore(os.getenv('SYNC_STATE_DB') or None)
+    return _sync_state_instance
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Test concurrent inventory batches keep deterministic per-SKU order (no network needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import InventoryItem
+from test_helpers import fake_ebay
+
+
+def _item(sku: str) -> InventoryItem:
+    return InventoryItem(sku=sku, title=sku, description=sku, condition='good',
+                         category_id='9355', price=10.0, quantity=1)
+
+
+def test_concurrent_batches_in_order():
+    """Batches run in parallel but results come back in CSV order"""
+    skus = [f"BAD-{i}" if i % 30 == 0 else f"SKU-{i}" for i in range(250)]
+    # Random per-call latency makes batches finish out of order
+    with fake_ebay(server_options={'latency_ms': (30.0, 0.5), 'latency_scale': 1.0},
+                   max_concurrent_batches=4) as (server, autolister):
+        server.rejected['bulk_create_or_replace_inventory_item'] = {sku for sku in skus if sku.startswith('BAD')}
+
+        results = autolister.inventory.bulk_create_inventory_items([_item(sku) for sku in skus])
+
+    assert results['successful'] == [sku for sku in skus if not sku.startswith('BAD')]
+    assert [f['sku'] for f in results['failed']] == [sku for sku in skus if sku.startswith('BAD')]
+    assert 1 < server.peak_in_flight <= 4
+    print(f"✓ {len(results['successful'])} created with {server.peak_in_flight} batches in flight")
+
+
+if __name__ == "__main__":
+    test_concurrent_batches_in_order()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test bulk offer creation and publishing with per-SKU result mapping (no network needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_helpers import fake_ebay
+
+CALLS = 'POST /sell/inventory/v1/bulk_create_offer'
+
+
+def test_bulk_create_and_publish():
+    """60 offers go out in 25-sized batches and every outcome maps back to its SKU"""
+    with fake_ebay() as (server, autolister):
+        offers = [{'sku': f"SKU-{i}" if i % 20 else f"BAD-{i}", 'category_id': '9355', 'price': 10.0}
+                  for i in range(60)]
+        for offer in offers:
+            server.inventory[offer['sku']] = {}
+        server.rejected['bulk_create_offer'] = {'BAD-0', 'BAD-20', 'BAD-40'}
+
+        results = autolister.listings.bulk_create_and_publish(offers)
+
+        assert server.stats[CALLS] == 3 and server.sent['bulk_create_offer'] == 60
+        assert server.sent['bulk_publish_offer'] == 57
+        assert len(results['successful']) == 57
+        assert {f['sku'] for f in results['failed']} == {'BAD-0', 'BAD-20', 'BAD-40'}
+        first = results['successful'][0]
+        offer_id = server.offer_ids_by_sku['SKU-1']
+        assert first == {'sku': 'SKU-1', 'offer_id': offer_id, 'listing_id': server.offers[offer_id]['listingId']}
+    print(f"✓ {len(results['successful'])} published from {server.stats[CALLS]} create calls")
+
+
+if __name__ == "__main__":
+    test_bulk_create_and_publish()
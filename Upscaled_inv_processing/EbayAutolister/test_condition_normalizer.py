@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the shared condition/grade normalization engine (no network needed)
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from condition_normalizer import ConditionNormalizer, normalize_condition
+from config import CONDITION_MAPPINGS
+from ebay_autolister import ConditionMapper
+
+
+def test_exact_and_grade_lookups():
+    """Mapping keys, eBay enums and grades resolve without the fuzzy path"""
+    engine = ConditionNormalizer()
+    for key, value in CONDITION_MAPPINGS.items():
+        assert engine.normalize(key.upper()) == value
+
+    assert engine.normalize('USED_GOOD') == 'USED_GOOD'
+    assert engine.normalize('like_new') == 'LIKE_NEW'
+    assert engine.normalize('  Very   Good ') == 'USED_VERY_GOOD'
+    assert engine.normalize('good', '9') == 'LIKE_NEW'
+    assert engine.normalize('used', 'vg') == 'USED_VERY_GOOD'
+    assert engine.normalize(grade='SA') == 'FOR_PARTS_OR_NOT_WORKING'
+    assert engine.fuzzy.cache_info().currsize == 0
+    print("✓ Exact, enum and grade lookups")
+
+
+def test_fuzzy_fallback_memoized():
+    """Unmatched text goes through the substring/term fallback once per distinct value"""
+    engine = ConditionNormalizer()
+    assert engine.normalize('Pre-owned, good condition') == 'USED_GOOD'
+    assert engine.normalize('pre-owned, good condition') == 'USED_GOOD'
+    assert engine.normalize('sealed in shrinkwrap') == 'NEW'
+    assert engine.normalize('???') == 'USED_GOOD'
+    assert engine.normalize('???', default='NEW') == 'NEW'
+
+    info = engine.fuzzy.cache_info()
+    assert info.misses == 3 and info.hits == 2
+    print("✓ Fuzzy fallback memoized")
+
+
+def test_map_column_matches_scalar():
+    """map_column gives the same answer as normalize() row by row"""
+    engine = ConditionNormalizer()
+    conditions = pd.Series(['like new', 'USED_GOOD', 'mostly good', None, 'for parts', 'open box'] * 100)
+    grades = pd.Series(['', 'A+', None, 'LN', '', 'zz'] * 100)
+
+    mapped = engine.map_column(conditions, grades)
+
+    expected = [engine.normalize(c if c is not None else '', g) for c, g in zip(conditions, grades)]
+    assert mapped.tolist() == expected
+    assert engine.fuzzy.cache_info().misses == 1
+    print("✓ map_column matches scalar normalize")
+
+
+def test_callers_share_engine():
+    """ConditionMapper and the module helper route through the engine"""
+    assert ConditionMapper.map_condition('Excellent refurbished') == 'EXCELLENT_REFURBISHED'
+    assert ConditionMapper.map_condition('good', 'B+') == 'USED_VERY_GOOD'
+    assert normalize_condition(grade='G') == 'USED_GOOD'
+    print("✓ Callers share the engine")
+
+
+if __name__ == "__main__":
+    test_exact_and_grade_lookups()
+    test_fuzzy_fallback_memoized()
+    test_map_column_matches_scalar()
+    test_callers_share_engine()
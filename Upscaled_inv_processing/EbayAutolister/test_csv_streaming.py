@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test streaming CSV ingestion feeds bulk creation lazily (no network needed)
+"""
+
+import csv
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import CSVProcessor
+from test_helpers import fake_ebay
+
+CALLS = 'POST /sell/inventory/v1/bulk_create_or_replace_inventory_item'
+
+
+def _write_csv(path, rows):
+    fields = ['sku', 'title', 'description', 'condition', 'category_id', 'price', 'quantity',
+              'brand', 'dimensions', 'images']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow({
+                'sku': f"SKU-{i}", 'title': f"Item {i}", 'description': 'd', 'condition': 'good',
+                'category_id': '9355', 'price': 'n/a' if i == 500 else f"{10 + i % 7}.99",
+                'quantity': '' if i % 2 else '3', 'brand': '' if i % 3 else 'Acme',
+                'dimensions': '6x4x2' if i % 5 == 0 else '', 'images': 'http://a/1.jpg, http://a/2.jpg'
+            })
+
+
+def test_stream_batches():
+    """Items come out validated, in API-sized batches, across chunk boundaries"""
+    path = os.path.join(tempfile.mkdtemp(prefix='stream_test_'), 'items.csv')
+    _write_csv(path, 2000)
+
+    batches = list(CSVProcessor.iter_item_batches(path, batch_size=25, chunk_size=333))
+    items = [item for batch in batches for item in batch]
+
+    assert len(items) == 1999, "row with invalid price is skipped"
+    assert all(len(batch) == 25 for batch in batches[:-1])
+    first = items[0]
+    assert first.brand == 'Acme' and first.quantity == 3 and first.dimensions['length'] == 6.0
+    assert items[1].brand == '' and items[1].quantity == 1
+    assert first.images == ['http://a/1.jpg', 'http://a/2.jpg']
+    print(f"✓ Streamed {len(items)} items in {len(batches)} batches")
+
+
+def test_bulk_create_consumes_lazily():
+    """Only a window of batches is pulled ahead of the ones that finished"""
+    path = os.path.join(tempfile.mkdtemp(prefix='stream_test_'), 'items.csv')
+    _write_csv(path, 1000)
+
+    with fake_ebay(max_concurrent_batches=3) as (server, autolister):
+        max_ahead = 0
+
+        def tracked():
+            nonlocal max_ahead
+            for n, batch in enumerate(CSVProcessor.iter_item_batches(path), 1):
+                max_ahead = max(max_ahead, n - server.stats[CALLS])
+                yield batch
+
+        results = autolister.inventory.bulk_create_inventory_batches(tracked())
+
+        assert len(results['successful']) == 999 == len(server.inventory)
+        assert results['successful'][:2] == ['SKU-0', 'SKU-1']
+        assert max_ahead <= 4
+    print(f"✓ {server.stats[CALLS]} calls, at most {max_ahead} batches pulled ahead")
+
+
+if __name__ == "__main__":
+    test_stream_batches()
+    test_bulk_create_consumes_lazily()
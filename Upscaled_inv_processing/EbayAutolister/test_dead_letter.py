@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test dead-lettering of bulk failures and targeted retry (no network needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dead_letter import OP_INVENTORY
+from ebay_autolister import InventoryItem
+from test_helpers import fake_ebay
+
+ENDPOINT = 'bulk_create_or_replace_inventory_item'
+
+
+def test_retry_only_retryable():
+    """Only transient failures are retried, and recovered SKUs leave the store"""
+    with fake_ebay() as (server, autolister):
+        store = autolister.inventory.dead_letters
+        server.unavailable[ENDPOINT] = {'SKU-3', 'SKU-40', 'SKU-77'}
+        server.rejected[ENDPOINT] = {'SKU-9'}
+
+        items = [InventoryItem(sku=f"SKU-{i}", title="t", description="d", condition='good',
+                               category_id='9355', price=5.0, quantity=1) for i in range(100)]
+        results = autolister.inventory.bulk_create_inventory_items(items)
+        assert len(results['failed']) == 4
+        assert store.get_stats() == {'retryable': 3, 'permanent': 1, 'total': 4}
+
+        # Transient problem clears; the retry sends only the 3 retryable SKUs
+        server.unavailable.clear()
+        server.sent.clear()
+        retry = autolister.retry_dead_letters(batch_size=2)
+
+        assert server.sent[ENDPOINT] == 3
+        assert sorted(retry['successful']) == ['SKU-3', 'SKU-40', 'SKU-77']
+        assert len(server.inventory) == 99 and 'SKU-9' not in server.inventory
+        remaining = store.list(OP_INVENTORY)
+        assert [e['sku'] for e in remaining] == ['SKU-9'] and remaining[0]['error_ids'] == [25002]
+    print(f"✓ Retried {retry['retried']} retryable failures, permanent failure kept")
+
+
+if __name__ == "__main__":
+    test_retry_only_retryable()
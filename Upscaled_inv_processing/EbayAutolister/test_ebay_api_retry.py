@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test EbayAPI retry, Retry-After and circuit breaker behaviour (no network needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+import ebay_autolister
+from ebay_autolister import EbayAPI, CircuitOpenError
+
+
+class StubResponse:
+    def __init__(self, status_code: int, body: dict = None, headers: dict = None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.headers = headers or {}
+        self.text = "{}" if body is None else str(body)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+
+class StubSession:
+    """Returns queued responses in order and records each call"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+def _api(responses, **kwargs) -> EbayAPI:
+    api = EbayAPI("id", "secret", sandbox=True, user_token="token", min_interval=0, **kwargs)
+    api.session = StubSession(responses)
+    return api
+
+
+def _no_sleep(monkey_delays):
+    ebay_autolister.time.sleep = lambda seconds: monkey_delays.append(seconds)
+
+
+def test_retries_then_succeeds():
+    """429 and 503 are retried and the call eventually succeeds"""
+    delays = []
+    real_sleep = ebay_autolister.time.sleep
+    _no_sleep(delays)
+    try:
+        api = _api([
+            StubResponse(429, headers={'Retry-After': '7'}),
+            StubResponse(503),
+            StubResponse(200, {'responses': []}),
+        ], max_retries=3, backoff_base=0.01)
+        result = api._make_request('POST', 'bulk_create_or_replace_inventory_item', {'requests': []})
+    finally:
+        ebay_autolister.time.sleep = real_sleep
+
+    assert result == {'responses': []}
+    assert api.session.calls == 3
+    assert delays[0] >= 7, "Retry-After must be honored"
+    print(f"✓ Retried twice (delays {[round(d, 2) for d in delays]})")
+
+
+def test_ebay_error_id_is_retryable():
+    """A 400 carrying a transient eBay errorId is retried"""
+    delays = []
+    real_sleep = ebay_autolister.time.sleep
+    _no_sleep(delays)
+    try:
+        api = _api([
+            StubResponse(400, {'errors': [{'errorId': 25001}]}),
+            StubResponse(200, {'ok': True}),
+        ], backoff_base=0.01)
+        assert api._make_request('GET', 'inventory_item/SKU1') == {'ok': True}
+    finally:
+        ebay_autolister.time.sleep = real_sleep
+    print("✓ errorId 25001 retried")
+
+
+def test_permanent_error_not_retried():
+    """A plain 400 fails immediately without retries"""
+    api = _api([StubResponse(400, {'errors': [{'errorId': 25002}]})])
+    try:
+        api._make_request('PUT', 'inventory_item/SKU1', {})
+    except requests.exceptions.HTTPError:
+        assert api.session.calls == 1
+        print("✓ Permanent error raised without retry")
+        return
+    raise AssertionError("Expected HTTPError")
+
+
+def test_circuit_opens():
+    """Consecutive transient failures open the circuit and later calls fail fast"""
+    real_sleep = ebay_autolister.time.sleep
+    _no_sleep([])
+    try:
+        api = _api([StubResponse(503)] * 4, max_retries=1, circuit_threshold=2, backoff_base=0.01)
+        try:
+            api._make_request('GET', 'inventory_item/SKU1')
+        except requests.exceptions.HTTPError:
+            pass
+        try:
+            api._make_request('GET', 'inventory_item/SKU2')
+        except CircuitOpenError:
+            assert api.session.calls == 2
+            print("✓ Circuit opened after threshold")
+            return
+    finally:
+        ebay_autolister.time.sleep = real_sleep
+    raise AssertionError("Expected CircuitOpenError")
+
+
+def test_creating_posts_not_retried_on_server_errors():
+    """Offer/publish/task POSTs are not repeated after a 5xx or timeout, but are after a 429"""
+    delays = []
+    real_sleep = ebay_autolister.time.sleep
+    _no_sleep(delays)
+    try:
+        api = _api([StubResponse(503)], backoff_base=0.01)
+        try:
+            api._make_request('POST', 'bulk_create_offer', {'requests': []})
+            raise AssertionError("Expected HTTPError")
+        except requests.exceptions.HTTPError:
+            assert api.session.calls == 1
+
+        api = _api([requests.exceptions.ReadTimeout("read timed out")], backoff_base=0.01)
+        try:
+            api._make_request('POST', 'offer/O1/publish')
+            raise AssertionError("Expected Timeout")
+        except requests.exceptions.Timeout:
+            assert api.session.calls == 1
+
+        api = _api([StubResponse(429, headers={'Retry-After': '0'}), StubResponse(200, {'offerId': 'O1'})],
+                   backoff_base=0.01)
+        assert api._make_request('POST', 'offer', {}) == {'offerId': 'O1'}
+
+        # Callers that know a POST is safe to repeat can opt in
+        api = _api([StubResponse(502), StubResponse(200, {'ok': True})], backoff_base=0.01)
+        assert api._make_request('POST', 'offer/O1/publish', idempotent=True) == {'ok': True}
+    finally:
+        ebay_autolister.time.sleep = real_sleep
+    print("✓ Non-idempotent POSTs retried only when throttled")
+
+
+if __name__ == "__main__":
+    test_retries_then_succeeds()
+    test_ebay_error_id_is_retryable()
+    test_permanent_error_not_retried()
+    test_circuit_opens()
+    test_creating_posts_not_retried_on_server_errors()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Test CSV enrichment with a fake search function and a local image host (no network needed)
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import enricher
+from enricher import ImageDownloader, RateLimiter, _sniff_extension
+from enrichment_cache import KIND_SEARCH, EnrichmentCache, product_key
+
+
+def _png() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (600, 600), (0, 128, 255)).save(out, "PNG")
+    return out.getvalue()
+
+
+class _Host(BaseHTTPRequestHandler):
+    """Serves a PNG behind a .jpg URL, HTML posing as an image and an endless image"""
+
+    def do_GET(self):
+        if self.path.startswith("/product.jpg"):
+            body, content_type = _png(), "image/jpeg"
+        elif self.path == "/page.jpg":
+            body, content_type = b"<!doctype html><html>Blocked</html>", "image/jpeg"
+        elif self.path == "/huge.jpg":
+            # No Content-Length: the cap has to be enforced while streaming
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.end_headers()
+            self.wfile.write(b"\xff\xd8\xff\xe0" + b"\0" * (3 * 1024 * 1024))
+            return
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Host)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_sniff_extension():
+    """Magic bytes decide the extension; Content-Type only helps with tiny bodies"""
+    assert _sniff_extension(b"\x89PNG\r\n\x1a\n\0\0\0\0", "image/jpeg") == ".png"
+    assert _sniff_extension(b"RIFF\0\0\0\0WEBPVP8 ") == ".webp"
+    assert _sniff_extension(b"<html><body>nope</body>", "image/jpeg") is None
+    assert _sniff_extension(b"", "image/gif; charset=binary") == ".gif"
+    print("✓ Extensions sniffed from content")
+
+
+def test_downloader_streams_and_rejects():
+    """Images are saved under their real type; HTML, 404s and oversized bodies leave nothing behind"""
+    server, base = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            with ImageDownloader(tmp, max_workers=3, max_mb=1) as downloader:
+                paths = ["product.jpg?w=1", "page.jpg", "huge.jpg", "missing.jpg"]
+                futures = [downloader.submit(f"{base}/{path}", f"SKU {n}") for n, path in enumerate(paths)]
+                results = [future.result() for future in futures]
+
+            assert results == ["SKU_0.png", None, None, None]
+            assert os.listdir(tmp) == ["SKU_0.png"]
+    finally:
+        server.shutdown()
+    print("✓ Downloads streamed, sniffed and capped")
+
+
+def test_enrich_csv_downloads_in_background():
+    """enrich_csv fills enrichment columns and records downloaded (and processed) images per row"""
+    server, base = _serve()
+    original_query = enricher.query_openai_search
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    try:
+        def fake_query(client, brand, model, limiter=None):
+            image = f"{base}/product.jpg?m={model}" if model != "NOIMG" else f"{base}/page.jpg"
+            return {"title": f"{brand} {model}", "retail_price": "$250.00", "best_image_url": image,
+                    "confidence": 0.9}
+
+        enricher.query_openai_search = fake_query
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "in.csv")
+            pd.DataFrame({"sku": ["A", "B", "C", "D"], "brand": ["Samsung", "Samsung", "", "Apple"],
+                          "mpn": ["SM-R890", "NOIMG", "", "A2337"]}).to_csv(source, index=False)
+            output = os.path.join(tmp, "out.csv")
+            images = os.path.join(tmp, "images")
+
+            enricher.enrich_csv(source, output, images, "sku", "brand", "mpn", use_cache=False)
+            df = pd.read_csv(output, dtype=str, keep_default_na=False)
+
+            assert list(df["title"]) == ["Samsung SM-R890", "Samsung NOIMG", "", "Apple A2337"]
+            assert list(df["price_40pct"]) == ["100.00", "100.00", "", "100.00"]
+            assert list(df["image_filename"]) == ["A.jpg", "", "", "D.jpg"]
+            assert list(df["thumbnail_filename"]) == ["A_thumb.jpg", "", "", "D_thumb.jpg"]
+            assert sorted(os.listdir(images)) == ["A.jpg", "A_thumb.jpg", "D.jpg", "D_thumb.jpg"]
+    finally:
+        enricher.query_openai_search = original_query
+        server.shutdown()
+    print("✓ enrich_csv downloads images alongside enrichment")
+
+
+def test_rate_limiter_paces_requests_and_tokens():
+    """Requests beyond the per-window budget wait; token overruns settled later slow the next calls"""
+    limiter = RateLimiter(rpm=5, tpm=10000, window=1.0)
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire(100)
+    assert 0.8 < time.monotonic() - start < 2.0, "5 immediately, 5 more at 5 per second"
+
+    limiter = RateLimiter(rpm=1000, tpm=1000, window=1.0)
+    limiter.acquire(500)
+    limiter.settle(500, 1500)
+    start = time.monotonic()
+    limiter.acquire(500)
+    assert time.monotonic() - start > 0.8, "the 1000-token overrun has to refill first"
+    print("✓ Rate limiter paces requests and tokens")
+
+
+def test_enrich_csv_runs_rows_concurrently_in_order():
+    """Slow searches overlap, every search goes through the limiter, and rows keep their own results"""
+    original_query = enricher.query_openai_search
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    limiters = set()
+    try:
+        def slow_query(client, brand, model, limiter=None):
+            limiters.add(limiter)
+            time.sleep(random.uniform(0.05, 0.15))
+            return {"title": f"{brand} {model}", "retail_price": 100}
+
+        enricher.query_openai_search = slow_query
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "in.csv")
+            pd.DataFrame({"sku": [f"S{i}" for i in range(40)], "brand": ["Samsung"] * 40,
+                          "mpn": [f"M{i}" for i in range(40)]}).to_csv(source, index=False)
+            output = os.path.join(tmp, "out.csv")
+
+            start = time.monotonic()
+            enricher.enrich_csv(source, output, os.path.join(tmp, "images"), "sku", "brand", "mpn",
+                                max_workers=8, use_cache=False)
+            elapsed = time.monotonic() - start
+
+            df = pd.read_csv(output, dtype=str, keep_default_na=False)
+            assert list(df["title"]) == [f"Samsung M{i}" for i in range(40)]
+            assert set(df["price_40pct"]) == {"40.00"}
+            assert elapsed < 2.0, f"40 searches of ~0.1s on 8 workers took {elapsed:.1f}s"
+            assert len(limiters) == 1 and None not in limiters
+    finally:
+        enricher.query_openai_search = original_query
+    print(f"✓ 40 rows enriched concurrently in {elapsed:.2f}s, in order")
+
+
+def test_enrich_csv_searches_each_product_once():
+    """Duplicate rows share one search and one image; a second run is served from the cache"""
+    server, base = _serve()
+    original_query = enricher.query_openai_search
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    searched = []
+    try:
+        def fake_query(client, brand, model, limiter=None):
+            searched.append((brand, model))
+            if model == "BROKEN":
+                raise enricher.EnrichmentError("no results")
+            return {"title": f"{brand} {model}", "retail_price": 100,
+                    "best_image_url": f"{base}/product.jpg?m={model}"}
+
+        enricher.query_openai_search = fake_query
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = EnrichmentCache(os.path.join(tmp, "cache.db"))
+            source = os.path.join(tmp, "in.csv")
+            pd.DataFrame({"sku": ["A", "B", "C", "D", "E"],
+                          "brand": ["Samsung", "samsung ", "Apple", "SAMSUNG", "Apple"],
+                          "mpn": ["SM-R890", "sm-r890", "A2337", "SM  R890", "BROKEN"]}).to_csv(source, index=False)
+            output = os.path.join(tmp, "out.csv")
+            images = os.path.join(tmp, "images")
+
+            enricher.enrich_csv(source, output, images, "sku", "brand", "mpn", cache=cache)
+            df = pd.read_csv(output, dtype=str, keep_default_na=False)
+
+            assert sorted(searched) == [("Apple", "A2337"), ("Apple", "BROKEN"), ("SAMSUNG", "SM  R890"),
+                                        ("Samsung", "SM-R890")]
+            assert list(df["title"]) == ["Samsung SM-R890", "Samsung SM-R890", "Apple A2337",
+                                         "SAMSUNG SM  R890", ""]
+            assert list(df["image_filename"]) == ["A.jpg", "A.jpg", "C.jpg", "D.jpg", ""]
+            assert sorted(os.listdir(images)) == ["A.jpg", "A_thumb.jpg", "C.jpg", "C_thumb.jpg",
+                                                  "D.jpg", "D_thumb.jpg"]
+            assert cache.get(KIND_SEARCH, product_key("SAMSUNG", "SM-R890"))["title"] == "Samsung SM-R890"
+            assert cache.get(KIND_SEARCH, product_key("Apple", "BROKEN")) is None, "failures are not cached"
+
+            # Only the failed product is searched again
+            del searched[:]
+            enricher.enrich_csv(source, output, images, "sku", "brand", "mpn", cache=cache)
+            assert searched == [("Apple", "BROKEN")]
+            assert list(pd.read_csv(output, dtype=str, keep_default_na=False)["title"]) == list(df["title"])
+    finally:
+        enricher.query_openai_search = original_query
+        server.shutdown()
+    print("✓ Duplicate products searched once and cached across runs")
+
+
+def test_enrich_csv_checkpoints_and_resumes():
+    """A crash keeps finished rows on disk; resume and only_missing search just the rest"""
+    original_query, original_write = enricher.query_openai_search, enricher._write_csv
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    searched, writes = [], []
+    try:
+        def crashing_query(client, brand, model, limiter=None):
+            if model == "M7":
+                raise RuntimeError("process killed")
+            if model == "M3":
+                raise enricher.EnrichmentError("no results")
+            searched.append(model)
+            return {"title": f"{brand} {model}", "retail_price": 100}
+
+        enricher.query_openai_search = crashing_query
+        enricher._write_csv = lambda df, path: (writes.append(path), original_write(df, path))
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "in.csv")
+            pd.DataFrame({"sku": [f"S{i}" for i in range(10)], "brand": ["Samsung"] * 10,
+                          "mpn": [f"M{i}" for i in range(10)]}).to_csv(source, index=False)
+            output = os.path.join(tmp, "out.csv")
+            images = os.path.join(tmp, "images")
+
+            try:
+                enricher.enrich_csv(source, output, images, "sku", "brand", "mpn", max_workers=1,
+                                    use_cache=False, checkpoint_every=2)
+                assert False, "the crash should propagate"
+            except RuntimeError:
+                pass
+            assert len(writes) == 4, "three checkpoints of two rows, then one on the crash"
+            titles = list(pd.read_csv(output, dtype=str, keep_default_na=False)["title"])
+            assert titles[:7] == [f"Samsung M{i}" if i != 3 else "" for i in range(7)]
+            assert titles[7:] == ["", "", ""]
+
+            # Resuming skips finished rows; M3 still fails
+            del searched[:]
+            enricher.query_openai_search = lambda client, brand, model, limiter=None: (
+                crashing_query(client, brand, "M3" if model == "M3" else f"{model}-ok"))
+            enricher.enrich_csv(source, output, images, "sku", "brand", "mpn", use_cache=False, resume=True)
+            assert sorted(searched) == ["M7-ok", "M8-ok", "M9-ok"]
+            df = pd.read_csv(output, dtype=str, keep_default_na=False)
+            assert df.at[2, "title"] == "Samsung M2" and df.at[3, "title"] == ""
+
+            # Retrying the finished file searches only the failed row
+            del searched[:]
+            enricher.query_openai_search = lambda client, brand, model, limiter=None: (
+                crashing_query(client, brand, f"{model}-retry"))
+            enricher.enrich_csv(output, output, images, "sku", "brand", "mpn", use_cache=False, only_missing=True)
+            assert searched == ["M3-retry"]
+            df = pd.read_csv(output, dtype=str, keep_default_na=False)
+            assert df["title"].ne("").all() and df.at[0, "title"] == "Samsung M0"
+            assert not os.path.exists(f"{output}.tmp")
+    finally:
+        enricher.query_openai_search, enricher._write_csv = original_query, original_write
+    print("✓ Enrichment checkpointed, resumed and retried")
+
+
+def test_interrupted_enrichment_stops_searching():
+    """An interrupted run issues only a bounded window of searches past the failure and caches them"""
+    original_query = enricher.query_openai_search
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    searched = []
+    lock = threading.Lock()
+    try:
+        def interrupted_query(client, brand, model, limiter=None):
+            if model == "M5":
+                raise KeyboardInterrupt()
+            with lock:
+                searched.append(model)
+            return {"title": f"{brand} {model}", "retail_price": 100}
+
+        enricher.query_openai_search = interrupted_query
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = EnrichmentCache(os.path.join(tmp, "cache.db"))
+            source = os.path.join(tmp, "in.csv")
+            pd.DataFrame({"sku": [f"S{i}" for i in range(200)], "brand": ["Samsung"] * 200,
+                          "mpn": [f"M{i}" for i in range(200)]}).to_csv(source, index=False)
+
+            try:
+                enricher.enrich_csv(source, os.path.join(tmp, "out.csv"), os.path.join(tmp, "images"),
+                                    "sku", "brand", "mpn", max_workers=2, cache=cache, checkpoint_every=2)
+                assert False, "the interrupt should propagate"
+            except KeyboardInterrupt:
+                pass
+
+            assert len(searched) <= 5 + 2 * 2, f"{len(searched)} searches ran after the interrupt"
+            assert len(cache.get_many(KIND_SEARCH, [product_key("Samsung", m) for m in searched])) == len(searched)
+    finally:
+        enricher.query_openai_search = original_query
+    print(f"✓ Interrupted run stopped after {len(searched)} searches, all cached")
+
+
+if __name__ == "__main__":
+    test_sniff_extension()
+    test_downloader_streams_and_rejects()
+    test_enrich_csv_downloads_in_background()
+    test_rate_limiter_paces_requests_and_tokens()
+    test_enrich_csv_runs_rows_concurrently_in_order()
+    test_enrich_csv_searches_each_product_once()
+    test_enrich_csv_checkpoints_and_resumes()
+    test_interrupted_enrichment_stops_searching()
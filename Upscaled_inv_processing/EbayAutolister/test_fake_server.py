@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the local fake eBay API and the load test harness end to end (no network needed)
+"""
+
+import os
+import sys
+import zlib
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import EbayAPI
+from fake_ebay_server import FakeEbayServer
+from load_test import run_load_test
+
+
+def test_bulk_limit_and_throttling():
+    """Oversized bulk calls are rejected; throttled calls get 429 + Retry-After and EbayAPI rides them out"""
+    with FakeEbayServer(latency_scale=0, rate_limit=20, burst=2) as server:
+        url = f"{server.base_url}/sell/inventory/v1/bulk_create_or_replace_inventory_item"
+        oversized = {"requests": [{"sku": f"S{i}"} for i in range(26)]}
+        response = requests.post(url, json=oversized)
+        assert response.status_code == 400
+
+        api = EbayAPI("id", "secret", min_interval=0, backoff_base=0.01, circuit_threshold=2,
+                      max_retries=10, api_base_url=server.base_url)
+        for i in range(10):
+            result = api._make_request('POST', 'bulk_create_or_replace_inventory_item',
+                                       {"requests": [{"sku": f"SKU-{i}"}]})
+            assert result['responses'][0]['statusCode'] == 200
+
+        assert server.stats['throttled'] > 0
+        assert not api.circuit_breaker.is_open, "429s must not open the circuit"
+        assert len(server.inventory) == 10
+    print("✓ Bulk limit enforced and throttling handled")
+
+
+def test_load_test_accounts_for_every_item():
+    """Every synthetic item ends up created or dead-lettered, and the retry pass recovers transients"""
+    report = run_load_test(items=600, create_listings=True, concurrency=4, latency_scale=0,
+                           transient_rate=0.05, permanent_rate=0.02)
+
+    permanent = sum(1 for i in range(600)
+                    if zlib.crc32(f"LT-{i:06d}".encode('utf-8')) / 2 ** 32 < 0.02)
+    assert report["inventory_created"] + report["inventory_failed"] == 600
+    assert report["dead_letters"]["permanent"] == permanent
+    assert report["dead_letters"]["retryable"] == 0
+    assert report["retry_recovered"] == report["retried"] > 0
+    assert report["listings_created"] == report["inventory_created"]
+    assert report["auto_fixed"] == report["validation"]["fixed"] > 0, "every auto-fix is journaled"
+    assert report["server"]["items_stored"] == 600 - permanent
+    print(f"✓ Load test: {report['items_per_sec']:.0f} items/sec, {report['server']['calls']} calls")
+
+
+if __name__ == "__main__":
+    test_bulk_limit_and_throttling()
+    test_load_test_accounts_for_every_item()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test bulk feed-file mode: feed files, the Feed API task workflow and per-SKU results (no network needed)
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import CompactInventoryItem, EbayAPI
+from fake_ebay_server import FakeEbayServer
+from feed_upload import FeedFileWriter, FeedUploader, parse_result_file
+from load_test import synthesize_catalog
+from test_helpers import fake_ebay
+
+
+def _item(n, **overrides):
+    fields = dict(sku=f"FD-{n:05d}", title=f"Widget <{n}> & more", description='desc',
+                  condition='used', grade='LN', category_id='171485', price=19.5, quantity=2,
+                  brand='Acme', images=[f"https://img/{n}/{i}.jpg" for i in range(15)])
+    fields.update(overrides)
+    return CompactInventoryItem(**fields)
+
+
+def test_feed_file_is_streamed_and_escaped():
+    """Feed files are gzip-compressed, escaped and carry one MessageID per SKU"""
+    path = os.path.join(tempfile.mkdtemp(), 'feed.xml.gz')
+    with FeedFileWriter(path, {"fulfillment_policy_id": "F1"}, max_images=12) as writer:
+        writer.write(_item(1))
+        writer.write(_item(2, upc='012345678905'))
+
+    xml = gzip.decompress(open(path, 'rb').read()).decode('utf-8')
+    assert writer.skus == ['FD-00001', 'FD-00002']
+    assert xml.count('<AddFixedPriceItemRequest') == 2 and '<MessageID>FD-00001</MessageID>' in xml
+    assert 'Widget &lt;1&gt; &amp; more' in xml
+    assert '<ConditionID>2750</ConditionID>' in xml  # grade LN -> LIKE_NEW
+    assert xml.count('<PictureURL>') == 24 and '<UPC>012345678905</UPC>' in xml
+    assert '<ShippingProfileID>F1</ShippingProfileID>' in xml
+    print("✓ Feed files streamed, compressed and escaped")
+
+
+def test_upload_batches_maps_results_per_sku():
+    """Files are split per max_items_per_file, tasks polled, and results mapped back per SKU"""
+    with FakeEbayServer(latency_scale=0, permanent_rate=0.05, feed_polls=2) as server:
+        api = EbayAPI("id", "secret", min_interval=0, api_base_url=server.base_url)
+        uploader = FeedUploader(api, max_items_per_file=40, poll_interval=0.01, timeout=10)
+        items = [_item(n) for n in range(100)]
+        seen = []
+
+        results = uploader.upload_batches([items[i:i + 25] for i in range(0, 100, 25)],
+                                          on_results=seen.append)
+
+        failing = {item.sku for item in items if zlib.crc32(item.sku.encode('utf-8')) / 2 ** 32 < 0.05}
+        assert [task["items"] for task in results["tasks"]] == [40, 40, 20]
+        assert {t["status"] for t in results["tasks"]} <= {"COMPLETED", "COMPLETED_WITH_ERROR"}
+        assert len(seen) == 3
+        assert {f["sku"] for f in results["failed"]} == failing
+        assert len(results["successful"]) == 100 - len(failing) == len(server.listings)
+        listing = results["successful"][0]
+        assert server.listings[listing["sku"]]["itemId"] == listing["listing_id"]
+        assert server.stats['GET /sell/feed/v1/task/{id}'] >= 3 * 3
+
+        result_path = uploader.download_result(results["tasks"][0]["task_id"])
+        assert sum(1 for _ in parse_result_file(result_path)) == 40
+    print("✓ Feed tasks uploaded, polled and mapped per SKU")
+
+
+def test_timed_out_tasks_stay_in_flight():
+    """A task still processing when polling stops is in flight, and is collected later without re-uploading"""
+    with FakeEbayServer(latency_scale=0, feed_polls=1000) as server:
+        api = EbayAPI("id", "secret", min_interval=0, api_base_url=server.base_url)
+        uploader = FeedUploader(api, poll_interval=0.01, timeout=0.05)
+        uploaded = []
+        results = uploader.upload_batches([[_item(1), _item(2)]],
+                                          on_uploaded=lambda task_id, skus: uploaded.append((task_id, skus)))
+
+        assert results["tasks"][0]["status"] == "TIMED_OUT"
+        assert results["failed"] == [] and results["successful"] == []
+        task_id = results["tasks"][0]["task_id"]
+        assert uploaded == [(task_id, ['FD-00001', 'FD-00002'])]
+        assert results["in_flight"] == [{"sku": 'FD-00001', "task_id": task_id},
+                                        {"sku": 'FD-00002', "task_id": task_id}]
+
+        server.feed_polls = 0
+        later = uploader.upload_batches([], in_flight=dict(uploaded))
+
+    assert [entry["sku"] for entry in later["successful"]] == ['FD-00001', 'FD-00002']
+    assert server.stats['POST /sell/feed/v1/task/{id}/upload_file'] == 1
+    print("✓ Timed-out task kept in flight and collected later")
+
+
+def test_resume_collects_in_flight_tasks():
+    """A resumed feed job polls the tasks an earlier run uploaded instead of uploading them again"""
+    work_dir = tempfile.mkdtemp(prefix='feed_test_')
+    csv_path = synthesize_catalog(os.path.join(work_dir, 'catalog.csv'), 30)
+
+    with fake_ebay(work_dir, {'feed_polls': 1000}, feed_poll_interval=0.01, feed_timeout=0.05,
+                   feed_max_items_per_file=20, validate_payloads=False) as (server, autolister):
+
+        first = autolister.process_csv_feed(csv_path, work_dir=work_dir)
+        assert first["feed_in_flight"] == 30 and first["inventory_failed"] == 0
+        assert first["job_status"] == 'partial'
+
+        server.feed_polls = 1
+        autolister.config.feed_timeout = 10
+        second = autolister.process_csv_feed(csv_path, resume=True, work_dir=work_dir)
+
+        assert second["job_id"] == first["job_id"] and second["job_status"] == 'completed'
+        assert second["listings_created"] == 30 and second["feed_in_flight"] == 0
+        assert server.stats['POST /sell/feed/v1/task/{id}/upload_file'] == 2
+        assert [task["file"] for task in second["feed_tasks"]] == [None, None]
+    print("✓ Resume collected in-flight feed tasks")
+
+
+def test_process_csv_feed_journals_and_resumes():
+    """Feed mode journals per-SKU outcomes and a resume only re-feeds what is not listed"""
+    work_dir = tempfile.mkdtemp(prefix='feed_test_')
+    csv_path = synthesize_catalog(os.path.join(work_dir, 'catalog.csv'), 120)
+
+    with fake_ebay(work_dir, {'transient_rate': 0.1}, feed_poll_interval=0.01,
+                   feed_max_items_per_file=50) as (server, autolister):
+        first = autolister.process_csv_feed(csv_path, work_dir=work_dir)
+        assert first["listings_created"] == first["inventory_created"] == len(server.listings)
+        assert first["inventory_failed"] > 0 and first["job_status"] == 'partial'
+
+        second = autolister.process_csv_feed(csv_path, resume=True, work_dir=work_dir)
+        assert second["job_id"] == first["job_id"]
+        assert second["listings_created"] == len(server.listings) == 120 - first["validation"]["rejected"]
+        assert sum(task["items"] for task in second["feed_tasks"]) == first["inventory_failed"] - \
+            first["validation"]["rejected"]
+    print("✓ Feed mode journals outcomes and resumes")
+
+
+if __name__ == "__main__":
+    test_feed_file_is_streamed_and_escaped()
+    test_upload_batches_maps_results_per_sku()
+    test_timed_out_tasks_stay_in_flight()
+    test_resume_collects_in_flight_tasks()
+    test_process_csv_feed_journals_and_resumes()
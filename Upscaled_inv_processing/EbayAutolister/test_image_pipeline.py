@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Test the concurrent image pipeline against a local image host (no network needed)
+"""
+
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from image_hashing import ImageHashIndex
+from image_pipeline import ImageCacheStore, ImagePipeline, ImageSource, model_key
+
+
+def _photo(seed: str, width: int) -> bytes:
+    """JPEG of a smooth pattern unique to seed, at the given width"""
+    rng = random.Random(seed)
+    base = Image.new("RGB", (8, 8))
+    base.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(64)])
+    out = io.BytesIO()
+    base.resize((width, width), Image.BICUBIC).save(out, "JPEG", quality=80)
+    return out.getvalue()
+
+
+class _ImageHost(BaseHTTPRequestHandler):
+    """/img/* is an image, /page/* is HTML, anything else is 404;
+    GET /photo/<seed>/<width> serves an actual photo"""
+    heads = Counter()
+    gets = Counter()
+
+    def do_GET(self):
+        _ImageHost.gets[self.path] += 1
+        parts = self.path.strip('/').split('/')
+        if parts[0] != 'photo':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = _photo(parts[1], int(parts[2]))
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        _ImageHost.heads[self.path] += 1
+        if self.path.startswith('/img/'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+        elif self.path.startswith('/page/'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+        else:
+            self.send_response(404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeTradingAPI:
+    def __init__(self, fail_item=None):
+        self.fail_item = fail_item
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def revise_item_pictures(self, item_id, image_urls):
+        with self.lock:
+            self.calls.append((item_id, list(image_urls)))
+        if item_id == self.fail_item:
+            return {'Ack': 'Failure', 'Errors': [{'LongMessage': 'Item ended'}]}
+        return {'Ack': 'Success'}
+
+
+def _serve():
+    _ImageHost.heads.clear()
+    _ImageHost.gets.clear()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ImageHost)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_sources_fall_through_and_models_are_shared():
+    """Sources run in order until enough images validate; each model and URL is looked up once"""
+    server, base = _serve()
+    searched = Counter()
+    try:
+        def primary(brand, model):
+            searched[model_key(brand, model)] += 1
+            if model.upper() == 'SM-R890':
+                return [f"{base}/img/{model}-1.jpg", f"{base}/missing.jpg", f"{base}/page/{model}"]
+            return []
+
+        def fallback(brand, model):
+            return [f"{base}/img/{model}-1.jpg", f"{base}/img/shared.jpg", f"{base}/img/{model}-2.jpg"]
+
+        def broken(brand, model):
+            raise RuntimeError("quota exceeded")
+
+        listings = [
+            {'sku': 'A', 'item_id': '100', 'brand': 'Samsung', 'model': 'SM-R890'},
+            {'sku': 'B', 'item_id': '101', 'brand': 'samsung ', 'model': 'sm-r890'},
+            {'sku': 'C', 'item_id': '102', 'brand': 'Samsung', 'model': 'SM-T500'},
+            {'sku': 'D', 'item_id': 'ITEM_ID_HERE', 'brand': 'Samsung', 'model': 'SM-T500'},
+            {'sku': 'E', 'item_id': '104', 'brand': 'Samsung', 'model': ''},
+        ]
+        api = FakeTradingAPI(fail_item='102')
+        pipeline = ImagePipeline(api, [ImageSource('broken', broken), ImageSource('primary', primary),
+                                       ImageSource('fallback', fallback)])
+        seen = []
+        results = pipeline.run(listings, on_result=lambda status, record: seen.append((status, record['sku'])))
+
+        assert searched == {('SAMSUNG', 'SM-R890'): 1, ('SAMSUNG', 'SM-T500'): 1}
+        assert sorted(r['sku'] for r in results['successful']) == ['A', 'B']
+        assert results['failed'] == [{'sku': 'C', 'item_id': '102', 'error': 'Item ended'}]
+        assert sorted(r['sku'] for r in results['skipped']) == ['D', 'E']
+        assert len(seen) == 5
+
+        r890 = results['images']['SAMSUNG SM-R890']
+        assert r890['sources'] == ['primary', 'fallback']
+        assert r890['images'] == [f"{base}/img/SM-R890-1.jpg", f"{base}/img/shared.jpg", f"{base}/img/SM-R890-2.jpg"]
+        assert len(api.calls) == 3
+        assert max(_ImageHost.heads.values()) == 1, "every URL is HEAD-checked once per run"
+    finally:
+        server.shutdown()
+    print("✓ Sources fall through in order and models are searched once")
+
+
+def test_dry_run_and_no_images():
+    """Dry runs never revise listings; models with no valid candidates fail every listing"""
+    server, base = _serve()
+    try:
+        source = ImageSource('host', lambda brand, model: [f"{base}/img/{model}.jpg"] if model != 'X' else
+                             [f"{base}/missing.jpg"])
+        api = FakeTradingAPI()
+        listings = [{'sku': f"S{i}", 'item_id': str(i), 'brand': 'Samsung', 'model': 'X' if i % 2 else f"M{i}"}
+                    for i in range(20)]
+        results = ImagePipeline(api, [source], validate_workers=4).run(listings, dry_run=True)
+
+        assert api.calls == []
+        assert len(results['successful']) == 10
+        assert {r['error'] for r in results['failed']} == {'No valid images found'}
+        assert len(results['failed']) == 10
+    finally:
+        server.shutdown()
+    print("✓ Dry run and empty results handled")
+
+
+def test_cache_skips_search_and_rechecks_stale_entries():
+    """Cached models need no search; stale entries are HEAD-checked and topped up when images died"""
+    server, base = _serve()
+    searched = Counter()
+    try:
+        def source(brand, model):
+            searched[model] += 1
+            return [f"{base}/img/{model}-{i}.jpg" for i in range(3)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ImageCacheStore(os.path.join(tmp, "images.db"))
+            listings = [{'sku': 'A', 'item_id': '1', 'brand': 'Samsung', 'model': 'SM-R890'}]
+
+            ImagePipeline(FakeTradingAPI(), [ImageSource('host', source)], cache=cache).run(listings)
+            assert searched['SM-R890'] == 1
+            assert cache.get(' samsung', 'sm-r890 ')['fresh']
+
+            _ImageHost.heads.clear()
+            api = FakeTradingAPI()
+            results = ImagePipeline(api, [ImageSource('host', source)], cache=cache).run(
+                [dict(listings[0], brand='SAMSUNG', model='sm-r890')])
+            assert searched['SM-R890'] == 1 and not _ImageHost.heads, "fresh hits make no network calls"
+            assert results['images']['SAMSUNG SM-R890']['cached']
+            assert len(api.calls[0][1]) == 3
+
+            # Age the entry past the re-check interval and kill one image
+            conn = sqlite3.connect(cache.db_path)
+            conn.execute("UPDATE model_images SET checked_at = 0, images_json = ?",
+                         (f'["{base}/img/SM-R890-0.jpg", "{base}/gone.jpg"]',))
+            conn.commit()
+            conn.close()
+            assert cache.get_stats() == {'models': 1, 'stale': 1}
+
+            results = ImagePipeline(FakeTradingAPI(), [ImageSource('host', source)], cache=cache).run(listings)
+            found = results['images']['SAMSUNG SM-R890']
+            assert not found['cached'] and searched['SM-R890'] == 2
+            assert found['images'] == [f"{base}/img/SM-R890-{i}.jpg" for i in range(3)]
+            assert cache.get_stats() == {'models': 1, 'stale': 0}
+    finally:
+        server.shutdown()
+    print("✓ Image cache reused and re-checked")
+
+
+def test_hash_index_collapses_duplicates_and_remembers_bad_photos():
+    """The same photo at other URLs/sizes is kept once; bad photos and hashed URLs are not fetched again"""
+    server, base = _serve()
+    try:
+        def source(brand, model):
+            return [f"{base}/photo/front/1600", f"{base}/photo/front/800", f"{base}/photo/placeholder/500",
+                    f"{base}/photo/back/1200", f"{base}/missing.jpg", f"{base}/photo/side/1000"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            index = ImageHashIndex(os.path.join(tmp, "hashes.db"))
+            listings = [{'sku': 'A', 'item_id': '1', 'brand': 'Samsung', 'model': 'SM-R890'}]
+
+            results = ImagePipeline(FakeTradingAPI(), [ImageSource('host', source)], hash_index=index).run(listings)
+            assert results['images']['SAMSUNG SM-R890']['images'] == [
+                f"{base}/photo/front/1600", f"{base}/photo/placeholder/500", f"{base}/photo/back/1200"]
+            assert index.get_stats() == {'hashed': 5, 'unusable': 1, 'bad': 0}
+
+            # Flag the placeholder; a copy of it at another URL is now rejected too
+            assert index.mark_bad_url(f"{base}/photo/placeholder/500", "no image tile")
+            _ImageHost.gets.clear()
+
+            def source_with_copy(brand, model):
+                return source(brand, model) + [f"{base}/photo/placeholder/700"]
+
+            results = ImagePipeline(FakeTradingAPI(), [ImageSource('host', source_with_copy)],
+                                    hash_index=index).run(listings)
+            assert results['images']['SAMSUNG SM-R890']['images'] == [
+                f"{base}/photo/front/1600", f"{base}/photo/back/1200", f"{base}/photo/side/1000"]
+            assert list(_ImageHost.gets) == [], "hashed and failed URLs are answered from the index"
+    finally:
+        server.shutdown()
+    print("✓ Near-duplicates collapsed and bad photos remembered")
+
+
+if __name__ == "__main__":
+    test_sources_fall_through_and_models_are_shared()
+    test_dry_run_and_no_images()
+    test_cache_skips_search_and_rechecks_stale_entries()
+    test_hash_index_collapses_duplicates_and_remembers_bad_photos()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the image processing stage: resize, metadata stripping, recompression and thumbnails
+"""
+
+import os
+import sys
+import tempfile
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from image_processing import ImageProcessor, process_image
+
+
+def _noisy(size, mode="RGB"):
+    """Incompressible test image so size caps actually bite"""
+    return Image.frombytes(mode, size, os.urandom(size[0] * size[1] * len(mode)))
+
+
+def test_resize_strip_and_thumbnail():
+    """Large images are downsized, EXIF is applied then dropped, alpha is flattened and PNGs become JPEGs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Stored landscape, EXIF says rotate 90 degrees: the result should be portrait
+        rotated = os.path.join(tmp, "SKU-1.jpg")
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "Camera Maker"
+        _noisy((3200, 2400)).save(rotated, "JPEG", quality=95, exif=exif)
+
+        transparent = os.path.join(tmp, "SKU-2.png")
+        Image.new("RGBA", (800, 600), (255, 0, 0, 0)).save(transparent)
+
+        with open(os.path.join(tmp, "SKU-3.jpg"), "wb") as f:
+            f.write(b"<html>not an image</html>")
+
+        results = ImageProcessor(max_workers=2).process_directory(tmp)
+        by_name = {os.path.basename(r['source']): r for r in results}
+
+        first = by_name["SKU-1.jpg"]
+        assert (first['width'], first['height']) == (1200, 1600)
+        assert first['bytes_after'] < first['bytes_before']
+        with Image.open(first['path']) as image:
+            assert not image.getexif()
+        with Image.open(first['thumbnail']) as thumb:
+            assert max(thumb.size) == 225
+
+        second = by_name["SKU-2.png"]
+        assert second['path'].endswith("SKU-2.jpg") and not os.path.exists(transparent)
+        with Image.open(second['path']) as image:
+            assert image.mode == "RGB" and image.getpixel((10, 10)) == (255, 255, 255)
+            assert image.size == (800, 600), "small images are never upscaled"
+
+        assert 'error' in by_name["SKU-3.jpg"]
+
+        # Thumbnails are not reprocessed on a second pass, and processed images are left as they are
+        processed = open(first['path'], "rb").read()
+        again = ImageProcessor(max_workers=1).process_directory(tmp)
+        assert len(again) == 3
+        assert [r.get('skipped') for r in again] == [True, True, None]
+        assert open(first['path'], "rb").read() == processed
+    print("✓ Images resized, stripped and thumbnailed")
+
+
+def test_size_cap_lowers_quality():
+    """An image over the byte cap is re-encoded at lower quality"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big.jpg")
+        _noisy((1200, 1200)).save(path, "JPEG", quality=95)
+
+        uncapped = process_image(path, max_bytes=50 * 1024 * 1024, thumbnail_size=None, force=True)
+        _noisy((1200, 1200)).save(path, "JPEG", quality=95)
+        capped = process_image(path, max_bytes=uncapped['bytes_after'] // 2, thumbnail_size=None)
+
+        assert capped['bytes_after'] < uncapped['bytes_after']
+        assert capped['thumbnail'] is None
+    print("✓ Size cap enforced")
+
+
+def test_source_that_is_the_target_is_kept():
+    """X.JPG and X.jpg naming one file (case-insensitive filesystems) must not delete the result"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "SKU-1.JPG")
+        _noisy((2000, 1000)).save(source, "JPEG", quality=95)
+        # A hard link stands in for the case-folded name
+        os.link(source, os.path.join(tmp, "SKU-1.jpg"))
+
+        result = process_image(source, thumbnail_size=None)
+
+        assert os.path.exists(source) and os.path.samefile(source, result['path'])
+        with Image.open(result['path']) as image:
+            assert image.size == (1600, 800)
+    print("✓ Same-file source kept")
+
+
+if __name__ == "__main__":
+    test_resize_strip_and_thumbnail()
+    test_size_cap_lowers_quality()
+    test_source_that_is_the_target_is_kept()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the local inventory mirror: paging, incremental refresh and reconciliation (no network needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import InventoryItem
+from test_helpers import fake_ebay
+
+OFFER_CALLS = 'GET /sell/inventory/v1/offer'
+
+
+def _ebay_item(title, quantity=1):
+    return {'product': {'title': title}, 'condition': 'USED_GOOD',
+            'availability': {'shipToLocationAvailability': {'quantity': quantity}}}
+
+
+def _items(skus, price=10.0):
+    return [InventoryItem(sku=sku, title="t", description="d", condition='good',
+                          category_id='9355', price=price, quantity=1)
+            for sku in skus]
+
+
+def test_incremental_refresh_and_reconcile():
+    """Second refresh only fetches offers for the changed SKU; reconcile finds gaps"""
+    with fake_ebay() as (server, autolister):
+        mirror = autolister.inventory.mirror
+        for i in range(250):
+            sku = f"SKU-{i:03d}"
+            server.inventory[sku] = _ebay_item(f"Item {i}")
+            server.offers[f"O-{sku}"] = {'offerId': f"O-{sku}", 'sku': sku, 'status': 'PUBLISHED',
+                                         'pricingSummary': {'price': {'value': '10.0'}}}
+            server.offer_ids_by_sku[sku] = f"O-{sku}"
+
+        first = mirror.refresh(autolister.api, page_size=100)
+        assert first['pages'] == 3 and first['offer_calls'] == server.stats[OFFER_CALLS] == 250
+        assert mirror.get_item('SKU-007')['product']['title'] == 'Item 7'
+
+        server.inventory['SKU-120'] = _ebay_item('Item 120 v2', quantity=3)
+        del server.inventory['SKU-249']
+        second = mirror.refresh(autolister.api, page_size=100)
+        assert second['items_changed'] == 1 and second['items_removed'] == 1
+        assert second['offer_calls'] == 1 and server.stats[OFFER_CALLS] == 251
+
+        report = mirror.reconcile(_items(['SKU-001', 'SKU-001', 'SKU-120', 'NEW-1']))
+        assert report['duplicate_csv_skus'] == ['SKU-001']
+        assert report['missing_on_ebay'] == ['NEW-1']
+        assert report['quantity_mismatch'] == [{'sku': 'SKU-120', 'csv': 1, 'ebay': 3}]
+        assert len(report['not_in_csv']) == 247
+    print(f"✓ Incremental refresh: {second}")
+
+
+def test_offer_changes_reach_the_mirror():
+    """Repricing and publishing update the mirror without a full refresh"""
+    with fake_ebay() as (server, autolister):
+        mirror = autolister.inventory.mirror
+        server.rejected['bulk_publish_offer'] = {"B"}
+        autolister._sync_items(_items(["A", "B"]), create_listings=True)
+        mirror.refresh(autolister.api)
+
+        report = mirror.reconcile(_items(["A", "B"]))
+        assert report['unpublished'] == ["B"] and not report['price_mismatch']
+
+        # Offer-only changes: nothing an incremental refresh would pick up
+        server.rejected.clear()
+        autolister._sync_items(_items(["A", "B"], price=12.5), create_listings=True)
+        assert mirror.refresh(autolister.api)['offer_calls'] == 0
+
+        report = mirror.reconcile(_items(["A", "B"], price=12.5))
+        assert report['unpublished'] == [] and report['price_mismatch'] == []
+        assert mirror.get_offers("B")[0]['listing']['listingId']
+    print("✓ Repriced and published offers written through to the mirror")
+
+
+def test_inventory_upserts_reach_the_mirror():
+    """Created or replaced inventory items are read back from the mirror without a refresh"""
+    with fake_ebay() as (server, autolister):
+        inventory = autolister.inventory
+        inventory.bulk_create_inventory_items(_items(["A", "B"]))
+        edited = _items(["A"])[0]
+        edited.title, edited.quantity = "Edited", 4
+        assert inventory.create_inventory_item(edited)
+
+        assert inventory.get_inventory_item("A")['product']['title'] == "Edited"
+        assert inventory.get_inventory_item("B")['availability']['shipToLocationAvailability'] == {'quantity': 1}
+        assert inventory.mirror.item_updated_at("B")
+        assert server.stats['GET /sell/inventory/v1/inventory_item/{id}'] == 0
+    print("✓ Inventory upserts written through to the mirror")
+
+
+if __name__ == "__main__":
+    test_incremental_refresh_and_reconcile()
+    test_offer_changes_reach_the_mirror()
+    test_inventory_upserts_reach_the_mirror()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test resumable listing jobs: a crashed run resumes without repeating calls (no network needed)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import job_journal
+from ebay_autolister import InventoryItem, CSVProcessor
+from test_helpers import fake_ebay
+
+
+class Crash(BaseException):
+    """Simulates the process dying mid-run (not swallowed by batch error handling)"""
+
+
+def _crash_after(api, calls: int):
+    """Make the client die before its (calls + 1)th request reaches the server"""
+    make_request = api._make_request
+
+    def _make_request(*args, **kwargs):
+        nonlocal calls
+        if calls == 0:
+            raise Crash()
+        calls -= 1
+        return make_request(*args, **kwargs)
+
+    api._make_request = _make_request
+
+
+def test_resume_after_crash():
+    """Crash during offers, resume, and every SKU is sent exactly once per stage"""
+    work_dir = tempfile.mkdtemp(prefix='journal_test_')
+    journal = job_journal.JobJournal(os.path.join(work_dir, 'journal.db'))
+    source = os.path.join(work_dir, 'items.csv')
+    items = [InventoryItem(sku=f"SKU-{i}", title="t", description="d", condition='good',
+                           category_id='9355', price=5.0, quantity=1) for i in range(100)]
+
+    with fake_ebay(work_dir, max_concurrent_batches=1) as (server, autolister):
+
+        # 4 inventory batches + 1 offer batch, then die
+        _crash_after(autolister.api, 5)
+        job_id = journal.start_or_resume('process_csv', source, resume=False, options={"create_listings": True})
+        try:
+            autolister.run_listing_job(CSVProcessor.batched(items, 25), True, journal, job_id)
+            raise AssertionError("Expected simulated crash")
+        except Crash:
+            pass
+        first_run = dict(server.sent)
+
+        del autolister.api._make_request
+        resumed_id = journal.start_or_resume('process_csv', source, resume=True)
+        assert resumed_id == job_id
+        stages = []
+        autolister.run_listing_job(CSVProcessor.batched(items, 25), True, journal, resumed_id,
+                                   on_stage=stages.append)
+        journal.finish_job(resumed_id)
+        assert stages == [job_journal.STAGE_INVENTORY, job_journal.STAGE_OFFER]
+
+    assert first_run == {'bulk_create_or_replace_inventory_item': 100, 'bulk_create_offer': 25}
+    assert dict(server.sent) == {'bulk_create_or_replace_inventory_item': 100, 'bulk_create_offer': 100,
+                                 'bulk_publish_offer': 100}, "each SKU once per inventory/offer/publish"
+
+    results = journal.build_results(job_id)
+    assert results['inventory_created'] == 100 and results['listings_created'] == 100
+    assert journal.get_job(job_id)['status'] == job_journal.JOB_COMPLETED
+    assert journal.find_resumable('process_csv', source) is None
+    print(f"✓ Resumed job {job_id}: {sum(server.sent.values()) - sum(first_run.values())} "
+          f"remaining requests, no repeats")
+
+
+if __name__ == "__main__":
+    test_resume_after_crash()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the compact item type and shared inventory payload builder (no network needed)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ebay_autolister import (CompactInventoryItem, ConditionMapper, InventoryItem,
+                             InventoryPayloadBuilder, item_to_dict)
+from test_helpers import fake_ebay
+
+
+def _fields(sku='SKU-1', **overrides):
+    fields = dict(sku=sku, title='Widget', description='A widget', condition='used',
+                  category_id='9355', price=19.99, quantity=2, brand='Acme', upc='123',
+                  grade='B', images=[f"https://img/{i}.jpg" for i in range(15)])
+    fields.update(overrides)
+    return fields
+
+
+def _record_calls(api) -> list:
+    """Record the (method, endpoint, data, body) of each call the client makes to the fake server"""
+    calls = []
+    make_request = api._make_request
+
+    def _make_request(method, endpoint, data=None, body=None, **kwargs):
+        calls.append((method, endpoint, data, body))
+        return make_request(method, endpoint, data=data, body=body, **kwargs)
+
+    api._make_request = _make_request
+    return calls
+
+
+def test_compact_item_matches_dataclass():
+    """CompactInventoryItem has InventoryItem's fields and defaults, without a __dict__"""
+    full = InventoryItem(**_fields(images=None))
+    compact = CompactInventoryItem(**_fields(images=None))
+
+    assert item_to_dict(full) == item_to_dict(compact)
+    assert compact.images == [] and compact.dimensions['length'] == 10.0
+    assert not hasattr(compact, '__dict__')
+    print("✓ Compact item mirrors InventoryItem")
+
+
+def test_single_and_bulk_payloads_share_builder():
+    """The single-item PUT body is the bulk entry without 'sku'"""
+    with fake_ebay() as (server, autolister):
+        manager = autolister.inventory
+        calls = _record_calls(manager.api)
+        item = InventoryItem(**_fields())
+
+        assert manager.create_inventory_item(item)
+        assert [call[:2] for call in calls] == [('PUT', 'inventory_item/SKU-1')]
+        data = server.inventory['SKU-1']
+
+    bulk_entry = manager.build_inventory_payload(item)
+    assert bulk_entry.pop('sku') == 'SKU-1'
+    assert bulk_entry == data
+    assert data['condition'] == ConditionMapper.map_condition('used', 'B')
+    assert data['conditionDescription'] == ConditionMapper.get_condition_description('used', 'B')
+    assert len(data['product']['imageUrls']) == 12
+    assert data['product']['upc'] == ['123']
+    print("✓ Single and bulk payloads come from one builder")
+
+
+def test_batch_serialized_once():
+    """Bulk batches go out as pre-serialized bytes and map back per SKU"""
+    with fake_ebay() as (server, autolister):
+        manager = autolister.inventory
+        calls = _record_calls(manager.api)
+        items = [CompactInventoryItem(**_fields(f"SKU-{i}")) for i in range(5)]
+
+        results = manager.bulk_create_inventory_items(items, batch_size=5)
+
+        assert results['successful'] == [f"SKU-{i}" for i in range(5)]
+        assert server.sent['bulk_create_or_replace_inventory_item'] == 5
+        _, endpoint, data, body = calls[0]
+    assert endpoint == 'bulk_create_or_replace_inventory_item'
+    assert data is None and isinstance(body, bytes)
+    assert json.loads(body)['requests'][0] == manager.build_inventory_payload(items[0])
+    print("✓ Batch serialized once as bytes")
+
+
+def test_condition_fields_cached():
+    """Condition mapping/description are computed once per (condition, grade)"""
+    ConditionMapper.condition_fields.cache_clear()
+    builder = InventoryPayloadBuilder(max_images=3)
+    for i in range(50):
+        builder.build(CompactInventoryItem(**_fields(f"SKU-{i}")))
+
+    info = ConditionMapper.condition_fields.cache_info()
+    assert info.misses == 1 and info.hits == 49
+    print("✓ Condition fields cached per (condition, grade)")
+
+
+if __name__ == "__main__":
+    test_compact_item_matches_dataclass()
+    test_single_and_bulk_payloads_share_builder()
+    test_batch_serialized_once()
+    test_condition_fields_cached()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test offline payload validation: rules, auto-fix, category policies and the report (no network needed)
+"""
+
+import csv
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import CompactInventoryItem, CSVProcessor
+from payload_validator import (CategoryPolicyStore, PayloadValidator, SEVERITY_ERROR,
+                               SEVERITY_FIXED, fetch_condition_policy)
+
+
+def _item(sku='SKU-1', **overrides):
+    fields = dict(sku=sku, title='Apple iPad 9th Gen 64GB', description='Tablet', condition='good',
+                  category_id='171485', price=199.0, quantity=1, brand='Apple',
+                  images=['https://img/1.jpg'])
+    fields.update(overrides)
+    return CompactInventoryItem(**fields)
+
+
+def _store() -> CategoryPolicyStore:
+    return CategoryPolicyStore(os.path.join(tempfile.mkdtemp(prefix='policy_test_'), 'policies.db'))
+
+
+def test_auto_fix_repairs_in_place():
+    """With auto_fix on, fixable problems are repaired and the item stays in the batch"""
+    validator = PayloadValidator(auto_fix=True)
+    item = _item(title='Word ' * 30, brand='', description='', upc='12-34',
+                 images=[f"https://img/{i}.jpg" for i in range(15)] + ['local.jpg'],
+                 dimensions={'length': 8.0})
+
+    clean, rejected = validator.validate_batch([item])
+
+    assert clean == [item] and not rejected
+    assert len(item.title) <= 80 and not item.title.endswith(' ')
+    assert item.brand == 'Unbranded' and item.description == item.title and item.upc == ''
+    assert len(item.images) == 12
+    assert item.dimensions == {'length': 8.0, 'width': 10.0, 'height': 10.0}
+    assert validator.report.fixed == 1
+    print("✓ Auto-fix repairs items in place")
+
+
+def test_rejects_unfixable_and_no_fix_mode():
+    """Hard errors always reject; with auto_fix off (the default), fixable problems reject too"""
+    validator = PayloadValidator()
+    _, rejected = validator.validate_batch([_item(price=0), _item('SKU-2', category_id='phones'),
+                                            _item('SKU-3', weight=0)])
+    assert [r['sku'] for r in rejected] == ['SKU-1', 'SKU-2', 'SKU-3']
+    assert rejected[0]['error'].startswith('Validation failed: Invalid price')
+
+    strict = PayloadValidator()
+    clean, rejected = strict.validate_batch([_item(brand='')])
+    assert not clean and rejected[0]['validation'][0]['severity'] == SEVERITY_ERROR
+    assert rejected[0]['error'].endswith('(VALIDATION_AUTO_FIX=true would fix some of these)')
+    print("✓ Unfixable items rejected")
+
+
+def test_category_condition_policy():
+    """Disallowed conditions are downgraded to the nearest allowed one, never upgraded"""
+    store = _store()
+    store.set_policy('171485', ['NEW', 'USED_EXCELLENT', 'FOR_PARTS_OR_NOT_WORKING'])
+    validator = PayloadValidator(policies=store, auto_fix=True)
+
+    graded = _item(condition='used', grade='LN')
+    refurb = _item('SKU-2', condition='seller refurbished')
+    clean, rejected = validator.validate_batch([graded, refurb])
+
+    assert clean == [graded] and graded.condition == 'USED_EXCELLENT' and graded.grade == ''
+    assert rejected[0]['sku'] == 'SKU-2'
+    print("✓ Category condition policies enforced")
+
+
+def test_policy_fetch_cached():
+    """Policies are fetched once per category and persisted"""
+    class MetadataAPI:
+        metadata_url = 'https://metadata'
+        calls = 0
+
+        def _make_request(self, method, endpoint, data=None, body=None, base_url=None):
+            assert base_url == self.metadata_url and data['filter'] == 'categoryIds:{9355}'
+            MetadataAPI.calls += 1
+            return {'itemConditionPolicies': [{'categoryId': '9355', 'itemConditions': [
+                {'conditionId': '1000'}, {'conditionId': '3000'}]}]}
+
+    api = MetadataAPI()
+    store = _store()
+    fetch = lambda category_id: fetch_condition_policy(api, category_id)
+    for _ in range(3):
+        assert store.get_policy('9355', fetch=fetch) == {'NEW', 'USED_EXCELLENT'}
+    assert CategoryPolicyStore(store.db_path).get_policy('9355') == {'NEW', 'USED_EXCELLENT'}
+    assert MetadataAPI.calls == 1
+    print("✓ Category policies fetched once and cached")
+
+
+def test_filter_batches_rebatches_and_reports():
+    """Streamed batches are re-packed after rejections and every issue lands in the report"""
+    validator = PayloadValidator()
+    rejected_batches = []
+    items = [_item(f"SKU-{i}", price=0 if i % 4 == 0 else 10.0) for i in range(20)]
+
+    out = list(validator.filter_batches(CSVProcessor.batched(items, 5), 5,
+                                        on_rejected=rejected_batches.append))
+
+    assert [len(b) for b in out] == [5, 5, 5]
+    assert sum(len(r['failed']) for r in rejected_batches) == 5
+    assert validator.report.summary()['rejected'] == 5
+
+    path = validator.report.write_csv(os.path.join(tempfile.mkdtemp(), 'report.csv'))
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 5 and rows[0]['rule'] == 'price'
+    assert all(row['severity'] != SEVERITY_FIXED for row in rows)
+    print("✓ filter_batches re-batches and reports")
+
+
+def test_filter_batches_reports_fixes_per_sku():
+    """Every auto-fix is passed to on_fixed per SKU, and nothing is fixed unless auto_fix is on"""
+    items = [_item('SKU-1', brand=''), _item('SKU-2'), _item('SKU-3', upc='12-34', price=0)]
+    fixed_batches = []
+    out = list(PayloadValidator(auto_fix=True).filter_batches([items], on_fixed=fixed_batches.append))
+
+    assert [item.sku for item in out[0]] == ['SKU-1', 'SKU-2']
+    assert len(fixed_batches) == 1 and fixed_batches[0]['failed'] == []
+    assert [entry['sku'] for entry in fixed_batches[0]['successful']] == ['SKU-1']
+    assert 'Unbranded' in fixed_batches[0]['successful'][0]['fixes'][0]
+
+    fixed_batches.clear()
+    out = list(PayloadValidator().filter_batches([[_item('SKU-4', brand='')]], on_fixed=fixed_batches.append))
+    assert out == [] and fixed_batches == []
+    print("✓ Auto-fixes reported per SKU")
+
+
+if __name__ == "__main__":
+    test_auto_fix_repairs_in_place()
+    test_rejects_unfixable_and_no_fix_mode()
+    test_category_condition_policy()
+    test_policy_fetch_cached()
+    test_filter_batches_rebatches_and_reports()
+    test_filter_batches_reports_fixes_per_sku()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test price/quantity-only repricing via bulk_update_price_quantity (no network needed)
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import InventoryManager
+from fake_ebay_server import FakeEbayServer
+from test_helpers import fake_ebay
+from sync_state import KIND_OFFER, get_sync_state
+
+CALLS = 'POST /sell/inventory/v1/bulk_update_price_quantity'
+
+
+def _seed(server: FakeEbayServer, sku: str, *offers):
+    """Put a live inventory item and its offers (offer_id, status) on the fake server"""
+    server.inventory[sku] = {"availability": {"shipToLocationAvailability": {"quantity": 1}}}
+    for offer_id, status in offers:
+        server.offers[offer_id] = {"offerId": offer_id, "sku": sku, "status": status,
+                                   "pricingSummary": {"price": {"value": "10.00", "currency": "USD"}}}
+        server.offer_ids_by_sku[sku] = offer_id
+
+
+def test_reprice_from_pricing_output():
+    """60 priced SKUs go out in 3 calls; pricing errors and unknown offers are skipped"""
+    work_dir = tempfile.mkdtemp(prefix='reprice_test_')
+    with fake_ebay(work_dir) as (server, autolister):
+        autolister.inventory.mirror = None
+        for i in range(60):
+            _seed(server, f"SKU-{i}", (f"O-{i}", "PUBLISHED"))
+        get_sync_state().mark_synced(KIND_OFFER, {f"SKU-{i}": "h" for i in range(60)},
+                                     remote_ids={f"SKU-{i}": f"O-{i}" for i in range(60)})
+
+        csv_path = os.path.join(work_dir, 'prices.csv')
+        rows = [{'sku': f"SKU-{i}", 'buy_it_now_price': 20 + i, 'quantity': 2, 'confidence': 0.8}
+                for i in range(60)]
+        rows.append({'sku': 'SKU-ERR', 'buy_it_now_price': 0, 'quantity': 1, 'confidence': 0})
+        rows.append({'sku': 'SKU-NO-OFFER', 'buy_it_now_price': 15, 'quantity': 1, 'confidence': 0.9})
+        pd.DataFrame(rows).to_csv(csv_path, index=False)
+
+        results = autolister.reprice_from_csv(csv_path)
+
+        assert server.stats[CALLS] == 3 and server.sent['bulk_update_price_quantity'] == 60
+        assert server.offers['O-0']['pricingSummary']['price'] == {'value': '20.00', 'currency': 'USD'}
+        assert server.inventory['SKU-59']['availability']['shipToLocationAvailability'] == {'quantity': 2}
+        assert len(results['successful']) == 60
+        assert [f['sku'] for f in results['failed']] == ['SKU-NO-OFFER']
+    print(f"✓ Repriced {len(results['successful'])} SKUs in {server.stats[CALLS]} calls")
+
+
+def test_price_without_offer_is_never_sent():
+    """bulk_update_price_quantity fails price updates that have no offer instead of dropping the price"""
+    assert InventoryManager.build_price_quantity_request({"sku": "A", "quantity": 2, "offer_id": "O-1"}) == {
+        "sku": "A", "shipToLocationAvailability": {"quantity": 2},
+        "offers": [{"offerId": "O-1", "availableQuantity": 2}]}
+
+    with fake_ebay() as (server, autolister):
+        _seed(server, "A")
+        _seed(server, "B")
+        results = autolister.inventory.bulk_update_price_quantity([
+            {"sku": "A", "price": 12.0, "quantity": 3},
+            {"sku": "B", "quantity": 4},
+        ])
+
+        assert results["successful"] == ["B"]
+        assert results["failed"][0]["sku"] == "A" and not results["failed"][0]["retryable"]
+        assert server.sent['bulk_update_price_quantity'] == 1
+        assert server.inventory["A"]["availability"]["shipToLocationAvailability"] == {"quantity": 1}
+    print("✓ Price without offer reported as failed")
+
+
+def test_reprice_picks_the_published_offer():
+    """Mirrored SKUs with several offers reprice the published one, or fail when that is ambiguous"""
+    with fake_ebay() as (server, autolister):
+        _seed(server, "MULTI", ("O-OLD", "UNPUBLISHED"), ("O-LIVE", "PUBLISHED"))
+        _seed(server, "TWINS", ("O-T1", "UNPUBLISHED"), ("O-T2", "UNPUBLISHED"))
+        autolister.inventory.mirror._store_offers("MULTI", [server.offers["O-OLD"], server.offers["O-LIVE"]])
+        autolister.inventory.mirror._store_offers("TWINS", [server.offers["O-T1"], server.offers["O-T2"]])
+
+        results = autolister.reprice([{"sku": "MULTI", "price": 30.0}, {"sku": "TWINS", "price": 40.0}])
+
+        assert results["successful"] == ["MULTI"]
+        assert server.offers["O-LIVE"]["pricingSummary"]["price"]["value"] == "30.00"
+        assert server.offers["O-OLD"]["pricingSummary"]["price"]["value"] == "10.00"
+        assert results["failed"][0]["sku"] == "TWINS" and "Ambiguous" in results["failed"][0]["error"]
+    print("✓ Published offer preferred; ambiguous SKU failed")
+
+
+if __name__ == "__main__":
+    test_reprice_from_pricing_output()
+    test_price_without_offer_is_never_sent()
+    test_reprice_picks_the_published_offer()
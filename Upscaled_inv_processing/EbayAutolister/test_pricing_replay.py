@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the pricing record/replay layer and offline benchmark (no network needed)
+"""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark_pricing
+from ebay_pricing.replay import ProviderRecorder, ReplayMissError, set_recorder, MODE_REPLAY
+
+
+def test_record_then_replay():
+    """A synthesized cassette replays the whole manifest with zero misses"""
+    work_dir = tempfile.mkdtemp(prefix='replay_test_')
+    manifest = os.path.join(work_dir, 'manifest.csv')
+    cassette = os.path.join(work_dir, 'cassette.jsonl')
+
+    benchmark_pricing.cmd_synthesize(SimpleNamespace(
+        skus=60, unique_ratio=0.3, seed=7, manifest=manifest, cassette=cassette
+    ))
+
+    rows = benchmark_pricing.load_manifest(manifest)
+    recorder = ProviderRecorder(mode=MODE_REPLAY, cassette_path=cassette, latency_scale=0)
+    set_recorder(recorder)
+    benchmark_pricing._fresh_pricing_state()
+
+    run = benchmark_pricing.price_manifest(rows, workers=4)
+    report = benchmark_pricing.build_report(run, recorder, workers=4, latency_scale=0)
+
+    assert report['skus'] == 60
+    assert report['errors'] == 0, run['errors']
+    assert not report['replay_misses']
+    assert report['provider_calls']['tavily'] > 0
+    assert report['cache_hits'] + report['cache_misses'] == 60
+    print(f"✓ Replayed {report['skus']} SKUs, cache hit rate {report['cache_hit_rate']:.0%}")
+
+    set_recorder(None)
+
+
+def test_replay_miss_raises():
+    """Unrecorded requests fail loudly instead of reaching the network"""
+    work_dir = tempfile.mkdtemp(prefix='replay_test_')
+    cassette = os.path.join(work_dir, 'empty.jsonl')
+    open(cassette, 'w').close()
+
+    recorder = ProviderRecorder(mode=MODE_REPLAY, cassette_path=cassette, latency_scale=0)
+    key = ProviderRecorder.make_key('tavily', query='unrecorded')
+
+    try:
+        recorder.call('tavily', key, lambda: {'results': []})
+    except ReplayMissError:
+        assert recorder.get_stats()['misses'] == {'tavily': 1}
+        print("✓ Replay miss raised")
+        return
+
+    raise AssertionError("Expected ReplayMissError")
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_replay_miss_raises()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test payload-hash diff sync only pushes changed SKUs (no network needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_autolister import InventoryItem
+from test_helpers import fake_ebay
+from sync_state import KIND_OFFER, get_sync_state
+
+
+def _items(prices):
+    return [InventoryItem(sku=f"SKU-{i}", title=f"Item {i}", description="desc", condition='good',
+                          category_id='9355', price=price, quantity=1)
+            for i, price in enumerate(prices)]
+
+
+def test_only_changed_skus_are_pushed():
+    """A re-run after editing a few rows sends only those rows"""
+    with fake_ebay() as (server, autolister):
+
+        prices = [10.0] * 200
+        first = autolister._sync_items(_items(prices), create_listings=True)
+        assert first['inventory_created'] == 200 and first['listings_created'] == 200
+
+        server.sent.clear()
+        items = _items(prices)
+        items[3].title = "Edited title"
+        items[50].price = 12.5
+        second = autolister._sync_items(items, create_listings=True)
+
+        assert second['inventory_created'] == 1 and second['inventory_unchanged'] == 199
+        assert second['listings_repriced'] == 1 and second['listings_created'] == 0
+        assert dict(server.sent) == {'bulk_create_or_replace_inventory_item': 1,
+                                     'bulk_update_price_quantity': 1}
+    print(f"✓ Second sync sent {dict(server.sent)}")
+
+
+def test_unpublished_offer_is_published_not_recreated():
+    """An offer whose publish failed keeps its offerId and is published on the next sync"""
+    with fake_ebay() as (server, autolister):
+        server.rejected['bulk_publish_offer'] = {"SKU-1"}
+
+        first = autolister._sync_items(_items([10.0] * 3), create_listings=True)
+        assert first['listings_created'] == 2 and first['listings_failed'] == 1
+        assert get_sync_state().get_pending(KIND_OFFER, ["SKU-1"]) == {
+            "SKU-1": server.offer_ids_by_sku["SKU-1"]}
+
+        server.rejected.clear()
+        server.sent.clear()
+        second = autolister._sync_items(_items([10.0] * 3), create_listings=True)
+
+        assert second['listings_created'] == 1 and second['listings_failed'] == 0
+        assert second['listings_unchanged'] == 2
+        assert 'bulk_create_offer' not in server.sent, "the existing offer must not be created again"
+        assert server.sent['bulk_publish_offer'] == 1
+        assert all(offer['status'] == 'PUBLISHED' for offer in server.offers.values())
+        assert not get_sync_state().get_pending(KIND_OFFER, ["SKU-1"])
+    print("✓ Unpublished offer finished on the next sync")
+
+
+if __name__ == "__main__":
+    test_only_changed_skus_are_pushed()
+    test_unpublished_offer_is_published_not_recreated()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test Trading API AddItems batching and the concurrent upload executor (no network needed)
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_trading_uploader import EbayTradingAPI
+
+NS = 'urn:ebay:apis:eBLBaseComponents'
+
+
+def _item(n):
+    return {'title': f"Item {n} & co", 'description': 'desc', 'category_id': '178893', 'price': 10.0,
+            'quantity': 1, 'condition': 'USED_GOOD', 'sku': f"SKU-{n}", 'brand': 'Samsung',
+            'model': 'SM-R890', 'fulfillment_policy_id': 'F', 'payment_policy_id': 'P',
+            'return_policy_id': 'R'}
+
+
+def _response(containers, ack='Success', call_errors=''):
+    return (f'<?xml version="1.0" encoding="UTF-8"?><AddItemsResponse xmlns="{NS}">'
+            f'<Ack>{ack}</Ack>{call_errors}{"".join(containers)}</AddItemsResponse>')
+
+
+def _container(message_id, item_id=None, error=None, severity='Error'):
+    body = f"<CorrelationID>{message_id}</CorrelationID>"
+    if item_id:
+        body += f"<ItemID>{item_id}</ItemID>"
+    if error:
+        body += (f"<Errors><ShortMessage>{error}</ShortMessage><LongMessage>{error}</LongMessage>"
+                 f"<ErrorCode>1</ErrorCode><SeverityCode>{severity}</SeverityCode></Errors>")
+    return f"<AddItemResponseContainer>{body}</AddItemResponseContainer>"
+
+
+class FakeTradingAPI(EbayTradingAPI):
+    """Answers AddItems locally: SKUs ending in 3 fail, others get ItemID 9000+n"""
+
+    def __init__(self, latency=0.0, min_interval=0.0):
+        super().__init__('dev', 'app', 'cert', 'token', sandbox=True, min_interval=min_interval)
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _post_xml(self, call_name, xml_body):
+        self._rate_limit()
+        with self._lock:
+            self.calls.append((call_name, xml_body))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+        containers = []
+        # Answer out of order to prove results are matched on CorrelationID
+        pairs = re.findall(r'<MessageID>(\d+)</MessageID>.*?<SKU>SKU-(\d+)</SKU>', xml_body, re.S)
+        for message_id, n in reversed(pairs):
+            if n.endswith('3'):
+                containers.append(_container(message_id, error='Bad item'))
+            else:
+                containers.append(_container(message_id, item_id=str(9000 + int(n))))
+        return _response(containers, ack='PartialFailure')
+
+
+def test_add_items_maps_results_per_item():
+    """Per-item results come back in request order, matched by CorrelationID"""
+    api = FakeTradingAPI()
+    results = api.add_items([_item(1), _item(3), _item(4)])
+
+    call_name, xml_body = api.calls[0]
+    assert call_name == 'AddItems' and xml_body.count('<AddItemRequestContainer>') == 3
+    assert 'Item 1 &amp; co' in xml_body
+    assert [r['Ack'] for r in results] == ['Success', 'Failure', 'Success']
+    assert results[0]['ItemID'] == '9001' and results[1]['ItemID'] is None
+    assert results[1]['Errors'][0]['LongMessage'] == 'Bad item'
+
+    try:
+        api.add_items([_item(n) for n in range(6)])
+        assert False, "more than ADD_ITEMS_LIMIT items should be rejected"
+    except ValueError:
+        pass
+    print("✓ AddItems results mapped per item")
+
+
+def test_call_level_failure_marks_every_item():
+    """Request-level errors (no containers) fail every item in the batch"""
+    api = EbayTradingAPI('dev', 'app', 'cert', 'token', sandbox=True)
+    errors = ('<Errors><ShortMessage>Auth</ShortMessage><LongMessage>Invalid token</LongMessage>'
+              '<SeverityCode>Error</SeverityCode></Errors>')
+    results = api._parse_add_items_response(_response([], ack='Failure', call_errors=errors), 2)
+    assert [r['Ack'] for r in results] == ['Failure', 'Failure']
+    assert results[1]['Errors'][0]['LongMessage'] == 'Invalid token'
+
+    warning = _response([_container(0, item_id='1', error='Minor', severity='Warning')])
+    assert api._parse_add_items_response(warning, 1)[0]['Ack'] == 'Warning'
+    print("✓ Call-level failures mark every item")
+
+
+def test_upload_items_batches_concurrently():
+    """Uploads chunk into batches of 5, run concurrently, and keep input order"""
+    api = FakeTradingAPI(latency=0.05)
+    items = [_item(n) for n in range(23)]
+    seen_batches = []
+
+    started = time.perf_counter()
+    results = api.upload_items(items, max_workers=4, on_batch=lambda b, r: seen_batches.append(len(b)))
+    elapsed = time.perf_counter() - started
+
+    assert len(api.calls) == 5 and sorted(seen_batches) == [3, 5, 5, 5, 5]
+    assert 1 < api.max_in_flight <= 4
+    assert elapsed < 5 * 0.05
+    assert [r['ItemID'] for r in results[:3]] == ['9000', '9001', '9002']
+    assert sum(r['Ack'] == 'Failure' for r in results) == 2  # SKU-3 and SKU-13
+    print("✓ upload_items batches and runs concurrently")
+
+
+def test_shared_limiter_spaces_calls():
+    """Concurrent workers still respect min_interval between call starts"""
+    api = FakeTradingAPI(min_interval=0.05)
+    started = time.perf_counter()
+    api.upload_items([_item(n) for n in range(20)], max_workers=4)
+    assert len(api.calls) == 4
+    assert time.perf_counter() - started >= 3 * 0.05 - 0.01
+    print("✓ Shared limiter spaces out concurrent calls")
+
+
+if __name__ == "__main__":
+    test_add_items_maps_results_per_item()
+    test_call_level_failure_marks_every_item()
+    test_upload_items_batches_concurrently()
+    test_shared_limiter_spaces_calls()
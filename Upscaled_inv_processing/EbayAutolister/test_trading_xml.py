@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the Trading API request builder and incremental response parser (no network needed)
+"""
+
+import io
+import os
+import sys
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trading_xml import EBAY_NS, TradingRequestBuilder, cdata, parse_response, xml_escape
+
+NS = {'e': EBAY_NS}
+
+
+def test_escaping_is_safe():
+    """Markup, quotes and invalid control characters never break the document"""
+    assert xml_escape('A & B <c> "d" \'e\'') == 'A &amp; B &lt;c&gt; &quot;d&quot; &apos;e&apos;'
+    assert xml_escape('bad\x00\x0bchars\ttab') == 'badchars\ttab'
+    assert xml_escape(None) == '' and xml_escape(12.5) == '12.5'
+    assert cdata('<b>x</b> ]]> y') == '<![CDATA[<b>x</b> ]]]]><![CDATA[> y]]>'
+    print("✓ Escaping is safe")
+
+
+def test_requests_are_well_formed():
+    """Every rendered request parses and carries the escaped values"""
+    builder = TradingRequestBuilder('tok&en')
+    item = {'title': 'Galaxy Watch <46mm> & band', 'description': '<p>Works ]]> great</p>\x01',
+            'category_id': '178893', 'price': 99.5, 'quantity': 1, 'condition': 'LIKE_NEW',
+            'sku': 'SKU"1', 'brand': 'Samsung', 'model': 'SM-R890',
+            'images': [f"https://img/{i}.jpg?a=1&b=2" for i in range(15)]}
+
+    root = ET.fromstring(builder.add_fixed_price_item(item))
+    assert root.find('e:RequesterCredentials/e:eBayAuthToken', NS).text == 'tok&en'
+    assert root.find('e:Item/e:Title', NS).text == 'Galaxy Watch <46mm> & band'
+    assert root.find('e:Item/e:Description', NS).text == '<p>Works ]]> great</p>'
+    assert root.find('e:Item/e:ConditionID', NS).text == '1500'
+    assert len(root.findall('e:Item/e:PictureDetails/e:PictureURL', NS)) == 12
+
+    root = ET.fromstring(builder.add_items([item, dict(item, sku='SKU-2')]))
+    assert [m.text for m in root.findall('e:AddItemRequestContainer/e:MessageID', NS)] == ['0', '1']
+
+    root = ET.fromstring(builder.revise_pictures('1234', ['https://img/a.jpg?x=1&y=2']))
+    assert root.tag == f"{{{EBAY_NS}}}ReviseFixedPriceItemRequest"
+    assert root.find('e:Item/e:PictureDetails/e:PictureURL', NS).text == 'https://img/a.jpg?x=1&y=2'
+
+    root = ET.fromstring(builder.get_item(sku='A<B'))
+    assert root.find('e:SKU', NS).text == 'A<B'
+    print("✓ Requests are well formed")
+
+
+def test_parse_response_call_level():
+    """Call-level Ack/ItemID/Errors, ignoring nested ErrorParameters, from text or a stream"""
+    xml = (f'<ReviseFixedPriceItemResponse xmlns="{EBAY_NS}"><Ack>Warning</Ack>'
+           '<Errors><ShortMessage>Minor</ShortMessage><LongMessage>Picture resized</LongMessage>'
+           '<ErrorCode>21917</ErrorCode><SeverityCode>Warning</SeverityCode>'
+           '<ErrorParameters ParamID="0"><Value>ignored</Value></ErrorParameters></Errors>'
+           '<ItemID>1234</ItemID></ReviseFixedPriceItemResponse>')
+    for source in (xml, xml.encode('utf-8'), io.BytesIO(xml.encode('utf-8'))):
+        result = parse_response(source)
+        assert result['Ack'] == 'Warning' and result['ItemID'] == '1234'
+        assert result['Errors'] == [{'ErrorCode': '21917', 'ShortMessage': 'Minor',
+                                     'LongMessage': 'Picture resized', 'SeverityCode': 'Warning'}]
+    print("✓ Call-level fields parsed")
+
+
+def test_parse_response_containers():
+    """Per-item containers keep their own ItemID/Errors, separate from call-level fields"""
+    containers = ''.join(
+        f'<AddItemResponseContainer><CorrelationID>{i}</CorrelationID>'
+        + (f'<ItemID>{1000 + i}</ItemID>' if i % 2 == 0 else
+           '<Errors><LongMessage>Bad</LongMessage><SeverityCode>Error</SeverityCode></Errors>')
+        + '</AddItemResponseContainer>'
+        for i in range(1000)
+    )
+    xml = (f'<AddItemsResponse xmlns="{EBAY_NS}"><Ack>PartialFailure</Ack>'
+           f'{containers}</AddItemsResponse>')
+
+    result = parse_response(xml, container='AddItemResponseContainer')
+    assert result['Ack'] == 'PartialFailure' and result['ItemID'] is None and result['Errors'] == []
+    assert len(result['Containers']) == 1000
+    assert result['Containers'][0] == {'CorrelationID': '0', 'Ack': None, 'ItemID': '1000', 'Errors': []}
+    assert result['Containers'][1]['Errors'][0]['LongMessage'] == 'Bad'
+    print("✓ Containers parsed incrementally")
+
+
+if __name__ == "__main__":
+    test_escaping_is_safe()
+    test_requests_are_well_formed()
+    test_parse_response_call_level()
+    test_parse_response_containers()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Trading API XML request builder and incremental response parser
+
+Requests are rendered from templates compiled once at import time (bound
+str.format methods) with every interpolated value escaped through one
+translate table, which also drops characters XML 1.0 cannot carry.
+Responses are parsed with iterparse and elements are cleared as soon as
+their fields are read, so large AddItems/GetItem responses never build a
+full tree.
+
+Usage:
+    builder = TradingRequestBuilder(auth_token)
+    xml = builder.revise_pictures(item_id, image_urls)
+    result = parse_response(response_text)   # {'Ack', 'ItemID', 'Errors'}
+"""
+
+import io
+from typing import Dict, Iterable, List, Union
+from xml.etree import ElementTree as ET
+
+EBAY_NS = 'urn:ebay:apis:eBLBaseComponents'
+
+# eBay accepts at most this many PictureURLs per listing
+MAX_PICTURES = 12
+
+ERROR_FIELDS = ('ErrorCode', 'ShortMessage', 'LongMessage', 'SeverityCode')
+
+# Inventory-style condition names -> Trading API ConditionID
+CONDITION_IDS = {
+    'NEW': '1000',
+    'LIKE_NEW': '1500',
+    'USED_EXCELLENT': '2500',
+    'USED_VERY_GOOD': '2750',
+    'USED_GOOD': '3000',
+    'USED_ACCEPTABLE': '4000',
+    'FOR_PARTS_OR_NOT_WORKING': '7000'
+}
+
+_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&apos;'}
+# Control characters other than tab/newline/carriage return are not valid XML 1.0
+_ESCAPES.update({chr(c): None for c in range(32) if c not in (9, 10, 13)})
+_ESCAPE_TABLE = str.maketrans(_ESCAPES)
+_CDATA_TABLE = str.maketrans({c: v for c, v in _ESCAPES.items() if v is None})
+
+
+def xml_escape(value) -> str:
+    """Escape a value for XML text or attribute content (None -> '')"""
+    if value is None:
+        return ''
+    return str(value).translate(_ESCAPE_TABLE)
+
+
+def cdata(value) -> str:
+    """Wrap HTML/text in CDATA, splitting any ']]>' so it cannot end the section early"""
+    text = '' if value is None else str(value).translate(_CDATA_TABLE)
+    return '<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+
+# Templates (compiled once; fields are escaped before formatting)
+_REQUEST = ('<?xml version="1.0" encoding="utf-8"?>\n'
+            '<{call}Request xmlns="' + EBAY_NS + '">'
+            '<RequesterCredentials><eBayAuthToken>{token}</eBayAuthToken></RequesterCredentials>'
+            '{body}</{call}Request>').format
+
+_ITEM = ('<Item>'
+         '<Title>{title}</Title>'
+         '<Description>{description}</Description>'
+         '<PrimaryCategory><CategoryID>{category_id}</CategoryID></PrimaryCategory>'
+         '<StartPrice>{price}</StartPrice>'
+         '<CategoryMappingAllowed>true</CategoryMappingAllowed>'
+         '<ConditionID>{condition_id}</ConditionID>'
+         '<Country>US</Country>'
+         '<Currency>USD</Currency>'
+         '<DispatchTimeMax>3</DispatchTimeMax>'
+         '<ListingDuration>GTC</ListingDuration>'
+         '<ListingType>FixedPriceItem</ListingType>'
+         '<Location>United States</Location>'
+         '<Quantity>{quantity}</Quantity>'
+         '<SKU>{sku}</SKU>'
+         '<Site>US</Site>'
+         '<ItemSpecifics>{specifics}</ItemSpecifics>'
+         '<PictureDetails><GalleryType>Gallery</GalleryType>{pictures}</PictureDetails>'
+         '<SellerProfiles>'
+         '<SellerShippingProfile><ShippingProfileID>{fulfillment_policy_id}</ShippingProfileID></SellerShippingProfile>'
+         '<SellerReturnProfile><ReturnProfileID>{return_policy_id}</ReturnProfileID></SellerReturnProfile>'
+         '<SellerPaymentProfile><PaymentProfileID>{payment_policy_id}</PaymentProfileID></SellerPaymentProfile>'
+         '</SellerProfiles>'
+         '</Item>').format
+
+_SPECIFIC = '<NameValueList><Name>{0}</Name><Value>{1}</Value></NameValueList>'.format
+_PICTURE = '<PictureURL>{0}</PictureURL>'.format
+_ADD_ITEMS_CONTAINER = '<AddItemRequestContainer><MessageID>{0}</MessageID>{1}</AddItemRequestContainer>'.format
+_REVISE_PICTURES = ('<Item><ItemID>{item_id}</ItemID>'
+                    '<PictureDetails><GalleryType>Gallery</GalleryType>{pictures}</PictureDetails>'
+                    '</Item>').format
+
+PLACEHOLDER_PICTURE = 'https://i.ebayimg.com/images/g/placeholder/s-l500.jpg'
+
+
+class TradingRequestBuilder:
+    """Renders Trading API request bodies for one seller token"""
+
+    def __init__(self, auth_token: str):
+        self.token = xml_escape(auth_token)
+
+    def request(self, call_name: str, body: str) -> str:
+        """Wrap an already-rendered body in the <CallNameRequest> envelope"""
+        return _REQUEST(call=call_name, token=self.token, body=body)
+
+    def item(self, item_data: Dict) -> str:
+        """
+        <Item> element shared by AddFixedPriceItem and AddItems
+
+        item_data should contain:
+        - title, description, category_id, price, quantity, sku
+        - condition: Inventory-style name (e.g. 'USED_GOOD'), see CONDITION_IDS
+        - brand, model, optional images (list of URLs)
+        - fulfillment_policy_id, payment_policy_id, return_policy_id
+        """
+        brand = item_data.get('brand', 'Samsung')
+        model = item_data.get('model', 'SM-R890')
+        # Determine case size based on model
+        case_size = '46mm' if 'R890' in str(model) or 'R895' in str(model) else '40mm'
+        specifics = (('Brand', brand), ('Model', model), ('Case Size', case_size),
+                     ('Band Material', 'Silicone'), ('Compatible Operating System', 'Wear OS'))
+
+        return _ITEM(
+            title=xml_escape(item_data.get('title', 'Item')),
+            description=cdata(item_data.get('description', '')),
+            category_id=xml_escape(item_data.get('category_id', '178')),
+            price=xml_escape(item_data.get('price', 10.00)),
+            condition_id=CONDITION_IDS.get(item_data.get('condition', 'USED_GOOD'), '3000'),
+            quantity=xml_escape(item_data.get('quantity', 1)),
+            sku=xml_escape(item_data.get('sku', '')),
+            specifics=''.join(_SPECIFIC(xml_escape(name), xml_escape(value)) for name, value in specifics),
+            pictures=self.pictures(item_data.get('images') or [PLACEHOLDER_PICTURE]),
+            fulfillment_policy_id=xml_escape(item_data.get('fulfillment_policy_id', '')),
+            return_policy_id=xml_escape(item_data.get('return_policy_id', '')),
+            payment_policy_id=xml_escape(item_data.get('payment_policy_id', ''))
+        )
+
+    @staticmethod
+    def pictures(image_urls: Iterable[str], max_pictures: int = MAX_PICTURES) -> str:
+        """PictureURL elements for up to max_pictures URLs"""
+        urls = list(image_urls)[:max_pictures]
+        return ''.join(_PICTURE(xml_escape(url)) for url in urls)
+
+    def add_fixed_price_item(self, item_data: Dict) -> str:
+        return self.request('AddFixedPriceItem', self.item(item_data))
+
+    def add_items(self, items: List[Dict]) -> str:
+        """AddItems request; each container's MessageID is the item's index"""
+        return self.request('AddItems', ''.join(
+            _ADD_ITEMS_CONTAINER(index, self.item(item_data)) for index, item_data in enumerate(items)
+        ))
+
+    def revise_pictures(self, item_id: str, image_urls: Iterable[str], max_pictures: int = MAX_PICTURES) -> str:
+        """ReviseFixedPriceItem request that replaces a listing's pictures"""
+        return self.request('ReviseFixedPriceItem', _REVISE_PICTURES(
+            item_id=xml_escape(item_id), pictures=self.pictures(image_urls, max_pictures)
+        ))
+
+    def get_item(self, item_id: str = None, sku: str = None, include_specifics: bool = False) -> str:
+        """GetItem request by ItemID or SKU"""
+        key = f"<ItemID>{xml_escape(item_id)}</ItemID>" if item_id else f"<SKU>{xml_escape(sku)}</SKU>"
+        return self.request('GetItem', f"{key}<IncludeItemSpecifics>{str(include_specifics).lower()}"
+                                       f"</IncludeItemSpecifics>")
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _as_stream(source: Union[str, bytes, io.IOBase]):
+    if isinstance(source, str):
+        return io.BytesIO(source.encode('utf-8'))
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def parse_response(source: Union[str, bytes, io.IOBase], container: str = None) -> Dict:
+    """
+    Incrementally parse a Trading API response.
+
+    Args:
+        source: Response text, bytes or a binary stream (e.g. response.raw)
+        container: Repeated per-item element (e.g. 'AddItemResponseContainer');
+            each is collected into 'Containers' with its own CorrelationID,
+            ItemID and Errors, and kept out of the call-level fields
+
+    Returns:
+        {'Ack', 'ItemID', 'Errors': [{ErrorCode, ShortMessage, LongMessage,
+        SeverityCode}], 'Containers': [...]} - Ack/ItemID are the first found
+        outside containers, Errors are all call-level errors
+
+    Raises:
+        xml.etree.ElementTree.ParseError: Malformed XML
+    """
+    result = {'Ack': None, 'ItemID': None, 'Errors': [], 'Containers': []}
+    open_tags = []
+    current = None  # container being filled
+    error = None    # Errors block being filled
+
+    for event, element in ET.iterparse(_as_stream(source), events=('start', 'end')):
+        name = _local(element.tag)
+        if event == 'start':
+            open_tags.append(name)
+            if name == container:
+                current = {'CorrelationID': None, 'Ack': None, 'ItemID': None, 'Errors': []}
+            elif name == 'Errors':
+                error = {}
+            continue
+
+        open_tags.pop()
+        parent = open_tags[-1] if open_tags else None
+        if name == 'Errors' and error is not None:
+            (current if current is not None else result)['Errors'].append(
+                {field: error.get(field) for field in ERROR_FIELDS})
+            error = None
+        elif parent == 'Errors' and error is not None:
+            error[name] = element.text
+        elif name == container and current is not None:
+            result['Containers'].append(current)
+            current = None
+        elif current is not None:
+            if parent == container and name in current and name != 'Errors':
+                current[name] = element.text
+        elif name in ('Ack', 'ItemID') and result[name] is None:
+            result[name] = element.text
+        element.clear()
+
+    return result
@@ -6,11 +6,11 @@ Uses web search to find official product images
 
 import requests
 import os
-import csv
-import json
-import time
 from dotenv import load_dotenv
 from ebay_trading_uploader import EbayTradingAPI
+from image_hashing import get_hash_index
+from image_pipeline import (ImagePipeline, ImageSource, get_image_cache, print_result, print_summary,
+                            read_item_mapping)
 
 load_dotenv()
 
@@ -49,68 +49,17 @@ def search_google_images(query: str, api_key: str = None, cx: str = None) -> lis
 
 def find_samsung_product_images(model: str) -> list:
     """
-    Try to find Samsung product images from various sources
+    Candidate Samsung product image URLs (validated by the image pipeline)
     """
     model_clean = model.strip().replace(' ', '').upper()
 
     # Common Samsung image CDN patterns
-    images = []
-
-    # Pattern 1: Samsung US image server
-    base_urls = [
+    return [
         f"https://image-us.samsung.com/SamsungUS/home/mobile/galaxy-watches/gallery/{model_clean}_Black_Front.jpg",
         f"https://images.samsung.com/is/image/samsung/{model_clean}",
         f"https://image-us.samsung.com/SamsungUS/home/mobile/tablets/pdp/{model_clean}-Front-Black.jpg"
     ]
 
-    # Test which URLs are valid
-    for url in base_urls:
-        try:
-            response = requests.head(url, timeout=5, allow_redirects=True)
-            if response.status_code == 200:
-                images.append(url)
-                if len(images) >= 3:
-                    break
-        except:
-            continue
-
-    return images
-
-
-def update_listing_with_images(api: EbayTradingAPI, item_id: str, image_urls: list) -> bool:
-    """Update eBay listing with product images"""
-
-    if not image_urls:
-        return False
-
-    # Build PictureURL elements
-    picture_urls = '\n'.join([f'            <PictureURL>{url}</PictureURL>' for url in image_urls[:12]])  # eBay max 12 images
-
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<ReviseFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <ItemID>{item_id}</ItemID>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-{picture_urls}
-        </PictureDetails>
-    </Item>
-</ReviseFixedPriceItemRequest>'''
-
-    try:
-        response = api._make_xml_request('ReviseFixedPriceItem', xml_request)
-        if response.get('Ack') in ['Success', 'Warning']:
-            return True
-        else:
-            print(f"  Response: {response.get('Errors', [{}])[0].get('LongMessage', 'Unknown error')}")
-            return False
-    except Exception as e:
-        print(f"  Error: {e}")
-        return False
-
 
 def main():
     # Load configuration
@@ -142,64 +91,19 @@ def main():
 
     # Process the mapping file
     print(f"\nReading {mapping_file}...")
-    updated = 0
-    failed = 0
-    skipped = 0
-
-    with open(mapping_file, 'r') as f:
-        reader = csv.DictReader(f)
-        items = list(reader)
+    items = read_item_mapping(mapping_file)
 
     print(f"Found {len(items)} items to process")
     print("="*80)
 
-    for idx, item in enumerate(items, 1):
-        sku = item['sku']
-        item_id = item['item_id']
-        brand = item['brand']
-        model = item['model']
-
-        if item_id == 'ITEM_ID_HERE' or not item_id:
-            skipped += 1
-            continue
-
-        print(f"\n[{idx}/{len(items)}] {brand} {model}")
-        print(f"  Item ID: {item_id}")
-
-        # Try to find images
-        print(f"  Searching for product images...")
-        images = find_samsung_product_images(model)
-
-        if not images and google_api_key and google_cx:
-            print(f"  Trying Google Image Search...")
-            images = search_google_images(f"{brand} {model} official product", google_api_key, google_cx)
-
-        if not images:
-            print(f"  ⚠ No images found")
-            failed += 1
-            continue
-
-        print(f"  Found {len(images)} image(s)")
-        for img_url in images:
-            print(f"    - {img_url}")
-
-        # Update listing
-        print(f"  Updating listing...")
-        if update_listing_with_images(api, item_id, images):
-            print(f"  ✓ Successfully updated")
-            updated += 1
-        else:
-            print(f"  ✗ Failed to update")
-            failed += 1
-
-        time.sleep(1)  # Rate limiting
-
-    print(f"\n{'='*80}")
-    print("Summary:")
-    print(f"  ✓ Updated: {updated}")
-    print(f"  ✗ Failed: {failed}")
-    print(f"  ⊝ Skipped: {skipped}")
-    print(f"{'='*80}\n")
+    sources = [ImageSource('samsung', lambda brand, model: find_samsung_product_images(model))]
+    if google_api_key and google_cx:
+        sources.append(ImageSource('google', lambda brand, model: search_google_images(
+            f"{brand} {model} official product", google_api_key, google_cx)))
+
+    pipeline = ImagePipeline(api, sources, cache=get_image_cache(), hash_index=get_hash_index())
+    results = pipeline.run(items, on_result=print_result)
+    print_summary(results, len(items))
 
 
 if __name__ == '__main__':
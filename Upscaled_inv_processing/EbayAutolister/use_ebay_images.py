@@ -64,24 +64,8 @@ def update_listing_images(api: EbayTradingAPI, item_id: str, image_urls: list) -
     if not image_urls:
         return False
 
-    picture_urls = '\n'.join([f'            <PictureURL>{url}</PictureURL>' for url in image_urls[:12]])
-
-    xml_request = f'''<?xml version="1.0" encoding="utf-8"?>
-<ReviseFixedPriceItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-    <RequesterCredentials>
-        <eBayAuthToken>{api.auth_token}</eBayAuthToken>
-    </RequesterCredentials>
-    <Item>
-        <ItemID>{item_id}</ItemID>
-        <PictureDetails>
-            <GalleryType>Gallery</GalleryType>
-{picture_urls}
-        </PictureDetails>
-    </Item>
-</ReviseFixedPriceItemRequest>'''
-
     try:
-        response = api._make_xml_request('ReviseFixedPriceItem', xml_request)
+        response = api.revise_item_pictures(item_id, image_urls)
         if response.get('Ack') in ['Success', 'Warning']:
             return True
         else: